@@ -0,0 +1,86 @@
+"""
+WOEplanet Spelunker: benchmarks package; collation keys benchmark.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.templates import collation_key, collator, unicode_sort_filter
+
+logger = logging.getLogger(__name__)
+
+# the place page sorts its children by name; the places with the most aliases have the most names to sort
+HEAVIEST_QUERY = """
+    SELECT woe_id, COUNT(*) as names
+    FROM aliases
+    GROUP BY woe_id
+    ORDER BY names DESC
+    LIMIT ?
+"""
+NAMES_QUERY = 'SELECT name FROM aliases WHERE woe_id = ?'
+
+
+def _uncached_sort(values: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Sort as the filter used to, with a new pyuca key for every name, every render
+    """
+
+    return sorted(values, key=lambda x: collator.sort_key(x.get('name', '')))
+
+
+def _cached_sort(values: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Sort with the filter, and its cached keys
+    """
+
+    return unicode_sort_filter(values, attribute='name')
+
+
+def _time(sort: Callable[[list[dict[str, Any]]], list[dict[str, Any]]], values: list[dict[str, Any]]) -> float:
+    """
+    Time a single sort, in milliseconds
+    """
+
+    start = time.perf_counter()
+    sort(values)
+    return (time.perf_counter() - start) * 1e3
+
+
+def main() -> None:
+    """
+    Collation keys benchmark entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark sorting the names of the places with the most of them')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--places', type=int, default=5, help='number of places, by most names')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+
+    conn = sqlite3.connect(str(db_path))
+    heaviest = conn.execute(HEAVIEST_QUERY, (args.places,)).fetchall()
+
+    logger.info('%-12s %8s %12s %12s %12s', 'woe_id', 'names', 'uncached', 'cold', 'warm')
+    for woe_id, count in heaviest:
+        values = [{'name': row[0]} for row in conn.execute(NAMES_QUERY, (woe_id,))]
+
+        uncached = _time(_uncached_sort, values)
+        collation_key.cache_clear()
+        cold = _time(_cached_sort, values)
+        warm = _time(_cached_sort, values)
+
+        logger.info('%-12d %8d %10.2fms %10.2fms %10.2fms', woe_id, count, uncached, cold, warm)
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
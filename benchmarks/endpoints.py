@@ -0,0 +1,444 @@
+"""
+WOEplanet Spelunker: benchmarks package; endpoints benchmark.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from woeplanet.spelunker.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# relative weights of each route in the request mix, roughly as the server's access logs have them
+ROUTE_MIX = {
+    '/id/{woeid}': 50,
+    '/search': 15,
+    '/nearby': 10,
+    '/countries/{iso}': 10,
+    '/placetypes/{placetype}': 10,
+    '/random': 5,
+}
+
+SAMPLE_PLACES = 1_000
+SAMPLE_QUERY = """
+    SELECT p.woe_id, p.name, p.iso, pt.shortname
+    FROM places p
+    JOIN placetypes pt ON pt.id = p.placetype_id
+    WHERE p.woe_id >= ?
+    ORDER BY p.woe_id
+    LIMIT 1
+"""
+CENTROID_QUERY = 'SELECT lat, lng FROM geometries WHERE woe_id = ?'
+
+UVICORN_HOST = '127.0.0.1'
+UVICORN_STARTUP_TIMEOUT = 120.0  # seconds; each worker's lifespan pre-warms the cache
+REQUEST_TIMEOUT = 60.0  # seconds
+
+Sample = dict[str, Any]
+
+
+@dataclass
+class RouteResult:
+    """
+    Latencies, errors and allocations of one route's requests.
+    """
+
+    latencies: list[float] = field(default_factory=list)  # seconds
+    errors: int = 0
+    allocated: list[int] = field(default_factory=list)  # peak bytes allocated serving a request
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        """
+        Summarize the route's requests; latencies are in milliseconds
+        """
+
+        latencies = sorted(self.latencies)
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': len(latencies),
+            'errors': self.errors,
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'mean_ms': statistics.fmean(latencies) * 1e3 if latencies else None,
+            'p50_ms': cuts[49] * 1e3 if cuts else None,
+            'p95_ms': cuts[94] * 1e3 if cuts else None,
+            'p99_ms': cuts[98] * 1e3 if cuts else None,
+            'allocated_bytes': int(statistics.median(self.allocated)) if self.allocated else None,
+        }
+
+
+def sample_places(db_path: Path, geom_db_path: Path, count: int, rng: random.Random) -> list[Sample]:
+    """
+    Sample places, with their names, countries, placetypes and centroids, the same places for the same seed
+    """
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute('ATTACH DATABASE ? AS geometries', (f'file:{geom_db_path}?mode=ro',))
+
+    # WOEIDs have gaps, so a random point in the range lands on the next place after it
+    low, high = conn.execute('SELECT (SELECT MIN(woe_id) FROM places), (SELECT MAX(woe_id) FROM places)').fetchone()
+    samples = []
+    for _ in range(count):
+        row = conn.execute(SAMPLE_QUERY, (rng.randint(low, high),)).fetchone()
+        centroid = conn.execute(CENTROID_QUERY, (row['woe_id'],)).fetchone()
+        samples.append({**dict(row), 'centroid': tuple(centroid) if centroid else None})
+
+    conn.close()
+    return samples
+
+
+def _place_url(place: Sample) -> str | None:
+    return f'/id/{place["woe_id"]}'
+
+
+def _search_url(place: Sample) -> str | None:
+    return str(httpx.URL('/search', params={'q': place['name']}))
+
+
+def _nearby_url(place: Sample) -> str | None:
+    if place['centroid'] is None:
+        return None
+    lat, lng = place['centroid']
+    return f'/nearby?lat={lat:.6f}&lng={lng:.6f}'
+
+
+def _country_url(place: Sample) -> str | None:
+    iso = place['iso']
+    return f'/countries/{iso}' if iso and len(iso) == 2 and iso.isalpha() else None  # noqa: PLR2004
+
+
+def _placetype_url(place: Sample) -> str | None:
+    return f'/placetypes/{place["shortname"]}'
+
+
+def _random_url(_place: Sample) -> str | None:
+    return '/random'
+
+
+ROUTE_URLS: dict[str, Callable[[Sample], str | None]] = {
+    '/id/{woeid}': _place_url,
+    '/search': _search_url,
+    '/nearby': _nearby_url,
+    '/countries/{iso}': _country_url,
+    '/placetypes/{placetype}': _placetype_url,
+    '/random': _random_url,
+}
+
+
+def request_mix(samples: list[Sample], count: int, mix: dict[str, int], rng: random.Random) -> list[tuple[str, str]]:
+    """
+    Make a sequence of (route, url) requests, with routes in proportion to their weights; the same for the same seed
+    """
+
+    routes = [route for route, weight in mix.items() if weight > 0]
+    weights = [mix[route] for route in routes]
+
+    requests: list[tuple[str, str]] = []
+    while len(requests) < count:
+        route = rng.choices(routes, weights)[0]
+        # not every place has a country or a centroid; sample another
+        url = ROUTE_URLS[route](rng.choice(samples))
+        if url is not None:
+            requests.append((route, url))
+
+    return requests
+
+
+async def run_requests(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, str]],
+    concurrency: int,
+) -> tuple[dict[str, RouteResult], float]:
+    """
+    Make requests, a number at a time, timing each, and the whole run
+    """
+
+    results = {route: RouteResult() for route, _ in requests}
+    queue = iter(requests)
+
+    async def worker() -> None:
+        for route, url in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url)
+                failed = response.is_server_error or response.is_client_error
+            except httpx.HTTPError:
+                failed = True
+            results[route].latencies.append(time.perf_counter() - start)
+            results[route].errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+async def measure_allocations(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, str]],
+    results: dict[str, RouteResult],
+    per_route: int,
+) -> None:
+    """
+    Measure the peak memory allocated serving each of a number of each route's requests, one at a time.
+
+    tracemalloc slows everything down, so this is a separate, untimed, run; it only means anything in-process.
+    """
+
+    counts = dict.fromkeys(results, 0)
+    tracemalloc.start()
+    try:
+        for route, url in requests:
+            if counts[route] >= per_route:
+                continue
+            counts[route] += 1
+
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            results[route].allocated.append(peak - before)
+
+    finally:
+        tracemalloc.stop()
+
+
+@asynccontextmanager
+async def asgi_client() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Drive the app in-process, through its lifespan, as one worker does
+    """
+
+    # the app reads its settings when it's imported, so not until the databases are set
+    from woeplanet.spelunker.server import app  # noqa: PLC0415
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=REQUEST_TIMEOUT) as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((UVICORN_HOST, 0))
+        return int(sock.getsockname()[1])
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Drive the app through a uvicorn server, with a number of workers, as it's run in production
+    """
+
+    port = _free_port()
+    command = [
+        sys.executable,
+        '-m',
+        'uvicorn',
+        'woeplanet.spelunker.server:app',
+        f'--host={UVICORN_HOST}',
+        f'--port={port}',
+        f'--workers={workers}',
+        '--log-level=warning',
+        '--no-server-header',
+    ]
+    server = await asyncio.create_subprocess_exec(*command)
+    try:
+        async with httpx.AsyncClient(base_url=f'http://{UVICORN_HOST}:{port}', timeout=REQUEST_TIMEOUT) as client:
+            deadline = time.monotonic() + UVICORN_STARTUP_TIMEOUT
+            while True:
+                try:
+                    await client.get('/about')
+                    break
+                except httpx.TransportError:
+                    if server.returncode is not None or time.monotonic() > deadline:
+                        msg = 'uvicorn failed to start'
+                        raise RuntimeError(msg) from None
+                    await asyncio.sleep(0.25)
+
+            yield client
+
+    finally:
+        if server.returncode is None:
+            server.terminate()
+        await server.wait()
+
+
+def _commit() -> str | None:
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def bench(args: argparse.Namespace, mix: dict[str, int]) -> dict[str, Any]:
+    """
+    Run the benchmark, returning its results
+    """
+
+    settings = get_settings()
+    rng = random.Random(args.seed)  # noqa: S311
+    samples = sample_places(settings.woeplanet_db_path, settings.woeplanet_geom_db_path, SAMPLE_PLACES, rng)
+    warmup = request_mix(samples, args.warmup, mix, rng)
+    requests = request_mix(samples, args.requests, mix, rng)
+
+    connect = asgi_client() if args.mode == 'asgi' else uvicorn_client(args.workers)
+    async with connect as client:
+        await run_requests(client, warmup, args.concurrency)
+        results, elapsed = await run_requests(client, requests, args.concurrency)
+        if args.mode == 'asgi' and args.allocations:
+            await measure_allocations(client, requests, results, args.allocations)
+
+    return {
+        'commit': _commit(),
+        'recorded_at': time.time(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'mode': args.mode,
+        'workers': args.workers if args.mode == 'uvicorn' else 1,
+        'concurrency': args.concurrency,
+        'seed': args.seed,
+        'mix': mix,
+        'requests': len(requests),
+        'errors': sum(result.errors for result in results.values()),
+        'elapsed': elapsed,
+        'throughput': len(requests) / elapsed,
+        'routes': {route: results[route].summary(elapsed) for route in mix if route in results},
+    }
+
+
+def report(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    """
+    Log a run's results per route, and the change in p50 and throughput from a baseline run, if there's one
+    """
+
+    logger.info(
+        '%s, %d requests, concurrency %d: %.1f req/s, %d errors',
+        results['mode'],
+        results['requests'],
+        results['concurrency'],
+        results['throughput'],
+        results['errors'],
+    )
+    logger.info(
+        '%-24s %8s %8s %10s %10s %10s %12s %10s',
+        'route',
+        'requests',
+        'req/s',
+        'p50',
+        'p95',
+        'p99',
+        'allocated',
+        'p50 Δ',
+    )
+    for route, summary in results['routes'].items():
+        previous = (baseline or {}).get('routes', {}).get(route)
+        delta = ''
+        if previous and previous['p50_ms']:
+            delta = f'{(summary["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"]:+.1%}'
+        allocated = f'{summary["allocated_bytes"]:d}B' if summary['allocated_bytes'] is not None else '-'
+        logger.info(
+            '%-24s %8d %8.1f %8.2fms %8.2fms %8.2fms %12s %10s',
+            route,
+            summary['requests'],
+            summary['throughput'],
+            summary['p50_ms'],
+            summary['p95_ms'],
+            summary['p99_ms'],
+            allocated,
+            delta,
+        )
+
+    if baseline:
+        logger.info(
+            'Throughput %+.1f%% on %s',
+            (results['throughput'] - baseline['throughput']) / baseline['throughput'] * 100,
+            (baseline.get('commit') or 'baseline')[:12],
+        )
+
+
+def _parse_mix(weights: list[str] | None) -> dict[str, int]:
+    mix = dict(ROUTE_MIX)
+    for weight in weights or []:
+        route, _, value = weight.rpartition('=')
+        if route not in mix or not value.isdigit():
+            msg = f'--weight must be one of {", ".join(mix)}, =, and a whole number'
+            raise argparse.ArgumentTypeError(msg)
+        mix[route] = int(value)
+    return mix
+
+
+def main() -> None:
+    """
+    Endpoints benchmark entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark the pages with a weighted mix of requests')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--geom-db', type=Path, help='path to the geometries database (default: from .env)')
+    parser.add_argument('--mode', choices=('asgi', 'uvicorn'), default='asgi', help='in-process, or through uvicorn')
+    parser.add_argument('--workers', type=int, default=2, help='uvicorn workers (default: 2)')
+    parser.add_argument('--requests', type=int, default=2_000, help='number of requests (default: 2000)')
+    parser.add_argument('--warmup', type=int, default=200, help='untimed requests first (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests at a time (default: 8)')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the places and mix of requests (default: 1)')
+    parser.add_argument(
+        '--allocations',
+        type=int,
+        default=20,
+        help='requests per route to measure allocations of, in-process only; 0 to skip (default: 20)',
+    )
+    parser.add_argument('--weight', action='append', help='a route\'s weight in the mix, e.g. "/random=0"')
+    parser.add_argument('--output', type=Path, help='path to write the JSON results to')
+    parser.add_argument('--compare', type=Path, help='path to the JSON results of a previous run to compare to')
+    args = parser.parse_args()
+
+    try:
+        mix = _parse_mix(args.weight)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+
+    # the app's settings come from the environment, for the in-process app and uvicorn's workers alike
+    if args.db:
+        os.environ['WOEPLANET_DB_PATH'] = str(args.db.resolve())
+    if args.geom_db:
+        os.environ['WOEPLANET_GEOM_DB_PATH'] = str(args.geom_db.resolve())
+    get_settings.cache_clear()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.getLogger('httpx').setLevel(logging.WARNING)  # it logs every request
+    baseline = json.loads(args.compare.read_text(encoding='utf-8')) if args.compare else None
+    results = asyncio.run(bench(args, mix))
+    report(results, baseline)
+
+    output = args.output or (
+        get_settings().woeplanet_storage_dir
+        / 'benchmarks'
+        / f'endpoints-{results["mode"]}-{(results["commit"] or "unknown")[:12]}-{int(results["recorded_at"])}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    logger.info('Results written to %s', output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+WOEplanet Spelunker: benchmarks package; place aliases benchmark.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+
+import aiosqlite
+
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.database import Database, PlaceFilters, PlaceQueryShape, _build_place_query
+
+logger = logging.getLogger(__name__)
+
+# as get_place_by_id used to; SQLite encodes every alias as JSON, for Python to decode
+JSON_QUERY = """
+    SELECT json_group_array(json_object('name', name, 'name_type', name_type, 'language', language))
+    FROM aliases
+    WHERE woe_id = ?
+"""
+# a place with its names, and nothing else that's related to it
+NAMES_FILTERS = PlaceFilters(
+    centroid=False,
+    bounding_box=False,
+    geometry=False,
+    exclude_placetypes=[],
+    ancestors=False,
+    hierarchy=False,
+    neighbours=False,
+    children=False,
+)
+BIGGEST_QUERY = 'SELECT woe_id, COUNT(*) as aliases FROM aliases GROUP BY woe_id ORDER BY aliases DESC LIMIT ?'
+
+
+async def _json_aliases(db: Database, conn: aiosqlite.Connection, woe_id: int) -> int:
+    """
+    Get a place, inflating its aliases from a JSON array
+    """
+
+    query, _ = _build_place_query(PlaceQueryShape.from_filters(NAMES_FILTERS))
+    cursor = await conn.execute(query, (woe_id,))
+    place = dict(await cursor.fetchone() or {})
+
+    cursor = await conn.execute(JSON_QUERY, (woe_id,))
+    row = await cursor.fetchone()
+    aliases = json.loads(row[0]) if row else []
+    place['aliases'] = db.inflate_aliases((alias['name'], alias['name_type'], alias['language']) for alias in aliases)
+    return len(place['aliases'])
+
+
+async def _row_aliases(db: Database, _conn: aiosqlite.Connection, woe_id: int) -> int:
+    """
+    Get a place, inflating its aliases from plain rows, as get_place_by_id does
+    """
+
+    place = await db.get_place_by_id(woe_id, NAMES_FILTERS) or {}
+    return len(place['aliases'])
+
+
+async def bench(db_path: Path, places: int, iterations: int) -> None:
+    """
+    Time inflating the aliases of the places with the most of them, both ways
+    """
+
+    conn = await aiosqlite.connect(str(db_path))
+    try:
+        db = Database(conn)
+        cursor = await conn.execute(BIGGEST_QUERY, (places,))
+        biggest = [(row[0], row[1]) for row in await cursor.fetchall()]
+
+        logger.info('%-12s %8s %12s %12s', 'woe_id', 'aliases', 'json', 'rows')
+        for woe_id, count in biggest:
+            timings = []
+            for inflate in (_json_aliases, _row_aliases):
+                await inflate(db, conn, woe_id)  # warm the page cache
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    await inflate(db, conn, woe_id)
+                timings.append((time.perf_counter() - start) / iterations * 1e3)
+
+            logger.info('%-12d %8d %10.2fms %10.2fms', woe_id, count, *timings)
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    """
+    Place aliases benchmark entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark inflating the aliases of the places with the most aliases')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--places', type=int, default=10, help='number of places, by most aliases')
+    parser.add_argument('--iterations', type=int, default=50, help='times to inflate each place')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+    asyncio.run(bench(db_path, args.places, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+WOEplanet Spelunker: benchmarks package; row materialization benchmark.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.records import Record
+
+logger = logging.getLogger(__name__)
+
+PAGE_QUERY = 'SELECT * FROM places WHERE woe_id > ? ORDER BY woe_id LIMIT ?'
+TIMING_ITERATIONS = 200
+
+
+def _dict_rows(conn: sqlite3.Connection, page_size: int) -> list[Any]:
+    """
+    Materialize a page as before; sqlite3.Row, each copied into a dict
+    """
+
+    conn.row_factory = sqlite3.Row
+    return [dict(r) for r in conn.execute(PAGE_QUERY, (0, page_size)).fetchall()]
+
+
+def _record_rows(conn: sqlite3.Connection, page_size: int) -> list[Any]:
+    """
+    Materialize a page as Records
+    """
+
+    conn.row_factory = Record
+    return conn.execute(PAGE_QUERY, (0, page_size)).fetchall()
+
+
+def bench(
+    conn: sqlite3.Connection, page_size: int, name: str, fetch: Callable[[sqlite3.Connection, int], list[Any]]
+) -> None:
+    """
+    Measure the memory a page of rows holds, the peak allocated making it, and the time taken
+    """
+
+    fetch(conn, page_size)  # warm the statement cache
+
+    tracemalloc.start()
+    rows = fetch(conn, page_size)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(TIMING_ITERATIONS):
+        fetch(conn, page_size)
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        '  %-8s %d rows: %8d bytes held, %8d bytes peak, %8.1fµs',
+        name,
+        len(rows),
+        held,
+        peak,
+        elapsed / TIMING_ITERATIONS * 1e6,
+    )
+
+
+def main() -> None:
+    """
+    Row materialization benchmark entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark the memory used materializing result rows')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--page-size', type=int, action='append', help='rows per page (default: 50 and 100)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+
+    conn = sqlite3.connect(str(db_path))
+    for page_size in args.page_size or [50, 100]:
+        logger.info('Page of %d places', page_size)
+        bench(conn, page_size, 'dict', _dict_rows)
+        bench(conn, page_size, 'Record', _record_rows)
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
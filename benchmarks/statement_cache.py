@@ -0,0 +1,108 @@
+"""
+WOEplanet Spelunker: benchmarks package; statement cache benchmark.
+"""
+
+import argparse
+import dataclasses
+import itertools
+import logging
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.database import PlaceFilters, PlaceQueryShape, _build_place_query
+from woeplanet.spelunker.dependencies.statements import STATEMENT_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+SQLITE3_DEFAULT_CACHE_SIZE = 128
+ASSEMBLY_ITERATIONS = 100_000
+
+
+def _place_shapes() -> list[PlaceQueryShape]:
+    """
+    Every place query shape the place pages can ask for, without geometries, which need SpatiaLite
+    """
+
+    flags = ('ancestors', 'hierarchy', 'names', 'neighbours', 'children', 'history', 'licensing', 'deprecated')
+    shapes = []
+    for values in itertools.product((True, False), repeat=len(flags)):
+        changes: dict[str, Any] = dict(zip(flags, values, strict=True))
+        filters = dataclasses.replace(PlaceFilters(geometry=False), **changes)
+        shapes.append(PlaceQueryShape.from_filters(filters))
+
+    return shapes
+
+
+def bench_assembly(shape: PlaceQueryShape) -> None:
+    """
+    Time building a place query's SQL text from its parts, and looking it up once built
+    """
+
+    build = _build_place_query.__wrapped__
+    start = time.perf_counter()
+    for _ in range(ASSEMBLY_ITERATIONS):
+        build(shape)
+    assembled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ASSEMBLY_ITERATIONS):
+        _build_place_query(shape)
+    memoized = time.perf_counter() - start
+
+    logger.info('SQL assembly, per query')
+    logger.info('  assembled: %8.2fµs', assembled / ASSEMBLY_ITERATIONS * 1e6)
+    logger.info('  memoized:  %8.2fµs', memoized / ASSEMBLY_ITERATIONS * 1e6)
+
+
+def bench_prepare(db_path: Path, geom_db_path: Path, shapes: list[PlaceQueryShape], queries: int) -> None:
+    """
+    Time running place queries, cycling through every shape, with statement caches of different sizes
+    """
+
+    statements = [_build_place_query(shape)[0] for shape in shapes]
+
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.execute('SELECT woe_id FROM places ORDER BY random() LIMIT ?', (queries,))
+    woe_ids = random.choices([row[0] for row in cursor.fetchall()], k=queries)  # noqa: S311
+    conn.close()
+
+    logger.info('%d place queries over %d shapes, per query', len(woe_ids), len(statements))
+    for cache_size in (0, SQLITE3_DEFAULT_CACHE_SIZE, STATEMENT_CACHE_SIZE):
+        conn = sqlite3.connect(str(db_path), cached_statements=cache_size)
+        conn.execute('ATTACH DATABASE ? AS geometries', (str(geom_db_path),))
+
+        start = time.perf_counter()
+        for woe_id, query in zip(woe_ids, itertools.cycle(statements), strict=False):
+            conn.execute(query, (woe_id, '[0, 11, 25]')).fetchone()
+        elapsed = time.perf_counter() - start
+        conn.close()
+
+        logger.info('  cached_statements=%-4d %8.2fµs', cache_size, elapsed / len(woe_ids) * 1e6)
+
+
+def main() -> None:
+    """
+    Statement cache benchmark entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark SQL memoization and the prepared statement cache')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--geom-db', type=Path, help='path to the geometries database (default: from .env)')
+    parser.add_argument('--queries', type=int, default=10_000, help='number of place queries to run')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+    geom_db_path = args.geom_db or get_settings().woeplanet_geom_db_path
+
+    shapes = _place_shapes()
+    bench_assembly(shapes[0])
+    bench_prepare(db_path, geom_db_path, shapes, args.queries)
+
+
+if __name__ == '__main__':
+    main()
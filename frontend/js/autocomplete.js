@@ -0,0 +1,61 @@
+/**
+ * Type-ahead suggestions for the search box, from /autocomplete
+ */
+
+const MIN_LENGTH = 2
+const DEBOUNCE_MS = 150
+
+export function initAutocomplete() {
+    const input = document.getElementById('q')
+    if (!input) return
+
+    const datalist = document.createElement('datalist')
+    datalist.id = 'q-suggestions'
+    input.after(datalist)
+    input.setAttribute('list', datalist.id)
+    input.setAttribute('autocomplete', 'off')
+
+    const urls = new Map()
+    let timer = null
+    let controller = null
+
+    input.addEventListener('input', () => {
+        // Picking a suggestion goes straight to the place
+        const url = urls.get(input.value)
+        if (url) {
+            window.location.assign(url)
+            return
+        }
+
+        clearTimeout(timer)
+        timer = setTimeout(async () => {
+            const q = input.value.trim()
+            if (q.length < MIN_LENGTH) return
+
+            if (controller) controller.abort()
+            controller = new AbortController()
+
+            try {
+                const params = new URLSearchParams({ q })
+                const response = await fetch('/autocomplete?' + params.toString(), { signal: controller.signal })
+                if (!response.ok) return
+                const data = await response.json()
+
+                urls.clear()
+                datalist.replaceChildren(
+                    ...data.results.map(result => {
+                        const label = `${result.name} (${result.placetype}, ${result.woe_id})`
+                        urls.set(label, result.url)
+                        const option = document.createElement('option')
+                        option.value = label
+                        return option
+                    })
+                )
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    console.error('Failed to fetch suggestions:', error)
+                }
+            }
+        }, DEBOUNCE_MS)
+    })
+}
@@ -5,9 +5,11 @@
 import { initMap } from './map.js'
 import { initLocation } from './location.js'
 import { initResults } from './results.js'
+import { initAutocomplete } from './autocomplete.js'
 
 document.addEventListener('DOMContentLoaded', () => {
     initMap()
     initLocation()
     initResults()
+    initAutocomplete()
 })
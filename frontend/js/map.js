@@ -1,5 +1,6 @@
 import L from 'leaflet'
 import './label.js'
+import { vectorTileLayer } from './tiles.js'
 
 // Fix Leaflet's default icon paths
 delete L.Icon.Default.prototype._getIconUrl
@@ -26,7 +27,8 @@ const defaults = {
     popup: null,
     scale: null,
     placetype: null,
-    geojson: null
+    geojson_url: null,
+    tiles_url: null
 }
 
 Object.keys(defaults).forEach(key => {
@@ -117,6 +119,13 @@ export class WoeplanetMap {
             ext: 'png'
         }).addTo(this.maps.main)
 
+        if (this.config.tiles_url) {
+            vectorTileLayer(this.config.tiles_url, {
+                minZoom: 0,
+                maxZoom: 20
+            }).addTo(this.maps.main)
+        }
+
         if (!isEmptyObject(this.config.bounds)) {
             this.maps.main.fitBounds(this.config.bounds)
             this.drawGeometry(this.maps.main)
@@ -135,8 +144,8 @@ export class WoeplanetMap {
         }
     }
 
-    drawGeometry(map) {
-        if (isEmptyObject(this.config.geojson)) return
+    async drawGeometry(map) {
+        if (!this.config.geojson_url) return
 
         const style = {
             color: '#6000DB',
@@ -147,7 +156,14 @@ export class WoeplanetMap {
         }
 
         try {
-            L.geoJSON(this.config.geojson, { style }).addTo(map)
+            const response = await fetch(this.config.geojson_url)
+            if (response.status === 404) return
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status} when fetching place GeoJSON`)
+            }
+            const data = await response.json()
+
+            L.geoJSON(data, { style }).addTo(map)
         } catch (error) {
             console.error('Failed to draw geometry:', error)
         }
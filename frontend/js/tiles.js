@@ -0,0 +1,244 @@
+import L from 'leaflet'
+
+/**
+ * Minimal Mapbox Vector Tile reader and Leaflet canvas layer, just enough to draw the
+ * point and polygon layers served by /tiles/{z}/{x}/{y}.mvt
+ */
+
+class ProtobufReader {
+    constructor(buffer) {
+        this.buf = new Uint8Array(buffer)
+        this.pos = 0
+        this.view = new DataView(this.buf.buffer, this.buf.byteOffset, this.buf.byteLength)
+    }
+
+    eof(end) {
+        return this.pos >= end
+    }
+
+    varint() {
+        let result = 0
+        let shift = 0
+        let byte
+        do {
+            byte = this.buf[this.pos++]
+            result += (byte & 0x7f) * Math.pow(2, shift)
+            shift += 7
+        } while (byte & 0x80)
+        return result
+    }
+
+    zigzag(value) {
+        return value % 2 === 1 ? (value + 1) / -2 : value / 2
+    }
+
+    string(length) {
+        const str = new TextDecoder().decode(this.buf.subarray(this.pos, this.pos + length))
+        this.pos += length
+        return str
+    }
+
+    double() {
+        const value = this.view.getFloat64(this.pos, true)
+        this.pos += 8
+        return value
+    }
+
+    packed() {
+        const end = this.varint() + this.pos
+        const values = []
+        while (this.pos < end) values.push(this.varint())
+        return values
+    }
+
+    skip(wireType) {
+        if (wireType === 0) this.varint()
+        else if (wireType === 1) this.pos += 8
+        else if (wireType === 2) this.pos += this.varint()
+        else if (wireType === 5) this.pos += 4
+        else throw new Error(`Unsupported protobuf wire type ${wireType}`)
+    }
+}
+
+function readValue(pbf, end) {
+    let value = null
+    while (!pbf.eof(end)) {
+        const key = pbf.varint()
+        const field = key >> 3
+        if (field === 1) value = pbf.string(pbf.varint())
+        else if (field === 3) value = pbf.double()
+        else if (field === 5) value = pbf.varint()
+        else if (field === 6) value = pbf.zigzag(pbf.varint())
+        else if (field === 7) value = Boolean(pbf.varint())
+        else pbf.skip(key & 0x7)
+    }
+    return value
+}
+
+function decodeGeometry(pbf, commands) {
+    const rings = []
+    let ring = null
+    let x = 0
+    let y = 0
+    let i = 0
+    while (i < commands.length) {
+        const command = commands[i] & 0x7
+        const count = commands[i] >> 3
+        i++
+        if (command === 7) {
+            if (ring) ring.push(ring[0])
+            continue
+        }
+        for (let n = 0; n < count; n++) {
+            x += pbf.zigzag(commands[i++])
+            y += pbf.zigzag(commands[i++])
+            if (command === 1) {
+                ring = []
+                rings.push(ring)
+            }
+            ring.push([x, y])
+        }
+    }
+    return rings
+}
+
+function readFeature(pbf, end) {
+    const feature = { id: null, tags: [], type: 0, rings: [] }
+    while (!pbf.eof(end)) {
+        const key = pbf.varint()
+        const field = key >> 3
+        if (field === 1) feature.id = pbf.varint()
+        else if (field === 2) feature.tags = pbf.packed()
+        else if (field === 3) feature.type = pbf.varint()
+        else if (field === 4) feature.rings = decodeGeometry(pbf, pbf.packed())
+        else pbf.skip(key & 0x7)
+    }
+    return feature
+}
+
+function readLayer(pbf, end) {
+    const layer = { name: null, extent: 4096, features: [], keys: [], values: [] }
+    while (!pbf.eof(end)) {
+        const key = pbf.varint()
+        const field = key >> 3
+        if (field === 1) {
+            layer.name = pbf.string(pbf.varint())
+        } else if (field === 2) {
+            const length = pbf.varint()
+            layer.features.push(readFeature(pbf, pbf.pos + length))
+        } else if (field === 3) {
+            layer.keys.push(pbf.string(pbf.varint()))
+        } else if (field === 4) {
+            const length = pbf.varint()
+            layer.values.push(readValue(pbf, pbf.pos + length))
+        } else if (field === 5) {
+            layer.extent = pbf.varint()
+        } else {
+            pbf.skip(key & 0x7)
+        }
+    }
+
+    layer.features.forEach(feature => {
+        feature.properties = {}
+        for (let i = 0; i < feature.tags.length; i += 2) {
+            feature.properties[layer.keys[feature.tags[i]]] = layer.values[feature.tags[i + 1]]
+        }
+    })
+    return layer
+}
+
+export function decodeTile(buffer) {
+    const pbf = new ProtobufReader(buffer)
+    const layers = {}
+    const end = pbf.buf.length
+    while (!pbf.eof(end)) {
+        const key = pbf.varint()
+        if (key >> 3 === 3) {
+            const length = pbf.varint()
+            const layer = readLayer(pbf, pbf.pos + length)
+            layers[layer.name] = layer
+        } else {
+            pbf.skip(key & 0x7)
+        }
+    }
+    return layers
+}
+
+/**
+ * Canvas grid layer drawing a placetype's vector tiles
+ */
+export const VectorTileLayer = L.GridLayer.extend({
+    options: {
+        color: '#6000DB',
+        fillOpacity: 0.15,
+        radius: 3
+    },
+
+    initialize(url, options) {
+        this._url = url
+        L.GridLayer.prototype.initialize.call(this, options)
+    },
+
+    createTile(coords, done) {
+        const tile = document.createElement('canvas')
+        const size = this.getTileSize()
+        tile.width = size.x
+        tile.height = size.y
+
+        const url = L.Util.template(this._url, coords)
+        fetch(url)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status} when fetching vector tile`)
+                }
+                return response.arrayBuffer()
+            })
+            .then(buffer => {
+                this.drawTile(tile, decodeTile(buffer))
+                done(null, tile)
+            })
+            .catch(error => done(error, tile))
+
+        return tile
+    },
+
+    drawTile(tile, layers) {
+        const ctx = tile.getContext('2d')
+        ctx.strokeStyle = this.options.color
+        ctx.fillStyle = this.options.color
+
+        const geometries = layers.geometries
+        if (geometries) {
+            const scale = tile.width / geometries.extent
+            geometries.features.forEach(feature => {
+                ctx.beginPath()
+                feature.rings.forEach(ring => {
+                    ring.forEach(([x, y], i) => {
+                        if (i === 0) ctx.moveTo(x * scale, y * scale)
+                        else ctx.lineTo(x * scale, y * scale)
+                    })
+                })
+                ctx.globalAlpha = this.options.fillOpacity
+                ctx.fill('evenodd')
+                ctx.globalAlpha = 1
+                ctx.stroke()
+            })
+        }
+
+        const centroids = layers.centroids
+        if (centroids) {
+            const scale = tile.width / centroids.extent
+            centroids.features.forEach(feature => {
+                feature.rings.forEach(([[x, y]]) => {
+                    ctx.beginPath()
+                    ctx.arc(x * scale, y * scale, this.options.radius, 0, 2 * Math.PI)
+                    ctx.fill()
+                })
+            })
+        }
+    }
+})
+
+export function vectorTileLayer(url, options) {
+    return new VectorTileLayer(url, options)
+}
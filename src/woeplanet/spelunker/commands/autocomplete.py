@@ -0,0 +1,163 @@
+"""
+WOEplanet Spelunker: commands package; autocomplete index module.
+"""
+
+import argparse
+import itertools
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from woeplanet.spelunker.common.autocomplete import (
+    AUTOCOMPLETE_LIMIT_MAX,
+    PRECOMPUTED_PREFIX_LENGTH,
+    PRECOMPUTED_PREFIX_NAMES,
+    autocomplete_key,
+    autocomplete_score,
+)
+from woeplanet.spelunker.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_autocomplete_index(db_path: Path) -> None:
+    """
+    Build the autocomplete_names and autocomplete_prefixes tables from aliases.
+
+    autocomplete_names holds one row per normalised name per place, keyed for prefix range scans; autocomplete_prefixes
+    holds the ranked top results for every short prefix, and for every longer prefix of more than
+    PRECOMPUTED_PREFIX_NAMES names, so ranking any other prefix on demand reads no more than that many. Deprecated
+    places and places of unknown placetype are left out. Run this offline, against each new data release.
+    """
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.create_function('autocomplete_key', 1, autocomplete_key, deterministic=True)
+        conn.create_function('autocomplete_score', 2, autocomplete_score, deterministic=True)
+
+        conn.execute('DROP TABLE IF EXISTS autocomplete_prefixes')
+        conn.execute('DROP TABLE IF EXISTS autocomplete_names')
+        conn.execute("""
+            CREATE TABLE autocomplete_names (
+                key TEXT NOT NULL,
+                woe_id INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                name_type TEXT,
+                placetype_id INTEGER NOT NULL,
+                PRIMARY KEY (key, woe_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE autocomplete_prefixes (
+                prefix TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                woe_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                name_type TEXT,
+                placetype_id INTEGER NOT NULL,
+                PRIMARY KEY (prefix, position)
+            ) WITHOUT ROWID
+        """)
+
+        start = time.perf_counter()
+        cursor = conn.execute("""
+            INSERT INTO autocomplete_names (key, woe_id, score, name, name_type, placetype_id)
+            SELECT key, woe_id, MIN(score), name, name_type, placetype_id
+            FROM (
+                SELECT
+                    autocomplete_key(a.name) AS key,
+                    a.woe_id,
+                    autocomplete_score(p.placetype_id, a.name_type) AS score,
+                    a.name,
+                    a.name_type,
+                    p.placetype_id
+                FROM aliases a
+                JOIN places p ON a.woe_id = p.woe_id
+                LEFT JOIN changes ch ON p.woe_id = ch.woe_id
+                WHERE p.placetype_id != 0 AND (ch.superseded_by IS NULL OR ch.woe_id IS NULL)
+            )
+            WHERE key != ''
+            GROUP BY key, woe_id
+        """)
+        logger.info('Names: %d in %.3fs', cursor.rowcount, time.perf_counter() - start)
+
+        # prefixes of more than PRECOMPUTED_PREFIX_NAMES names, of the last length; only these have longer prefixes that
+        # can have as many
+        conn.execute('CREATE TEMP TABLE common_prefixes (prefix TEXT PRIMARY KEY) WITHOUT ROWID')
+        for length in itertools.count(1):
+            start = time.perf_counter()
+            conn.execute('DROP TABLE IF EXISTS prefix_names')
+            conn.execute(
+                """
+                CREATE TEMP TABLE prefix_names AS
+                SELECT
+                    substr(key, 1, ?) AS prefix,
+                    woe_id,
+                    MIN(score) AS score,
+                    name,
+                    name_type,
+                    placetype_id,
+                    COUNT(*) AS names
+                FROM autocomplete_names
+                WHERE length(key) >= ? AND (? <= ? OR substr(key, 1, ?) IN common_prefixes)
+                GROUP BY prefix, woe_id
+                """,
+                (length, length, length, PRECOMPUTED_PREFIX_LENGTH, length - 1),
+            )
+            conn.execute('DELETE FROM common_prefixes')
+            conn.execute(
+                'INSERT INTO common_prefixes SELECT prefix FROM prefix_names GROUP BY prefix HAVING SUM(names) > ?',
+                (PRECOMPUTED_PREFIX_NAMES,),
+            )
+            cursor = conn.execute(
+                """
+                INSERT INTO autocomplete_prefixes (prefix, position, woe_id, name, name_type, placetype_id)
+                SELECT prefix, position, woe_id, name, name_type, placetype_id
+                FROM (
+                    SELECT
+                        prefix,
+                        woe_id,
+                        name,
+                        name_type,
+                        placetype_id,
+                        ROW_NUMBER() OVER (PARTITION BY prefix ORDER BY score, woe_id) AS position
+                    FROM prefix_names
+                    WHERE ? <= ? OR prefix IN common_prefixes
+                )
+                WHERE position <= ?
+                """,
+                (length, PRECOMPUTED_PREFIX_LENGTH, AUTOCOMPLETE_LIMIT_MAX),
+            )
+            logger.info('Prefixes of length %d: %d in %.3fs', length, cursor.rowcount, time.perf_counter() - start)
+
+            if length >= PRECOMPUTED_PREFIX_LENGTH and conn.execute('SELECT 1 FROM common_prefixes').fetchone() is None:
+                break
+
+        conn.execute('DROP TABLE prefix_names')
+        conn.execute('DROP TABLE common_prefixes')
+        conn.commit()
+        conn.execute('ANALYZE autocomplete_names')
+        conn.execute('ANALYZE autocomplete_prefixes')
+
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    """
+    Autocomplete index entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Build the autocomplete index in the WOEplanet database')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+    build_autocomplete_index(db_path)
+
+
+if __name__ == '__main__':
+    main()
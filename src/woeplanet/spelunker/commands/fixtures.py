@@ -0,0 +1,763 @@
+"""
+WOEplanet Spelunker: commands package; fixture databases module.
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import logging
+import math
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pycountry
+
+from woeplanet.spelunker.commands.autocomplete import build_autocomplete_index
+from woeplanet.spelunker.commands.schema import create_databases
+from woeplanet.spelunker.commands.search_index import build_search_index
+from woeplanet.spelunker.commands.simplify import build_simplified_geometries
+from woeplanet.spelunker.commands.spatial_index import build_spatial_index
+from woeplanet.spelunker.config.placetypes import PLACETYPE_ID, PLACETYPE_UNKNOWN, Placetype
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLACES = 100_000
+DEFAULT_SEED = 1
+MIN_PLACES = 1_000
+BATCH_SIZE = 10_000
+LOG_EVERY = 1_000_000
+
+EARTH_WOE_ID = 1
+MIN_COUNTRIES = 20
+PLACES_PER_COUNTRY = 400  # until every country is in
+
+# (shortname, name) of each placetype, by ID, as the placetypes table has them
+PLACETYPE_NAMES: dict[int, tuple[str, str]] = {
+    PLACETYPE_UNKNOWN: ('Undefined', 'Undefined'),
+    6: ('Street', 'Street'),
+    7: ('Town', 'Town'),
+    8: ('State', 'State'),
+    9: ('County', 'County'),
+    10: ('LocalAdmin', 'Local Administrative Area'),
+    11: ('Zip', 'Postal Code'),
+    12: ('Country', 'Country'),
+    13: ('Island', 'Island'),
+    14: ('Airport', 'Airport'),
+    15: ('Drainage', 'Drainage'),
+    16: ('LandFeature', 'Land Feature'),
+    17: ('Miscellaneous', 'Miscellaneous'),
+    18: ('Nationality', 'Nationality'),
+    19: ('Supername', 'Supername'),
+    20: ('POI', 'Point of Interest'),
+    21: ('Region', 'Region'),
+    22: ('Suburb', 'Suburb'),
+    23: ('SportsTeam', 'Sports Team'),
+    24: ('Colloquial', 'Colloquial'),
+    25: ('Zone', 'Zone'),
+    26: ('HistoricalState', 'Historical State'),
+    27: ('HistoricalCounty', 'Historical County'),
+    29: ('Continent', 'Continent'),
+    31: ('Timezone', 'Time Zone'),
+    32: ('NearbyIntersection', 'Nearby Intersection'),
+    33: ('Estate', 'Estate'),
+    35: ('HistoricalTown', 'Historical Town'),
+    36: ('Aggregate', 'Aggregate'),
+    37: ('Ocean', 'Ocean'),
+    38: ('Sea', 'Sea'),
+}
+
+# continents, and roughly where their countries are
+CONTINENTS = (
+    ('Africa', 5.0, 20.0),
+    ('Antarctica', -80.0, 0.0),
+    ('Asia', 35.0, 90.0),
+    ('Europe', 50.0, 15.0),
+    ('North America', 45.0, -100.0),
+    ('Oceania', -25.0, 140.0),
+    ('South America', -15.0, -60.0),
+)
+CONTINENT_WEIGHTS = (54, 1, 48, 44, 23, 14, 12)
+COUNTRY_SPREAD = 20.0  # degrees from the continent's centre
+COUNTRY_ZIPF = 1.1  # place counts by country fall off with rank, so a few countries have most places
+
+# the admin levels below countries, and each level's share of all places
+ADMIN_LEVELS = (
+    (PLACETYPE_ID[Placetype.STATE], 0.0005),
+    (PLACETYPE_ID[Placetype.COUNTY], 0.005),
+    (PLACETYPE_ID[Placetype.LOCAL_ADMIN], 0.02),
+)
+ADMIN_PARETO = 1.2  # how unevenly an admin level's places are spread over its areas
+
+# places outside any country, parented by Earth, and how many there are at most
+WORLD_PLACETYPES = {
+    PLACETYPE_ID[Placetype.OCEAN]: 5,
+    PLACETYPE_ID[Placetype.SEA]: 20,
+    PLACETYPE_ID[Placetype.TIMEZONE]: 40,
+    PLACETYPE_ID[Placetype.REGION]: 20,
+    PLACETYPE_ID[Placetype.NATIONALITY]: 20,
+    PLACETYPE_ID[Placetype.AGGREGATE]: 10,
+    PLACETYPE_ID[Placetype.HISTORICAL_STATE]: 10,
+    PLACETYPE_ID[Placetype.HISTORICAL_COUNTY]: 10,
+}
+
+# the placetypes of the places in local admin areas, by share
+LOCAL_PLACETYPES = {
+    PLACETYPE_ID[Placetype.ZIP]: 40.0,
+    PLACETYPE_ID[Placetype.TOWN]: 25.0,
+    PLACETYPE_ID[Placetype.SUBURB]: 8.0,
+    PLACETYPE_ID[Placetype.POI]: 6.0,
+    PLACETYPE_ID[Placetype.LAND_FEATURE]: 4.0,
+    PLACETYPE_ID[Placetype.DRAINAGE]: 3.0,
+    PLACETYPE_ID[Placetype.ISLAND]: 2.0,
+    PLACETYPE_ID[Placetype.STREET]: 2.0,
+    PLACETYPE_UNKNOWN: 1.5,
+    PLACETYPE_ID[Placetype.ESTATE]: 1.0,
+    PLACETYPE_ID[Placetype.MISCELLANEOUS]: 1.0,
+    PLACETYPE_ID[Placetype.HISTORICAL_TOWN]: 1.0,
+    PLACETYPE_ID[Placetype.AIRPORT]: 0.5,
+    PLACETYPE_ID[Placetype.COLLOQUIAL]: 0.5,
+    PLACETYPE_ID[Placetype.ZONE]: 0.5,
+    PLACETYPE_ID[Placetype.NEARBY_INTERSECTION]: 0.3,
+    PLACETYPE_ID[Placetype.SPORTS_TEAM]: 0.2,
+}
+
+# polygon vertices, by placetype; places of other placetypes are points
+POLYGON_VERTICES = {
+    PLACETYPE_ID[Placetype.CONTINENT]: 512,
+    PLACETYPE_ID[Placetype.COUNTRY]: 256,
+    PLACETYPE_ID[Placetype.STATE]: 128,
+    PLACETYPE_ID[Placetype.COUNTY]: 64,
+    PLACETYPE_ID[Placetype.LOCAL_ADMIN]: 32,
+    PLACETYPE_ID[Placetype.TOWN]: 16,
+    PLACETYPE_ID[Placetype.SUBURB]: 8,
+    PLACETYPE_ID[Placetype.ZIP]: 8,
+}
+LOCAL_RADIUS = 0.05  # of a local place's polygon, as a share of its area's radius
+
+# the mean number of aliases a place has, by placetype, before Pareto skew; other placetypes have one
+ALIAS_SCALE = {
+    PLACETYPE_ID[Placetype.SUPERNAME]: 100.0,
+    PLACETYPE_ID[Placetype.CONTINENT]: 40.0,
+    PLACETYPE_ID[Placetype.COUNTRY]: 20.0,
+    PLACETYPE_ID[Placetype.STATE]: 4.0,
+    PLACETYPE_ID[Placetype.COUNTY]: 2.0,
+    PLACETYPE_ID[Placetype.LOCAL_ADMIN]: 1.5,
+}
+ALIAS_PARETO = 1.5
+MAX_ALIASES = 2_000
+
+NAME_TYPES = {'V': 50, 'S': 20, 'P': 10, 'Q': 10, 'A': 10}
+LANGUAGES = {
+    'ENG': 40,
+    'SPA': 10,
+    'FRE': 8,
+    'GER': 8,
+    'POR': 6,
+    'ITA': 5,
+    'DUT': 4,
+    'RUS': 4,
+    'POL': 3,
+    'SWE': 3,
+    'JPN': 3,
+    'CHI': 3,
+    'ARA': 2,
+    'UNK': 1,
+}
+ACCENTED = str.maketrans('aeiou', 'áéíóú')
+SYLLABLES = (
+    'al', 'an', 'ar', 'ba', 'bel', 'ber', 'bri', 'ca', 'cas', 'dor', 'el', 'en', 'fen', 'gar', 'glen', 'ha', 'hol',
+    'is', 'jo', 'ka', 'kir', 'lan', 'lo', 'mar', 'mil', 'mon', 'nor', 'o', 'pel', 'por', 'qui', 'ra', 'ros', 'san',
+    'sel', 'ter', 'tor', 'u', 'val', 'ven', 'wes', 'win', 'ya', 'zu',
+)  # fmt: skip
+SUFFIXES = ('', '', '', '', 'ton', 'ham', 'ville', 'burg', 'stad', 'field', 'mouth', 'ford', 'by', 'polis')
+
+SUPERSEDED_SHARE = 0.02
+NO_GEOMETRY_SHARE = 0.005
+NULL_ISLAND_SHARE = 0.002
+HISTORY_SHARE = 0.3
+LICENSING_SHARE = 0.6
+RELEASES = ('7.3.1', '7.3.2', '7.4.0', '7.4.1', '7.5.1', '7.5.2', '7.6.0', '7.8.1', '7.9.0', '7.10.0')
+LICENSES = (
+    ('geoplanet', 'https://creativecommons.org/licenses/by/3.0/', 'Yahoo! GeoPlanet, CC BY 3.0'),
+    ('flickr', 'https://creativecommons.org/publicdomain/zero/1.0/', 'Flickr Shapes, CC0'),
+    ('quattroshapes', 'https://creativecommons.org/licenses/by/2.0/', 'Quattroshapes, CC BY 2.0'),
+    ('naturalearth', 'https://www.naturalearthdata.com/about/terms-of-use/', 'Natural Earth, public domain'),
+    ('geonames', 'https://creativecommons.org/licenses/by/4.0/', 'GeoNames, CC BY 4.0'),
+)
+
+INSERTS = {
+    'places': 'INSERT INTO places VALUES (?, ?, ?, ?, ?, ?)',
+    'aliases': 'INSERT INTO aliases VALUES (?, ?, ?, ?)',
+    'admins': 'INSERT INTO admins VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'countries': 'INSERT INTO countries VALUES (?, ?, ?, ?)',
+    'ancestors': 'INSERT INTO ancestors VALUES (?, ?)',
+    'children': 'INSERT INTO children VALUES (?, ?)',
+    'neighbors': 'INSERT INTO neighbors VALUES (?, ?)',
+    # a superseded place may already have a row, for the place it supersedes
+    'changes': (
+        'INSERT INTO changes VALUES (?, ?, ?) '
+        'ON CONFLICT (woe_id) DO UPDATE SET superseded_by = COALESCE(excluded.superseded_by, superseded_by)'
+    ),
+    'history': 'INSERT INTO history VALUES (?, ?)',
+    'licensing': 'INSERT INTO licensing VALUES (?, ?)',
+    'geometries': 'INSERT INTO geometries VALUES (?, ?, ?, ?, ?, ?, ?, GeomFromText(?, 4326))',
+}
+
+
+@functools.cache
+def unit_circle(vertices: int) -> tuple[tuple[float, float], ...]:
+    """
+    Get the points of a regular polygon, inscribed in the unit circle
+    """
+
+    return tuple(
+        (math.cos(2 * math.pi * vertex / vertices), math.sin(2 * math.pi * vertex / vertices))
+        for vertex in range(vertices)
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Area:
+    """
+    A place that other places are in; Earth, a continent, or an admin area.
+    """
+
+    woe_id: int
+    placetype_id: int
+    iso: str | None
+    language: str
+    admins: tuple[int | None, ...]  # continent, country, state, county, local admin
+    ancestors: tuple[int, ...]  # nearest first, up to Earth
+    lat: float
+    lng: float
+    radius: float  # degrees
+    weight: float
+
+
+class FixtureWriter:
+    """
+    Buffered inserts into the WOEplanet and geometries databases, a batch at a time.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, geom_conn: sqlite3.Connection) -> None:
+        self._conns = {table: geom_conn if table == 'geometries' else conn for table in INSERTS}
+        self._rows: dict[str, list[tuple[object, ...]]] = {table: [] for table in INSERTS}
+        self.counts: dict[str, int] = dict.fromkeys(INSERTS, 0)
+
+    def add(self, table: str, row: tuple[object, ...]) -> None:
+        """
+        Add a row to a table, writing the table's batch once it's full
+        """
+
+        rows = self._rows[table]
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        """
+        Write a table's batch
+        """
+
+        rows = self._rows[table]
+        self._conns[table].executemany(INSERTS[table], rows)
+        self.counts[table] += len(rows)
+        rows.clear()
+
+    def flush(self) -> None:
+        """
+        Write every table's batch
+        """
+
+        for table in INSERTS:
+            self._flush(table)
+
+
+class FixtureGenerator:
+    """
+    Generate a synthetic WOEplanet database, deterministically for a seed.
+
+    Places are in a hierarchy of continents, countries, states, counties and local admin areas; a few countries have
+    most places, and within each level some areas have many more places than others. Every place has aliases, its
+    ancestors and children, neighbours among its siblings and a point or polygon geometry, apart from a few that visit
+    Null Island; some are superseded, and some have history and licensing.
+    """
+
+    def __init__(self, writer: FixtureWriter, places: int, seed: int) -> None:
+        self._writer = writer
+        self._places = places
+        self._rng = random.Random(seed)  # noqa: S311
+        self._woe_id = EARTH_WOE_ID
+        self._written = 0
+        self._last_child: dict[int, int] = {}
+
+    def _next_woe_id(self) -> int:
+        """
+        Get the next WOEID; WOEIDs are sparse, as they are in GeoPlanet
+        """
+
+        self._woe_id += self._rng.randint(1, 4)
+        return self._woe_id
+
+    def _name(self) -> str:
+        """
+        Make up a place name
+        """
+
+        syllables = self._rng.choices(SYLLABLES, k=self._rng.randint(1, 3))
+        return ''.join(syllables).capitalize() + self._rng.choice(SUFFIXES)
+
+    def _alias(self, name: str, name_type: str, language: str) -> str:
+        """
+        Make up an alias of a name, for its name type and language
+        """
+
+        if name_type == 'A':
+            return name[:3].upper()
+        if name_type == 'Q':
+            return name[: max(2, len(name) // 2)] + 'ie'
+        if name_type == 'V' and language in {'SPA', 'FRE', 'POR', 'ITA'}:
+            return name.translate(ACCENTED)
+        if name_type == 'V':
+            return f'{name} {self._rng.choice(SYLLABLES).capitalize()}'
+
+        return name
+
+    def _aliases(self, woe_id: int, name: str, placetype_id: int, language: str) -> None:
+        """
+        Write a place's aliases; its name, in its language, and a Pareto distributed number of others
+        """
+
+        self._writer.add('aliases', (woe_id, name, 'P', language))
+
+        scale = ALIAS_SCALE.get(placetype_id, 1.0)
+        count = min(MAX_ALIASES, int(scale * self._rng.paretovariate(ALIAS_PARETO))) - 1
+        name_types = self._rng.choices(list(NAME_TYPES), weights=list(NAME_TYPES.values()), k=count)
+        languages = self._rng.choices(list(LANGUAGES), weights=list(LANGUAGES.values()), k=count)
+        for name_type, alias_language in zip(name_types, languages, strict=True):
+            self._writer.add(
+                'aliases', (woe_id, self._alias(name, name_type, alias_language), name_type, alias_language)
+            )
+
+    def _polygon(self, lat: float, lng: float, radius: float, vertices: int) -> tuple[str, tuple[float, ...]]:
+        """
+        Make a star shaped polygon around a point, as WKT, and its bounding box (sw_lat, sw_lng, ne_lat, ne_lng)
+        """
+
+        random = self._rng.random
+        points = [
+            (lng + radius * (0.7 + 0.3 * random()) * x, lat + radius * (0.7 + 0.3 * random()) * y)
+            for x, y in unit_circle(vertices)
+        ]
+        lngs, lats = [x for x, _ in points], [y for _, y in points]
+        bbox = (min(lats), min(lngs), max(lats), max(lngs))
+        if bbox[0] < -90.0 or bbox[1] < -180.0 or bbox[2] > 90.0 or bbox[3] > 180.0:  # noqa: PLR2004
+            points = [(max(-180.0, min(180.0, x)), max(-90.0, min(90.0, y))) for x, y in points]
+            lngs, lats = [x for x, _ in points], [y for _, y in points]
+            bbox = (min(lats), min(lngs), max(lats), max(lngs))
+
+        ring = ', '.join(f'{x:.6f} {y:.6f}' for x, y in [*points, points[0]])
+        return f'POLYGON(({ring}))', bbox
+
+    def _geometry(self, woe_id: int, placetype_id: int, lat: float, lng: float, radius: float) -> None:
+        """
+        Write a place's geometry; a polygon, for placetypes that have them, otherwise a point
+        """
+
+        roll = self._rng.random()
+        if roll < NO_GEOMETRY_SHARE:
+            return
+        if roll < NO_GEOMETRY_SHARE + NULL_ISLAND_SHARE:
+            self._writer.add('geometries', (woe_id, 0.0, 0.0, None, None, None, None, 'POINT(0 0)'))
+            return
+
+        vertices = POLYGON_VERTICES.get(placetype_id)
+        if vertices is None:
+            self._writer.add('geometries', (woe_id, lat, lng, None, None, None, None, f'POINT({lng:.6f} {lat:.6f})'))
+            return
+
+        wkt, bounds = self._polygon(lat, lng, radius, vertices)
+        self._writer.add('geometries', (woe_id, lat, lng, *bounds, wkt))
+
+    def _place(  # noqa: PLR0913
+        self,
+        placetype_id: int,
+        name: str,
+        parent: Area | None,
+        *,
+        iso: str | None,
+        language: str,
+        admins: tuple[int | None, ...] | None,
+        lat: float,
+        lng: float,
+        radius: float,
+    ) -> int:
+        """
+        Write a place, with its aliases, relations, changes, history, licensing and geometry
+        """
+
+        rng = self._rng
+        woe_id = EARTH_WOE_ID if parent is None else self._next_woe_id()
+        self._writer.add('places', (woe_id, iso, name, language, placetype_id, parent.woe_id if parent else None))
+        self._aliases(woe_id, name, placetype_id, language)
+        self._geometry(woe_id, placetype_id, lat, lng, radius)
+
+        if admins is not None:
+            self._writer.add('admins', (woe_id, iso, *admins))
+
+        if parent is not None:
+            self._writer.add('children', (parent.woe_id, woe_id))
+            for ancestor in (parent.woe_id, *parent.ancestors):
+                self._writer.add('ancestors', (woe_id, ancestor))
+
+            # a place neighbours the sibling before it, which it sometimes supersedes
+            sibling = self._last_child.get(parent.woe_id)
+            self._last_child[parent.woe_id] = woe_id
+            if sibling is not None:
+                self._writer.add('neighbors', (woe_id, sibling))
+                self._writer.add('neighbors', (sibling, woe_id))
+                if rng.random() < SUPERSEDED_SHARE:
+                    self._writer.add('changes', (sibling, woe_id, None))
+                    self._writer.add('changes', (woe_id, None, json.dumps([sibling])))
+
+        if rng.random() < HISTORY_SHARE:
+            added, modified = sorted(rng.sample(RELEASES, 2))
+            self._writer.add('history', (woe_id, json.dumps({'added': added, 'modified': modified})))
+
+        if rng.random() < LICENSING_SHARE:
+            keys = rng.sample([key for key, _, _ in LICENSES], rng.randint(1, 3))
+            self._writer.add('licensing', (woe_id, json.dumps(keys)))
+
+        self._written += 1
+        if self._written % LOG_EVERY == 0:
+            logger.info('Places: %d of %d', self._written, self._places)
+
+        return woe_id
+
+    def _area(  # noqa: PLR0913
+        self,
+        placetype_id: int,
+        name: str,
+        parent: Area,
+        level: int,
+        *,
+        iso: str | None,
+        language: str,
+        lat: float,
+        lng: float,
+        radius: float,
+        weight: float,
+    ) -> Area:
+        """
+        Write an area, at a level of the admins hierarchy (0 for continents), and get it
+        """
+
+        admins = list(parent.admins)
+        woe_id = self._place(
+            placetype_id,
+            name,
+            parent,
+            iso=iso,
+            language=language,
+            admins=None,
+            lat=lat,
+            lng=lng,
+            radius=radius,
+        )
+        admins[level] = woe_id
+        self._writer.add('admins', (woe_id, iso, *admins))
+
+        return Area(
+            woe_id=woe_id,
+            placetype_id=placetype_id,
+            iso=iso,
+            language=language,
+            admins=tuple(admins),
+            ancestors=(parent.woe_id, *parent.ancestors),
+            lat=lat,
+            lng=lng,
+            radius=radius,
+            weight=weight,
+        )
+
+    def _offset(self, area: Area, spread: float) -> tuple[float, float]:
+        """
+        Get a point within a share of an area's radius of its centre
+        """
+
+        angle = self._rng.uniform(0, 2 * math.pi)
+        distance = area.radius * spread * math.sqrt(self._rng.random())
+        lat = max(-85.0, min(85.0, area.lat + distance * math.sin(angle)))
+        lng = (area.lng + distance * math.cos(angle) + 180.0) % 360.0 - 180.0
+        return lat, lng
+
+    def _countries(self, continents: list[Area]) -> list[Area]:
+        """
+        Write countries, the real ones, as many as the scale allows, each with a continent and a Zipf weight
+        """
+
+        rng = self._rng
+        countries = sorted(pycountry.countries, key=lambda country: country.alpha_2)
+        rng.shuffle(countries)
+        countries = countries[: min(len(countries), max(MIN_COUNTRIES, self._places // PLACES_PER_COUNTRY))]
+
+        areas = []
+        for rank, country in enumerate(countries, start=1):
+            weight = 1.0 / rank**COUNTRY_ZIPF
+            continent = rng.choices(continents, weights=CONTINENT_WEIGHTS)[0]
+            lat = max(-85.0, min(85.0, continent.lat + rng.uniform(-COUNTRY_SPREAD, COUNTRY_SPREAD)))
+            lng = (continent.lng + rng.uniform(-COUNTRY_SPREAD, COUNTRY_SPREAD) + 180.0) % 360.0 - 180.0
+            area = self._area(
+                PLACETYPE_ID[Placetype.COUNTRY],
+                country.name,
+                continent,
+                1,
+                iso=country.alpha_2,
+                language=rng.choices(list(LANGUAGES), weights=list(LANGUAGES.values()))[0],
+                lat=lat,
+                lng=lng,
+                radius=1.0 + 15.0 * math.sqrt(weight),
+                weight=weight,
+            )
+            self._writer.add('countries', (area.woe_id, country.name, country.alpha_2, country.alpha_3))
+            areas.append(area)
+
+        return areas
+
+    def _levels(self, countries: list[Area]) -> list[Area]:
+        """
+        Write the admin levels below countries; each area is in an area of the level above, picked by weight.
+
+        An area's weight is a Pareto distributed share of its parent's, so each country keeps its share of places,
+        however unevenly they're spread within it.
+        """
+
+        rng = self._rng
+        parents = countries
+        for level, (placetype_id, share) in enumerate(ADMIN_LEVELS, start=2):
+            count = max(len(parents), int(self._places * share))
+            cum_weights = list(itertools.accumulate(parent.weight for parent in parents))
+            # every parent gets one, so no country is without a state, nor state without a county
+            picked = [*parents, *rng.choices(parents, cum_weights=cum_weights, k=count - len(parents))]
+            shares = [rng.paretovariate(ADMIN_PARETO) for _ in picked]
+            totals: dict[int, float] = {}
+            for parent, area_share in zip(picked, shares, strict=True):
+                totals[parent.woe_id] = totals.get(parent.woe_id, 0.0) + area_share
+
+            areas = []
+            for parent, area_share in zip(picked, shares, strict=True):
+                lat, lng = self._offset(parent, 0.6)
+                areas.append(
+                    self._area(
+                        placetype_id,
+                        self._name(),
+                        parent,
+                        level,
+                        iso=parent.iso,
+                        language=parent.language,
+                        lat=lat,
+                        lng=lng,
+                        radius=parent.radius * rng.uniform(0.1, 0.3),
+                        weight=parent.weight * area_share / totals[parent.woe_id],
+                    ),
+                )
+            parents = areas
+
+        return parents
+
+    def _world_places(self, earth: Area) -> None:
+        """
+        Write the places outside any country, such as oceans and timezones
+        """
+
+        for placetype_id, most in WORLD_PLACETYPES.items():
+            for _ in range(max(1, min(most, self._places // MIN_PLACES))):
+                lat, lng = self._rng.uniform(-60.0, 60.0), self._rng.uniform(-180.0, 180.0)
+                self._place(
+                    placetype_id,
+                    self._name(),
+                    earth,
+                    iso=None,
+                    language='ENG',
+                    admins=None,
+                    lat=lat,
+                    lng=lng,
+                    radius=5.0,
+                )
+
+    def _local_places(self, local_admins: list[Area], count: int) -> None:
+        """
+        Write the places in local admin areas, picked by weight, a batch at a time
+        """
+
+        rng = self._rng
+        cum_weights = list(itertools.accumulate(area.weight for area in local_admins))
+        placetypes = list(LOCAL_PLACETYPES)
+        placetype_weights = list(itertools.accumulate(LOCAL_PLACETYPES.values()))
+
+        while count > 0:
+            batch = min(count, BATCH_SIZE)
+            parents = rng.choices(local_admins, cum_weights=cum_weights, k=batch)
+            batch_placetypes = rng.choices(placetypes, cum_weights=placetype_weights, k=batch)
+            for parent, placetype_id in zip(parents, batch_placetypes, strict=True):
+                lat, lng = self._offset(parent, 1.0)
+                self._place(
+                    placetype_id,
+                    self._name(),
+                    parent,
+                    iso=parent.iso,
+                    language=parent.language,
+                    admins=parent.admins,
+                    lat=lat,
+                    lng=lng,
+                    radius=parent.radius * LOCAL_RADIUS,
+                )
+            count -= batch
+
+    def generate(self) -> None:
+        """
+        Write every place
+        """
+
+        earth = Area(
+            woe_id=EARTH_WOE_ID,
+            placetype_id=PLACETYPE_ID[Placetype.SUPERNAME],
+            iso=None,
+            language='ENG',
+            admins=(None, None, None, None, None),
+            ancestors=(),
+            lat=0.0,
+            lng=0.0,
+            radius=180.0,
+            weight=1.0,
+        )
+        self._place(
+            earth.placetype_id,
+            'Earth',
+            None,
+            iso=None,
+            language='ENG',
+            admins=None,
+            lat=0.0,
+            lng=0.0,
+            radius=earth.radius,
+        )
+
+        continents = [
+            self._area(
+                PLACETYPE_ID[Placetype.CONTINENT],
+                name,
+                earth,
+                0,
+                iso=None,
+                language='ENG',
+                lat=lat,
+                lng=lng,
+                radius=COUNTRY_SPREAD,
+                weight=weight,
+            )
+            for (name, lat, lng), weight in zip(CONTINENTS, CONTINENT_WEIGHTS, strict=True)
+        ]
+        countries = self._countries(continents)
+        local_admins = self._levels(countries)
+        self._world_places(earth)
+        self._local_places(local_admins, max(0, self._places - self._written))
+
+
+def build_fixture_databases(
+    db_path: Path,
+    geom_db_path: Path,
+    *,
+    places: int = DEFAULT_PLACES,
+    seed: int = DEFAULT_SEED,
+    indexes: bool = False,
+) -> None:
+    """
+    Build synthetic WOEplanet and geometries databases, with a number of places, the same for the same seed.
+
+    The databases are new, and mustn't already exist. Geometries are made with SpatiaLite, so it must be installed.
+    With indexes, the search index, autocomplete, spatial index and simplified geometries are built too, as for a data
+    release.
+    """
+
+    create_databases(db_path, geom_db_path)
+
+    conn = sqlite3.connect(str(db_path))
+    geom_conn = sqlite3.connect(str(geom_db_path))
+    try:
+        geom_conn.enable_load_extension(True)  # noqa: FBT003
+        geom_conn.execute("SELECT load_extension('mod_spatialite')")
+        geom_conn.enable_load_extension(False)  # noqa: FBT003
+
+        # the databases are thrown away if this fails, so there's no need to journal
+        for connection in (conn, geom_conn):
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+
+        conn.executemany(
+            'INSERT INTO placetypes VALUES (?, ?, ?)',
+            [(ptid, name, short) for ptid, (short, name) in PLACETYPE_NAMES.items()],
+        )
+        conn.executemany('INSERT INTO licenses VALUES (?, ?, ?)', LICENSES)
+
+        start = time.perf_counter()
+        writer = FixtureWriter(conn, geom_conn)
+        FixtureGenerator(writer, places, seed).generate()
+        writer.flush()
+        for table, count in writer.counts.items():
+            logger.info('%s: %d rows', table, count)
+        logger.info('Places in %.3fs', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        conn.execute("INSERT INTO aliases_fts (aliases_fts) VALUES ('rebuild')")
+        logger.info('Full text index in %.3fs', time.perf_counter() - start)
+
+        for connection in (conn, geom_conn):
+            connection.commit()
+            connection.execute('ANALYZE')
+
+    finally:
+        conn.close()
+        geom_conn.close()
+
+    if indexes:
+        build_search_index(db_path)
+        build_autocomplete_index(db_path)
+        build_spatial_index(db_path, geom_db_path)
+        build_simplified_geometries(geom_db_path)
+
+
+def main() -> None:
+    """
+    Fixture databases entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Build synthetic WOEplanet databases, for tests and benchmarks')
+    parser.add_argument('--db', type=Path, required=True, help='path to write the WOEplanet database to')
+    parser.add_argument('--geom-db', type=Path, required=True, help='path to write the geometries database to')
+    parser.add_argument('--places', type=int, default=DEFAULT_PLACES, help=f'(default: {DEFAULT_PLACES})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'(default: {DEFAULT_SEED})')
+    parser.add_argument(
+        '--indexes',
+        action='store_true',
+        help='also build the search index, autocomplete, spatial index and simplified geometries',
+    )
+    args = parser.parse_args()
+
+    if args.places < MIN_PLACES:
+        parser.error(f'--places must be at least {MIN_PLACES}')
+    for path in (args.db, args.geom_db):
+        if path.exists():
+            parser.error(f'{path} already exists')
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+    build_fixture_databases(args.db, args.geom_db, places=args.places, seed=args.seed, indexes=args.indexes)
+
+
+if __name__ == '__main__':
+    main()
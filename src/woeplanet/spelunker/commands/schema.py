@@ -0,0 +1,114 @@
+"""
+WOEplanet Spelunker: commands package; schema module.
+"""
+
+import sqlite3
+from collections.abc import Sequence
+from pathlib import Path
+
+# the WOEplanet database's tables, as woeplanet-build makes them, with the indexes the Spelunker's queries rely on;
+# the search index and autocomplete commands add their own tables, from aliases
+WOEPLANET_SCHEMA = (
+    """
+    CREATE TABLE placetypes (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        shortname TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE places (
+        woe_id INTEGER PRIMARY KEY,
+        iso TEXT,
+        name TEXT NOT NULL,
+        language TEXT,
+        placetype_id INTEGER NOT NULL,
+        parent_id INTEGER
+    )
+    """,
+    'CREATE INDEX places_placetype_id ON places (placetype_id)',
+    """
+    CREATE TABLE aliases (
+        woe_id INTEGER NOT NULL,
+        name TEXT,
+        name_type TEXT,
+        language TEXT
+    )
+    """,
+    'CREATE INDEX aliases_woe_id ON aliases (woe_id)',
+    "CREATE VIRTUAL TABLE aliases_fts USING fts5(name, content='aliases')",
+    """
+    CREATE TABLE admins (
+        woe_id INTEGER PRIMARY KEY,
+        iso TEXT,
+        continent INTEGER,
+        country INTEGER,
+        state INTEGER,
+        county INTEGER,
+        local_admin INTEGER
+    )
+    """,
+    'CREATE INDEX admins_country ON admins (country)',
+    """
+    CREATE TABLE countries (
+        woe_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        iso2 TEXT NOT NULL,
+        iso3 TEXT NOT NULL
+    )
+    """,
+    'CREATE TABLE ancestors (woe_id INTEGER NOT NULL, ancestor_woe_id INTEGER NOT NULL)',
+    'CREATE INDEX ancestors_woe_id ON ancestors (woe_id)',
+    'CREATE TABLE neighbors (woe_id INTEGER NOT NULL, neighbor_woe_id INTEGER NOT NULL)',
+    'CREATE INDEX neighbors_woe_id ON neighbors (woe_id)',
+    'CREATE TABLE children (woe_id INTEGER NOT NULL, child_woe_id INTEGER NOT NULL)',
+    'CREATE INDEX children_woe_id ON children (woe_id)',
+    # supersedes is a JSON array of WOEIDs
+    'CREATE TABLE changes (woe_id INTEGER PRIMARY KEY, superseded_by INTEGER, supersedes TEXT)',
+    # history is a JSON object of provenance by source
+    'CREATE TABLE history (woe_id INTEGER PRIMARY KEY, history TEXT)',
+    # licenses is a JSON array of license keys
+    'CREATE TABLE licensing (woe_id INTEGER PRIMARY KEY, licenses TEXT)',
+    'CREATE TABLE licenses (key TEXT PRIMARY KEY, url TEXT, attribution TEXT)',
+)
+
+# the geometries database's tables; geom is a SpatiaLite geometry, and the simplify command adds geometries_simplified
+GEOMETRIES_SCHEMA = (
+    """
+    CREATE TABLE geometries (
+        woe_id INTEGER PRIMARY KEY,
+        lat REAL,
+        lng REAL,
+        sw_lat REAL,
+        sw_lng REAL,
+        ne_lat REAL,
+        ne_lng REAL,
+        geom BLOB
+    )
+    """,
+    'CREATE INDEX geometries_lat_lng ON geometries (lat, lng)',
+)
+
+
+def create_schema(db_path: Path, schema: Sequence[str]) -> None:
+    """
+    Create a schema's tables and indexes in a new database.
+    """
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        for statement in schema:
+            conn.execute(statement)
+        conn.commit()
+
+    finally:
+        conn.close()
+
+
+def create_databases(db_path: Path, geom_db_path: Path) -> None:
+    """
+    Create empty WOEplanet and geometries databases.
+    """
+
+    create_schema(db_path, WOEPLANET_SCHEMA)
+    create_schema(geom_db_path, GEOMETRIES_SCHEMA)
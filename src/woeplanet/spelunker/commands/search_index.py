@@ -0,0 +1,134 @@
+"""
+WOEplanet Spelunker: commands package; search index module.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from woeplanet.spelunker.config.search_ranking import (
+    SEARCH_NAME_STRIDE,
+    SEARCH_ROWID_STRIDE,
+    SEARCH_TIER_COLUMNS,
+    name_type_priority_sql,
+    search_tier_sql,
+)
+from woeplanet.spelunker.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# of a place's aliases of the same name and type, the one in this language is preferred
+CANONICAL_LANGUAGE = 'ENG'
+
+
+def build_search_index(db_path: Path) -> None:
+    """
+    Build the search_names table, and its search_names_fts full text index, from aliases.
+
+    search_names holds one row per distinct name per name type per place, so a search shows the name it matched, and
+    the full text rank of a place with many names isn't diluted by them. Its rowid orders a place's names by name type
+    priority, so searching by WOE ID can walk the full text index in rowid order, meeting each place's best matching
+    name first, rather than grouping every matching alias by place. search_names_fts is contentless, and indexes each
+    name in its tier's column, so relevance is ranked by FTS5 itself. Run this offline, against each new data release.
+    """
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute('DROP TABLE IF EXISTS search_names_fts')
+        conn.execute('DROP TABLE IF EXISTS search_names')
+        conn.execute("""
+            CREATE TABLE search_names (
+                id INTEGER PRIMARY KEY,
+                woe_id INTEGER NOT NULL,
+                name_type TEXT,
+                priority INTEGER NOT NULL,
+                tier INTEGER NOT NULL,
+                language TEXT,
+                name TEXT NOT NULL
+            )
+        """)
+
+        start = time.perf_counter()
+        cursor = conn.execute(
+            f"""
+            INSERT INTO search_names (id, woe_id, name_type, priority, tier, language, name)
+            SELECT
+                n.woe_id * ? + n.priority * ? + n.position - 1,
+                n.woe_id,
+                n.name_type,
+                n.priority,
+                {search_tier_sql('p.placetype_id', 'n.priority')},
+                n.language,
+                n.name
+            FROM (
+                SELECT
+                    woe_id,
+                    name_type,
+                    priority,
+                    language,
+                    name,
+                    ROW_NUMBER() OVER (PARTITION BY woe_id, priority ORDER BY name) AS position
+                FROM (
+                    SELECT
+                        woe_id,
+                        name_type,
+                        priority,
+                        language,
+                        name,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY woe_id, priority, name ORDER BY language IS NOT ?, alias_rowid
+                        ) AS choice
+                    FROM (
+                        SELECT
+                            woe_id,
+                            {name_type_priority_sql('name_type')} AS priority,
+                            name_type,
+                            name,
+                            language,
+                            rowid AS alias_rowid
+                        FROM aliases
+                        WHERE name IS NOT NULL AND name != ''
+                    )
+                )
+                WHERE choice = 1
+            ) n
+            LEFT JOIN places p ON n.woe_id = p.woe_id
+            WHERE n.position <= ?
+            ORDER BY n.woe_id, n.priority, n.position
+            """,  # noqa: S608
+            (SEARCH_ROWID_STRIDE, SEARCH_NAME_STRIDE, CANONICAL_LANGUAGE, SEARCH_NAME_STRIDE),
+        )
+        logger.info('Names: %d in %.3fs', cursor.rowcount, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        columns = ', '.join(SEARCH_TIER_COLUMNS)
+        tiers = ', '.join(f'CASE tier WHEN {tier} THEN name END' for tier in range(len(SEARCH_TIER_COLUMNS)))
+        conn.execute(f"CREATE VIRTUAL TABLE search_names_fts USING fts5({columns}, content='')")
+        conn.execute(f'INSERT INTO search_names_fts (rowid, {columns}) SELECT id, {tiers} FROM search_names')  # noqa: S608
+        logger.info('Full text index in %.3fs', time.perf_counter() - start)
+
+        conn.commit()
+        conn.execute('ANALYZE search_names')
+
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    """
+    Search index entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Build the search index in the WOEplanet database')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+    db_path = args.db or get_settings().woeplanet_db_path
+    build_search_index(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+WOEplanet Spelunker: commands package; geometry simplification module.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from woeplanet.spelunker.config.geometry_tiers import GEOMETRY_TIERS
+from woeplanet.spelunker.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_POINTS = 64
+
+
+def build_simplified_geometries(geom_db_path: Path, min_points: int = DEFAULT_MIN_POINTS) -> None:
+    """
+    Build the geometries_simplified table, one row per geometry per tier.
+
+    Geometries with no more than min_points vertices aren't worth simplifying and are skipped; the server falls back
+    to the full resolution geometry for these. Run this offline, against each new data release.
+    """
+
+    conn = sqlite3.connect(str(geom_db_path))
+    try:
+        conn.enable_load_extension(True)  # noqa: FBT003
+        conn.execute("SELECT load_extension('mod_spatialite')")
+        conn.enable_load_extension(False)  # noqa: FBT003
+
+        conn.execute('DROP TABLE IF EXISTS geometries_simplified')
+        conn.execute("""
+            CREATE TABLE geometries_simplified (
+                woe_id INTEGER NOT NULL,
+                tier INTEGER NOT NULL,
+                geom BLOB NOT NULL,
+                PRIMARY KEY (woe_id, tier)
+            ) WITHOUT ROWID
+        """)
+
+        for tier in GEOMETRY_TIERS:
+            start = time.perf_counter()
+            cursor = conn.execute(
+                """
+                INSERT INTO geometries_simplified (woe_id, tier, geom)
+                SELECT woe_id, ?, simplified
+                FROM (
+                    SELECT woe_id, SimplifyPreserveTopology(geom, ?) AS simplified
+                    FROM geometries
+                    WHERE geom IS NOT NULL AND ST_NPoints(geom) > ?
+                )
+                WHERE simplified IS NOT NULL
+                """,
+                (tier.tier, tier.tolerance, min_points),
+            )
+            logger.info(
+                'Tier %d (tolerance %s): %d geometries in %.3fs',
+                tier.tier,
+                tier.tolerance,
+                cursor.rowcount,
+                time.perf_counter() - start,
+            )
+
+        conn.commit()
+        conn.execute('ANALYZE geometries_simplified')
+
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    """
+    Geometry simplification entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Build simplified geometry tiers in the WOEplanet geometries database')
+    parser.add_argument('--geom-db', type=Path, help='path to the geometries database (default: from .env)')
+    parser.add_argument(
+        '--min-points',
+        type=int,
+        default=DEFAULT_MIN_POINTS,
+        help=f'only simplify geometries with more than this many vertices (default: {DEFAULT_MIN_POINTS})',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+    geom_db_path = args.geom_db or get_settings().woeplanet_geom_db_path
+    build_simplified_geometries(geom_db_path, min_points=args.min_points)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+WOEplanet Spelunker: commands package; spatial index module.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from woeplanet.spelunker.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_spatial_index(db_path: Path, geom_db_path: Path) -> None:
+    """
+    Build the places_rtree R*Tree, of each place's bounds by placetype, from the geometries database.
+
+    A place's placetype is the R*Tree's first dimension, as a zero width range, so a vector tile's places of a
+    placetype are found in one index search. Places without bounds are indexed as a point at their centroid. Bounds
+    that cross the antimeridian, whose west is east of their east, are unwrapped so their east is past 180. Run this
+    offline, against each new data release.
+    """
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute('ATTACH DATABASE ? AS geometries', (str(geom_db_path),))
+        conn.execute('DROP TABLE IF EXISTS places_rtree')
+        conn.execute("""
+            CREATE VIRTUAL TABLE places_rtree USING rtree(
+                woe_id,
+                min_placetype, max_placetype,
+                min_lng, max_lng,
+                min_lat, max_lat
+            )
+        """)
+
+        start = time.perf_counter()
+        cursor = conn.execute("""
+            INSERT INTO places_rtree (woe_id, min_placetype, max_placetype, min_lng, max_lng, min_lat, max_lat)
+            SELECT
+                p.woe_id,
+                p.placetype_id,
+                p.placetype_id,
+                COALESCE(g.sw_lng, g.lng),
+                CASE WHEN g.sw_lng > g.ne_lng THEN g.ne_lng + 360 ELSE COALESCE(g.ne_lng, g.lng) END,
+                COALESCE(g.sw_lat, g.lat),
+                COALESCE(g.ne_lat, g.lat)
+            FROM places p
+            JOIN geometries.geometries g ON p.woe_id = g.woe_id
+            WHERE COALESCE(g.sw_lng, g.lng) IS NOT NULL AND COALESCE(g.sw_lat, g.lat) IS NOT NULL
+        """)
+        logger.info('Places: %d in %.3fs', cursor.rowcount, time.perf_counter() - start)
+
+        conn.commit()
+
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    """
+    Spatial index entrypoint
+    """
+
+    parser = argparse.ArgumentParser(description='Build the spatial index of place bounds in the WOEplanet database')
+    parser.add_argument('--db', type=Path, help='path to the WOEplanet database (default: from .env)')
+    parser.add_argument('--geom-db', type=Path, help='path to the geometries database (default: from .env)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+    settings = get_settings()
+    build_spatial_index(args.db or settings.woeplanet_db_path, args.geom_db or settings.woeplanet_geom_db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+WOEplanet Spelunker: commands package; tile pyramid module.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from woeplanet.spelunker.common.http_cache import data_release
+from woeplanet.spelunker.common.tile_archive import TileArchiveWriter, Tileset
+from woeplanet.spelunker.config.placetypes import Placetype
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.database import Database, SearchFilters, create_connection_factory
+from woeplanet.spelunker.dependencies.tiles import build_tile, fetch_tile_places, tile_cache_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLACETYPES = [Placetype.CONTINENT, Placetype.COUNTRY, Placetype.STATE]
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 8
+CHUNK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class TileJob:
+    """
+    A tile to render, for a placetype and search filters combination.
+    """
+
+    placetype: Placetype
+    filters: SearchFilters
+    z: int
+    x: int
+    y: int
+
+
+@dataclass(frozen=True)
+class RenderedTile:
+    """
+    A rendered tile, and how many places it contains.
+    """
+
+    job: TileJob
+    tile: bytes
+    places: int
+
+
+async def _render_chunk(jobs: list[TileJob]) -> list[RenderedTile]:
+    """
+    Render a chunk of tiles over a single database connection
+    """
+
+    settings = get_settings()
+    factory = await create_connection_factory(settings.woeplanet_db_path, settings.woeplanet_geom_db_path)
+    conn = await factory()
+    try:
+        db = Database(conn)
+        rendered = []
+        for job in jobs:
+            places = await fetch_tile_places(db, job.placetype, job.filters, z=job.z, x=job.x, y=job.y)
+            tile = build_tile(places, job.placetype, job.z, job.x, job.y)
+            rendered.append(RenderedTile(job=job, tile=tile, places=len(places)))
+        return rendered
+    finally:
+        await conn.close()
+
+
+def render_chunk(jobs: list[TileJob]) -> list[RenderedTile]:
+    """
+    Render a chunk of tiles; runs in a worker process
+    """
+
+    return asyncio.run(_render_chunk(jobs))
+
+
+def _children(job: TileJob) -> list[TileJob]:
+    """
+    Get the four child tiles of a tile, at the next zoom level
+    """
+
+    return [
+        TileJob(job.placetype, job.filters, job.z + 1, job.x * 2 + dx, job.y * 2 + dy)
+        for dy in range(2)
+        for dx in range(2)
+    ]
+
+
+def build_tile_pyramid(  # noqa: PLR0913
+    output: Path,
+    placetypes: list[Placetype],
+    filters: list[SearchFilters],
+    *,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    workers: int | None = None,
+) -> None:
+    """
+    Render the tile pyramid for placetypes and search filters combinations into a tile archive.
+
+    Tiles are rendered a zoom level at a time. A tile with no places has no places in any of its children, so only the
+    children of tiles with places are rendered at the next zoom level. Run this offline, against each new data release.
+    """
+
+    tilesets = [
+        Tileset(key=tile_cache_key(placetype, search_filters), min_zoom=min_zoom, max_zoom=max_zoom)
+        for placetype in placetypes
+        for search_filters in filters
+    ]
+
+    jobs = [
+        TileJob(placetype, search_filters, min_zoom, x, y)
+        for placetype in placetypes
+        for search_filters in filters
+        for x in range(2**min_zoom)
+        for y in range(2**min_zoom)
+    ]
+
+    with (
+        TileArchiveWriter(output, tilesets, metadata={'data_release': data_release()}) as writer,
+        ProcessPoolExecutor(max_workers=workers) as executor,
+    ):
+        for z in range(min_zoom, max_zoom + 1):
+            start = time.perf_counter()
+            chunks = [jobs[i : i + CHUNK_SIZE] for i in range(0, len(jobs), CHUNK_SIZE)]
+            next_jobs = []
+            for rendered in executor.map(render_chunk, chunks):
+                for item in rendered:
+                    job = item.job
+                    writer.add(tile_cache_key(job.placetype, job.filters), job.z, job.x, job.y, item.tile)
+                    if item.places and z < max_zoom:
+                        next_jobs.extend(_children(job))
+
+            logger.info('Zoom %d: %d tiles in %.3fs', z, len(jobs), time.perf_counter() - start)
+            jobs = next_jobs
+
+
+def main() -> None:
+    """
+    Tile pyramid entrypoint
+    """
+
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description='Pre-render vector tiles for low zoom levels into a tile archive')
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=settings.woeplanet_tile_archive_path,
+        help='path to write the tile archive to (default: from .env)',
+    )
+    parser.add_argument(
+        '--placetype',
+        type=Placetype,
+        action='append',
+        choices=list(Placetype),
+        help=f'placetype to render, may be repeated (default: {", ".join(DEFAULT_PLACETYPES)})',
+    )
+    parser.add_argument(
+        '--include',
+        action='append',
+        choices=['deprecated', 'unknown', 'nullisland'],
+        default=[],
+        help='also render tiles including these places, may be repeated',
+    )
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM, help=f'(default: {DEFAULT_MIN_ZOOM})')
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM, help=f'(default: {DEFAULT_MAX_ZOOM})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if args.output is None:
+        parser.error('--output is required when WOEPLANET_TILE_ARCHIVE_PATH is not set')
+    if not 0 <= args.min_zoom <= args.max_zoom:
+        parser.error('--min-zoom must be between 0 and --max-zoom')
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s')
+
+    # the tileset for the default filters is always rendered, as is the one for any includes asked for
+    filters = [SearchFilters(deprecated=False, unknown=False, null_island=False)]
+    if args.include:
+        filters.append(
+            SearchFilters(
+                deprecated='deprecated' in args.include,
+                unknown='unknown' in args.include,
+                null_island='nullisland' in args.include,
+            ),
+        )
+
+    build_tile_pyramid(
+        args.output,
+        args.placetype or DEFAULT_PLACETYPES,
+        filters,
+        min_zoom=args.min_zoom,
+        max_zoom=args.max_zoom,
+        workers=args.workers,
+    )
+
+
+if __name__ == '__main__':
+    main()
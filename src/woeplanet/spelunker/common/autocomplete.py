@@ -0,0 +1,34 @@
+"""
+WOEplanet Spelunker: common package; autocomplete module.
+"""
+
+import unicodedata
+
+from woeplanet.spelunker.config.place_scale import placetype_to_scale
+from woeplanet.spelunker.config.search_ranking import NAME_TYPE_PRIORITY, NAME_TYPE_PRIORITY_OTHER, SCALE_UNKNOWN
+
+# Prefixes up to this many characters have their top results precomputed; they match too many names to rank on demand
+PRECOMPUTED_PREFIX_LENGTH = 3
+# as do longer prefixes of more than this many names, so any prefix that isn't precomputed is ranked from at most these
+PRECOMPUTED_PREFIX_NAMES = 1000
+AUTOCOMPLETE_LIMIT_DEFAULT = 10
+AUTOCOMPLETE_LIMIT_MAX = 20
+
+
+def autocomplete_key(text: str) -> str:
+    """
+    Normalise a name, or a prefix of one, for prefix matching; case folded, without accents or extra whitespace
+    """
+
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.split())
+
+
+def autocomplete_score(placetype_id: int, name_type: str | None) -> int:
+    """
+    Score a name for autocomplete ranking, lower is better; larger places first, then by name type
+    """
+
+    scale = placetype_to_scale(placetype_id) or SCALE_UNKNOWN
+    return scale * 10 + NAME_TYPE_PRIORITY.get(name_type or '', NAME_TYPE_PRIORITY_OTHER)
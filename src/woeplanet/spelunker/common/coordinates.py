@@ -2,6 +2,7 @@
 WOEplanet Spelunker: common package; coordinates extraction module.
 """
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Any
 
@@ -16,7 +17,7 @@ class PlaceCoordinates:
     bounds: list[list[float]] | None
 
 
-def extract_coordinates(place: dict[str, Any] | None) -> PlaceCoordinates:
+def extract_coordinates(place: Mapping[str, Any] | None) -> PlaceCoordinates:
     """
     Extract centroid and bounds from a place dictionary.
     """
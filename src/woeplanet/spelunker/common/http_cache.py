@@ -0,0 +1,62 @@
+"""
+WOEplanet Spelunker: common package; HTTP caching module.
+"""
+
+import hashlib
+from functools import lru_cache
+from http import HTTPStatus
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from woeplanet.spelunker.config.settings import get_settings
+
+CACHE_CONTROL_LONG = 'public, max-age=604800'  # 1 week
+CACHE_CONTROL_NO_STORE = 'no-store'
+
+
+@lru_cache
+def data_release() -> str:
+    """
+    Get a short identifier for the data release currently being served.
+    """
+
+    settings = get_settings()
+    parts = []
+    for path in (settings.woeplanet_db_path, settings.woeplanet_geom_db_path):
+        stat = path.stat()
+        parts.append(f'{path.name}:{stat.st_size}:{int(stat.st_mtime)}')
+
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def make_etag(*parts: str | int) -> str:
+    """
+    Make a weak ETag for a resource that only changes between data releases.
+    """
+
+    return f'W/"{data_release()}-{"-".join(str(part) for part in parts)}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Does the request's If-None-Match header match an ETag?
+    """
+
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
+def not_modified_response(etag: str, cache_control: str = CACHE_CONTROL_LONG) -> Response:
+    """
+    Return a 304 Not Modified response.
+    """
+
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={'ETag': etag, 'Cache-Control': cache_control},
+    )
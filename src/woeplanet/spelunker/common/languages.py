@@ -2,19 +2,42 @@
 WOEplanet Spelunker: common package; languages module.
 """
 
+import functools
+from collections.abc import Mapping
+from types import MappingProxyType
+
 import pycountry
 
+# WOE's own code for an unknown language, which ISO 639 otherwise has as Enawené-Nawé
+UNKNOWN_LANGUAGE_CODE = 'unk'
+UNKNOWN_LANGUAGE_NAME = 'Unknown'
 
-def language_name(code: str) -> str:
+
+@functools.cache
+def load_language_names() -> Mapping[str, str]:
     """
-    Get the name of a language from an ISO 639 code
+    Build a read only map of lower case ISO 639 alpha-3 and bibliographic codes to language names, once.
+
+    pycountry loads its database the first time it's used, and each get scans its indices; the lifespan loads the map
+    up front, so neither happens on a request.
     """
 
-    if code.lower() == 'unk':
-        return 'Unknown'
+    names: dict[str, str] = {}
+    for lang in pycountry.languages:
+        names[lang.alpha_3.lower()] = lang.name
+    for lang in pycountry.languages:
+        # as with pycountry's own lookups, a bibliographic code takes precedence over an alpha-3 code
+        bibliographic = getattr(lang, 'bibliographic', None)
+        if bibliographic:
+            names[bibliographic.lower()] = lang.name
+
+    names[UNKNOWN_LANGUAGE_CODE] = UNKNOWN_LANGUAGE_NAME
+    return MappingProxyType(names)
 
-    lang = pycountry.languages.get(bibliographic=code.lower())
-    if not lang:
-        lang = pycountry.languages.get(alpha_3=code.lower())
 
-    return lang.name if lang else 'Unknown'
+def language_name(code: str) -> str:
+    """
+    Get the name of a language from an ISO 639 code
+    """
+
+    return load_language_names().get(code.lower(), UNKNOWN_LANGUAGE_NAME)
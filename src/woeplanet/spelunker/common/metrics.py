@@ -0,0 +1,127 @@
+"""
+WOEplanet Spelunker: common package; metrics module.
+"""
+
+import os
+import tempfile
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# prometheus_client shares metrics between processes through files in this directory, if it's set when it's imported
+MULTIPROCESS_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+# route label for requests that don't match a route, so arbitrary paths can't make new series
+UNMATCHED_ROUTE = '<unmatched>'
+
+QUERY_SECONDS = Histogram(
+    'woeplanet_query_seconds',
+    'Database method latency',
+    ['method'],
+    buckets=LATENCY_BUCKETS,
+)
+QUERY_ROWS = Histogram(
+    'woeplanet_query_rows',
+    'Rows returned by database methods',
+    ['method'],
+    buckets=ROWS_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    'woeplanet_request_seconds',
+    'HTTP request latency, from the first middleware to the last byte of the response',
+    ['route', 'method', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_WAIT_SECONDS = Histogram(
+    'woeplanet_pool_wait_seconds',
+    'Time waiting to check out a pooled database connection',
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'woeplanet_cache_lookups',
+    'Disk cache lookups, by key prefix and result',
+    ['prefix', 'result'],
+)
+
+
+def init_multiprocess_metrics(metrics_dir: Path | None = None) -> Path:
+    """
+    Share metrics between worker processes, through files in a directory, emptied of any previous run's.
+
+    Call before uvicorn starts its workers; they're spawned, and so import prometheus_client afresh with the directory
+    set. Without a directory, a temporary one is made.
+    """
+
+    if metrics_dir is None:
+        metrics_dir = Path(tempfile.mkdtemp(prefix='woeplanet-metrics-'))
+
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    for path in metrics_dir.glob('*.db'):
+        path.unlink()
+
+    os.environ[MULTIPROCESS_DIR_ENV] = str(metrics_dir)
+    return metrics_dir
+
+
+def render_metrics() -> bytes:
+    """
+    Render all metrics in the Prometheus text format; every worker's, if they're shared, or this process's
+    """
+
+    if MULTIPROCESS_DIR_ENV not in os.environ:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def result_rows(result: object) -> int | None:
+    """
+    Count the rows in a database method's result; None for counts and other scalars, which aren't rows.
+
+    A page is its items, a sequence its length, and a mapping one row, unless it's rows grouped by a key, as
+    inflate_place_ids groups places by placetype.
+    """
+
+    if result is None:
+        return 0
+
+    items = getattr(result, 'items', None)
+    if isinstance(items, Sequence):
+        return len(items)
+
+    if isinstance(result, Mapping):
+        groups = list(result.values())
+        if groups and all(isinstance(group, list) for group in groups):
+            return sum(len(group) for group in groups)
+        return 1
+
+    if isinstance(result, str):
+        return 1
+
+    return len(result) if isinstance(result, Sequence) else None
+
+
+def observe_query(method: str, elapsed: float, rows: int | None) -> None:
+    """
+    Record a database method's latency, and the rows it returned, if any
+    """
+
+    QUERY_SECONDS.labels(method).observe(elapsed)
+    if rows is not None:
+        QUERY_ROWS.labels(method).observe(rows)
@@ -0,0 +1,291 @@
+"""
+WOEplanet Spelunker: common package; Mapbox Vector Tile encoding module.
+
+A minimal encoder for version 2 of the Mapbox Vector Tile specification, just enough for point and polygon layers.
+See https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+"""
+
+import math
+import struct
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_EXTENT = 4096
+MAX_LATITUDE = 85.0511287798
+
+GEOM_POINT = 1
+GEOM_POLYGON = 3
+
+CMD_MOVE_TO = 1
+CMD_LINE_TO = 2
+CMD_CLOSE_PATH = 7
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+
+MIN_RING_POINTS = 3
+
+Coordinates = list[tuple[int, int]]
+Projector = Callable[[float, float], tuple[int, int]]
+PropertyValue = str | int | float | bool | None
+
+
+@dataclass
+class TileFeature:
+    """
+    A vector tile feature; geometry is a GeoJSON geometry object, in WGS84 longitude/latitude.
+    """
+
+    id: int
+    geometry: dict[str, Any]
+    properties: dict[str, PropertyValue] = field(default_factory=dict)
+
+
+@dataclass
+class TileLayer:
+    """
+    A named vector tile layer.
+    """
+
+    name: str
+    features: list[TileFeature] = field(default_factory=list)
+    extent: int = DEFAULT_EXTENT
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """
+    Get the WGS84 bounds of a tile, as (west, south, east, north)
+    """
+
+    n = 2**z
+
+    def lat(ty: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def _projector(z: int, x: int, y: int, extent: int) -> Projector:
+    """
+    Return a function projecting WGS84 longitude/latitude to integer tile coordinates
+    """
+
+    n = 2**z
+
+    def project(lng: float, lat: float) -> tuple[int, int]:
+        lat = max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)
+        lat_rad = math.radians(lat)
+        world_x = (lng + 180.0) / 360.0 * n
+        world_y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+        return (round((world_x - x) * extent), round((world_y - y) * extent))
+
+    return project
+
+
+def _varint(value: int) -> bytes:
+    """
+    Encode an unsigned varint
+    """
+
+    out = bytearray()
+    while value > 0x7F:  # noqa: PLR2004
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    """
+    Zigzag encode a signed integer
+    """
+
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+
+def _length_delimited(field_number: int, payload: bytes) -> bytes:
+    return _key(field_number, WIRE_LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed(field_number: int, values: list[int]) -> bytes:
+    return _length_delimited(field_number, b''.join(_varint(v) for v in values))
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def _encode_value(value: str | float | bool) -> bytes:  # noqa: FBT001
+    """
+    Encode a layer Value message
+    """
+
+    if isinstance(value, bool):
+        return _key(7, WIRE_VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, WIRE_VARINT) + _varint(value)
+        return _key(6, WIRE_VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, WIRE_FIXED64) + struct.pack('<d', value)
+    return _length_delimited(1, str(value).encode('utf-8'))
+
+
+def _ring_area(ring: Coordinates) -> int:
+    """
+    Twice the signed area of a ring in tile coordinates; positive is clockwise, as y points down
+    """
+
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1], strict=True))
+
+
+def _clean_ring(ring: list[list[float]], project: Projector) -> Coordinates:
+    """
+    Project a GeoJSON ring, dropping repeated points and the closing point
+    """
+
+    points: Coordinates = []
+    for lng, lat, *_ in ring:
+        point = project(lng, lat)
+        if not points or point != points[-1]:
+            points.append(point)
+
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+
+    return points
+
+
+def _polygons(geometry: dict[str, Any]) -> list[list[list[list[float]]]]:
+    """
+    Get the polygons in a GeoJSON geometry, ignoring anything that isn't areal
+    """
+
+    geom_type = geometry.get('type')
+    if geom_type == 'Polygon':
+        return [geometry['coordinates']]
+    if geom_type == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    if geom_type == 'GeometryCollection':
+        return [polygon for child in geometry.get('geometries', []) for polygon in _polygons(child)]
+    return []
+
+
+class _Cursor:
+    """
+    Geometry command encoder, tracking the delta encoded cursor position
+    """
+
+    def __init__(self) -> None:
+        self.x = 0
+        self.y = 0
+        self.commands: list[int] = []
+
+    def move_to(self, points: Coordinates) -> None:
+        self.commands.append(_command(CMD_MOVE_TO, len(points)))
+        self._deltas(points)
+
+    def line_to(self, points: Coordinates) -> None:
+        self.commands.append(_command(CMD_LINE_TO, len(points)))
+        self._deltas(points)
+
+    def close_path(self) -> None:
+        self.commands.append(_command(CMD_CLOSE_PATH, 1))
+
+    def _deltas(self, points: Coordinates) -> None:
+        for x, y in points:
+            self.commands.extend([_zigzag(x - self.x), _zigzag(y - self.y)])
+            self.x, self.y = x, y
+
+
+def _encode_geometry(geometry: dict[str, Any], project: Projector) -> tuple[int, list[int]] | None:
+    """
+    Encode a GeoJSON geometry as a geometry type and command list
+    """
+
+    cursor = _Cursor()
+
+    if geometry.get('type') == 'Point':
+        lng, lat, *_ = geometry['coordinates']
+        cursor.move_to([project(lng, lat)])
+        return GEOM_POINT, cursor.commands
+
+    for polygon in _polygons(geometry):
+        for index, ring in enumerate(polygon):
+            points = _clean_ring(ring, project)
+            area = _ring_area(points) if len(points) >= MIN_RING_POINTS else 0
+            if area == 0:
+                # a collapsed exterior ring takes its holes with it
+                if index == 0:
+                    break
+                continue
+
+            # exterior rings are clockwise, interior rings anti-clockwise
+            if (index == 0) != (area > 0):
+                points.reverse()
+
+            cursor.move_to(points[:1])
+            cursor.line_to(points[1:])
+            cursor.close_path()
+
+    if not cursor.commands:
+        return None
+
+    return GEOM_POLYGON, cursor.commands
+
+
+def _encode_layer(layer: TileLayer, z: int, x: int, y: int) -> bytes | None:
+    """
+    Encode a Layer message, or None if no features survive encoding
+    """
+
+    project = _projector(z, x, y, layer.extent)
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, str | float | bool], int] = {}
+    features: list[bytes] = []
+
+    for feature in layer.features:
+        encoded = _encode_geometry(feature.geometry, project)
+        if encoded is None:
+            continue
+
+        geom_type, commands = encoded
+        tags: list[int] = []
+        for key, value in feature.properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        message = _key(1, WIRE_VARINT) + _varint(feature.id)
+        if tags:
+            message += _packed(2, tags)
+        message += _key(3, WIRE_VARINT) + _varint(geom_type)
+        message += _packed(4, commands)
+        features.append(_length_delimited(2, message))
+
+    if not features:
+        return None
+
+    message = _key(15, WIRE_VARINT) + _varint(2)
+    message += _length_delimited(1, layer.name.encode('utf-8'))
+    message += b''.join(features)
+    message += b''.join(_length_delimited(3, key.encode('utf-8')) for key in keys)
+    message += b''.join(_length_delimited(4, _encode_value(value)) for _, value in values)
+    message += _key(5, WIRE_VARINT) + _varint(layer.extent)
+    return message
+
+
+def encode_tile(layers: list[TileLayer], z: int, x: int, y: int) -> bytes:
+    """
+    Encode layers as a Mapbox Vector Tile
+    """
+
+    encoded = (_encode_layer(layer, z, x, y) for layer in layers)
+    return b''.join(_length_delimited(3, layer) for layer in encoded if layer is not None)
@@ -24,12 +24,12 @@ class PaginationUrls:
 @dataclass
 class PaginationContext:
     """
-    Full pagination context for templates.
+    Full pagination context for templates; total and pages are None when counting ran out of time.
     """
 
-    total: int
+    total: int | None
     page: int
-    pages: int
+    pages: int | None
     urls: PaginationUrls
 
 
@@ -38,32 +38,40 @@ def build_pagination_context(
     result: PaginatedResult,
     *,
     pagination: PaginationParams,
-    total: int,
+    total: int | None,
 ) -> PaginationContext:
     """
     Build full pagination context including page numbers (cursor-based).
+
+    Items with a score are paginated on a (score, woe_id) cursor, otherwise on the WOE ID alone.
     """
 
     prev_url = None
     next_url = None
-    pages = max(1, math.ceil(total / pagination.limit))
+    pages = max(1, math.ceil(total / pagination.limit)) if total is not None else None
 
     if result.items:
-        first_id = result.items[0]['woe_id']
-        last_id = result.items[-1]['woe_id']
+        first = result.items[0]
+        last = result.items[-1]
 
         if result.has_more:
+            cursor: dict[str, int | float] = {'after': last['woe_id']}
+            if 'score' in last:
+                cursor['after_score'] = last['score']
             next_url = str(
-                request.url.remove_query_params(['before', 'page']).include_query_params(
-                    after=last_id,
+                request.url.remove_query_params(['before', 'before_score', 'after_score', 'page']).include_query_params(
+                    **cursor,
                     page=pagination.page + 1,
                 ),
             )
 
         if pagination.page > 1:
+            cursor = {'before': first['woe_id']}
+            if 'score' in first:
+                cursor['before_score'] = first['score']
             prev_url = str(
-                request.url.remove_query_params(['after', 'page']).include_query_params(
-                    before=first_id,
+                request.url.remove_query_params(['after', 'after_score', 'before_score', 'page']).include_query_params(
+                    **cursor,
                     page=pagination.page - 1,
                 ),
             )
@@ -81,7 +89,7 @@ def build_offset_pagination_context(
     result: PaginatedResult,
     *,
     pagination: PaginationParams,
-    total: int,
+    total: int | None,
 ) -> PaginationContext:
     """
     Build full pagination context including page numbers (offset-based).
@@ -89,7 +97,7 @@ def build_offset_pagination_context(
 
     prev_url = None
     next_url = None
-    pages = max(1, math.ceil(total / pagination.limit))
+    pages = max(1, math.ceil(total / pagination.limit)) if total is not None else None
 
     if result.has_more:
         next_url = str(
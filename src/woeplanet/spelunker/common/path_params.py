@@ -9,6 +9,8 @@ from pydantic import Field, TypeAdapter, ValidationError
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
 
+from woeplanet.spelunker.config.geometry_tiers import MAX_ZOOM
+
 MAX_WOEID = 2_147_483_647
 WOEID_REQUIRED = 'WOEID is required'
 WOEID_INVALID = 'WOEID must be a positive 32-bit integer'
@@ -16,6 +18,8 @@ ISO_REQUIRED = 'ISO country code is required'
 ISO_INVALID = 'ISO country code must be 2 uppercase letters'
 PLACETYPE_REQUIRED = 'Placetype is required'
 PLACETYPE_INVALID = 'Placetype must be a non-empty string'
+TILE_REQUIRED = 'Tile coordinates are required'
+TILE_INVALID = f'Tile zoom must be between 0 and {MAX_ZOOM}, and x and y within the tile grid for that zoom'
 
 WoeidType = Annotated[int, Field(gt=0, le=MAX_WOEID)]
 IsoCountryCodeType = Annotated[str, Field(min_length=2, max_length=2, pattern=r'^[A-Z]{2}$')]
@@ -72,3 +76,19 @@ def get_path_placetype(request: Request) -> str:
 
     except ValidationError as exc:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=PLACETYPE_INVALID) from exc
+
+
+def get_path_tile(request: Request) -> tuple[int, int, int]:
+    """
+    Get z/x/y tile coordinates from the path
+    """
+
+    try:
+        z, x, y = (int(request.path_params[key]) for key in ('z', 'x', 'y'))
+    except KeyError as exc:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=TILE_REQUIRED) from exc
+
+    if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2**z or not 0 <= y < 2**z:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=TILE_INVALID)
+
+    return z, x, y
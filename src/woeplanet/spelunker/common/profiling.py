@@ -7,6 +7,8 @@ import logging
 import time
 from collections.abc import Awaitable, Callable
 
+from woeplanet.spelunker.common.metrics import observe_query, result_rows
+from woeplanet.spelunker.common.tracing import trace_span
 from woeplanet.spelunker.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -23,19 +25,25 @@ def is_profiling_enabled() -> bool:
 def profile_async[T, **P](func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
     """
     Decorator to profile async functions
+
+    Their latency, and the rows they return, are always recorded as metrics, and as a span of the request's trace;
+    latency is also logged when profiling.
     """
 
     @functools.wraps(func)
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-        if not is_profiling_enabled():
-            return await func(*args, **kwargs)
-
         start = time.perf_counter()
+        rows = None
         try:
-            return await func(*args, **kwargs)
+            with trace_span(func.__qualname__):
+                result = await func(*args, **kwargs)
+            rows = result_rows(result)
+            return result
         finally:
             elapsed = time.perf_counter() - start
-            logger.debug('%s: %.3fs', func.__qualname__, elapsed)
+            observe_query(func.__qualname__, elapsed, rows)
+            if is_profiling_enabled():
+                logger.debug('%s: %.3fs', func.__qualname__, elapsed)
 
     return wrapper
 
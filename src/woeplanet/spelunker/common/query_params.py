@@ -12,6 +12,15 @@ from pydantic import BaseModel, Field, ValidationError, field_validator
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
 
+from woeplanet.spelunker.common.autocomplete import AUTOCOMPLETE_LIMIT_DEFAULT, AUTOCOMPLETE_LIMIT_MAX
+from woeplanet.spelunker.common.sampling import (
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_PROFILE_INTERVAL,
+    MAX_PROFILE_DURATION,
+    MAX_PROFILE_INTERVAL,
+    MIN_PROFILE_INTERVAL,
+)
+from woeplanet.spelunker.config.geometry_tiers import MAX_ZOOM, MIN_ZOOM
 from woeplanet.spelunker.config.placetypes import Placetype
 from woeplanet.spelunker.config.settings import get_settings
 from woeplanet.spelunker.dependencies.database import SearchFilters
@@ -21,8 +30,11 @@ LIMIT_DEFAULT = 10
 LIMIT_MAX = 100
 MAX_QUERY_LENGTH = 255
 MAX_NEARBY_DISTANCE = 100_000
+SLOW_QUERY_LIMIT_DEFAULT = 50
+SLOW_QUERY_LIMIT_MAX = 1000
 
 NameType = Literal['any', 'S', 'P', 'V', 'Q', 'A', 'woeid']
+SearchSort = Literal['relevance', 'woeid']
 
 
 class SearchParams(BaseModel):
@@ -32,6 +44,7 @@ class SearchParams(BaseModel):
 
     q: Annotated[str, Field(max_length=MAX_QUERY_LENGTH)] = ''
     name_type: NameType = 'any'
+    sort: SearchSort = 'relevance'
 
 
 class PlacetypeFilterModel(BaseModel):
@@ -63,13 +76,49 @@ class NearbyParamsModel(BaseModel):
     distance: Annotated[int, Field(gt=0, le=MAX_NEARBY_DISTANCE)] | None = None
 
 
+class MapParamsModel(BaseModel):
+    """
+    Map query parameters with validation.
+    """
+
+    zoom: Annotated[int, Field(ge=MIN_ZOOM, le=MAX_ZOOM)] | None = None
+
+
+class AutocompleteParams(BaseModel):
+    """
+    Autocomplete query parameters with validation.
+    """
+
+    q: Annotated[str, Field(min_length=1, max_length=MAX_QUERY_LENGTH)]
+    limit: Annotated[int, Field(gt=0, le=AUTOCOMPLETE_LIMIT_MAX)] = AUTOCOMPLETE_LIMIT_DEFAULT
+
+
+class SlowQueryParams(BaseModel):
+    """
+    Slow query log query parameters with validation.
+    """
+
+    limit: Annotated[int, Field(gt=0, le=SLOW_QUERY_LIMIT_MAX)] = SLOW_QUERY_LIMIT_DEFAULT
+
+
+class ProfileParams(BaseModel):
+    """
+    Sampling profile query parameters with validation; in seconds.
+    """
+
+    duration: Annotated[float, Field(gt=0, le=MAX_PROFILE_DURATION)] = DEFAULT_PROFILE_DURATION
+    interval: Annotated[float, Field(ge=MIN_PROFILE_INTERVAL, le=MAX_PROFILE_INTERVAL)] = DEFAULT_PROFILE_INTERVAL
+
+
 class PaginationParamsModel(BaseModel):
     """
     Pagination query parameters with validation.
     """
 
     after: Annotated[int, Field(gt=0)] | None = None
+    after_score: Annotated[float, Field(allow_inf_nan=False)] | None = None
     before: Annotated[int, Field(gt=0)] | None = None
+    before_score: Annotated[float, Field(allow_inf_nan=False)] | None = None
     limit: Annotated[int, Field(gt=0)] | None = None
     page: Annotated[int, Field(gt=0)] | None = None
 
@@ -95,6 +144,8 @@ class PaginationParams:
     before: int | None
     limit: int
     page: int
+    after_score: float | None = None
+    before_score: float | None = None
 
 
 @dataclass
@@ -108,6 +159,15 @@ class NearbyParams:
     distance: int
 
 
+@dataclass
+class MapParams:
+    """
+    Map query parameters.
+    """
+
+    zoom: int | None
+
+
 def parse_nearby_params(request: Request) -> NearbyParams:
     """
     Parse and validate nearby query params.
@@ -139,6 +199,27 @@ def parse_nearby_params(request: Request) -> NearbyParams:
     )
 
 
+def parse_map_params(request: Request) -> MapParams:
+    """
+    Parse and validate map query params.
+    """
+
+    try:
+        validated = MapParamsModel(zoom=request.query_params.get('zoom'))
+    except ValidationError as exc:
+        errors = exc.errors()
+        if errors:
+            msg = errors[0].get('msg', 'Invalid map parameters')
+            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=msg) from exc
+
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid map parameters',
+        ) from exc
+
+    return MapParams(zoom=validated.zoom)
+
+
 def parse_filter_params(request: Request) -> FilterParams:
     """
     Build filter parameters from query parameters
@@ -170,7 +251,9 @@ def parse_pagination(request: Request) -> PaginationParams:
     try:
         validated = PaginationParamsModel(
             after=request.query_params.get('after'),
+            after_score=request.query_params.get('after_score'),
             before=request.query_params.get('before'),
+            before_score=request.query_params.get('before_score'),
             limit=request.query_params.get('limit'),
             page=request.query_params.get('page'),
         )
@@ -187,7 +270,9 @@ def parse_pagination(request: Request) -> PaginationParams:
 
     return PaginationParams(
         after=validated.after,
+        after_score=validated.after_score,
         before=validated.before,
+        before_score=validated.before_score,
         limit=min(validated.limit, LIMIT_MAX) if validated.limit else LIMIT_DEFAULT,
         page=validated.page if validated.page else 1,
     )
@@ -202,6 +287,7 @@ def parse_search_params(request: Request) -> SearchParams:
         return SearchParams(
             q=request.query_params.get('q', '').strip(),
             name_type=request.query_params.get('name-type', 'any').strip(),
+            sort=request.query_params.get('sort', 'relevance').strip(),
         )
     except ValidationError as exc:
         errors = exc.errors()
@@ -215,6 +301,57 @@ def parse_search_params(request: Request) -> SearchParams:
         ) from exc
 
 
+def parse_autocomplete_params(request: Request) -> AutocompleteParams:
+    """
+    Parse and validate autocomplete query parameters.
+    """
+
+    try:
+        return AutocompleteParams(
+            q=request.query_params.get('q', '').strip(),
+            limit=request.query_params.get('limit', AUTOCOMPLETE_LIMIT_DEFAULT),
+        )
+    except ValidationError as exc:
+        errors = exc.errors()
+        if errors:
+            msg = errors[0].get('msg', 'Invalid autocomplete parameters')
+            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=msg) from exc
+
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid autocomplete parameters',
+        ) from exc
+
+
+def parse_slow_query_params(request: Request) -> SlowQueryParams:
+    """
+    Parse and validate slow query log query parameters.
+    """
+
+    try:
+        return SlowQueryParams(limit=request.query_params.get('limit', SLOW_QUERY_LIMIT_DEFAULT))
+    except ValidationError as exc:
+        errors = exc.errors()
+        msg = errors[0].get('msg', 'Invalid slow query parameters') if errors else 'Invalid slow query parameters'
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=msg) from exc
+
+
+def parse_profile_params(request: Request) -> ProfileParams:
+    """
+    Parse and validate sampling profile query parameters.
+    """
+
+    try:
+        return ProfileParams(
+            duration=request.query_params.get('duration', DEFAULT_PROFILE_DURATION),
+            interval=request.query_params.get('interval', DEFAULT_PROFILE_INTERVAL),
+        )
+    except ValidationError as exc:
+        errors = exc.errors()
+        msg = errors[0].get('msg', 'Invalid profile parameters') if errors else 'Invalid profile parameters'
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=msg) from exc
+
+
 def parse_placetype_filter(request: Request) -> Placetype | None:
     """
     Parse and validate placetype query param.
@@ -0,0 +1,284 @@
+"""
+WOEplanet Spelunker: common package; sampling profiler module.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DURATION = 30.0  # seconds
+MAX_PROFILE_DURATION = 600.0  # seconds
+DEFAULT_PROFILE_INTERVAL = 0.01  # seconds; 100 samples a second
+MIN_PROFILE_INTERVAL = 0.001  # seconds
+MAX_PROFILE_INTERVAL = 1.0  # seconds
+
+# the leaf frames of threads waiting for work; the event loop polling for I/O, and aiosqlite's threads, the pool's
+# connections, waiting for statements
+IDLE_FRAMES = frozenset({('selectors', 'select'), ('threading', 'wait'), ('queue', 'get')})
+
+
+class RouteFrames:
+    """
+    Module-level holder of the code objects of the functions that hold a request's route, in a local named route.
+    """
+
+    codes: set[CodeType] = set()  # noqa: RUF012
+
+
+def tag_route[F: Callable[..., Any]](func: F) -> F:
+    """
+    Decorator to tag the samples taken while a function is on the stack with its route local; it costs nothing per call
+    """
+
+    RouteFrames.codes.add(func.__code__)
+    return func
+
+
+@dataclass(frozen=True)
+class ProfileStatus:
+    """
+    A profile's progress; path is where it's written, when it's stopped.
+    """
+
+    pid: int
+    running: bool
+    path: str | None
+    started_at: float | None  # seconds since the epoch
+    duration: float | None  # seconds
+    interval: float | None  # seconds
+    samples: int
+
+
+class SamplingProfiler:
+    """
+    A sampling profiler for a worker; a thread that samples every other thread's stack at an interval, for a duration.
+
+    Stacks are counted, and written in the folded format of flamegraph.pl, speedscope and inferno, as the thread's
+    name, then the route of the request the thread was serving, if any, then the frames from the outermost in. Idle
+    threads aren't counted. The pool's connections run statements in their own threads, so their samples have no route.
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self._output_dir = output_dir
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._samples = 0
+        self._labels: dict[CodeType, str] = {}
+        self._idle: dict[CodeType, bool] = {}
+        self._path: Path | None = None
+        self._started_at: float | None = None
+        self._duration: float | None = None
+        self._interval: float | None = None
+        # longest first, so a frame's file is named relative to the innermost directory on the path that holds it
+        self._prefixes = sorted({f'{path.rstrip(os.sep)}{os.sep}' for path in sys.path if path}, key=len, reverse=True)
+
+    @property
+    def running(self) -> bool:
+        """
+        Is a profile being taken?
+        """
+
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> ProfileStatus:
+        """
+        Get the current, or last, profile's progress
+        """
+
+        return ProfileStatus(
+            pid=os.getpid(),
+            running=self.running,
+            path=str(self._path) if self._path else None,
+            started_at=self._started_at,
+            duration=self._duration,
+            interval=self._interval,
+            samples=self._samples,
+        )
+
+    def start(self, duration: float = DEFAULT_PROFILE_DURATION, interval: float = DEFAULT_PROFILE_INTERVAL) -> bool:
+        """
+        Start a profile, which stops itself after its duration; False if one's already running
+        """
+
+        with self._lock:
+            if self.running:
+                return False
+
+            self._started_at = time.time()
+            stamp = datetime.fromtimestamp(self._started_at, tz=UTC).strftime('%Y%m%dT%H%M%SZ')
+            self._path = self._output_dir / f'profile-{os.getpid()}-{stamp}.folded'
+            self._duration = duration
+            self._interval = interval
+            self._stacks = Counter()
+            self._samples = 0
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(duration, interval),
+                name='sampling-profiler',
+                daemon=True,
+            )
+            self._thread.start()
+
+        logger.info('Profiling for %.1fs, every %.3fs, to %s', duration, interval, self._path)
+        return True
+
+    def stop(self, *, wait: bool = True) -> bool:
+        """
+        Stop the profile early, and write it; without waiting, it's written in the background. False if none's running
+        """
+
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return False
+
+        self._stop.set()
+        if wait:
+            thread.join()
+
+        return True
+
+    def _run(self, duration: float, interval: float) -> None:
+        """
+        Sample until stopped, or for the duration, then write the profile
+        """
+
+        deadline = time.monotonic() + duration
+        try:
+            while not self._stop.wait(interval) and time.monotonic() < deadline:
+                self._sample()
+        finally:
+            self._write()
+
+    def _label(self, code: CodeType) -> str:
+        """
+        Name a frame by its function and where it's defined, once per code object
+        """
+
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            prefix = next((prefix for prefix in self._prefixes if filename.startswith(prefix)), '')
+            label = f'{code.co_qualname} ({filename.removeprefix(prefix)}:{code.co_firstlineno})'
+            self._labels[code] = label
+
+        return label
+
+    def _is_idle(self, code: CodeType) -> bool:
+        """
+        Is a thread whose innermost frame runs this code waiting for work?
+        """
+
+        idle = self._idle.get(code)
+        if idle is None:
+            idle = self._idle[code] = (Path(code.co_filename).stem, code.co_name) in IDLE_FRAMES
+
+        return idle
+
+    def _sample(self) -> None:
+        """
+        Count every other thread's stack, tagged with its route
+        """
+
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        current = threading.get_ident()
+        for thread_id, leaf in sys._current_frames().items():  # noqa: SLF001
+            if thread_id == current or self._is_idle(leaf.f_code):
+                continue
+
+            frames: list[str] = []
+            route = None
+            frame: FrameType | None = leaf
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                if route is None and frame.f_code in RouteFrames.codes:
+                    route = frame.f_locals.get('route')
+                frame = frame.f_back
+
+            tags = (names.get(thread_id, str(thread_id)), *([str(route)] if route is not None else []))
+            self._stacks[(*tags, *reversed(frames))] += 1
+            self._samples += 1
+
+    def _write(self) -> None:
+        """
+        Write the counted stacks, in the folded format
+        """
+
+        if self._path is None:
+            return
+
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        with self._path.open('w', encoding='utf-8') as output:
+            for stack, count in self._stacks.most_common():
+                output.write(f'{";".join(frame.replace(";", ":") for frame in stack)} {count}\n')
+
+        logger.info('Profile of %d samples written to %s', self._samples, self._path)
+
+
+class SamplingProfilerHolder:
+    """
+    Module-level sampling profiler holder to avoid global statement.
+    """
+
+    profiler: SamplingProfiler | None = None
+
+
+def _toggle_profile() -> None:
+    """
+    Start a profile, or stop the running one, writing it in the background
+    """
+
+    profiler = SamplingProfilerHolder.profiler
+    if profiler is not None and not profiler.stop(wait=False):
+        profiler.start()
+
+
+def init_sampling_profiler(storage_dir: Path) -> SamplingProfiler:
+    """
+    Initialise the worker's sampling profiler, writing profiles to storage.
+
+    SIGUSR2 toggles it, if the worker's event loop runs in its main thread, as it does under uvicorn, so a single worker
+    can be profiled by its pid.
+    """
+
+    SamplingProfilerHolder.profiler = SamplingProfiler(storage_dir / 'profiles')
+    if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, _toggle_profile)
+
+    return SamplingProfilerHolder.profiler
+
+
+def get_sampling_profiler() -> SamplingProfiler | None:
+    """
+    Get the worker's sampling profiler.
+    """
+
+    return SamplingProfilerHolder.profiler
+
+
+def close_sampling_profiler() -> None:
+    """
+    Stop, and write, any running profile, and stop handling SIGUSR2.
+    """
+
+    if SamplingProfilerHolder.profiler is not None:
+        SamplingProfilerHolder.profiler.stop()
+        SamplingProfilerHolder.profiler = None
+
+    if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR2)
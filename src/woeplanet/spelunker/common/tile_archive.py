@@ -0,0 +1,203 @@
+"""
+WOEplanet Spelunker: common package; tile archive module.
+
+A single file archive of pre-rendered vector tiles, in the spirit of PMTiles, laid out so it can be memory mapped and
+read without parsing more than a fixed size header:
+
+    header      magic, version, metadata length, entry count
+    metadata    JSON; the archive's data release and, per tileset, its zoom range
+    directory   fixed size entries (tileset, z, x, y, offset, length), sorted by (tileset, z, x, y)
+    data        tile data; identical tiles are stored once
+
+Empty tiles aren't stored; a tile missing from a tileset's zoom range is empty, rather than unknown.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Self
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'WOETILES'
+VERSION = 1
+
+HEADER = struct.Struct('<8sHII')
+ENTRY = struct.Struct('<HBIIQI')
+
+TileKey = tuple[int, int, int, int]
+
+
+class TileArchiveError(Exception):
+    """
+    Raised when a file isn't a readable tile archive.
+    """
+
+
+@dataclass(frozen=True)
+class Tileset:
+    """
+    A tileset in an archive, and the zoom range it was rendered for.
+    """
+
+    key: str
+    min_zoom: int
+    max_zoom: int
+
+
+class TileArchiveWriter:
+    """
+    Write a tile archive; tiles can be added in any order, data is spooled to a temporary file until closed.
+    """
+
+    def __init__(self, path: Path, tilesets: list[Tileset], metadata: dict[str, Any] | None = None) -> None:
+        self._path = path
+        self._tilesets = tilesets
+        self._tileset_index = {tileset.key: index for index, tileset in enumerate(tilesets)}
+        self._metadata = metadata or {}
+        self._entries: dict[TileKey, tuple[int, int]] = {}
+        self._offsets: dict[bytes, int] = {}
+        self._data: IO[bytes] = tempfile.TemporaryFile(dir=path.parent)  # noqa: SIM115
+        self._size = 0
+
+    def __enter__(self) -> Self:
+        """
+        Enter the writer's context
+        """
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Write the archive, unless the context exited with an exception
+        """
+
+        if exc_type is None:
+            self.close()
+        else:
+            self._data.close()
+
+    def add(self, key: str, z: int, x: int, y: int, tile: bytes) -> None:
+        """
+        Add a tile to a tileset
+        """
+
+        if not tile:
+            return
+
+        digest = hashlib.sha256(tile).digest()
+        offset = self._offsets.get(digest)
+        if offset is None:
+            offset = self._offsets[digest] = self._size
+            self._data.write(tile)
+            self._size += len(tile)
+
+        self._entries[(self._tileset_index[key], z, x, y)] = (offset, len(tile))
+
+    def close(self) -> None:
+        """
+        Write the archive, atomically replacing any existing archive at the path
+        """
+
+        metadata = {
+            **self._metadata,
+            'tilesets': [
+                {'key': tileset.key, 'min_zoom': tileset.min_zoom, 'max_zoom': tileset.max_zoom}
+                for tileset in self._tilesets
+            ],
+        }
+        metadata_bytes = json.dumps(metadata).encode('utf-8')
+
+        with tempfile.NamedTemporaryFile(dir=self._path.parent, suffix='.tmp', delete=False) as ofh:
+            tmp_path = Path(ofh.name)
+            ofh.write(HEADER.pack(MAGIC, VERSION, len(metadata_bytes), len(self._entries)))
+            ofh.write(metadata_bytes)
+            for entry_key in sorted(self._entries):
+                ofh.write(ENTRY.pack(*entry_key, *self._entries[entry_key]))
+
+            self._data.seek(0)
+            shutil.copyfileobj(self._data, ofh)
+
+        self._data.close()
+        tmp_path.replace(self._path)
+        logger.info('Wrote %d tiles (%d bytes of tile data) to %s', len(self._entries), self._size, self._path)
+
+
+class TileArchive:
+    """
+    Read tiles from a memory mapped tile archive.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open('rb') as ifh:
+            try:
+                self._mmap = mmap.mmap(ifh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                msg = f'{path} is empty'
+                raise TileArchiveError(msg) from exc
+
+        try:
+            magic, version, metadata_length, self._count = HEADER.unpack_from(self._mmap, 0)
+        except struct.error as exc:
+            self._mmap.close()
+            msg = f'{path} is too short to be a tile archive'
+            raise TileArchiveError(msg) from exc
+
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            msg = f'{path} is not a version {VERSION} tile archive'
+            raise TileArchiveError(msg)
+
+        self.metadata: dict[str, Any] = json.loads(self._mmap[HEADER.size : HEADER.size + metadata_length])
+        self.tilesets = {
+            tileset['key']: (index, Tileset(**tileset)) for index, tileset in enumerate(self.metadata['tilesets'])
+        }
+        self._directory = HEADER.size + metadata_length
+        self._data = self._directory + self._count * ENTRY.size
+
+    def close(self) -> None:
+        """
+        Unmap the archive
+        """
+
+        self._mmap.close()
+
+    def get(self, key: str, z: int, x: int, y: int) -> bytes | None:
+        """
+        Get a tile; empty bytes for an empty tile, or None if the archive doesn't cover the tile
+        """
+
+        found = self.tilesets.get(key)
+        if found is None:
+            return None
+
+        index, tileset = found
+        if not tileset.min_zoom <= z <= tileset.max_zoom:
+            return None
+
+        target = (index, z, x, y)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            *entry_key, offset, length = ENTRY.unpack_from(self._mmap, self._directory + mid * ENTRY.size)
+            if tuple(entry_key) == target:
+                start = self._data + offset
+                return self._mmap[start : start + length]
+            if tuple(entry_key) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return b''
@@ -0,0 +1,266 @@
+"""
+WOEplanet Spelunker: common package; tracing module.
+"""
+
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'woeplanet-spelunker'
+SCOPE_NAME = 'woeplanet.spelunker'
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+# Server-Timing metric names are HTTP tokens
+NON_TOKEN_CHARACTERS = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+AttributeValue = str | int | float | bool
+
+
+@dataclass(slots=True)
+class Span:
+    """
+    A timed part of a request; start and end are perf_counter times.
+    """
+
+    name: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """
+        Seconds the span took, or has taken so far
+        """
+
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+@dataclass(slots=True)
+class Trace:
+    """
+    A request's spans; the root span is the request, and epoch_ns the wall clock time it started.
+    """
+
+    trace_id: str
+    root: Span
+    epoch_ns: int
+    spans: list[Span] = field(default_factory=list)
+
+
+# a request's spans are recorded in its trace, and queries it runs concurrently inherit both, as tasks copy the context
+_current_trace: ContextVar[Trace | None] = ContextVar('current_trace', default=None)
+_current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: AttributeValue) -> Iterator[Trace]:
+    """
+    Trace a request; spans started while it runs, and by any tasks it starts, are recorded in its trace
+    """
+
+    root = Span(name, secrets.token_hex(8), None, time.perf_counter(), attributes=attributes)
+    trace = Trace(secrets.token_hex(16), root, time.time_ns())
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(root)
+    try:
+        yield trace
+    finally:
+        root.end = time.perf_counter()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def trace_span(name: str, **attributes: AttributeValue) -> Iterator[Span | None]:
+    """
+    Record a span in the current request's trace, as a child of the current span; outside a request, it does nothing
+    """
+
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    span = Span(name, secrets.token_hex(8), parent.span_id if parent else None, time.perf_counter(), None, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.end = time.perf_counter()
+        _current_span.reset(token)
+        trace.spans.append(span)
+
+
+def add_span(name: str, start: float, **attributes: AttributeValue) -> None:
+    """
+    Record a span that started at a perf_counter time and has just ended, as a child of the current span
+    """
+
+    trace = _current_trace.get()
+    if trace is None:
+        return
+
+    parent = _current_span.get()
+    span_id = secrets.token_hex(8)
+    trace.spans.append(
+        Span(name, span_id, parent.span_id if parent else None, start, time.perf_counter(), attributes),
+    )
+
+
+def server_timing(trace: Trace) -> str:
+    """
+    Summarize a trace as a Server-Timing header; spans of the same name are added up, and the request's total is last
+    """
+
+    durations: dict[str, float] = {}
+    counts: Counter[str] = Counter()
+    for span in sorted(trace.spans, key=lambda span: span.start):
+        durations[span.name] = durations.get(span.name, 0.0) + span.duration
+        counts[span.name] += 1
+
+    metrics = []
+    for name, duration in durations.items():
+        description = f';desc="{counts[name]} calls"' if counts[name] > 1 else ''
+        metrics.append(f'{NON_TOKEN_CHARACTERS.sub("-", name)};dur={duration * 1e3:.1f}{description}')
+    metrics.append(f'total;dur={trace.root.duration * 1e3:.1f}')
+
+    return ', '.join(metrics)
+
+
+def _otlp_attributes(attributes: dict[str, AttributeValue]) -> list[dict[str, Any]]:
+    """
+    Convert span attributes to OTLP key values; OTLP JSON encodes 64 bit integers as strings
+    """
+
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded: dict[str, Any] = {'boolValue': value}
+        elif isinstance(value, int):
+            encoded = {'intValue': str(value)}
+        elif isinstance(value, float):
+            encoded = {'doubleValue': value}
+        else:
+            encoded = {'stringValue': value}
+        values.append({'key': key, 'value': encoded})
+
+    return values
+
+
+def otlp_json(trace: Trace) -> dict[str, Any]:
+    """
+    Convert a trace to an OTLP/JSON export request, as an OpenTelemetry collector's file receiver reads them
+    """
+
+    def unix_nano(perf_counter: float | None) -> str:
+        offset = (perf_counter if perf_counter is not None else trace.root.start) - trace.root.start
+        return str(trace.epoch_ns + int(offset * 1e9))
+
+    spans = []
+    for span in (trace.root, *trace.spans):
+        otlp_span = {
+            'traceId': trace.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': SPAN_KIND_SERVER if span is trace.root else SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': unix_nano(span.start),
+            'endTimeUnixNano': unix_nano(span.end),
+            'attributes': _otlp_attributes(span.attributes),
+        }
+        if span.parent_id is not None:
+            otlp_span['parentSpanId'] = span.parent_id
+        spans.append(otlp_span)
+
+    return {
+        'resourceSpans': [
+            {
+                'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+                'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': spans}],
+            },
+        ],
+    }
+
+
+class TraceExporter:
+    """
+    Appends traces to a file, one OTLP/JSON export request a line; every worker can append to the same file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = path.open('ab', buffering=0)
+
+    def export(self, trace: Trace) -> None:
+        """
+        Append a trace, in a single write, so concurrent workers' lines don't interleave
+        """
+
+        line = json.dumps(otlp_json(trace), separators=(',', ':')).encode() + b'\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        """
+        Close the file
+        """
+
+        self._file.close()
+
+
+class TraceExporterHolder:
+    """
+    Module-level trace exporter holder to avoid global statement.
+    """
+
+    exporter: TraceExporter | None = None
+
+
+def init_trace_exporter(path: Path | None) -> TraceExporter | None:
+    """
+    Initialise the trace exporter; without a path, traces aren't exported.
+    """
+
+    if path is None:
+        return None
+
+    logger.info('Exporting traces to %s', path)
+    TraceExporterHolder.exporter = TraceExporter(path)
+    return TraceExporterHolder.exporter
+
+
+def get_trace_exporter() -> TraceExporter | None:
+    """
+    Get the current trace exporter, if traces are exported.
+    """
+
+    return TraceExporterHolder.exporter
+
+
+def close_trace_exporter() -> None:
+    """
+    Close the trace exporter.
+    """
+
+    if TraceExporterHolder.exporter is not None:
+        TraceExporterHolder.exporter.close()
+        TraceExporterHolder.exporter = None
@@ -0,0 +1,52 @@
+"""
+WOEplanet Spelunker: config package; admission control module.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class CostClass(StrEnum):
+    """
+    How much of a worker's database pool a route's requests use.
+    """
+
+    PLACE = 'place'  # a handful of indexed lookups on one connection
+    LISTING = 'listing'  # counts, facets and pages over many rows, on up to three connections at once
+
+
+@dataclass(frozen=True)
+class AdmissionLimit:
+    """
+    Per worker limits for a cost class; requests past the queue, or waiting too long in it, are shed with a 503.
+    """
+
+    concurrency: int
+    queue: int
+    max_wait: float  # seconds
+    retry_after: int  # seconds
+
+
+# Sized for a pool of 10 connections per worker; listings can't take every connection, so place pages keep theirs
+ADMISSION_LIMITS: dict[CostClass, AdmissionLimit] = {
+    CostClass.PLACE: AdmissionLimit(concurrency=6, queue=32, max_wait=2.0, retry_after=1),
+    CostClass.LISTING: AdmissionLimit(concurrency=2, queue=8, max_wait=5.0, retry_after=5),
+}
+
+# Route paths, as in routers/routes.py, by cost class; routes not listed here don't touch the pool and aren't limited
+ROUTE_COST_CLASSES: dict[str, CostClass] = {
+    '/autocomplete': CostClass.PLACE,
+    '/countries': CostClass.PLACE,
+    '/id/{woeid:int}': CostClass.PLACE,
+    '/id/{woeid:int}.geojson': CostClass.PLACE,
+    '/id/{woeid:int}/map': CostClass.PLACE,
+    '/placetypes': CostClass.PLACE,
+    '/random': CostClass.PLACE,
+    '/tiles/{z:int}/{x:int}/{y:int}.mvt': CostClass.PLACE,
+    '/countries/{iso:str}': CostClass.LISTING,
+    '/id/{woeid:int}/nearby': CostClass.LISTING,
+    '/nearby': CostClass.LISTING,
+    '/nullisland': CostClass.LISTING,
+    '/placetypes/{placetype:str}': CostClass.LISTING,
+    '/search': CostClass.LISTING,
+}
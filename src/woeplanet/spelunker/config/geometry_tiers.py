@@ -0,0 +1,79 @@
+"""
+WOEplanet Spelunker: config package; geometry simplification tiers module.
+"""
+
+import math
+from dataclasses import dataclass
+
+MIN_ZOOM = 0
+MAX_ZOOM = 20
+TILE_SIZE = 256
+VIEWPORT_WIDTH = 1024
+VIEWPORT_HEIGHT = 768
+FULL_PRECISION = 6  # ~10cm
+
+
+@dataclass(frozen=True)
+class GeometryTier:
+    """
+    A simplified geometry tier; used for all zoom levels up to and including max_zoom.
+    """
+
+    tier: int
+    max_zoom: int
+    tolerance: float  # degrees, roughly half a pixel at max_zoom
+    precision: int  # GeoJSON coordinate decimal places
+
+
+GEOMETRY_TIERS: tuple[GeometryTier, ...] = (
+    GeometryTier(tier=1, max_zoom=3, tolerance=0.1, precision=2),
+    GeometryTier(tier=2, max_zoom=6, tolerance=0.01, precision=3),
+    GeometryTier(tier=3, max_zoom=9, tolerance=0.001, precision=4),
+    GeometryTier(tier=4, max_zoom=12, tolerance=0.0001, precision=5),
+)
+
+
+def geometry_tier_for_zoom(zoom: int) -> GeometryTier | None:
+    """
+    Get the geometry tier for a zoom level; None means full resolution
+    """
+
+    for tier in GEOMETRY_TIERS:
+        if zoom <= tier.max_zoom:
+            return tier
+
+    return None
+
+
+def _mercator_y(lat: float) -> float:
+    """
+    Project a latitude to Web Mercator y, in radians
+    """
+
+    lat = max(min(lat, 85.0511), -85.0511)
+    return math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+
+
+def zoom_for_bounds(
+    bounds: list[list[float]] | None,
+    width: int = VIEWPORT_WIDTH,
+    height: int = VIEWPORT_HEIGHT,
+) -> int:
+    """
+    Get the zoom level at which a bounding box fits a viewport, as Leaflet's fitBounds would
+    """
+
+    if not bounds:
+        return MAX_ZOOM
+
+    (sw_lat, sw_lng), (ne_lat, ne_lng) = bounds
+    lng_fraction = abs(ne_lng - sw_lng) / 360.0
+    lat_fraction = abs(_mercator_y(ne_lat) - _mercator_y(sw_lat)) / (2 * math.pi)
+
+    zooms = [MAX_ZOOM]
+    if lng_fraction > 0:
+        zooms.append(math.floor(math.log2(width / (TILE_SIZE * lng_fraction))))
+    if lat_fraction > 0:
+        zooms.append(math.floor(math.log2(height / (TILE_SIZE * lat_fraction))))
+
+    return max(MIN_ZOOM, min(zooms))
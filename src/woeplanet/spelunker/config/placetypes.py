@@ -2,6 +2,7 @@
 WOEplanet Spelunker: config package; placetypes module.
 """
 
+from collections.abc import Mapping
 from enum import StrEnum
 from typing import Any
 
@@ -90,8 +91,8 @@ class PlacetypeCache:
     Cache for placetype lookups by ID.
     """
 
-    _by_id: dict[int, dict[str, Any]] | None = None
-    _by_shortname: dict[str, dict[str, Any]] | None = None
+    _by_id: dict[int, Mapping[str, Any]] | None = None
+    _by_shortname: dict[str, Mapping[str, Any]] | None = None
 
     @classmethod
     async def _populate(cls, db: Database) -> None:
@@ -105,7 +106,7 @@ class PlacetypeCache:
             cls._by_shortname = {pt['shortname'].lower(): pt for pt in placetypes}
 
     @classmethod
-    async def get_by_id(cls, db: Database, ptid: int) -> dict[str, Any] | None:
+    async def get_by_id(cls, db: Database, ptid: int) -> Mapping[str, Any] | None:
         """
         Get a placetype by ID
         """
@@ -114,7 +115,7 @@ class PlacetypeCache:
         return cls._by_id.get(ptid) if cls._by_id else None
 
     @classmethod
-    async def get_by_shortname(cls, db: Database, shortname: str) -> dict[str, Any] | None:
+    async def get_by_shortname(cls, db: Database, shortname: str) -> Mapping[str, Any] | None:
         """
         Get a placetype by shortname (case-insensitive)
         """
@@ -143,7 +144,7 @@ def placetype_shortname_to_id(shortname: str) -> int | None:
         return None
 
 
-async def placetype_by_id(db: Database, ptid: int) -> dict[str, Any] | None:
+async def placetype_by_id(db: Database, ptid: int) -> Mapping[str, Any] | None:
     """
     Get a placetype record by ID.
 
@@ -156,7 +157,7 @@ async def placetype_by_id(db: Database, ptid: int) -> dict[str, Any] | None:
     return await PlacetypeCache.get_by_id(db, ptid)
 
 
-async def placetype_by_shortname(db: Database, shortname: str) -> dict[str, Any] | None:
+async def placetype_by_shortname(db: Database, shortname: str) -> Mapping[str, Any] | None:
     """
     Get a placetype record by shortname (case-insensitive).
 
@@ -0,0 +1,70 @@
+"""
+WOEplanet Spelunker: config package; search ranking module.
+"""
+
+from woeplanet.spelunker.config.place_scale import PLACETYPE_TO_SCALE
+
+# Name types, best first: standard/official, preferred, variant, colloquial, abbreviation
+NAME_TYPE_PRIORITY = {'S': 1, 'P': 2, 'V': 3, 'Q': 4, 'A': 5}
+NAME_TYPE_PRIORITY_OTHER = 6
+SCALE_UNKNOWN = 99
+
+# FTS5 rank configuration; bm25 scores are negative, better text matches are more negative
+RANK_FUNCTION = 'bm25()'
+
+# Without the search index, relevance is the bm25 rank plus a penalty per scale level and per name type priority, lower
+# is better
+SCALE_WEIGHT = 0.1
+NAME_TYPE_WEIGHT = 1.0
+
+# With it, search_names_fts indexes each name in the column of its tier; the band of its place's scale, plus its name
+# type's priority after the first. Each tier's bm25 weight is SEARCH_TIER_DECAY times the tier before's, so FTS5 ranks
+# every match with the boosts, and larger places' better names rank first
+SEARCH_SCALE_BAND = 4
+SEARCH_TIERS = 12
+SEARCH_TIER_DECAY = 0.7
+SEARCH_TIER_COLUMNS = tuple(f'name{tier}' for tier in range(SEARCH_TIERS))
+SEARCH_RANK_FUNCTION = f'bm25({", ".join(f"{SEARCH_TIER_DECAY**tier:.6g}" for tier in range(SEARCH_TIERS))})'
+
+# search_names rowids are woe_id * SEARCH_ROWID_STRIDE + name type priority * SEARCH_NAME_STRIDE + the name's position
+# among the place's names of that priority, so rowid order is (woe_id, priority); names past the stride aren't indexed
+SEARCH_NAME_STRIDE = 1024
+SEARCH_ROWID_STRIDE = SEARCH_NAME_STRIDE * 8
+
+# Relevance ranks this many of the best matches, which FTS5 can find without visiting every match
+RELEVANCE_CANDIDATES = 2000
+
+
+def scale_sql(column: str) -> str:
+    """
+    Get an SQL expression for the scale of a placetype ID column
+    """
+
+    whens = ' '.join(f'WHEN {placetype_id} THEN {scale}' for placetype_id, scale in PLACETYPE_TO_SCALE.items())
+    return f'CASE {column} {whens} ELSE {SCALE_UNKNOWN} END'
+
+
+def name_type_priority_sql(column: str) -> str:
+    """
+    Get an SQL expression for the priority of a name type column
+    """
+
+    whens = ' '.join(f"WHEN '{name_type}' THEN {priority}" for name_type, priority in NAME_TYPE_PRIORITY.items())
+    return f'CASE {column} {whens} ELSE {NAME_TYPE_PRIORITY_OTHER} END'
+
+
+def search_priority_sql(column: str) -> str:
+    """
+    Get an SQL expression for the name type priority of a search_names rowid column
+    """
+
+    return f'{column} % {SEARCH_ROWID_STRIDE} / {SEARCH_NAME_STRIDE}'
+
+
+def search_tier_sql(placetype_column: str, priority_column: str) -> str:
+    """
+    Get an SQL expression for the search_names_fts tier of a name, by its place's placetype ID and its priority columns
+    """
+
+    band = f'({scale_sql(placetype_column)}) / {SEARCH_SCALE_BAND}'
+    return f'MIN({band} + {priority_column} - 1, {SEARCH_TIERS - 1})'
@@ -3,14 +3,19 @@ WOEplanet Spelunker: config package; settings module.
 """
 
 from functools import lru_cache
+from pathlib import Path
 from typing import Literal
 
 import dotenv
-from pydantic import DirectoryPath, FilePath, field_validator
+from pydantic import DirectoryPath, FilePath, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 DEFAULT_CACHE_TTL = 3600  # 1 hour
 DEFAULT_NEARBY_DISTANCE = 5000  # 5 km
+DEFAULT_QUERY_BUDGET = 5.0  # seconds
+DEFAULT_COUNT_BUDGET = 1.0  # seconds
+DEFAULT_SLOW_QUERY_THRESHOLD = 0.5  # seconds
+DEFAULT_SLOW_QUERY_LOG_SIZE = 500
 
 
 class Settings(BaseSettings):
@@ -38,6 +43,15 @@ class Settings(BaseSettings):
 
     woeplanet_cache_ttl: int = DEFAULT_CACHE_TTL
     woeplanet_nearby_distance: int = DEFAULT_NEARBY_DISTANCE
+    woeplanet_tile_archive_path: Path | None = None
+    woeplanet_query_budget: float = DEFAULT_QUERY_BUDGET
+    woeplanet_count_budget: float = DEFAULT_COUNT_BUDGET
+    woeplanet_metrics_dir: Path | None = None
+    woeplanet_slow_query_threshold: float | None = DEFAULT_SLOW_QUERY_THRESHOLD
+    woeplanet_slow_query_log_size: int = DEFAULT_SLOW_QUERY_LOG_SIZE
+    woeplanet_admin_token: SecretStr | None = None
+    woeplanet_server_timing: bool = False
+    woeplanet_trace_file: Path | None = None
 
     @field_validator('woeplanet_db_path', 'woeplanet_geom_db_path', mode='after')
     @classmethod
@@ -2,19 +2,31 @@
 WOEplanet Spelunker: dependencies package; caching module.
 """
 
+import asyncio
 import functools
 import logging
+import os
+import time
+import weakref
 from collections.abc import Awaitable, Callable
 from pathlib import Path
-from typing import ParamSpec, TypeVar
+from typing import Any, ParamSpec, TypeVar
 
-from diskcache import Cache, Lock  # type: ignore[import-untyped]
+from diskcache import Cache  # type: ignore[import-untyped]
+from starlette.concurrency import run_in_threadpool
+
+from woeplanet.spelunker.common.metrics import CACHE_LOOKUPS
+from woeplanet.spelunker.common.tracing import add_span
 
 logger = logging.getLogger(__name__)
 
 P = ParamSpec('P')
 T = TypeVar('T')
 
+# a missed key is locked across workers while one of them runs its query; the lock expires, should that worker die
+CACHE_LOCK_EXPIRE = 120  # seconds
+CACHE_LOCK_POLL = 0.05  # seconds
+
 
 class CacheHolder:
     """
@@ -24,6 +36,14 @@ class CacheHolder:
     cache: Cache | None = None
 
 
+class CacheLocks:
+    """
+    Module-level holder of this worker's locks, by key, while any of its coroutines holds or waits for one.
+    """
+
+    locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
 def init_cache(cache_dir: Path) -> Cache:
     """
     Initialise the disk cache.
@@ -53,12 +73,40 @@ def close_cache() -> None:
         CacheHolder.cache = None
 
 
+async def _lookup(cache: Cache, key: str, prefix: str) -> Any:  # noqa: ANN401
+    """
+    Look up a key, recording the lookup as a span of the request's trace
+    """
+
+    start = time.perf_counter()
+    result = await run_in_threadpool(cache.get, key)
+    add_span('cache.get', start, prefix=prefix, hit=result is not None)
+    return result
+
+
+async def _acquire(cache: Cache, key: str) -> bool:
+    """
+    Lock a key across workers, without blocking the event loop; False if another worker caches it meanwhile
+    """
+
+    while not await run_in_threadpool(cache.add, f'{key}:lock', os.getpid(), expire=CACHE_LOCK_EXPIRE):
+        if await run_in_threadpool(cache.__contains__, key):
+            return False
+        await asyncio.sleep(CACHE_LOCK_POLL)
+
+    return True
+
+
 def disk_cache(
     key_builder: Callable[..., str],
     expire: int | None = None,
 ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
     """
     Decorator for caching async database methods using DiskCache.
+
+    On a miss, one coroutine, of any worker, runs the query, while the others wait for its result without blocking
+    their event loops. The cache is a SQLite database, locked across workers, so it's read and written in the
+    threadpool.
     """
 
     def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
@@ -69,23 +117,35 @@ def disk_cache(
                 return await func(*args, **kwargs)
 
             key = key_builder(**kwargs)
+            prefix = key.partition(':')[0]
 
-            result = cache.get(key)
+            result = await _lookup(cache, key, prefix)
             if result is not None:
                 logger.debug('Cache hit for %s', key)
+                CACHE_LOOKUPS.labels(prefix, 'hit').inc()
                 return result
 
-            lock_key = f'{key}:lock'
-            with Lock(cache, lock_key, expire=120):
-                result = cache.get(key)
-                if result is not None:
-                    logger.debug('Cache hit after lock for %s', key)
+            # this worker's coroutines queue on an asyncio lock, so only one of them polls the cross worker lock
+            lock = CacheLocks.locks.setdefault(key, asyncio.Lock())
+            start = time.perf_counter()
+            async with lock:
+                locked = await _acquire(cache, key)
+                add_span('cache.lock', start, prefix=prefix)
+                try:
+                    result = await _lookup(cache, key, prefix)
+                    if result is not None:
+                        logger.debug('Cache hit after lock for %s', key)
+                        CACHE_LOOKUPS.labels(prefix, 'hit').inc()
+                        return result
+
+                    logger.debug('Cache miss for %s, executing query', key)
+                    CACHE_LOOKUPS.labels(prefix, 'miss').inc()
+                    result = await func(*args, **kwargs)
+                    await run_in_threadpool(cache.set, key, result, expire=expire)
                     return result
-
-                logger.debug('Cache miss for %s, executing query', key)
-                result = await func(*args, **kwargs)
-                cache.set(key, result, expire=expire)
-                return result
+                finally:
+                    if locked:
+                        await run_in_threadpool(cache.delete, f'{key}:lock')
 
         return wrapper
 
@@ -2,16 +2,21 @@
 WOEplanet Spelunker: dependencies package; database module.
 """
 
+import asyncio
+import contextvars
+import functools
 import json
 import logging
 import math
 import random
-from collections.abc import AsyncIterator, Callable, Coroutine
+import sqlite3
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Iterable, Mapping, Sequence
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from http import HTTPStatus
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
 import aiosqlite
 from aiosqlitepool import SQLiteConnectionPool
@@ -21,11 +26,41 @@ from starlette.requests import Request
 if TYPE_CHECKING:
     from starlette.applications import Starlette
 
+from woeplanet.spelunker.common.autocomplete import PRECOMPUTED_PREFIX_LENGTH, autocomplete_score
+from woeplanet.spelunker.common.metrics import POOL_WAIT_SECONDS
 from woeplanet.spelunker.common.profiling import profile_async
-from woeplanet.spelunker.dependencies.cache import disk_cache
+from woeplanet.spelunker.common.tracing import add_span
+from woeplanet.spelunker.config.geometry_tiers import FULL_PRECISION, GeometryTier
+from woeplanet.spelunker.config.search_ranking import (
+    NAME_TYPE_PRIORITY,
+    NAME_TYPE_PRIORITY_OTHER,
+    NAME_TYPE_WEIGHT,
+    RANK_FUNCTION,
+    RELEVANCE_CANDIDATES,
+    SCALE_WEIGHT,
+    SEARCH_RANK_FUNCTION,
+    SEARCH_ROWID_STRIDE,
+    name_type_priority_sql,
+    scale_sql,
+    search_priority_sql,
+)
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.cache import disk_cache, get_cache
+from woeplanet.spelunker.dependencies.query_budget import (
+    QueryInterruptedError,
+    install_query_budget,
+    is_interrupted,
+    query_budget,
+)
+from woeplanet.spelunker.dependencies.records import Record
+from woeplanet.spelunker.dependencies.slow_queries import get_slow_query_log
+from woeplanet.spelunker.dependencies.statements import STATEMENT_CACHE_SIZE, select_sql
 
 logger = logging.getLogger(__name__)
 
+# a worker finishes this many of the disk cached queries that ran over a request's budget at a time, to fill the cache
+CACHE_FILLS = 1
+
 
 @dataclass
 class PlaceFilters:
@@ -48,6 +83,175 @@ class PlaceFilters:
     licensing: bool = False
 
 
+# a place's fields of related WOEIDs, and the table and column each is read from
+PLACE_RELATIONS = (
+    ('ancestors', 'ancestors', 'ancestor_woe_id'),
+    ('neighbours', 'neighbors', 'neighbor_woe_id'),
+    ('children', 'children', 'child_woe_id'),
+)
+
+# separates the names of a place's aliases of a language and name type, as char(31) in SQL
+ALIAS_SEPARATOR = '\x1f'
+
+# a place's hierarchy levels, as admins columns, and the alias each level's place is joined as
+HIERARCHY_LEVELS = (
+    ('continent', 'p_cont'),
+    ('country', 'p_coun'),
+    ('state', 'p_state'),
+    ('county', 'p_county'),
+    ('local_admin', 'p_la'),
+)
+
+# a vector tile's places, at most; past this, the places with the largest bounds are kept
+TILE_PLACES_LIMIT = 5000
+
+# a place's bounds, or its centroid if it has none; bounds crossing the antimeridian are unwrapped, east past 180
+TILE_WEST_SQL = 'COALESCE(g.sw_lng, g.lng)'
+TILE_EAST_SQL = 'CASE WHEN g.sw_lng > g.ne_lng THEN g.ne_lng + 360 ELSE COALESCE(g.ne_lng, g.lng) END'
+TILE_SOUTH_SQL = 'COALESCE(g.sw_lat, g.lat)'
+TILE_NORTH_SQL = 'COALESCE(g.ne_lat, g.lat)'
+
+# the places_rtree search for a placetype's places whose bounds intersect a window
+TILE_RTREE_WINDOW_SQL = (
+    'min_placetype <= ? AND max_placetype >= ? AND min_lat <= ? AND max_lat >= ? AND min_lng <= ? AND max_lng >= ?'
+)
+
+
+@dataclass(frozen=True)
+class PlaceQueryShape:
+    """
+    The PlaceFilters that shape a place query's SQL.
+
+    Excluded placetypes are bound as a parameter, so only whether there are any shapes the query.
+    """
+
+    centroid: bool
+    bounding_box: bool
+    geometry: bool
+    null_island: bool
+    deprecated: bool
+    exclude_placetypes: bool
+    ancestors: bool
+    hierarchy: bool
+    names: bool
+    neighbours: bool
+    children: bool
+    history: bool
+    licensing: bool
+
+    @classmethod
+    def from_filters(cls, filters: PlaceFilters) -> 'PlaceQueryShape':
+        """
+        Get the shape of a place query for its filters
+        """
+
+        return cls(
+            centroid=filters.centroid,
+            bounding_box=filters.bounding_box,
+            geometry=filters.geometry,
+            null_island=filters.null_island,
+            deprecated=filters.deprecated,
+            exclude_placetypes=bool(filters.exclude_placetypes),
+            ancestors=filters.ancestors,
+            hierarchy=filters.hierarchy,
+            names=filters.names,
+            neighbours=filters.neighbours,
+            children=filters.children,
+            history=filters.history,
+            licensing=filters.licensing,
+        )
+
+
+@functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_place_query(shape: PlaceQueryShape) -> tuple[str, tuple[str, ...]]:  # noqa: C901
+    """
+    Build a place query, and the JSON fields it selects, once per shape.
+
+    Its parameters are the WOEID, then the excluded placetypes as a JSON array, if any. Related WOEIDs and aliases are
+    fetched by _build_place_related_query.
+    """
+
+    select_cols = ['p.*', 'pt.shortname as placetype_name']
+    joins: list[str] = ['JOIN placetypes pt ON p.placetype_id = pt.id']
+    where_clauses = ['p.woe_id = ?']
+    json_fields: list[str] = []
+
+    needs_geometry_join = shape.centroid or shape.bounding_box or shape.geometry or shape.null_island
+
+    if needs_geometry_join:
+        joins.append('LEFT JOIN geometries.geometries g ON p.woe_id = g.woe_id')
+
+        if shape.centroid:
+            select_cols.extend(['g.lat', 'g.lng'])
+        if shape.bounding_box:
+            select_cols.extend(['g.sw_lat', 'g.sw_lng', 'g.ne_lat', 'g.ne_lng'])
+        if shape.geometry:
+            select_cols.append('AsGeoJSON(g.geom) as geom')
+
+    if shape.null_island:
+        where_clauses.append('(g.lat IS NOT NULL AND g.lng IS NOT NULL AND g.geom IS NOT NULL)')
+
+    if shape.deprecated:
+        joins.append('LEFT JOIN changes ch ON p.woe_id = ch.woe_id')
+        where_clauses.append('(ch.superseded_by IS NULL OR ch.woe_id IS NULL)')
+    else:
+        joins.append('LEFT JOIN changes ch ON p.woe_id = ch.woe_id')
+        select_cols.extend(['ch.superseded_by', 'ch.supersedes'])
+        json_fields.append('supersedes')
+
+    if shape.exclude_placetypes:
+        where_clauses.append('p.placetype_id NOT IN (SELECT value FROM json_each(?))')
+
+    if shape.hierarchy:
+        # a.woe_id is NULL for a place without a hierarchy; each level's WOEID and name are read into a dict
+        joins.append('LEFT JOIN admins a ON p.woe_id = a.woe_id')
+        select_cols.append('a.woe_id as hierarchy')
+        for level, alias in HIERARCHY_LEVELS:
+            joins.append(f'LEFT JOIN places {alias} ON a.{level} = {alias}.woe_id')
+            select_cols.extend([f'a.{level} as hierarchy_{level}', f'{alias}.name as hierarchy_{level}_name'])
+
+    if shape.history:
+        joins.append('LEFT JOIN history hist ON p.woe_id = hist.woe_id')
+        select_cols.append('hist.history')
+        json_fields.append('history')
+
+    if shape.licensing:
+        joins.append('LEFT JOIN licensing lic ON p.woe_id = lic.woe_id')
+        select_cols.append('lic.licenses')
+        json_fields.append('licenses')
+
+    query = select_sql(select_cols, 'places p', joins, where_clauses)
+    return query, tuple(json_fields)
+
+
+@functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_place_related_query(shape: PlaceQueryShape) -> str | None:
+    """
+    Build a query for a place's related WOEIDs and aliases, once per shape; its parameters are the WOEID, per SELECT.
+
+    Each row is (relation, related WOEID, names, name_type, language); relation is a PLACE_RELATIONS field, with a
+    related WOEID, or aliases, with all the names of a language and name type, ALIAS_SEPARATOR separated. Plain rows,
+    rather than JSON arrays built in SQL, skip encoding and then decoding every alias of places with thousands of them,
+    and grouping names in SQL makes a Python string per name, rather than three per alias.
+    """
+
+    selects = [
+        f"SELECT '{field}', {column}, NULL, NULL, NULL FROM {table} WHERE woe_id = ?"  # noqa: S608
+        for field, table, column in PLACE_RELATIONS
+        if getattr(shape, field)
+    ]
+    if shape.names:
+        selects.append(
+            "SELECT 'aliases', NULL, group_concat(name, char(31)), name_type, language FROM aliases WHERE woe_id = ? "
+            'GROUP BY language, name_type',
+        )
+
+    if not selects:
+        return None
+
+    return '\nUNION ALL\n'.join(selects)
+
+
 @dataclass
 class SearchFilters:
     """
@@ -102,7 +306,7 @@ class PaginatedResult:
     Paginated query result.
     """
 
-    items: list[dict[str, Any]]
+    items: Sequence[Mapping[str, Any]]
     has_more: bool
 
 
@@ -133,9 +337,72 @@ class Database:
     Wrapper around aiosqlite.Connection
     """
 
+    _simplified_geometries: ClassVar[bool | None] = None
+    _autocomplete_index: ClassVar[bool | None] = None
+    _search_index: ClassVar[bool | None] = None
+    _spatial_index: ClassVar[bool | None] = None
+
     def __init__(self, conn: aiosqlite.Connection) -> None:
         self._conn = conn
-        self._conn.row_factory = aiosqlite.Row
+        self._conn.row_factory = Record
+
+    async def _record_statement(self, query: str, params: Sequence[Any], rows: int | None, start: float) -> None:
+        """
+        Record a statement that started at a perf_counter time in the slow query log, if it's enabled and it was slow
+        """
+
+        slow_query_log = get_slow_query_log()
+        if slow_query_log is not None:
+            await slow_query_log.record(self._conn, query, params, rows, time.perf_counter() - start)
+
+    async def _fetch(self, query: str, params: Sequence[Any], row_factory: Any) -> list[Any]:  # noqa: ANN401
+        """
+        Run a statement and fetch all its rows, made by a row factory, timing both for the slow query log
+        """
+
+        start = time.perf_counter()
+        try:
+            cursor = await self._conn.execute(query, params)
+            cursor.row_factory = row_factory
+            rows = list(await cursor.fetchall())
+        except sqlite3.OperationalError as exc:
+            if is_interrupted(exc):
+                await self._record_statement(query, params, None, start)
+            raise
+
+        await self._record_statement(query, params, len(rows), start)
+        return rows
+
+    async def _fetch_records(self, query: str, params: Sequence[Any] = ()) -> list[Record]:
+        """
+        Run a statement and fetch its rows, as they are; Records need no copying into dicts
+        """
+
+        return await self._fetch(query, params, Record)
+
+    async def _fetch_tuples(self, query: str, params: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+        """
+        Run a statement and fetch its rows as plain tuples, for rows unpacked as they're read
+        """
+
+        return await self._fetch(query, params, None)
+
+    async def _fetch_one(self, query: str, params: Sequence[Any] = ()) -> Record | None:
+        """
+        Run a statement and fetch its first row, timing both for the slow query log
+        """
+
+        start = time.perf_counter()
+        try:
+            cursor = await self._conn.execute(query, params)
+            row = await cursor.fetchone()
+        except sqlite3.OperationalError as exc:
+            if is_interrupted(exc):
+                await self._record_statement(query, params, None, start)
+            raise
+
+        await self._record_statement(query, params, int(row is not None), start)
+        return cast('Record | None', row)
 
     async def _do_pagination_query(  # noqa: PLR0913
         self,
@@ -165,18 +432,10 @@ class Database:
 
         params.append(limit + 1)
 
-        query = f"""
-            SELECT {', '.join(select_cols)}
-            FROM places p
-            {' '.join(joins)}
-            WHERE {' AND '.join(where_clauses)}
-            ORDER BY p.woe_id {order}
-            LIMIT ?
-        """  # noqa: S608
+        query = select_sql(select_cols, 'places p', joins, where_clauses, f'p.woe_id {order}', limit=True)
 
         logger.debug('%s - %s', query, params)
-        cursor = await self._conn.execute(query, params)
-        rows = [dict(r) for r in await cursor.fetchall()]
+        rows = await self._fetch_records(query, params)
 
         has_more = len(rows) > limit
         items = rows[:limit]
@@ -196,19 +455,14 @@ class Database:
         Execute a count query on places table.
         """
 
-        query = f"""
-            SELECT COUNT(*)
-            FROM places p
-            {' '.join(joins)}
-            WHERE {' AND '.join(where_clauses)}
-        """  # noqa: S608
+        query = select_sql(('COUNT(*)',), 'places p', joins, where_clauses)
 
-        cursor = await self._conn.execute(query, params)
-        row = await cursor.fetchone()
+        logger.debug('%s - %s', query, params)
+        row = await self._fetch_one(query, params)
         return row[0] if row else 0
 
     @profile_async
-    async def get_place_by_id(  # noqa: C901, PLR0912, PLR0915
+    async def get_place_by_id(
         self,
         woe_id: int,
         filters: PlaceFilters,
@@ -217,140 +471,219 @@ class Database:
         Get a place by WOEID
         """
 
-        select_cols = ['p.*', 'pt.shortname as placetype_name']
-        joins: list[str] = ['JOIN placetypes pt ON p.placetype_id = pt.id']
-        where_clauses = ['p.woe_id = ?']
+        shape = PlaceQueryShape.from_filters(filters)
+        query, json_fields = _build_place_query(shape)
         params: list[Any] = [woe_id]
-        json_fields: list[str] = []
+        if filters.exclude_placetypes:
+            params.append(json.dumps(filters.exclude_placetypes))
 
-        needs_geometry_join = filters.centroid or filters.bounding_box or filters.geometry or filters.null_island
+        logger.debug('%s - %s', query, params)
+        row = await self._fetch_one(query, params)
+        if row is None:
+            return None
 
-        if needs_geometry_join:
-            joins.append('LEFT JOIN geometries.geometries g ON p.woe_id = g.woe_id')
+        result = dict(row)
+        for json_field in json_fields:
+            if result[json_field]:
+                result[json_field] = json.loads(result[json_field])
+            else:
+                result[json_field] = []
 
-            if filters.centroid:
-                select_cols.extend(['g.lat', 'g.lng'])
-            if filters.bounding_box:
-                select_cols.extend(['g.sw_lat', 'g.sw_lng', 'g.ne_lat', 'g.ne_lng'])
-            if filters.geometry:
-                select_cols.append('AsGeoJSON(g.geom) as geom')
+        if filters.hierarchy:
+            hierarchy = {
+                level: {'woe_id': result.pop(f'hierarchy_{level}'), 'name': result.pop(f'hierarchy_{level}_name')}
+                for level, _ in HIERARCHY_LEVELS
+            }
+            result['hierarchy'] = hierarchy if result['hierarchy'] is not None else None
 
-        if filters.null_island:
-            where_clauses.append('(g.lat IS NOT NULL AND g.lng IS NOT NULL AND g.geom IS NOT NULL)')
+        related_query = _build_place_related_query(shape)
+        if related_query is not None:
+            result.update(await self._get_place_related(woe_id, related_query, shape))
 
-        if filters.deprecated:
-            joins.append('LEFT JOIN changes ch ON p.woe_id = ch.woe_id')
-            where_clauses.append('(ch.superseded_by IS NULL OR ch.woe_id IS NULL)')
-        else:
-            joins.append('LEFT JOIN changes ch ON p.woe_id = ch.woe_id')
-            select_cols.extend(['ch.superseded_by', 'ch.supersedes'])
-            json_fields.append('supersedes')
+        return result
 
-        if filters.exclude_placetypes:
-            placeholders = ','.join('?' * len(filters.exclude_placetypes))
-            where_clauses.append(f'p.placetype_id NOT IN ({placeholders})')
-            params.extend(filters.exclude_placetypes)
+    async def _get_place_related(self, woe_id: int, query: str, shape: PlaceQueryShape) -> dict[str, Any]:
+        """
+        Get a place's related WOEIDs, by field, and its inflated aliases, with a _build_place_related_query query
+        """
 
-        if filters.ancestors:
-            select_cols.append("""
-                (
-                    SELECT json_group_array(ancestor_woe_id)
-                    FROM ancestors
-                    WHERE woe_id = p.woe_id
-                ) as ancestors""")
-            json_fields.append('ancestors')
+        fields = [name for name, _, _ in PLACE_RELATIONS if getattr(shape, name)]
+        params = [woe_id] * (len(fields) + shape.names)
+        logger.debug('%s - %s', query, params)
+        rows = await self._fetch_tuples(query, params)
 
-        if filters.hierarchy:
-            select_cols.append("""
-                (
-                    SELECT json_object(
-                        'continent', json_object('woe_id', a.continent, 'name', p_cont.name),
-                        'country', json_object('woe_id', a.country, 'name', p_coun.name),
-                        'state', json_object('woe_id', a.state, 'name', p_state.name),
-                        'county', json_object('woe_id', a.county, 'name', p_county.name),
-                        'local_admin', json_object('woe_id', a.local_admin, 'name', p_la.name)
-                    )
-                    FROM admins a
-                    LEFT JOIN places p_cont ON a.continent = p_cont.woe_id
-                    LEFT JOIN places p_coun ON a.country = p_coun.woe_id
-                    LEFT JOIN places p_state ON a.state = p_state.woe_id
-                    LEFT JOIN places p_county ON a.county = p_county.woe_id
-                    LEFT JOIN places p_la ON a.local_admin = p_la.woe_id
-                    WHERE a.woe_id = p.woe_id
-                ) as hierarchy""")
-            json_fields.append('hierarchy')
-
-        if filters.neighbours:
-            select_cols.append("""
-                (
-                    SELECT json_group_array(neighbor_woe_id)
-                    FROM neighbors
-                    WHERE woe_id = p.woe_id
-                ) as neighbours""")
-            json_fields.append('neighbours')
-
-        if filters.children:
-            select_cols.append("""
-                (
-                    SELECT json_group_array(child_woe_id)
-                    FROM children
-                    WHERE woe_id = p.woe_id
-                ) as children""")
-            json_fields.append('children')
-
-        if filters.names:
-            select_cols.append("""
-                (
-                    SELECT json_group_array(
-                        json_object(
-                            'name', name,
-                            'name_type', name_type,
-                            'language', language
-                        )
-                    )
-                    FROM aliases
-                    WHERE woe_id = p.woe_id
-                ) as aliases""")
-            json_fields.append('aliases')
-
-        if filters.history:
-            joins.append('LEFT JOIN history hist ON p.woe_id = hist.woe_id')
-            select_cols.append('hist.history')
-            json_fields.append('history')
-
-        if filters.licensing:
-            joins.append('LEFT JOIN licensing lic ON p.woe_id = lic.woe_id')
-            select_cols.append('lic.licenses')
-            json_fields.append('licenses')
+        related: dict[str, Any] = {name: [] for name in fields}
+        alias_groups: list[tuple[str, str, str]] = []
+        for relation, related_woe_id, names, name_type, language in rows:
+            if relation == 'aliases':
+                alias_groups.append((names, name_type, language))
+            else:
+                related[relation].append(related_woe_id)
+
+        if shape.names:
+            aliases = (
+                (name, name_type, language)
+                for names, name_type, language in alias_groups
+                for name in names.split(ALIAS_SEPARATOR)
+            )
+            related['aliases'] = self.inflate_aliases(aliases) if alias_groups else []
+
+        return related
+
+    async def _has_simplified_geometries(self) -> bool:
+        """
+        Check, once per worker, whether the simplify command has built the geometries_simplified table.
+        """
+
+        if Database._simplified_geometries is None:
+            row = await self._fetch_one(
+                "SELECT 1 FROM geometries.sqlite_master WHERE type = 'table' AND name = 'geometries_simplified'",
+            )
+            Database._simplified_geometries = row is not None
+
+        return Database._simplified_geometries
+
+    async def _build_geometry_query(
+        self,
+        tier: GeometryTier | None,
+    ) -> tuple[str, list[Any], list[str], list[Any]]:
+        """
+        Build the geometry expression, and any joins it needs, for a geometry tier (None for full resolution).
+
+        Uses the precomputed geometries_simplified table when present, otherwise simplifies on the fly.
+        """
+
+        if tier is None:
+            return 'g.geom', [], [], []
+
+        if await self._has_simplified_geometries():
+            joins = ['LEFT JOIN geometries.geometries_simplified gs ON g.woe_id = gs.woe_id AND gs.tier = ?']
+            return 'COALESCE(gs.geom, g.geom)', [], joins, [tier.tier]
+
+        return 'COALESCE(SimplifyPreserveTopology(g.geom, ?), g.geom)', [tier.tolerance], [], []
+
+    @profile_async
+    async def get_place_geometry(self, woe_id: int, *, tier: GeometryTier | None = None) -> str | None:
+        """
+        Get a place's geometry as GeoJSON text, simplified for a geometry tier (None for full resolution).
+        """
+
+        geom_expr, params, joins, join_params = await self._build_geometry_query(tier)
+        params.append(tier.precision if tier else FULL_PRECISION)
+        params.extend(join_params)
+        params.append(woe_id)
 
         query = f"""
-            SELECT {', '.join(select_cols)}
-            FROM places p
+            SELECT AsGeoJSON({geom_expr}, ?) as geom
+            FROM geometries.geometries g
             {' '.join(joins)}
-            WHERE {' AND '.join(where_clauses)}
+            WHERE g.woe_id = ? AND g.geom IS NOT NULL
         """  # noqa: S608
 
         logger.debug('%s - %s', query, params)
-        cursor = await self._conn.execute(query, params)
-        row = await cursor.fetchone()
-        if row is None:
-            return None
+        row = await self._fetch_one(query, params)
+        return row[0] if row else None
 
-        result = dict(row)
-        for json_field in json_fields:
-            if result[json_field]:
-                result[json_field] = json.loads(result[json_field])
-            else:
-                result[json_field] = None if json_field == 'hierarchy' else []
+    async def _has_spatial_index(self) -> bool:
+        """
+        Check, once per worker, whether the spatial index command has built the places_rtree table.
+        """
 
-        if filters.names and result.get('aliases'):
-            result['aliases'] = self.inflate_aliases(result['aliases'])
+        if Database._spatial_index is None:
+            row = await self._fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'places_rtree'")
+            Database._spatial_index = row is not None
 
-        return result
+        return Database._spatial_index
+
+    @profile_async
+    async def get_tile_places(
+        self,
+        placetype_id: int,
+        bounds: tuple[float, float, float, float],
+        *,
+        filters: SearchFilters,
+        tier: GeometryTier | None = None,
+        limit: int = TILE_PLACES_LIMIT,
+    ) -> list[Record]:
+        """
+        Get places of a placetype within bounds (west, south, east, north), for a vector tile.
+
+        Geometries are simplified for the geometry tier and clipped to the bounds, as GeoJSON text. Places whose
+        bounds cross the antimeridian are found from either side. Past the limit, the places with the largest bounds
+        are kept, as the smallest are the least visible at the tile's zoom.
+        """
+
+        west, south, east, north = bounds
+        geom_expr, params, joins, join_params = await self._build_geometry_query(tier)
+        params.extend([west, south, east, north, tier.precision if tier else FULL_PRECISION])
+
+        # a window's bounds are matched twice; as they are, and shifted east, to meet bounds unwrapped past 180
+        windows = ((north, south, east, west), (north, south, east + 360, west + 360))
+        where_clauses: list[str] = []
+        where_params: list[Any] = []
+        if await self._has_spatial_index():
+            source = f"""
+                (
+                    SELECT woe_id, (max_lng - min_lng) * (max_lat - min_lat) AS area
+                    FROM places_rtree
+                    WHERE {TILE_RTREE_WINDOW_SQL}
+                    UNION
+                    SELECT woe_id, (max_lng - min_lng) * (max_lat - min_lat) AS area
+                    FROM places_rtree
+                    WHERE {TILE_RTREE_WINDOW_SQL}
+                ) r
+                JOIN places p ON r.woe_id = p.woe_id
+            """  # noqa: S608
+            for window in windows:
+                params.extend([placetype_id, placetype_id, *window])
+            area = 'r.area'
+        else:
+            source = 'places p'
+            lng_clause = f'{TILE_WEST_SQL} <= ? AND {TILE_EAST_SQL} >= ?'
+            where_clauses.extend(
+                [
+                    'p.placetype_id = ?',
+                    f'{TILE_SOUTH_SQL} <= ?',
+                    f'{TILE_NORTH_SQL} >= ?',
+                    f'(({lng_clause}) OR ({lng_clause}))',
+                ]
+            )
+            where_params.extend([placetype_id, north, south])
+            for _, _, window_east, window_west in windows:
+                where_params.extend([window_east, window_west])
+            area = f'({TILE_EAST_SQL} - {TILE_WEST_SQL}) * ({TILE_NORTH_SQL} - {TILE_SOUTH_SQL})'
+
+        params.extend(join_params)
+        params.extend(where_params)
+        apply_search_filters(
+            filters,
+            joins,
+            where_clauses,
+            FilterOptions(geometry_join_exists=True, include_unknown=False),
+        )
+        params.append(limit)
+
+        query = f"""
+            SELECT
+                p.woe_id,
+                p.name,
+                g.lat,
+                g.lng,
+                AsGeoJSON(ST_Intersection({geom_expr}, BuildMbr(?, ?, ?, ?, 4326)), ?) as geom
+            FROM {source}
+            JOIN geometries.geometries g ON p.woe_id = g.woe_id
+            {' '.join(joins)}
+            {'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}
+            ORDER BY {area} DESC, p.woe_id
+            LIMIT ?
+        """  # noqa: S608
 
-    def inflate_aliases(self, aliases: list[dict[str, str]]) -> dict[str, dict[str, set[str]]]:
+        logger.debug('%s - %s', query, params)
+        return await self._fetch_records(query, params)
+
+    def inflate_aliases(self, aliases: Iterable[tuple[str, str, str]]) -> dict[str, dict[str, set[str]]]:
         """
-        Inflate aliases, grouped by language and then alias type
+        Inflate (name, name_type, language) aliases, grouped by language and then alias type
 
         name_type codes:
             S - Standard/Official name
@@ -363,16 +696,13 @@ class Database:
         name_type_order = ['S', 'P', 'V', 'Q', 'A']
 
         grouped: dict[str, dict[str, set[str]]] = {}
-        for alias in aliases:
-            lang = alias['language']
-            name_type = alias['name_type']
-            name = alias['name']
+        for name, name_type, lang in aliases:
+            by_type = grouped.get(lang)
+            if by_type is None:
+                by_type = grouped[lang] = {nt: set() for nt in name_type_order}
 
-            if lang not in grouped:
-                grouped[lang] = {nt: set() for nt in name_type_order}
-
-            if name_type in grouped[lang]:
-                grouped[lang][name_type].add(name)
+            if name_type in by_type:
+                by_type[name_type].add(name)
 
         return grouped
 
@@ -385,8 +715,8 @@ class Database:
         if not woe_ids:
             return {}
 
-        placeholders = ','.join('?' * len(woe_ids))
-        query = f"""
+        # one JSON array parameter, rather than a placeholder per WOEID, keeps the statement the same for any number
+        query = """
             SELECT
                 p.woe_id,
                 p.name,
@@ -395,12 +725,11 @@ class Database:
                 pt.shortname as placetype_shortname
             FROM places p
             JOIN placetypes pt ON p.placetype_id = pt.id
-            WHERE p.woe_id IN ({placeholders})
-        """  # noqa: S608
+            WHERE p.woe_id IN (SELECT value FROM json_each(?))
+        """
 
         logger.debug('%s - %s', query, woe_ids)
-        cursor = await self._conn.execute(query, woe_ids)
-        rows = await cursor.fetchall()
+        rows = await self._fetch_records(query, (json.dumps(woe_ids),))
 
         result: dict[str, list[dict[str, Any]]] = {}
         for row in rows:
@@ -419,7 +748,7 @@ class Database:
 
     @disk_cache(key_builder=_make_search_filter_cache_key('countries_facets'))
     @profile_async
-    async def get_countries_facets(self, *, filters: SearchFilters) -> list[dict[str, Any]]:
+    async def get_countries_facets(self, *, filters: SearchFilters) -> list[Record]:
         """
         Get all countries with place counts
         """
@@ -455,9 +784,7 @@ class Database:
         """  # noqa: S608
 
         logger.debug('%s - %s', query, {})
-        cursor = await self._conn.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query)
 
     @disk_cache(key_builder=_make_search_filter_cache_key('total_woeids'))
     @profile_async
@@ -479,8 +806,7 @@ class Database:
         """  # noqa: S608
 
         logger.debug('%s - %s', query, {})
-        cursor = await self._conn.execute(query)
-        row = await cursor.fetchone()
+        row = await self._fetch_one(query)
         if not row:
             raise HTTPException(
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -491,7 +817,7 @@ class Database:
 
     @disk_cache(key_builder=_make_search_filter_cache_key('placetypes_facets'))
     @profile_async
-    async def get_placetype_facets(self, *, filters: SearchFilters) -> list[dict[str, Any]]:
+    async def get_placetype_facets(self, *, filters: SearchFilters) -> list[Record]:
         """
         Get all placetypes with place counts
         """
@@ -516,9 +842,7 @@ class Database:
         """  # noqa: S608
 
         logger.debug('%s - %s', query, {})
-        cursor = await self._conn.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query)
 
     def _build_placetype_query(
         self,
@@ -593,7 +917,7 @@ class Database:
         return await self._do_count_query(joins, where_clauses, params)
 
     @profile_async
-    async def get_country_by_iso(self, iso: str) -> dict[str, Any] | None:
+    async def get_country_by_iso(self, iso: str) -> Record | None:
         """
         Get a country by ISO 3166-1 alpha-2 code.
         """
@@ -605,9 +929,8 @@ class Database:
             WHERE UPPER(iso2) = ?
         """
         logger.debug('%s - %s', query, (iso_upper,))
-        cursor = await self._conn.execute(query, (iso_upper,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        row = await self._fetch_one(query, (iso_upper,))
+        return cast('Record', row) if row else None
 
     def _build_country_query(
         self,
@@ -711,7 +1034,7 @@ class Database:
         *,
         iso2: str,
         filters: SearchFilters,
-    ) -> list[dict[str, Any]]:
+    ) -> list[Record]:
         """
         Get placetype facets (buckets with counts) for a given ISO2 country code.
         """
@@ -744,9 +1067,7 @@ class Database:
         """  # noqa: S608
 
         logger.debug('%s - %s', query, params)
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query, params)
 
     def _build_nullisland_query(
         self,
@@ -810,7 +1131,7 @@ class Database:
         return await self._do_count_query(joins, where_clauses, params)
 
     @profile_async
-    async def get_nullisland_placetype_facets(self, *, filters: SearchFilters) -> list[dict[str, Any]]:
+    async def get_nullisland_placetype_facets(self, *, filters: SearchFilters) -> list[Record]:
         """
         Get placetype facets for Null Island places.
         """
@@ -841,129 +1162,397 @@ class Database:
         """  # noqa: S608
 
         logger.debug('%s', query)
-        cursor = await self._conn.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query)
 
-    @profile_async
-    async def search_places(  # noqa: PLR0913
+    async def _has_search_index(self) -> bool:
+        """
+        Check, once per worker, whether the search index command has built the search_names tables.
+        """
+
+        if Database._search_index is None:
+            row = await self._fetch_one(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_names_fts'",
+            )
+            Database._search_index = row is not None
+
+        return Database._search_index
+
+    def _build_search_place_joins(self, alias: str, filters: SearchFilters) -> tuple[list[str], list[str]]:
+        """
+        Build the joins from search names to their places, and the search filters on those places.
+
+        Filtering in the same statement as the text match, before its LIMIT, keeps pages full and has_more honest.
+        """
+
+        joins = [
+            f'JOIN places p ON {alias}.woe_id = p.woe_id',
+            'JOIN placetypes pt ON p.placetype_id = pt.id',
+            'LEFT JOIN geometries.geometries g ON p.woe_id = g.woe_id',
+        ]
+        where_clauses: list[str] = []
+        apply_search_filters(filters, joins, where_clauses, FilterOptions(geometry_join_exists=True))
+
+        return joins, where_clauses
+
+    def _build_relevance_query(
         self,
         query_text: str,
-        *,
-        name_type: str | None = None,
+        name_type: str | None,
         filters: SearchFilters,
-        after: int | None = None,
-        before: int | None = None,
-        limit: int = 50,
-    ) -> PaginatedResult:
+        *,
+        indexed: bool,
+    ) -> tuple[str, list[Any]]:
         """
-        Search places with optional name_type filter and keyset pagination.
+        Build a query scoring each matching place by its best name, boosted by placetype scale and name type.
+
+        Only the best RELEVANCE_CANDIDATES matches are scored; FTS5 finds these with ORDER BY rank, without joining
+        every matching name. The search index's rank function weighs the boosts itself, so its candidates are the best
+        of every match; without it, the best bm25 text matches are re-ranked.
         """
 
-        params: list[Any] = [query_text]
-        where_clauses = ['fts.name MATCH ?']
+        if indexed:
+            params: list[Any] = [query_text, SEARCH_RANK_FUNCTION]
+            name_type_clause = ''
+            if name_type and name_type != 'any':
+                name_type_clause = f'AND {search_priority_sql("rowid")} = ?'
+                params.append(NAME_TYPE_PRIORITY.get(name_type, NAME_TYPE_PRIORITY_OTHER))
+            params.append(RELEVANCE_CANDIDATES)
+
+            joins, where_clauses = self._build_search_place_joins('s', filters)
+            query = f"""
+                SELECT
+                    s.woe_id,
+                    s.name as alias_name,
+                    s.name_type,
+                    s.language,
+                    c.rank,
+                    MIN(c.rank) as score,
+                    p.name,
+                    pt.shortname as placetype_name,
+                    g.lat,
+                    g.lng
+                FROM (
+                    SELECT rowid, rank
+                    FROM search_names_fts
+                    WHERE search_names_fts MATCH ? AND rank MATCH ? {name_type_clause}
+                    ORDER BY rank
+                    LIMIT ?
+                ) c
+                JOIN search_names s ON c.rowid = s.rowid
+                {' '.join(joins)}
+                {'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}
+                GROUP BY s.woe_id
+            """  # noqa: S608
 
+            return query, params
+
+        params = [SCALE_WEIGHT, NAME_TYPE_WEIGHT, query_text, RANK_FUNCTION, RELEVANCE_CANDIDATES]
+        joins, where_clauses = self._build_search_place_joins('a', filters)
         if name_type and name_type != 'any':
             where_clauses.append('a.name_type = ?')
             params.append(name_type)
 
-        if before:
-            where_clauses.append('a.woe_id < ?')
-            params.append(before)
-            order = 'DESC'
-        elif after:
-            where_clauses.append('a.woe_id > ?')
-            params.append(after)
-            order = 'ASC'
-        else:
-            order = 'ASC'
-
-        params.append(limit + 1)
-
         query = f"""
             SELECT
                 a.woe_id,
                 a.name as alias_name,
                 a.name_type,
                 a.language,
-                fts.rank
-            FROM aliases_fts fts
-            JOIN aliases a ON fts.rowid = a.rowid
-            WHERE {' AND '.join(where_clauses)}
+                c.rank,
+                MIN(c.rank + ? * {scale_sql('p.placetype_id')} + ? * {name_type_priority_sql('a.name_type')}) as score,
+                p.name,
+                pt.shortname as placetype_name,
+                g.lat,
+                g.lng
+            FROM (
+                SELECT rowid, rank
+                FROM aliases_fts
+                WHERE aliases_fts MATCH ? AND rank MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ) c
+            JOIN aliases a ON c.rowid = a.rowid
+            {' '.join(joins)}
+            {'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}
             GROUP BY a.woe_id
-            HAVING MIN(CASE a.name_type
-                WHEN 'S' THEN 1 WHEN 'P' THEN 2 WHEN 'V' THEN 3
-                WHEN 'Q' THEN 4 WHEN 'A' THEN 5 ELSE 6 END)
-            ORDER BY a.woe_id {order}
-            LIMIT ?
         """  # noqa: S608
 
-        logger.debug('%s - %s', query, params)
-        try:
-            cursor = await self._conn.execute(query, params)
-            search_rows = [dict(r) for r in await cursor.fetchall()]
-        except Exception:
-            logger.exception('Search query failed')
-            return PaginatedResult(items=[], has_more=False)
+        return query, params
 
-        if not search_rows:
-            return PaginatedResult(items=[], has_more=False)
+    def _build_search_page_query(self, page: str, order_by: str) -> str:
+        """
+        Wrap a page of search results with each place's country, which is only looked up for the page's places
+        """
 
-        has_more = len(search_rows) > limit
-        search_rows = search_rows[:limit]
+        return f"""
+            SELECT r.*, c.name as country_name
+            FROM ({page}) r
+            LEFT JOIN admins ad ON r.woe_id = ad.woe_id
+            LEFT JOIN countries c ON ad.country = c.woe_id
+            GROUP BY r.woe_id
+            ORDER BY {order_by}
+        """  # noqa: S608
+
+    def _build_relevance_page_query(  # noqa: PLR0913
+        self,
+        query_text: str,
+        name_type: str | None,
+        filters: SearchFilters,
+        *,
+        indexed: bool,
+        after: tuple[float, int] | None,
+        before: tuple[float, int] | None,
+        limit: int,
+    ) -> tuple[str, list[Any]]:
+        """
+        Build a page of search results sorted by relevance, keyset-paginated on a (score, woe_id) cursor.
+        """
+
+        inner, params = self._build_relevance_query(query_text, name_type, filters, indexed=indexed)
+
+        cursor_clause = ''
         if before:
-            search_rows = search_rows[::-1]
+            cursor_clause = 'WHERE (score, woe_id) < (?, ?)'
+            params.extend(before)
+            order = 'DESC'
+        elif after:
+            cursor_clause = 'WHERE (score, woe_id) > (?, ?)'
+            params.extend(after)
+            order = 'ASC'
+        else:
+            order = 'ASC'
 
-        woe_ids = [r['woe_id'] for r in search_rows]
-        places = await self._enrich_search_results(woe_ids, filters)
+        params.append(limit + 1)
+        page = f"""
+            SELECT *
+            FROM ({inner})
+            {cursor_clause}
+            ORDER BY score {order}, woe_id {order}
+            LIMIT ?
+        """  # noqa: S608
 
-        items = []
-        for row in search_rows:
-            woe_id = row['woe_id']
-            if woe_id in places:
-                item = {**row, **places[woe_id]}
-                items.append(item)
+        return self._build_search_page_query(page, f'r.score {order}, r.woe_id {order}'), params
 
-        return PaginatedResult(items=items, has_more=has_more)
+    def _build_woeid_page_query(  # noqa: PLR0913
+        self,
+        query_text: str,
+        name_type: str | None,
+        filters: SearchFilters,
+        *,
+        after: int | None,
+        before: int | None,
+        limit: int,
+    ) -> tuple[str, list[Any]]:
+        """
+        Build a page of search results sorted by WOE ID, keyset-paginated on the WOE ID.
+        """
+
+        params: list[Any] = [query_text]
+        joins, filter_clauses = self._build_search_place_joins('a', filters)
+        where_clauses = ['fts.name MATCH ?', *filter_clauses]
+
+        if name_type and name_type != 'any':
+            where_clauses.append('a.name_type = ?')
+            params.append(name_type)
+
+        if before:
+            where_clauses.append('a.woe_id < ?')
+            params.append(before)
+            order = 'DESC'
+        elif after:
+            where_clauses.append('a.woe_id > ?')
+            params.append(after)
+            order = 'ASC'
+        else:
+            order = 'ASC'
 
-    async def _enrich_search_results(self, woe_ids: list[int], filters: SearchFilters) -> dict[int, dict[str, Any]]:
+        params.append(limit + 1)
+
+        page = f"""
+            SELECT
+                a.woe_id,
+                a.name as alias_name,
+                a.name_type,
+                a.language,
+                fts.rank,
+                p.name,
+                pt.shortname as placetype_name,
+                g.lat,
+                g.lng
+            FROM aliases_fts fts
+            JOIN aliases a ON fts.rowid = a.rowid
+            {' '.join(joins)}
+            WHERE {' AND '.join(where_clauses)}
+            GROUP BY a.woe_id
+            HAVING MIN({name_type_priority_sql('a.name_type')})
+            ORDER BY a.woe_id {order}
+            LIMIT ?
+        """  # noqa: S608
+
+        return self._build_search_page_query(page, f'r.woe_id {order}'), params
+
+    async def _search_by_woeid_indexed(  # noqa: PLR0913
+        self,
+        query_text: str,
+        name_type: str | None,
+        filters: SearchFilters,
+        *,
+        after: int | None,
+        before: int | None,
+        limit: int,
+    ) -> list[Record]:
         """
-        Enrich search results with place details, filtering as needed.
+        Get up to limit + 1 places matching a search, sorted by WOE ID, straight off the search_names index.
+
+        search_names rowids sort by (woe_id, name type priority), so a place's matching names are adjacent and its
+        best name comes first; walking the index in rowid order and keeping one name per place needs no aggregation,
+        and stops as soon as the page is full.
         """
 
-        if not woe_ids:
-            return {}
+        joins, filter_clauses = self._build_search_place_joins('s', filters)
+        joins.extend(
+            [
+                'LEFT JOIN admins ad ON p.woe_id = ad.woe_id',
+                'LEFT JOIN countries c ON ad.country = c.woe_id',
+            ],
+        )
+        where_clauses = ['fts.search_names_fts MATCH ?', *filter_clauses]
+        params: list[Any] = [query_text]
 
-        placeholders = ','.join('?' * len(woe_ids))
-        params: list[Any] = list(woe_ids)
+        if name_type and name_type != 'any':
+            where_clauses.append(f'{search_priority_sql("fts.rowid")} = ?')
+            params.append(NAME_TYPE_PRIORITY.get(name_type, NAME_TYPE_PRIORITY_OTHER))
 
-        joins = [
-            'JOIN placetypes pt ON p.placetype_id = pt.id',
-            'LEFT JOIN geometries.geometries g ON p.woe_id = g.woe_id',
-            'LEFT JOIN admins ad ON p.woe_id = ad.woe_id',
-            'LEFT JOIN countries c ON ad.country = c.woe_id',
-        ]
-        where_clauses = [f'p.woe_id IN ({placeholders})']
-        apply_search_filters(filters, joins, where_clauses, FilterOptions(geometry_join_exists=True))
+        if before:
+            where_clauses.append('fts.rowid < ?')
+            params.append(before * SEARCH_ROWID_STRIDE)
+            order = 'DESC'
+        elif after:
+            where_clauses.append('fts.rowid >= ?')
+            params.append((after + 1) * SEARCH_ROWID_STRIDE)
+            order = 'ASC'
+        else:
+            order = 'ASC'
 
         query = f"""
             SELECT
-                p.woe_id,
+                s.woe_id,
+                s.name as alias_name,
+                s.name_type,
+                s.language,
+                fts.rank,
                 p.name,
                 pt.shortname as placetype_name,
                 g.lat,
                 g.lng,
                 c.name as country_name
-            FROM places p
+            FROM search_names_fts fts
+            JOIN search_names s ON fts.rowid = s.rowid
             {' '.join(joins)}
             WHERE {' AND '.join(where_clauses)}
-            GROUP BY p.woe_id
+            ORDER BY fts.rowid {order}
         """  # noqa: S608
 
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
+        logger.debug('%s - %s', query, params)
+        rows: dict[int, Record] = {}
+        read = 0
+        start = time.perf_counter()
+        try:
+            async with self._conn.execute(query, params) as cursor:
+                async for row in cursor:
+                    read += 1
+                    woe_id = row['woe_id']
+                    if woe_id not in rows and len(rows) > limit:
+                        break
+                    # walking backwards, a place's best name is the last of its names
+                    if woe_id not in rows or order == 'DESC':
+                        rows[woe_id] = cast('Record', row)
+        except sqlite3.OperationalError as exc:
+            if is_interrupted(exc):
+                await self._record_statement(query, params, None, start)
+            raise
+
+        await self._record_statement(query, params, read, start)
+        return list(rows.values())
+
+    async def _fetch_search_rows(self, query: str, params: list[Any]) -> list[Record]:
+        """
+        Run a search page query
+        """
+
+        logger.debug('%s - %s', query, params)
+        return await self._fetch_records(query, params)
+
+    @profile_async
+    async def search_places(  # noqa: PLR0913
+        self,
+        query_text: str,
+        *,
+        name_type: str | None = None,
+        filters: SearchFilters,
+        sort: str = 'woeid',
+        after: int | None = None,
+        after_score: float | None = None,
+        before: int | None = None,
+        before_score: float | None = None,
+        limit: int = 50,
+    ) -> PaginatedResult:
+        """
+        Search places with optional name_type filter and keyset pagination.
+
+        Each page is a single statement; search filters are applied before the page's LIMIT, so pages are full. Sorting
+        by relevance paginates on a (score, woe_id) cursor, sorting by woeid paginates on the WOE ID alone.
+        """
+
+        indexed = await self._has_search_index()
+
+        try:
+            if sort == 'relevance':
+                # a relevance cursor needs both halves; a bare WOE ID cursor is from a WOE ID sorted page
+                after_cursor = (after_score, after) if after and after_score is not None else None
+                before_cursor = (before_score, before) if before and before_score is not None else None
+                before = before if before_cursor else None
+                query, params = self._build_relevance_page_query(
+                    query_text,
+                    name_type,
+                    filters,
+                    indexed=indexed,
+                    after=after_cursor,
+                    before=before_cursor,
+                    limit=limit,
+                )
+                search_rows = await self._fetch_search_rows(query, params)
+            elif indexed:
+                search_rows = await self._search_by_woeid_indexed(
+                    query_text,
+                    name_type,
+                    filters,
+                    after=after,
+                    before=before,
+                    limit=limit,
+                )
+            else:
+                query, params = self._build_woeid_page_query(
+                    query_text,
+                    name_type,
+                    filters,
+                    after=after,
+                    before=before,
+                    limit=limit,
+                )
+                search_rows = await self._fetch_search_rows(query, params)
+        except Exception as exc:
+            if is_interrupted(exc):
+                raise
+            logger.exception('Search query failed')
+            return PaginatedResult(items=[], has_more=False)
+
+        has_more = len(search_rows) > limit
+        search_rows = search_rows[:limit]
+        if before:
+            search_rows = search_rows[::-1]
 
-        return {row['woe_id']: dict(row) for row in rows}
+        return PaginatedResult(items=search_rows, has_more=has_more)
 
     @profile_async
     async def search_places_count(
@@ -974,20 +1563,29 @@ class Database:
         filters: SearchFilters,
     ) -> int:
         """
-        Get count of search results.
+        Get count of search results; every matching place is counted, though relevance only ranks the best matches.
         """
 
+        if await self._has_search_index():
+            names, fts, name_type_column = 'search_names', 'search_names_fts', 's.priority'
+            match_column = 'fts.search_names_fts'
+            name_type_value: str | int | None = NAME_TYPE_PRIORITY.get(name_type or '', NAME_TYPE_PRIORITY_OTHER)
+        else:
+            names, fts, name_type_column = 'aliases', 'aliases_fts', 's.name_type'
+            match_column = 'fts.name'
+            name_type_value = name_type
+
+        where_clauses = [f'{match_column} MATCH ?']
+        params: list[Any] = [query_text]
         joins = [
-            'JOIN aliases a ON p.woe_id = a.woe_id',
-            'JOIN aliases_fts fts ON a.rowid = fts.rowid',
+            f'JOIN {names} s ON p.woe_id = s.woe_id',
+            f'JOIN {fts} fts ON s.rowid = fts.rowid',
             'LEFT JOIN geometries.geometries g ON p.woe_id = g.woe_id',
         ]
-        where_clauses = ['fts.name MATCH ?']
-        params: list[Any] = [query_text]
 
         if name_type and name_type != 'any':
-            where_clauses.append('a.name_type = ?')
-            params.append(name_type)
+            where_clauses.append(f'{name_type_column} = ?')
+            params.append(name_type_value)
 
         apply_search_filters(filters, joins, where_clauses, FilterOptions(geometry_join_exists=True))
 
@@ -1000,43 +1598,166 @@ class Database:
 
         logger.debug('%s - %s', query, params)
         try:
-            cursor = await self._conn.execute(query, params)
-            row = await cursor.fetchone()
+            row = await self._fetch_one(query, params)
             return row[0] if row else 0
-        except Exception:
+        except Exception as exc:
+            if is_interrupted(exc):
+                raise
             logger.exception('Search count query failed')
             return 0
 
+    @profile_async
+    async def search_places_ranked_count(
+        self,
+        query_text: str,
+        *,
+        name_type: str | None = None,
+        filters: SearchFilters,
+    ) -> int:
+        """
+        Get count of the places relevance ranks, the only places its pages reach.
+
+        Relevance ranks the best matching names, before they're filtered, and a place can have several of them, so
+        there can be fewer of these places than the best matches.
+        """
+
+        inner, params = self._build_relevance_query(
+            query_text,
+            name_type,
+            filters,
+            indexed=await self._has_search_index(),
+        )
+        query = f'SELECT COUNT(*) FROM ({inner})'  # noqa: S608
+
+        logger.debug('%s - %s', query, params)
+        try:
+            row = await self._fetch_one(query, params)
+            return row[0] if row else 0
+        except Exception as exc:
+            if is_interrupted(exc):
+                raise
+            logger.exception('Search ranked count query failed')
+            return 0
+
+    async def _has_autocomplete_index(self) -> bool:
+        """
+        Check, once per worker, whether the autocomplete command has built the autocomplete tables.
+        """
+
+        if Database._autocomplete_index is None:
+            row = await self._fetch_one(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'autocomplete_prefixes'",
+            )
+            Database._autocomplete_index = row is not None
+
+        return Database._autocomplete_index
+
+    @profile_async
+    async def autocomplete(self, key: str, *, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Get the top places with a name starting with a normalised prefix, larger places and better names first.
+
+        Uses the autocomplete tables when present, their precomputed prefixes or else a range scan of names, otherwise
+        ranks a bounded set of FTS prefix matches.
+        """
+
+        if not await self._has_autocomplete_index():
+            return await self._autocomplete_fts(key, limit=limit)
+
+        query = """
+            SELECT woe_id, name, name_type, placetype_id
+            FROM autocomplete_prefixes
+            WHERE prefix = ?
+            ORDER BY position
+            LIMIT ?
+        """
+        params: list[Any] = [key, limit]
+        logger.debug('%s - %s', query, params)
+        rows = await self._fetch_records(query, params)
+
+        # every short prefix, and every longer prefix of many names, is precomputed; any other has few enough to rank
+        if not rows and len(key) > PRECOMPUTED_PREFIX_LENGTH:
+            query = """
+                SELECT woe_id, name, name_type, placetype_id, MIN(score) as score
+                FROM autocomplete_names
+                WHERE key >= ? AND key < ?
+                GROUP BY woe_id
+                ORDER BY score, woe_id
+                LIMIT ?
+            """
+            params = [key, f'{key}\U0010ffff', limit]
+            logger.debug('%s - %s', query, params)
+            rows = await self._fetch_records(query, params)
+
+        return [
+            {'woe_id': r['woe_id'], 'name': r['name'], 'name_type': r['name_type'], 'placetype_id': r['placetype_id']}
+            for r in rows
+        ]
+
+    async def _autocomplete_fts(self, key: str, *, limit: int, candidates: int = 500) -> list[dict[str, Any]]:
+        """
+        Autocomplete from FTS prefix matches, for databases without the autocomplete tables.
+        """
+
+        phrase = key.replace('"', '""')
+        joins = ['JOIN aliases a ON fts.rowid = a.rowid', 'JOIN places p ON a.woe_id = p.woe_id']
+        where_clauses = ['fts.name MATCH ?']
+        apply_search_filters(SearchFilters(), joins, where_clauses, FilterOptions(include_null_island=False))
+
+        query = f"""
+            SELECT a.woe_id, a.name, a.name_type, p.placetype_id
+            FROM aliases_fts fts
+            {' '.join(joins)}
+            WHERE {' AND '.join(where_clauses)}
+            LIMIT ?
+        """  # noqa: S608
+        params = [f'"{phrase}"*', candidates]
+
+        logger.debug('%s - %s', query, params)
+        try:
+            rows = await self._fetch_records(query, params)
+        except Exception as exc:
+            if is_interrupted(exc):
+                raise
+            logger.exception('Autocomplete query failed')
+            return []
+
+        # only the suggestions returned are copied into dicts, for their JSON response
+        best: dict[int, tuple[int, Record]] = {}
+        for row in rows:
+            score = autocomplete_score(row['placetype_id'], row['name_type'])
+            if row['woe_id'] not in best or score < best[row['woe_id']][0]:
+                best[row['woe_id']] = (score, row)
+
+        ranked = sorted(best.values(), key=lambda entry: (entry[0], entry[1]['woe_id']))
+        return [dict(row) for _, row in ranked[:limit]]
+
     @disk_cache(key_builder=_make_cache_key('placetypes'))
     @profile_async
-    async def get_placetypes(self) -> list[dict[str, Any]]:
+    async def get_placetypes(self) -> list[Record]:
         """
         Get all placetypes
         """
 
         query = 'SELECT * FROM placetypes'
-        cursor = await self._conn.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query)
 
     @profile_async
-    async def get_licenses(self) -> list[dict[str, Any]]:
+    async def get_licenses(self) -> list[Record]:
         """
         Get all licenses
         """
 
         query = 'SELECT * FROM licenses'
-        cursor = await self._conn.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return await self._fetch_records(query)
 
     async def _get_woeid_range(self) -> tuple[int, int]:
         """
         Get min/max woe_id range from places table.
         """
 
-        cursor = await self._conn.execute('SELECT MIN(woe_id), MAX(woe_id) FROM places')
-        row = await cursor.fetchone()
+        # as separate subqueries, each is a single primary key lookup; together, they scan every place
+        row = await self._fetch_one('SELECT (SELECT MIN(woe_id) FROM places), (SELECT MAX(woe_id) FROM places)')
         if not row or row[0] is None:
             return (0, 0)
         return (row[0], row[1])
@@ -1047,19 +1768,19 @@ class Database:
         """
 
         if not filters.null_island:
-            cursor = await self._conn.execute(
+            row = await self._fetch_one(
                 'SELECT 1 FROM geometries.geometries WHERE woe_id = ? AND lat IS NOT NULL AND lng IS NOT NULL',
                 (woe_id,),
             )
-            if not await cursor.fetchone():
+            if not row:
                 return False
 
         if not filters.deprecated:
-            cursor = await self._conn.execute(
+            row = await self._fetch_one(
                 'SELECT 1 FROM changes WHERE woe_id = ? AND superseded_by IS NOT NULL',
                 (woe_id,),
             )
-            if await cursor.fetchone():
+            if row:
                 return False
 
         return True
@@ -1082,9 +1803,12 @@ class Database:
             where_clauses.append(f'placetype_id NOT IN ({placeholders})')
             params.extend(filters.exclude_placetypes)
 
+        # ORDER BY woe_id makes this a seek on the primary key; without it, SQLite may walk the smaller placetype
+        # index instead, taking the first place of the lowest placetype rather than the next WOEID
         select_sql = f"""
             SELECT woe_id FROM places
             WHERE {' AND '.join(where_clauses)}
+            ORDER BY woe_id
             LIMIT 1
         """  # noqa: S608
 
@@ -1093,8 +1817,7 @@ class Database:
             random_id = random.randint(min_id, max_id)  # noqa: S311
             query_params = [random_id, *params]
 
-            cursor = await self._conn.execute(select_sql, query_params)
-            row = await cursor.fetchone()
+            row = await self._fetch_one(select_sql, query_params)
             if row and await self._is_valid_random_place(row[0], filters):
                 return dict(row)
 
@@ -1118,11 +1841,6 @@ class Database:
         lat_delta = distance / 111000.0
         lng_delta = distance / (111000.0 * max(math.cos(math.radians(lat)), 0.01))
 
-        joins: list[str] = ['JOIN geometries.geometries g ON p.woe_id = g.woe_id']
-        where_clauses: list[str] = [
-            'g.lat BETWEEN ? AND ?',
-            'g.lng BETWEEN ? AND ?',
-        ]
         # MakePoint params first (lng, lat), then WHERE clause params
         params: list[Any] = [
             lng,
@@ -1132,41 +1850,12 @@ class Database:
             lng - lng_delta,
             lng + lng_delta,
         ]
-        apply_search_filters(
-            filters,
-            joins,
-            where_clauses,
-            FilterOptions(geometry_join_exists=True, include_null_island=False, include_unknown=False),
-        )
-
-        query = f"""
-            WITH origin AS (SELECT MakePoint(?, ?, 4326) AS pt),
-            candidates AS (
-                SELECT
-                    p.woe_id,
-                    p.name,
-                    p.placetype_id,
-                    pt.shortname as placetype_name,
-                    g.lat,
-                    g.lng,
-                    ST_Distance(g.geom, origin.pt, 1) as distance_m
-                FROM places p
-                JOIN placetypes pt ON p.placetype_id = pt.id
-                {' '.join(joins)}
-                CROSS JOIN origin
-                WHERE {' AND '.join(where_clauses)}
-            )
-            SELECT * FROM candidates
-            WHERE distance_m <= ?
-            ORDER BY distance_m ASC, woe_id ASC
-            LIMIT ? OFFSET ?
-        """  # noqa: S608
+        query = _build_nearby_query(NearbyQueryShape.from_filters(filters, count=False))
 
         params.extend([distance, limit + 1, offset])
 
         logger.debug('%s - %s', query, params)
-        cursor = await self._conn.execute(query, params)
-        rows = [dict(r) for r in await cursor.fetchall()]
+        rows = await self._fetch_records(query, params)
 
         has_more = len(rows) > limit
         items = rows[:limit]
@@ -1188,11 +1877,6 @@ class Database:
         lat_delta = distance / 111000.0
         lng_delta = distance / (111000.0 * max(math.cos(math.radians(lat)), 0.01))
 
-        joins: list[str] = ['JOIN geometries.geometries g ON p.woe_id = g.woe_id']
-        where_clauses: list[str] = [
-            'g.lat BETWEEN ? AND ?',
-            'g.lng BETWEEN ? AND ?',
-        ]
         # MakePoint params first (lng, lat), then WHERE clause params
         params: list[Any] = [
             lng,
@@ -1203,32 +1887,84 @@ class Database:
             lng + lng_delta,
             distance,
         ]
-        apply_search_filters(
-            filters,
-            joins,
-            where_clauses,
-            FilterOptions(geometry_join_exists=True, include_null_island=False, include_unknown=False),
-        )
-
-        query = f"""
-            WITH origin AS (SELECT MakePoint(?, ?, 4326) AS pt),
-            candidates AS (
-                SELECT p.woe_id,
-                    ST_Distance(g.geom, origin.pt, 1) as distance_m
-                FROM places p
-                {' '.join(joins)}
-                CROSS JOIN origin
-                WHERE {' AND '.join(where_clauses)}
-            )
-            SELECT COUNT(*) FROM candidates WHERE distance_m <= ?
-        """  # noqa: S608
+        query = _build_nearby_query(NearbyQueryShape.from_filters(filters, count=True))
 
         logger.debug('%s - %s', query, params)
-        cursor = await self._conn.execute(query, params)
-        row = await cursor.fetchone()
+        row = await self._fetch_one(query, params)
         return row[0] if row else 0
 
 
+@dataclass(frozen=True)
+class NearbyQueryShape:
+    """
+    The SearchFilters that shape a nearby query's SQL, and whether it counts.
+
+    Nearby places always have a centroid and a known placetype, so only the deprecated filter shapes the query.
+    """
+
+    deprecated: bool
+    count: bool
+
+    @classmethod
+    def from_filters(cls, filters: SearchFilters, *, count: bool) -> 'NearbyQueryShape':
+        """
+        Get the shape of a nearby query for its filters
+        """
+
+        return cls(deprecated=filters.deprecated, count=count)
+
+
+@functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_nearby_query(shape: NearbyQueryShape) -> str:
+    """
+    Build a query for places within a distance of a point, or their count, once per shape.
+
+    Its parameters are the point (lng, lat), the bounding box pre-filter's parameters, the distance and, unless
+    counting, the limit and offset.
+    """
+
+    joins = ['JOIN geometries.geometries g ON p.woe_id = g.woe_id']
+    where_clauses = ['g.lat BETWEEN ? AND ?', 'g.lng BETWEEN ? AND ?']
+    apply_search_filters(
+        SearchFilters(deprecated=shape.deprecated),
+        joins,
+        where_clauses,
+        FilterOptions(geometry_join_exists=True, include_null_island=False, include_unknown=False),
+    )
+
+    candidate_cols: tuple[str, ...]
+    if shape.count:
+        candidate_cols = ('p.woe_id', 'ST_Distance(g.geom, origin.pt, 1) as distance_m')
+        candidate_joins = (*joins, 'CROSS JOIN origin')
+        outer = 'SELECT COUNT(*) FROM candidates WHERE distance_m <= ?'
+    else:
+        candidate_cols = (
+            'p.woe_id',
+            'p.name',
+            'p.placetype_id',
+            'pt.shortname as placetype_name',
+            'g.lat',
+            'g.lng',
+            'ST_Distance(g.geom, origin.pt, 1) as distance_m',
+        )
+        candidate_joins = ('JOIN placetypes pt ON p.placetype_id = pt.id', *joins, 'CROSS JOIN origin')
+        outer = """
+            SELECT * FROM candidates
+            WHERE distance_m <= ?
+            ORDER BY distance_m ASC, woe_id ASC
+            LIMIT ? OFFSET ?
+        """
+
+    candidates = select_sql(candidate_cols, 'places p', candidate_joins, where_clauses)
+    return f"""
+        WITH origin AS (SELECT MakePoint(?, ?, 4326) AS pt),
+        candidates AS (
+            {candidates}
+        )
+        {outer}
+    """
+
+
 async def create_connection_factory(
     db_path: Path,
     geom_db_path: Path,
@@ -1242,11 +1978,12 @@ async def create_connection_factory(
         Create and initialise a database connection with Spatialite support.
         """
 
-        conn = await aiosqlite.connect(str(db_path))
+        conn = await aiosqlite.connect(str(db_path), cached_statements=STATEMENT_CACHE_SIZE)
         await conn.execute('ATTACH DATABASE ? AS geometries', (str(geom_db_path),))
         await conn.enable_load_extension(True)  # noqa: FBT003
         await conn.execute("SELECT load_extension('mod_spatialite')")
         await conn.enable_load_extension(False)  # noqa: FBT003
+        await install_query_budget(conn)
 
         return conn
 
@@ -1266,22 +2003,160 @@ async def init_pool(db_path: Path, geom_db_path: Path, pool_size: int = 10) -> S
     )
 
 
-@asynccontextmanager
-async def get_db(
-    request: Request | None = None,
-    app: 'Starlette | None' = None,
-) -> AsyncIterator[Database]:
+def _get_pool(request: Request | None, app: 'Starlette | None') -> SQLiteConnectionPool:
     """
-    Get a database connection from the pool
+    Get the connection pool from a request's app, or an app
     """
 
     if request is not None:
-        pool = request.app.state.db_pool
+        pool: SQLiteConnectionPool = request.app.state.db_pool
     elif app is not None:
         pool = app.state.db_pool
     else:
         msg = 'Either request or app must be provided'
         raise ValueError(msg)
 
+    return pool
+
+
+@asynccontextmanager
+async def _checkout(pool: SQLiteConnectionPool) -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Check out a pooled connection, recording how long it took to get, as a metric and a span of the request's trace
+    """
+
+    start = time.perf_counter()
     async with pool.connection() as conn:
-        yield Database(conn)
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        add_span('pool.checkout', start)
+        yield conn
+
+
+@dataclass(frozen=True)
+class Degradable:
+    """
+    A query, such as a count or facets, that can fall back to a placeholder result rather than fail its page.
+    """
+
+    query: Callable[[Database], Awaitable[Any]]
+    fallback: Any = None
+    # a disk cached query that runs over is finished in the background, so it's cached for later requests
+    cached: bool = False
+
+
+class CacheFills:
+    """
+    Module-level holder of the background tasks finishing cached queries that ran over a request's budget.
+    """
+
+    tasks: ClassVar[set[asyncio.Task[None]]] = set()
+
+
+async def _fill_cache(pool: SQLiteConnectionPool, query: Callable[[Database], Awaitable[Any]]) -> None:
+    """
+    Run a disk cached query to completion, without a budget, so it fills the cache
+    """
+
+    start = time.perf_counter()
+    try:
+        async with _checkout(pool) as conn:
+            await query(Database(conn))
+        logger.info('Cache filled in the background in %.3fs', time.perf_counter() - start)
+    except Exception:
+        logger.exception('Background cache fill failed')
+
+
+def _start_cache_fill(pool: SQLiteConnectionPool, query: Callable[[Database], Awaitable[Any]]) -> None:
+    """
+    Finish a disk cached query that ran over in the background, unless the cache is off or the worker's busy filling it
+    """
+
+    if get_cache() is None or len(CacheFills.tasks) >= CACHE_FILLS:
+        return
+
+    # in an empty context, so the fill isn't part of the request's trace
+    task = asyncio.create_task(_fill_cache(pool, query), context=contextvars.Context())
+    CacheFills.tasks.add(task)
+    task.add_done_callback(CacheFills.tasks.discard)
+
+
+async def cancel_cache_fills() -> None:
+    """
+    Cancel the background cache fills, before the pool closes
+    """
+
+    tasks = list(CacheFills.tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _query_interrupted(exc: QueryInterruptedError) -> HTTPException:
+    """
+    Build the response for a request whose query was interrupted
+    """
+
+    logger.warning('%s', exc)
+    return HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail='The database took too long to answer')
+
+
+@asynccontextmanager
+async def get_db(
+    request: Request | None = None,
+    app: 'Starlette | None' = None,
+) -> AsyncIterator[Database]:
+    """
+    Get a database connection from the pool.
+
+    A request's queries share the query budget, and are interrupted if its client disconnects; an app's are not.
+    """
+
+    pool = _get_pool(request, app)
+    seconds = get_settings().woeplanet_query_budget if request is not None else None
+    async with _checkout(pool) as conn:
+        try:
+            async with query_budget(conn, seconds, request):
+                yield Database(conn)
+        except QueryInterruptedError as exc:
+            raise _query_interrupted(exc) from exc
+
+
+async def gather_db(
+    *queries: Callable[[Database], Awaitable[Any]] | Degradable,
+    request: Request | None = None,
+    app: 'Starlette | None' = None,
+) -> list[Any]:
+    """
+    Run independent queries concurrently, each on its own pooled connection, returning their results in order.
+
+    Each aiosqlite connection runs its queries on its own thread, so a page's facets, count and results take as long as
+    the slowest of them, rather than their sum. Don't call this while holding a connection from get_db; waiting on the
+    pool while holding one of its connections can deadlock a busy pool.
+
+    For a request, each query has the query budget, or the shorter count budget if it's Degradable; a Degradable query
+    that runs over returns its fallback, rather than failing the page, and, if it's cached, is finished in the
+    background.
+    """
+
+    pool = _get_pool(request, app)
+    settings = get_settings()
+
+    async def run(query: Callable[[Database], Awaitable[Any]] | Degradable) -> Any:  # noqa: ANN401
+        degradable = query if isinstance(query, Degradable) else Degradable(query)
+        seconds = None
+        if request is not None:
+            seconds = settings.woeplanet_count_budget if degradable is query else settings.woeplanet_query_budget
+
+        async with _checkout(pool) as conn:
+            try:
+                async with query_budget(conn, seconds, request):
+                    return await degradable.query(Database(conn))
+            except QueryInterruptedError as exc:
+                if degradable is not query:
+                    raise _query_interrupted(exc) from exc
+                logger.warning('%s; degraded to %r', exc, degradable.fallback)
+                if degradable.cached:
+                    _start_cache_fill(pool, degradable.query)
+                return degradable.fallback
+
+    return list(await asyncio.gather(*(run(query) for query in queries)))
@@ -0,0 +1,136 @@
+"""
+WOEplanet Spelunker: dependencies package; query budget module.
+"""
+
+import asyncio
+import logging
+import math
+import sqlite3
+import time
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+import aiosqlite
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# SQLite calls a connection's progress handler every this many virtual machine instructions
+PROGRESS_INTERVAL = 1000
+DISCONNECT_POLL_INTERVAL = 0.25  # seconds
+
+
+class QueryInterruptedError(Exception):
+    """
+    Raised when a query is interrupted, because it ran over its time budget or its client went away.
+    """
+
+
+class QueryBudget:
+    """
+    A connection's query deadline; SQLite's progress handler checks it on the connection's own thread.
+    """
+
+    def __init__(self) -> None:
+        self.deadline = math.inf
+        self.cancelled = False
+
+    def __call__(self) -> int:
+        """
+        Progress handler; a non-zero return interrupts the running query
+        """
+
+        return int(self.cancelled or time.monotonic() > self.deadline)
+
+
+_budgets: weakref.WeakKeyDictionary[aiosqlite.Connection, QueryBudget] = weakref.WeakKeyDictionary()
+
+
+async def install_query_budget(conn: aiosqlite.Connection) -> None:
+    """
+    Install a query budget's progress handler on a new connection; it does nothing until a budget is started
+    """
+
+    budget = QueryBudget()
+    await conn.set_progress_handler(budget, PROGRESS_INTERVAL)
+    _budgets[conn] = budget
+
+
+def is_interrupted(exc: BaseException) -> bool:
+    """
+    Check whether an exception is SQLite reporting an interrupted query
+    """
+
+    return isinstance(exc, sqlite3.OperationalError) and str(exc) == 'interrupted'
+
+
+async def _watch_disconnect(request: Request, conn: aiosqlite.Connection, budget: QueryBudget) -> None:
+    """
+    Interrupt a connection's queries as soon as a request's client disconnects; ASGI has no disconnect event to await
+    """
+
+    while not await request.is_disconnected():  # noqa: ASYNC110
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+    budget.cancelled = True
+    await conn.interrupt()
+
+
+@asynccontextmanager
+async def query_budget(
+    conn: aiosqlite.Connection,
+    seconds: float | None,
+    request: Request | None = None,
+) -> AsyncIterator[None]:
+    """
+    Interrupt queries on a connection that run past a time budget, or past their request's client disconnecting.
+
+    Interrupted queries raise QueryInterruptedError. A budget of None, or a connection without a budget installed,
+    runs queries to completion.
+    """
+
+    budget = _budgets.get(conn)
+    if budget is None or seconds is None:
+        yield
+        return
+
+    budget.deadline = time.monotonic() + seconds
+    budget.cancelled = False
+    watcher = asyncio.create_task(_watch_disconnect(request, conn, budget)) if request is not None else None
+
+    try:
+        yield
+    except sqlite3.OperationalError as exc:
+        if not is_interrupted(exc):
+            raise
+
+        reason = 'client disconnected' if budget.cancelled else f'over its {seconds}s budget'
+        msg = f'Query interrupted; {reason}'
+        raise QueryInterruptedError(msg) from exc
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        budget.deadline = math.inf
+        budget.cancelled = False
+
+
+@contextmanager
+def suspend_query_budget(conn: aiosqlite.Connection) -> Iterator[None]:
+    """
+    Run statements on a connection to completion, whatever's left of its query budget, then resume the budget
+    """
+
+    budget = _budgets.get(conn)
+    if budget is None:
+        yield
+        return
+
+    deadline, cancelled = budget.deadline, budget.cancelled
+    budget.deadline, budget.cancelled = math.inf, False
+    try:
+        yield
+    finally:
+        budget.deadline = deadline
+        # the client may have disconnected meanwhile
+        budget.cancelled = cancelled or budget.cancelled
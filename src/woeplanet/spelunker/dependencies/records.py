@@ -0,0 +1,74 @@
+"""
+WOEplanet Spelunker: dependencies package; records module.
+"""
+
+import sqlite3
+import threading
+from collections.abc import Iterator, Mapping
+from typing import Any, cast
+
+# each aiosqlite connection runs its queries, and so makes its rows, on a thread of its own, one query at a time
+_last_query = threading.local()
+
+
+def _query_columns(description: tuple[Any, ...]) -> dict[str, int]:
+    """
+    Get the column indices for a query's cursor description, built once per query, and shared by all its rows
+    """
+
+    if getattr(_last_query, 'description', None) is not description:
+        columns: dict[str, int] = {}
+        for index, column in enumerate(description):
+            # like sqlite3.Row, a name selected twice is the first column of that name
+            columns.setdefault(column[0], index)
+        _last_query.description = description
+        _last_query.columns = columns
+
+    return cast('dict[str, int]', _last_query.columns)
+
+
+class Record(Mapping[str, Any]):
+    """
+    A read only result row; a connection's row factory, in place of sqlite3.Row.
+
+    Records are mappings, so they can be read like the dicts they replace, in code and in templates, without copying
+    each row into a dict of its own; a row is its values tuple, and its query's column indices, which all of its rows
+    share. Like sqlite3.Row, records can also be indexed by column number.
+    """
+
+    __slots__ = ('_columns', '_values')
+
+    def __init__(self, cursor: sqlite3.Cursor, values: tuple[Any, ...]) -> None:
+        self._columns = _query_columns(cursor.description)
+        self._values = values
+
+    def __getitem__(self, key: str | int) -> Any:  # noqa: ANN401
+        """
+        Get a column's value, by name or by number
+        """
+
+        if isinstance(key, int):
+            return self._values[key]
+
+        return self._values[self._columns[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over column names
+        """
+
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        """
+        Number of named columns
+        """
+
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        """
+        Show a record like the dict it reads as
+        """
+
+        return f'Record({dict(self)!r})'
@@ -0,0 +1,171 @@
+"""
+WOEplanet Spelunker: dependencies package; slow query log module.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+from diskcache import Cache, Deque  # type: ignore[import-untyped]
+
+from woeplanet.spelunker.dependencies.query_budget import suspend_query_budget
+
+logger = logging.getLogger(__name__)
+
+# statement shapes are memoized, so there are few of them; this only bounds plans for f-string statements
+QUERY_PLAN_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    """
+    A statement that ran over the slow query threshold; rows is None if it was interrupted.
+    """
+
+    sql: str
+    params: list[Any]
+    rows: int | None
+    elapsed: float  # seconds
+    recorded_at: float  # seconds since the epoch
+    pid: int
+    plan: list[str] | None  # EXPLAIN QUERY PLAN, one line per step, indented by depth
+
+
+class SlowQueryLog:
+    """
+    A ring buffer of slow statements, shared by every worker through a diskcache Deque.
+
+    Each worker captures the EXPLAIN QUERY PLAN of a statement once, the first time it's slow, and records it with
+    every slow run of that statement.
+    """
+
+    def __init__(self, directory: Path, size: int, threshold: float) -> None:
+        self.threshold = threshold
+        self._cache = Cache(str(directory))
+        self._entries = Deque.fromcache(self._cache, maxlen=size)
+        self._plans: dict[str, list[str]] = {}
+
+    async def _query_plan(self, conn: aiosqlite.Connection, sql: str, params: Sequence[Any]) -> list[str] | None:
+        """
+        Get a statement's query plan, once per statement per worker
+        """
+
+        plan = self._plans.get(sql)
+        if plan is not None:
+            return plan
+
+        try:
+            # a statement interrupted for running over its budget is explained all the same
+            with suspend_query_budget(conn):
+                cursor = await conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                cursor.row_factory = None  # (id, parent, notused, detail) tuples, unpacked as they're read
+                steps = await cursor.fetchall()
+        except sqlite3.Error as exc:
+            logger.warning('Failed to explain slow query: %s', exc)
+            return None
+
+        depths: dict[int, int] = {0: -1}
+        plan = []
+        for step_id, parent_id, _, detail in steps:
+            depths[step_id] = depths.get(parent_id, -1) + 1
+            plan.append(f'{"  " * depths[step_id]}{detail}')
+
+        if len(self._plans) >= QUERY_PLAN_CACHE_SIZE:
+            del self._plans[next(iter(self._plans))]
+        self._plans[sql] = plan
+        return plan
+
+    async def record(
+        self,
+        conn: aiosqlite.Connection,
+        sql: str,
+        params: Sequence[Any],
+        rows: int | None,
+        elapsed: float,
+    ) -> None:
+        """
+        Record a statement, with its query plan, if it ran over the threshold
+        """
+
+        if elapsed < self.threshold:
+            return
+
+        logger.warning('Slow query, %.3fs, %s rows: %s - %s', elapsed, rows, sql, params)
+        entry = SlowQuery(
+            sql=sql,
+            params=list(params),
+            rows=rows,
+            elapsed=elapsed,
+            recorded_at=time.time(),
+            pid=os.getpid(),
+            plan=await self._query_plan(conn, sql, params),
+        )
+        self._entries.append(entry)
+
+    def entries(self, limit: int | None = None) -> list[SlowQuery]:
+        """
+        Get the statements recorded, most recent first
+        """
+
+        entries = list(reversed(self._entries))
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        """
+        Forget every recorded statement
+        """
+
+        self._entries.clear()
+
+    def close(self) -> None:
+        """
+        Close the log's cache
+        """
+
+        self._cache.close()
+
+
+class SlowQueryLogHolder:
+    """
+    Module-level slow query log holder to avoid global statement.
+    """
+
+    log: SlowQueryLog | None = None
+
+
+def init_slow_query_log(cache_dir: Path, threshold: float | None, size: int) -> SlowQueryLog | None:
+    """
+    Initialise the slow query log; a threshold of None disables it.
+    """
+
+    if threshold is None:
+        return None
+
+    log_path = cache_dir / 'slow-queries'
+    logger.info('Logging queries slower than %.3fs at %s', threshold, log_path)
+    SlowQueryLogHolder.log = SlowQueryLog(log_path, size, threshold)
+    return SlowQueryLogHolder.log
+
+
+def get_slow_query_log() -> SlowQueryLog | None:
+    """
+    Get the current slow query log, if it's enabled.
+    """
+
+    return SlowQueryLogHolder.log
+
+
+def close_slow_query_log() -> None:
+    """
+    Close the slow query log.
+    """
+
+    if SlowQueryLogHolder.log is not None:
+        SlowQueryLogHolder.log.close()
+        SlowQueryLogHolder.log = None
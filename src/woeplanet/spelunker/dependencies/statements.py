@@ -0,0 +1,38 @@
+"""
+WOEplanet Spelunker: dependencies package; SQL statements module.
+"""
+
+from collections.abc import Sequence
+
+# sqlite3 keeps this many prepared statements per connection; enough for every query shape a worker serves, so each
+# shape is compiled once per connection rather than being evicted by the next page's
+STATEMENT_CACHE_SIZE = 512
+
+
+def select_sql(  # noqa: PLR0913
+    select_cols: Sequence[str],
+    from_clause: str,
+    joins: Sequence[str] = (),
+    where_clauses: Sequence[str] = (),
+    order_by: str | None = None,
+    *,
+    limit: bool = False,
+) -> str:
+    """
+    Assemble a SELECT statement from its parts.
+
+    Queries with the same shape get the same text, so sqlite3's per connection statement cache prepares each shape
+    once; values must be bound as parameters, never formatted into the parts. Assembling is cheaper than hashing the
+    parts to look it up, so callers memoize on a smaller shape, as _build_place_query does, if at all. With limit, the
+    statement ends with a LIMIT ? placeholder.
+    """
+
+    parts = [f'SELECT {", ".join(select_cols)}', f'FROM {from_clause}', *joins]
+    if where_clauses:
+        parts.append(f'WHERE {" AND ".join(where_clauses)}')
+    if order_by:
+        parts.append(f'ORDER BY {order_by}')
+    if limit:
+        parts.append('LIMIT ?')
+
+    return '\n'.join(parts)
@@ -2,8 +2,10 @@
 WOEplanet Spelunker: dependencies package; templates module.
 """
 
+from collections.abc import Iterable
 from functools import lru_cache
 from http import HTTPStatus
+from typing import Any
 
 import emoji
 import inflect
@@ -12,6 +14,8 @@ import pyuca
 from starlette.templating import Jinja2Templates
 
 from woeplanet.spelunker.common.languages import language_name
+from woeplanet.spelunker.common.tracing import trace_span
+from woeplanet.spelunker.config.placetypes import Placetype
 from woeplanet.spelunker.config.settings import get_settings
 
 NAME_TYPES = {
@@ -22,10 +26,54 @@ NAME_TYPES = {
     'A': 'abbreviated',
 }
 
+# a collation key is a tuple of a few dozen ints per character, ~1KB for a typical name; bounds the cache to ~16MB
+COLLATION_KEY_CACHE_SIZE = 16384
+# inflections of words that aren't placetype names, such as language names
+INFLECTION_CACHE_SIZE = 1024
+
 settings = get_settings()
 collator = pyuca.Collator()
 inflect_engine = inflect.engine()
 
+# plurals and articles of placetype names and shortnames, as written and lower cased
+_placetype_plurals: dict[str, str] = {}
+_placetype_articles: dict[str, str] = {}
+
+
+def load_placetype_inflections(names: Iterable[str] = ()) -> None:
+    """
+    Precompute the plurals and articles of placetype shortnames, and of the given placetype names.
+
+    inflect takes tens of microseconds a word, and facet pages inflect every placetype; the shortnames are loaded on
+    import, and the lifespan adds the names from the database.
+    """
+
+    for name in (*Placetype, *names):
+        for form in {str(name), name.lower()}:
+            _placetype_plurals[form] = inflect_engine.plural(form)
+            _placetype_articles[form] = inflect_engine.an(form)
+
+
+load_placetype_inflections()
+
+
+@lru_cache(maxsize=INFLECTION_CACHE_SIZE)
+def _plural(value: str, *, one: bool) -> str:
+    """
+    Get the plural, or for a count of one the singular, of a word or phrase that isn't a placetype
+    """
+
+    return inflect_engine.plural(value, 1 if one else None)
+
+
+@lru_cache(maxsize=INFLECTION_CACHE_SIZE)
+def _article(value: str) -> str:
+    """
+    Get a word or phrase that isn't a placetype, with its indefinite article
+    """
+
+    return inflect_engine.an(value)
+
 
 def plural_filter(value: str, count: int | None = None) -> str:
     """
@@ -37,7 +85,12 @@ def plural_filter(value: str, count: int | None = None) -> str:
     if not value:
         return value
 
-    return inflect_engine.plural(value, count)
+    # inflect only tells a count of one, or its synonyms, from any other count
+    one = count is not None and inflect_engine.get_count(count) == 1
+    if not one and value in _placetype_plurals:
+        return _placetype_plurals[value]
+
+    return _plural(value, one=one)
 
 
 def any_filter(value: str) -> str:
@@ -47,7 +100,9 @@ def any_filter(value: str) -> str:
 
     if value.lower() == 'miscellaneous':
         return value
-    return inflect_engine.an(value)
+    if value in _placetype_articles:
+        return _placetype_articles[value]
+    return _article(value)
 
 
 def language_filter(value: str) -> str:
@@ -58,15 +113,27 @@ def language_filter(value: str) -> str:
     return language_name(value)
 
 
+@lru_cache(maxsize=COLLATION_KEY_CACHE_SIZE)
+def collation_key(value: str) -> tuple[int, ...]:
+    """
+    Get the Unicode Collation Algorithm sort key for a string, once per string.
+
+    pyuca builds keys in pure Python, tens of microseconds each; the same names are sorted on every render of a place
+    page, so the most recently used keys are kept.
+    """
+
+    return collator.sort_key(value)
+
+
 def unicode_sort_filter(value: list, attribute: str | None = None) -> list:
     """
     Jinja filter; sorts using Unicode Collation Algorithm
     """
 
     if attribute:
-        return sorted(value, key=lambda x: collator.sort_key(x.get(attribute, '')))
+        return sorted(value, key=lambda x: collation_key(x.get(attribute, '')))
 
-    return sorted(value, key=collator.sort_key)
+    return sorted(value, key=collation_key)
 
 
 def http_phrase_filter(value: int) -> str:
@@ -109,6 +176,20 @@ def emoji_filter(value: str) -> str:
     return emoji.emojize(f':{value}:', language='alias')
 
 
+class TracedTemplate(jinja2.Template):
+    """
+    A template whose renders are recorded as spans of the request's trace.
+    """
+
+    async def render_async(self, *args: Any, **kwargs: Any) -> str:  # noqa: ANN401
+        """
+        Render the template, as a span named for it
+        """
+
+        with trace_span('template', template=self.name or '<string>'):
+            return await super().render_async(*args, **kwargs)
+
+
 @lru_cache
 def get_templater() -> Jinja2Templates:
     """
@@ -117,6 +198,7 @@ def get_templater() -> Jinja2Templates:
 
     loader = jinja2.FileSystemLoader(str(settings.woeplanet_templates_dir))
     env = jinja2.Environment(autoescape=True, enable_async=True, loader=loader)
+    env.template_class = TracedTemplate
 
     env.filters['langname'] = language_filter
     env.filters['pluralise'] = plural_filter
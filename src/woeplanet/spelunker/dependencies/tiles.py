@@ -0,0 +1,180 @@
+"""
+WOEplanet Spelunker: dependencies package; vector tile cache module.
+"""
+
+import json
+import logging
+import tempfile
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from woeplanet.spelunker.common.http_cache import data_release
+from woeplanet.spelunker.common.mvt import TileFeature, TileLayer, encode_tile, tile_bounds
+from woeplanet.spelunker.common.tile_archive import TileArchive, TileArchiveError
+from woeplanet.spelunker.config.geometry_tiers import geometry_tier_for_zoom
+from woeplanet.spelunker.config.placetypes import PLACETYPE_ID, Placetype
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.database import TILE_PLACES_LIMIT, Database, SearchFilters
+from woeplanet.spelunker.dependencies.records import Record
+
+logger = logging.getLogger(__name__)
+
+TILE_BUFFER = 1 / 16  # of a tile, so polygon edges don't show at tile boundaries
+LAYER_CENTROIDS = 'centroids'
+LAYER_GEOMETRIES = 'geometries'
+
+
+class TileArchiveHolder:
+    """
+    Module-level tile archive holder to avoid global statement.
+    """
+
+    archive: TileArchive | None = None
+
+
+def tile_cache_key(placetype: str, filters: SearchFilters) -> str:
+    """
+    Get the cache key for a tileset; a placetype and search filters combination
+    """
+
+    return f'{placetype}/{int(filters.deprecated)}{int(filters.unknown)}{int(filters.null_island)}'
+
+
+def _tile_path(key: str, z: int, x: int, y: int) -> Path:
+    """
+    Get the on disk path of a cached tile; tiles are cached per data release
+    """
+
+    root = get_settings().woeplanet_cache_dir / 'tiles' / data_release()
+    return root / key / str(z) / str(x) / f'{y}.mvt'
+
+
+def read_cached_tile(key: str, z: int, x: int, y: int) -> bytes | None:
+    """
+    Read a tile from the disk cache
+    """
+
+    path = _tile_path(key, z, x, y)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def write_cached_tile(key: str, z: int, x: int, y: int, tile: bytes) -> None:
+    """
+    Write a tile to the disk cache, atomically, so concurrent workers never read a partial tile
+    """
+
+    path = _tile_path(key, z, x, y)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as ofh:
+            tmp_path = Path(ofh.name)
+            ofh.write(tile)
+        tmp_path.replace(path)
+    except OSError:
+        logger.exception('Failed to cache tile %s/%d/%d/%d', key, z, x, y)
+
+
+def open_tile_archive(path: Path | None) -> TileArchive | None:
+    """
+    Open the pre-rendered tile archive, if there is one for the data release currently being served.
+    """
+
+    if path is None or not path.exists():
+        return None
+
+    try:
+        archive = TileArchive(path)
+    except TileArchiveError:
+        logger.exception('Ignoring tile archive %s', path)
+        return None
+
+    if archive.metadata.get('data_release') != data_release():
+        logger.warning('Ignoring tile archive %s, it was built for a different data release', path)
+        archive.close()
+        return None
+
+    logger.info('Opened tile archive %s (%d tilesets)', path, len(archive.tilesets))
+    TileArchiveHolder.archive = archive
+    return archive
+
+
+def close_tile_archive() -> None:
+    """
+    Close the pre-rendered tile archive.
+    """
+
+    if TileArchiveHolder.archive is not None:
+        TileArchiveHolder.archive.close()
+        TileArchiveHolder.archive = None
+
+
+def read_archived_tile(key: str, z: int, x: int, y: int) -> bytes | None:
+    """
+    Read a tile from the pre-rendered tile archive, or None if the archive doesn't cover it
+    """
+
+    if TileArchiveHolder.archive is None:
+        return None
+
+    return TileArchiveHolder.archive.get(key, z, x, y)
+
+
+async def fetch_tile_places(  # noqa: PLR0913
+    db: Database,
+    placetype: Placetype,
+    filters: SearchFilters,
+    *,
+    z: int,
+    x: int,
+    y: int,
+) -> list[Record]:
+    """
+    Get the places of a placetype for a tile, buffered so polygon edges don't show at tile boundaries.
+
+    A tile with more than TILE_PLACES_LIMIT places only has the largest.
+    """
+
+    west, south, east, north = tile_bounds(z, x, y)
+    lng_buffer = (east - west) * TILE_BUFFER
+    lat_buffer = (north - south) * TILE_BUFFER
+    bounds = (west - lng_buffer, south - lat_buffer, east + lng_buffer, north + lat_buffer)
+
+    places = await db.get_tile_places(
+        PLACETYPE_ID[placetype],
+        bounds,
+        filters=filters,
+        tier=geometry_tier_for_zoom(z),
+        limit=TILE_PLACES_LIMIT,
+    )
+    if len(places) >= TILE_PLACES_LIMIT:
+        logger.warning('Tile %s/%d/%d/%d has only its %d largest places', placetype, z, x, y, TILE_PLACES_LIMIT)
+
+    return places
+
+
+def build_tile(places: Sequence[Mapping[str, Any]], placetype: str, z: int, x: int, y: int) -> bytes:
+    """
+    Encode places as a vector tile with centroid and geometry layers
+    """
+
+    centroids = TileLayer(name=LAYER_CENTROIDS)
+    geometries = TileLayer(name=LAYER_GEOMETRIES)
+
+    for place in places:
+        properties: dict[str, str | int | float | bool | None] = {
+            'woe_id': place['woe_id'],
+            'name': place['name'],
+            'placetype': placetype,
+        }
+        if place['lat'] is not None and place['lng'] is not None:
+            point = {'type': 'Point', 'coordinates': [place['lng'], place['lat']]}
+            centroids.features.append(TileFeature(id=place['woe_id'], geometry=point, properties=properties))
+        if place['geom']:
+            geometry = json.loads(place['geom'])
+            geometries.features.append(TileFeature(id=place['woe_id'], geometry=geometry, properties=properties))
+
+    return encode_tile([geometries, centroids], z, x, y)
@@ -2,56 +2,111 @@
 WOEplanet Spelunker: handlers package; lifespan module.
 """
 
+import asyncio
+import itertools
 import logging
+import os
 import time
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from typing import Any
 
-from diskcache import Lock  # type: ignore[import-untyped]
 from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
 
+from woeplanet.spelunker.common.languages import load_language_names
+from woeplanet.spelunker.common.sampling import close_sampling_profiler, init_sampling_profiler
+from woeplanet.spelunker.common.tracing import close_trace_exporter, init_trace_exporter
 from woeplanet.spelunker.config.settings import get_settings
 from woeplanet.spelunker.dependencies.cache import close_cache, get_cache, init_cache
-from woeplanet.spelunker.dependencies.database import SearchFilters, get_db, init_pool
+from woeplanet.spelunker.dependencies.database import (
+    Database,
+    SearchFilters,
+    cancel_cache_fills,
+    gather_db,
+    get_db,
+    init_pool,
+)
+from woeplanet.spelunker.dependencies.slow_queries import close_slow_query_log, init_slow_query_log
+from woeplanet.spelunker.dependencies.templates import load_placetype_inflections
+from woeplanet.spelunker.dependencies.tiles import close_tile_archive, open_tile_archive
 
 logger = logging.getLogger(__name__)
 
+# every combination of filters, the default first, as it's the one most pages use
 PREWARM_FILTERS = [
-    SearchFilters(deprecated=False, unknown=False, null_island=False),
+    SearchFilters(deprecated=deprecated, unknown=unknown, null_island=null_island)
+    for deprecated, unknown, null_island in itertools.product((False, True), repeat=3)
 ]
+PREWARM_LOCK_KEY = 'prewarm-lock'
+# the lock is refreshed as each combination of filters starts, so it only expires should one take this long, or the
+# worker die
+PREWARM_LOCK_EXPIRE = 300  # seconds
+WARM_KEY = 'cache-warm'
+WARM_EXPIRE = 3600  # seconds
+
+
+def _facet_queries(filters: SearchFilters) -> list[Callable[[Database], Awaitable[Any]]]:
+    """
+    The count and facets queries of a combination of filters
+    """
+
+    return [
+        lambda db: db.get_total_woeids(filters=filters),
+        lambda db: db.get_placetype_facets(filters=filters),
+        lambda db: db.get_countries_facets(filters=filters),
+    ]
 
 
 async def prewarm_cache(app: Starlette) -> None:
     """
     Pre-warm the cache with expensive queries.
 
-    Uses blocking lock so workers wait, then checks if cache is already warm.
+    One worker pre-warms, while every worker serves requests; the others find the lock taken, or the cache already
+    warm, and skip it. Each combination of filters' count and facets run in parallel, on their own pooled connections,
+    so that most of the pool is left for requests.
     """
 
     cache = get_cache()
     if cache is None:
         return
 
-    with Lock(cache, 'prewarm-lock', expire=300):
-        warm_key = 'cache-warm'
-        if cache.get(warm_key):
-            logger.info('Cache already warm, skipping')
-            return
+    if await run_in_threadpool(cache.get, WARM_KEY):
+        logger.info('Cache already warm, skipping')
+        return
+
+    if not await run_in_threadpool(cache.add, PREWARM_LOCK_KEY, os.getpid(), expire=PREWARM_LOCK_EXPIRE):
+        logger.info('Cache being pre-warmed by another worker, skipping')
+        return
 
+    try:
         start = time.perf_counter()
         logger.info('Pre-warming cache')
 
-        async with get_db(app=app) as db:
-            for filters in PREWARM_FILTERS:
-                await db.get_total_woeids(filters=filters)
-                await db.get_placetype_facets(filters=filters)
-                await db.get_countries_facets(filters=filters)
-
-            await db.get_placetypes()
+        for filters in PREWARM_FILTERS:
+            await run_in_threadpool(cache.touch, PREWARM_LOCK_KEY, expire=PREWARM_LOCK_EXPIRE)
+            await gather_db(*_facet_queries(filters), app=app)
 
-        cache.set(warm_key, 1, expire=3600)
+        await run_in_threadpool(cache.set, WARM_KEY, 1, expire=WARM_EXPIRE)
         logger.info('Cache pre-warm complete in %.3fs', time.perf_counter() - start)
 
+    except Exception:
+        logger.exception('Cache pre-warm failed')
+
+    finally:
+        await run_in_threadpool(cache.delete, PREWARM_LOCK_KEY)
+
+
+async def preload_placetype_inflections(app: Starlette) -> None:
+    """
+    Precompute the plurals and articles of the placetype names in the database, off the request path.
+    """
+
+    async with get_db(app=app) as db:
+        placetypes = await db.get_placetypes()
+
+    load_placetype_inflections(name for pt in placetypes for name in (pt['name'], pt['shortname']))
+
 
 @asynccontextmanager
 async def lifespan(app: Starlette) -> AsyncIterator[None]:
@@ -63,9 +118,27 @@ async def lifespan(app: Starlette) -> AsyncIterator[None]:
     settings = get_settings()
     app.state.db_pool = await init_pool(settings.woeplanet_db_path, settings.woeplanet_geom_db_path)
     init_cache(settings.woeplanet_cache_dir)
-    await prewarm_cache(app)
+    init_slow_query_log(
+        settings.woeplanet_cache_dir,
+        settings.woeplanet_slow_query_threshold,
+        settings.woeplanet_slow_query_log_size,
+    )
+    open_tile_archive(settings.woeplanet_tile_archive_path)
+    init_sampling_profiler(settings.woeplanet_storage_dir)
+    init_trace_exporter(settings.woeplanet_trace_file)
+    load_language_names()
+    await preload_placetype_inflections(app)
+    prewarm = asyncio.create_task(prewarm_cache(app))
     logger.info('Worker ready')
     yield
+    prewarm.cancel()
+    with suppress(asyncio.CancelledError):
+        await prewarm
+    await cancel_cache_fills()
+    close_sampling_profiler()
+    close_trace_exporter()
+    close_tile_archive()
+    close_slow_query_log()
     close_cache()
     await app.state.db_pool.close()
     logger.info('Worker shutting down')
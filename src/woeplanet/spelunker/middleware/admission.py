@@ -0,0 +1,127 @@
+"""
+WOEplanet Spelunker: middleware package; admission control middleware module.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from http import HTTPStatus
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.routing import BaseRoute, Match, Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from woeplanet.spelunker.config.admission import ADMISSION_LIMITS, ROUTE_COST_CLASSES, AdmissionLimit, CostClass
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionGate:
+    """
+    Admit up to a cost class's concurrency limit of requests at once, queueing up to its queue limit more.
+    """
+
+    def __init__(self, limit: AdmissionLimit) -> None:
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit.concurrency)
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """
+        How many requests are queued
+        """
+
+        return self._waiting
+
+    async def acquire(self) -> float | None:
+        """
+        Wait for a slot; the seconds waited, or None if the request should be shed
+        """
+
+        if self._semaphore.locked() and self._waiting >= self.limit.queue:
+            return None
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            async with asyncio.timeout(self.limit.max_wait):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            return None
+        finally:
+            self._waiting -= 1
+
+        return time.perf_counter() - start
+
+    def release(self) -> None:
+        """
+        Release a slot
+        """
+
+        self._semaphore.release()
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware to limit concurrent requests per route cost class, shedding load past each class's queue.
+
+    Requests are classified by the route they match, so expensive listings queue behind each other rather than in
+    front of cheap place pages. Time spent queued is reported as the X-Queue-Wait-Time header.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self._app = app
+        self._routes = [
+            (route, ROUTE_COST_CLASSES[route.path])
+            for route in routes
+            if isinstance(route, (Route, Mount)) and route.path in ROUTE_COST_CLASSES
+        ]
+        self._gates = {cost_class: AdmissionGate(limit) for cost_class, limit in ADMISSION_LIMITS.items()}
+
+    def _classify(self, scope: Scope) -> CostClass | None:
+        """
+        Get the cost class of the route a request matches, if any
+        """
+
+        for route, cost_class in self._routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return cost_class
+
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            return await self._app(scope, receive, send)
+
+        cost_class = self._classify(scope)
+        if cost_class is None:
+            return await self._app(scope, receive, send)
+
+        gate = self._gates[cost_class]
+        waited = await gate.acquire()
+        if waited is None:
+            logger.warning('Shedding %s request for %s; %d queued', cost_class, scope['path'], gate.waiting)
+            response = PlainTextResponse(
+                'The Spelunker is busy, please try again shortly',
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(gate.limit.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('X-Queue-Wait-Time', f'{waited:0.4f}s')
+
+            await send(message)
+
+        try:
+            await self._app(scope, receive, send_wrapper)
+        finally:
+            gate.release()
+
+        return None
@@ -0,0 +1,64 @@
+"""
+WOEplanet Spelunker: middleware package; metrics middleware module.
+"""
+
+import time
+from collections.abc import Sequence
+from http import HTTPStatus
+
+from starlette.routing import BaseRoute, Match, Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from woeplanet.spelunker.common.metrics import REQUEST_SECONDS, UNMATCHED_ROUTE
+from woeplanet.spelunker.common.sampling import tag_route
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware to record request latency, by the route a request matches, its method and its response status.
+
+    Requests are labelled with their route's path, such as /id/{woeid:int}, rather than their own, so each route has
+    one series however many places are requested.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self._app = app
+        self._routes = [route for route in routes if isinstance(route, (Route, Mount))]
+
+    def _route_path(self, scope: Scope) -> str:
+        """
+        Get the path of the route a request matches, if any
+        """
+
+        for route in self._routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return route.path
+
+        return UNMATCHED_ROUTE
+
+    @tag_route
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            return await self._app(scope, receive, send)
+
+        # resolved before the request's handled, so the sampling profiler can tag samples with it
+        route = self._route_path(scope)
+        status = HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+            await send(message)
+
+        start_time = time.perf_counter()
+        try:
+            await self._app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.labels(route, scope['method'], str(status)).observe(
+                time.perf_counter() - start_time,
+            )
+
+        return None
@@ -8,19 +8,52 @@ from starlette.applications import Starlette
 from starlette.datastructures import MutableHeaders
 from starlette.types import Message, Receive, Scope, Send
 
+from woeplanet.spelunker.common.tracing import get_trace_exporter, server_timing, start_trace
+from woeplanet.spelunker.config.settings import get_settings
+
 
 class TimingMiddleware:
     """
-    ASGI middleware to report elapsed page load time as the X-Page-Load-Time header
+    ASGI middleware to report elapsed page load time as the X-Page-Load-Time header.
+
+    With Server-Timing, or a trace file, set, each request is traced, too; its spans are summarized in a Server-Timing
+    header, and exported to the trace file.
     """
 
     def __init__(self, app: Starlette) -> None:
         self._app = app
+        self._server_timing = get_settings().woeplanet_server_timing
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope['type'] != 'http':
             return await self._app(scope, receive, send)
 
+        exporter = get_trace_exporter()
+        if not self._server_timing and exporter is None:
+            return await self._time(scope, receive, send)
+
+        with start_trace('request', **{'http.request.method': scope['method'], 'url.path': scope['path']}) as trace:
+
+            async def send_wrapper(message: Message) -> None:
+                if message['type'] == 'http.response.start':
+                    trace.root.attributes['http.response.status_code'] = message['status']
+                    if self._server_timing:
+                        MutableHeaders(scope=message).append('Server-Timing', server_timing(trace))
+
+                await send(message)
+
+            await self._time(scope, receive, send_wrapper)
+
+        if exporter is not None:
+            exporter.export(trace)
+
+        return None
+
+    async def _time(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle a request, reporting its elapsed time when its response starts
+        """
+
         async def send_wrapper(message: Message) -> None:
             if message['type'] == 'http.response.start':
                 end_time = time.perf_counter()
@@ -32,5 +65,3 @@ class TimingMiddleware:
 
         start_time = time.perf_counter()
         await self._app(scope, receive, send_wrapper)
-
-        return None
@@ -0,0 +1,76 @@
+"""
+WOEplanet Spelunker: pages package; admin endpoints module.
+"""
+
+import dataclasses
+import secrets
+from http import HTTPStatus
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from woeplanet.spelunker.common.http_cache import CACHE_CONTROL_NO_STORE
+from woeplanet.spelunker.common.query_params import parse_profile_params, parse_slow_query_params
+from woeplanet.spelunker.common.sampling import get_sampling_profiler
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.slow_queries import get_slow_query_log
+
+
+def authorize_admin(request: Request) -> None:
+    """
+    Check a request has the admin token as its bearer token; admin endpoints don't exist without an admin token set.
+    """
+
+    token = get_settings().woeplanet_admin_token
+    if token is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    expected = token.get_secret_value().encode()
+    if scheme.lower() != 'bearer' or not secrets.compare_digest(credentials.encode(), expected):
+        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, headers={'WWW-Authenticate': 'Bearer'})
+
+
+async def slow_queries_endpoint(request: Request) -> JSONResponse:
+    """
+    Admin endpoint; the slow query log, most recent first, as JSON
+    """
+
+    authorize_admin(request)
+    params = parse_slow_query_params(request)
+
+    slow_query_log = get_slow_query_log()
+    content: dict[str, Any] = {'threshold': None, 'queries': []}
+    if slow_query_log is not None:
+        content['threshold'] = slow_query_log.threshold
+        content['queries'] = [dataclasses.asdict(entry) for entry in slow_query_log.entries(params.limit)]
+
+    return JSONResponse(content, headers={'Cache-Control': CACHE_CONTROL_NO_STORE})
+
+
+async def profile_endpoint(request: Request) -> JSONResponse:
+    """
+    Admin endpoint; the sampling profiler of the worker that serves the request.
+
+    GET gets the current, or last, profile's progress; POST starts a profile, of duration and interval seconds, which
+    stops itself and is written to storage at the end; DELETE stops it early.
+    """
+
+    authorize_admin(request)
+
+    profiler = get_sampling_profiler()
+    if profiler is None:
+        raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail='Sampling profiler is not running')
+
+    if request.method == 'POST':
+        params = parse_profile_params(request)
+        if not profiler.start(params.duration, params.interval):
+            raise HTTPException(status_code=HTTPStatus.CONFLICT, detail='A profile is already running')
+
+    elif request.method == 'DELETE' and not await run_in_threadpool(profiler.stop):
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail='No profile is running')
+
+    return JSONResponse(dataclasses.asdict(profiler.status()), headers={'Cache-Control': CACHE_CONTROL_NO_STORE})
@@ -0,0 +1,45 @@
+"""
+WOEplanet Spelunker: pages package; autocomplete module.
+"""
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from woeplanet.spelunker.common.autocomplete import autocomplete_key
+from woeplanet.spelunker.common.http_cache import CACHE_CONTROL_LONG, is_not_modified, make_etag, not_modified_response
+from woeplanet.spelunker.common.query_params import parse_autocomplete_params
+from woeplanet.spelunker.config.placetypes import placetype_id_to_shortname
+from woeplanet.spelunker.dependencies.database import get_db
+
+
+async def autocomplete_endpoint(request: Request) -> Response:
+    """
+    Autocomplete endpoint; the top places with a name starting with a prefix, as JSON
+    """
+
+    params = parse_autocomplete_params(request)
+    key = autocomplete_key(params.q)
+    etag = make_etag('autocomplete', key, params.limit)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    results = []
+    if key:
+        async with get_db(request=request) as db:
+            places = await db.autocomplete(key, limit=params.limit)
+
+        results = [
+            {
+                'woe_id': place['woe_id'],
+                'name': place['name'],
+                'name_type': place['name_type'],
+                'placetype': placetype_id_to_shortname(place['placetype_id']),
+                'url': str(request.url_for('place_endpoint', woeid=place['woe_id'])),
+            }
+            for place in places
+        ]
+
+    return JSONResponse(
+        {'q': params.q, 'results': results},
+        headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL_LONG},
+    )
@@ -15,7 +15,7 @@ from woeplanet.spelunker.common.path_params import get_path_iso_code
 from woeplanet.spelunker.common.query_params import parse_filter_params, parse_pagination, parse_placetype_filter
 from woeplanet.spelunker.config.place_scale import placetype_to_scale
 from woeplanet.spelunker.config.placetypes import PLACETYPE_COUNTRY, PLACETYPE_UNKNOWN
-from woeplanet.spelunker.dependencies.database import get_db
+from woeplanet.spelunker.dependencies.database import Degradable, gather_db, get_db
 from woeplanet.spelunker.dependencies.templates import get_templater
 from woeplanet.spelunker.pages.random import _random_place
 
@@ -30,9 +30,11 @@ async def country_facets_endpoint(request: Request) -> HTMLResponse:
     place = await _random_place(request=request)
     parsed = parse_filter_params(request)
 
-    async with get_db(request=request) as db:
-        total_woeids = await db.get_total_woeids(filters=parsed.filters)
-        countries = await db.get_countries_facets(filters=parsed.filters)
+    total_woeids, countries = await gather_db(
+        lambda db: db.get_total_woeids(filters=parsed.filters),
+        lambda db: db.get_countries_facets(filters=parsed.filters),
+        request=request,
+    )
 
     template = get_templater().get_template('countries.html.j2')
     template_args = {
@@ -69,29 +71,39 @@ async def country_search_endpoint(request: Request) -> HTMLResponse:
     pagination = parse_pagination(request)
 
     async with get_db(request=request) as db:
-        buckets = await db.get_placetypes_by_country(iso2=iso, filters=parsed.filters)
         country = await db.get_country_by_iso(iso)
 
-        if not country:
-            raise HTTPException(
-                status_code=HTTPStatus.NOT_FOUND,
-                detail=f'Country {iso} not found',
-            )
-
-        country_woe_id = country['woe_id']
-        total = await db.get_places_by_country_count(
-            country_woe_id=country_woe_id,
-            filters=parsed.filters,
-            placetype=placetype,
+    if not country:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Country {iso} not found',
         )
-        result = await db.get_places_by_country(
+
+    country_woe_id = country['woe_id']
+    buckets, total, result = await gather_db(
+        Degradable(
+            lambda db: db.get_placetypes_by_country(iso2=iso, filters=parsed.filters),
+            fallback=[],
+            cached=True,
+        ),
+        Degradable(
+            lambda db: db.get_places_by_country_count(
+                country_woe_id=country_woe_id,
+                filters=parsed.filters,
+                placetype=placetype,
+            ),
+            cached=True,
+        ),
+        lambda db: db.get_places_by_country(
             country_woe_id,
             filters=parsed.filters,
             placetype=placetype,
             after=pagination.after,
             before=pagination.before,
             limit=pagination.limit,
-        )
+        ),
+        request=request,
+    )
 
     paging = build_pagination_context(request, result, pagination=pagination, total=total)
 
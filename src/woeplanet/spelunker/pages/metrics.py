@@ -0,0 +1,22 @@
+"""
+WOEplanet Spelunker: pages package; metrics endpoint module.
+"""
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from woeplanet.spelunker.common.metrics import METRICS_CONTENT_TYPE, render_metrics
+from woeplanet.spelunker.pages.admin import authorize_admin
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Prometheus metrics endpoint; an admin endpoint, as the metrics show how loaded the server is.
+    """
+
+    authorize_admin(request)
+
+    # every worker's metrics are read from their files
+    content = await run_in_threadpool(render_metrics)
+    return Response(content=content, media_type=METRICS_CONTENT_TYPE)
@@ -7,7 +7,7 @@ from starlette.responses import HTMLResponse
 
 from woeplanet.spelunker.common.pagination import build_pagination_context
 from woeplanet.spelunker.common.query_params import parse_filter_params, parse_pagination
-from woeplanet.spelunker.dependencies.database import get_db
+from woeplanet.spelunker.dependencies.database import Degradable, gather_db
 from woeplanet.spelunker.dependencies.templates import get_templater
 
 
@@ -19,15 +19,17 @@ async def nullisland_endpoint(request: Request) -> HTMLResponse:
     parsed = parse_filter_params(request)
     pagination = parse_pagination(request)
 
-    async with get_db(request=request) as db:
-        buckets = await db.get_nullisland_placetype_facets(filters=parsed.filters)
-        total = await db.get_nullisland_places_count(filters=parsed.filters)
-        result = await db.get_nullisland_places(
+    buckets, total, result = await gather_db(
+        Degradable(lambda db: db.get_nullisland_placetype_facets(filters=parsed.filters), fallback=[]),
+        Degradable(lambda db: db.get_nullisland_places_count(filters=parsed.filters)),
+        lambda db: db.get_nullisland_places(
             filters=parsed.filters,
             after=pagination.after,
             before=pagination.before,
             limit=pagination.limit,
-        )
+        ),
+        request=request,
+    )
 
     paging = build_pagination_context(request, result, pagination=pagination, total=total)
 
@@ -7,16 +7,23 @@ from http import HTTPStatus
 
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, Response
 
 from woeplanet.spelunker.common.coordinates import extract_coordinates
+from woeplanet.spelunker.common.http_cache import CACHE_CONTROL_LONG, is_not_modified, make_etag, not_modified_response
 from woeplanet.spelunker.common.languages import language_name
 from woeplanet.spelunker.common.pagination import build_offset_pagination_context
 from woeplanet.spelunker.common.path_params import get_path_woeid
-from woeplanet.spelunker.common.query_params import parse_filter_params, parse_nearby_params, parse_pagination
+from woeplanet.spelunker.common.query_params import (
+    parse_filter_params,
+    parse_map_params,
+    parse_nearby_params,
+    parse_pagination,
+)
+from woeplanet.spelunker.config.geometry_tiers import geometry_tier_for_zoom, zoom_for_bounds
 from woeplanet.spelunker.config.place_scale import placetype_to_scale
 from woeplanet.spelunker.config.placetypes import placetype_by_id
-from woeplanet.spelunker.dependencies.database import PlaceFilters, get_db
+from woeplanet.spelunker.dependencies.database import Degradable, PlaceFilters, gather_db, get_db
 from woeplanet.spelunker.dependencies.templates import get_templater
 from woeplanet.spelunker.pages.random import _random_place
 
@@ -91,12 +98,13 @@ async def place_map_endpoint(request: Request) -> HTMLResponse:
     """
 
     woeid = get_path_woeid(request=request)
+    map_params = parse_map_params(request)
 
     async with get_db(request=request) as db:
         filters = PlaceFilters(
             centroid=True,
             bounding_box=True,
-            geometry=True,
+            geometry=False,
             ancestors=False,
             hierarchy=False,
             names=False,
@@ -114,41 +122,10 @@ async def place_map_endpoint(request: Request) -> HTMLResponse:
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f'Place with woeid {woeid} not found')
 
         coords = extract_coordinates(place)
-        geom = place.get('geom')
-        geojson = None
-        if geom:
-            geojson = {
-                'type': 'Feature',
-                'properties': {
-                    'woe_id': place.get('woe_id'),
-                    'name': place.get('name'),
-                    'placetype': place.get('placetype_name'),
-                },
-                'geometry': json.loads(geom) if isinstance(geom, str) else geom,
-            }
-        elif coords.bounds:
-            sw_lat, sw_lng = coords.bounds[0]
-            ne_lat, ne_lng = coords.bounds[1]
-            geojson = {
-                'type': 'Feature',
-                'properties': {
-                    'woe_id': place.get('woe_id'),
-                    'name': place.get('name'),
-                    'placetype': place.get('placetype_name'),
-                },
-                'geometry': {
-                    'type': 'Polygon',
-                    'coordinates': [
-                        [
-                            [sw_lng, sw_lat],
-                            [ne_lng, sw_lat],
-                            [ne_lng, ne_lat],
-                            [sw_lng, ne_lat],
-                            [sw_lng, sw_lat],
-                        ],
-                    ],
-                },
-            }
+        geojson_url = None
+        if coords.bounds or coords.centroid:
+            zoom = map_params.zoom if map_params.zoom is not None else zoom_for_bounds(coords.bounds)
+            geojson_url = str(request.url_for('place_geojson_endpoint', woeid=woeid).include_query_params(zoom=zoom))
 
         name = place.get('name')
         placetype_id = int(place.get('placetype_id', 0))
@@ -158,7 +135,7 @@ async def place_map_endpoint(request: Request) -> HTMLResponse:
             'map': True,
             'centroid': coords.centroid,
             'bounds': coords.bounds,
-            'geojson': json.dumps(geojson) if geojson else None,
+            'geojson_url': geojson_url,
             'title': f'Map: {name if name else "Unknown"} ({woeid})',
             'woeid': place.get('woe_id'),
             'name': place.get('name'),
@@ -169,6 +146,81 @@ async def place_map_endpoint(request: Request) -> HTMLResponse:
         return HTMLResponse(content)
 
 
+async def place_geojson_endpoint(request: Request) -> Response:
+    """
+    Place GeoJSON endpoint; the place's geometry, simplified for the zoom level, as a GeoJSON Feature
+    """
+
+    woeid = get_path_woeid(request=request)
+    map_params = parse_map_params(request)
+
+    async with get_db(request=request) as db:
+        filters = PlaceFilters(
+            centroid=False,
+            bounding_box=True,
+            geometry=False,
+            ancestors=False,
+            hierarchy=False,
+            names=False,
+            neighbours=False,
+            children=False,
+            null_island=False,
+            deprecated=False,
+            exclude_placetypes=[],
+            history=False,
+            licensing=False,
+        )
+        place = await db.get_place_by_id(woeid, filters)
+
+        if not place:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f'Place with woeid {woeid} not found')
+
+        coords = extract_coordinates(place)
+        zoom = map_params.zoom if map_params.zoom is not None else zoom_for_bounds(coords.bounds)
+        tier = geometry_tier_for_zoom(zoom)
+        etag = make_etag('geojson', woeid, tier.tier if tier else 'full')
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        geometry = await db.get_place_geometry(woeid, tier=tier)
+
+    if not geometry and coords.bounds:
+        sw_lat, sw_lng = coords.bounds[0]
+        ne_lat, ne_lng = coords.bounds[1]
+        geometry = json.dumps(
+            {
+                'type': 'Polygon',
+                'coordinates': [
+                    [
+                        [sw_lng, sw_lat],
+                        [ne_lng, sw_lat],
+                        [ne_lng, ne_lat],
+                        [sw_lng, ne_lat],
+                        [sw_lng, sw_lat],
+                    ],
+                ],
+            },
+        )
+
+    if not geometry:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f'Place with woeid {woeid} has no geometry')
+
+    # The geometry is already GeoJSON text, straight from SpatiaLite; splice it in rather than parse and re-encode it
+    properties = json.dumps(
+        {
+            'woe_id': place.get('woe_id'),
+            'name': place.get('name'),
+            'placetype': place.get('placetype_name'),
+        },
+    )
+    content = f'{{"type":"Feature","properties":{properties},"geometry":{geometry}}}'
+    return Response(
+        content,
+        media_type='application/geo+json',
+        headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL_LONG},
+    )
+
+
 async def place_nearby_endpoint(request: Request) -> HTMLResponse:
     """
     Place nearby page endpoint - finds places near a given WOE ID's centroid
@@ -196,69 +248,74 @@ async def place_nearby_endpoint(request: Request) -> HTMLResponse:
         )
         place = await db.get_place_by_id(woeid, place_filters)
 
-        if not place:
-            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f'Place with woeid {woeid} not found')
-
-        lat = place.get('lat')
-        lng = place.get('lng')
-        distance = nearby_params.distance
-        template = get_templater().get_template('nearby-results.html.j2')
-
-        if lat is None or lng is None:
-            template_args = {
-                'map': False,
-                'title': f'Near {place.get("name")}',
-                'woeid': woeid,
-                'name': place.get('name'),
-                'scale': placetype_to_scale(int(place.get('placetype_id', 0))),
-                'doc': place,
-                'results': [],
-                'distance': distance,
-                'includes': filter_params.includes,
-                'includes_qs': filter_params.query_string,
-                'total': 0,
-                'no_centroid': True,
-            }
-            content = await template.render_async(request=request, **template_args)
-            return HTMLResponse(content)
-
-        total = await db.get_places_near_centroid_count(
-            lat=lat,
-            lng=lng,
-            distance=distance,
-            filters=filter_params.filters,
-        )
-        result = await db.get_places_near_centroid(
-            lat=lat,
-            lng=lng,
-            distance=distance,
-            filters=filter_params.filters,
-            limit=pagination.limit,
-            offset=offset,
-        )
+    if not place:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f'Place with woeid {woeid} not found')
 
-        paging = build_offset_pagination_context(request, result, pagination=pagination, total=total)
+    lat = place.get('lat')
+    lng = place.get('lng')
+    distance = nearby_params.distance
+    template = get_templater().get_template('nearby-results.html.j2')
 
+    if lat is None or lng is None:
         template_args = {
-            'map': True,
-            'centroid': [lat, lng],
+            'map': False,
             'title': f'Near {place.get("name")}',
             'woeid': woeid,
             'name': place.get('name'),
             'scale': placetype_to_scale(int(place.get('placetype_id', 0))),
             'doc': place,
-            'results': result.items,
-            'lat': lat,
-            'lng': lng,
+            'results': [],
             'distance': distance,
             'includes': filter_params.includes,
             'includes_qs': filter_params.query_string,
-            'pagination': paging,
-            'total': total,
+            'total': 0,
+            'no_centroid': True,
         }
         content = await template.render_async(request=request, **template_args)
         return HTMLResponse(content)
 
+    total, result = await gather_db(
+        Degradable(
+            lambda db: db.get_places_near_centroid_count(
+                lat=lat,
+                lng=lng,
+                distance=distance,
+                filters=filter_params.filters,
+            ),
+        ),
+        lambda db: db.get_places_near_centroid(
+            lat=lat,
+            lng=lng,
+            distance=distance,
+            filters=filter_params.filters,
+            limit=pagination.limit,
+            offset=offset,
+        ),
+        request=request,
+    )
+
+    paging = build_offset_pagination_context(request, result, pagination=pagination, total=total)
+
+    template_args = {
+        'map': True,
+        'centroid': [lat, lng],
+        'title': f'Near {place.get("name")}',
+        'woeid': woeid,
+        'name': place.get('name'),
+        'scale': placetype_to_scale(int(place.get('placetype_id', 0))),
+        'doc': place,
+        'results': result.items,
+        'lat': lat,
+        'lng': lng,
+        'distance': distance,
+        'includes': filter_params.includes,
+        'includes_qs': filter_params.query_string,
+        'pagination': paging,
+        'total': total,
+    }
+    content = await template.render_async(request=request, **template_args)
+    return HTMLResponse(content)
+
 
 async def nearby_endpoint(request: Request) -> HTMLResponse:
     """
@@ -283,46 +340,51 @@ async def nearby_endpoint(request: Request) -> HTMLResponse:
         content = await template.render_async(request=request, **template_args)
         return HTMLResponse(content)
 
+    lat, lng = nearby_params.lat, nearby_params.lng
     filter_params = parse_filter_params(request)
     pagination = parse_pagination(request)
     offset = (pagination.page - 1) * pagination.limit
 
-    async with get_db(request=request) as db:
-        total = await db.get_places_near_centroid_count(
-            lat=nearby_params.lat,
-            lng=nearby_params.lng,
-            distance=nearby_params.distance,
-            filters=filter_params.filters,
-        )
-        result = await db.get_places_near_centroid(
-            lat=nearby_params.lat,
-            lng=nearby_params.lng,
+    total, result = await gather_db(
+        Degradable(
+            lambda db: db.get_places_near_centroid_count(
+                lat=lat,
+                lng=lng,
+                distance=nearby_params.distance,
+                filters=filter_params.filters,
+            ),
+        ),
+        lambda db: db.get_places_near_centroid(
+            lat=lat,
+            lng=lng,
             distance=nearby_params.distance,
             filters=filter_params.filters,
             limit=pagination.limit,
             offset=offset,
-        )
-
-        paging = build_offset_pagination_context(request, result, pagination=pagination, total=total)
-
-        first_place = result.items[0] if result.items else None
-        template = get_templater().get_template('nearby-results.html.j2')
-        template_args = {
-            'map': True,
-            'centroid': [nearby_params.lat, nearby_params.lng],
-            'title': 'Nearby',
-            'woeid': first_place['woe_id'] if first_place else 0,
-            'name': first_place['name'] if first_place else 'Nearby',
-            'scale': placetype_to_scale(first_place['placetype_id']) if first_place else 15,
-            'doc': first_place if first_place else {},
-            'results': result.items,
-            'lat': nearby_params.lat,
-            'lng': nearby_params.lng,
-            'distance': nearby_params.distance,
-            'includes': filter_params.includes,
-            'includes_qs': filter_params.query_string,
-            'pagination': paging,
-            'total': total,
-        }
-        content = await template.render_async(request=request, **template_args)
-        return HTMLResponse(content)
+        ),
+        request=request,
+    )
+
+    paging = build_offset_pagination_context(request, result, pagination=pagination, total=total)
+
+    first_place = result.items[0] if result.items else None
+    template = get_templater().get_template('nearby-results.html.j2')
+    template_args = {
+        'map': True,
+        'centroid': [nearby_params.lat, nearby_params.lng],
+        'title': 'Nearby',
+        'woeid': first_place['woe_id'] if first_place else 0,
+        'name': first_place['name'] if first_place else 'Nearby',
+        'scale': placetype_to_scale(first_place['placetype_id']) if first_place else 15,
+        'doc': first_place if first_place else {},
+        'results': result.items,
+        'lat': nearby_params.lat,
+        'lng': nearby_params.lng,
+        'distance': nearby_params.distance,
+        'includes': filter_params.includes,
+        'includes_qs': filter_params.query_string,
+        'pagination': paging,
+        'total': total,
+    }
+    content = await template.render_async(request=request, **template_args)
+    return HTMLResponse(content)
@@ -15,9 +15,10 @@ from woeplanet.spelunker.common.path_params import get_path_placetype
 from woeplanet.spelunker.common.query_params import parse_filter_params, parse_pagination
 from woeplanet.spelunker.config.place_scale import placetype_to_scale
 from woeplanet.spelunker.config.placetypes import placetype_by_shortname
-from woeplanet.spelunker.dependencies.database import get_db
+from woeplanet.spelunker.dependencies.database import Degradable, gather_db, get_db
 from woeplanet.spelunker.dependencies.templates import get_templater
 from woeplanet.spelunker.pages.random import _random_place
+from woeplanet.spelunker.pages.tiles import tiles_url_template
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +31,11 @@ async def placetype_facets_endpoint(request: Request) -> HTMLResponse:
     place = await _random_place(request=request)
     parsed = parse_filter_params(request)
 
-    async with get_db(request=request) as db:
-        total_woeids = await db.get_total_woeids(filters=parsed.filters)
-        placetypes = await db.get_placetype_facets(filters=parsed.filters)
+    total_woeids, placetypes = await gather_db(
+        lambda db: db.get_total_woeids(filters=parsed.filters),
+        lambda db: db.get_placetype_facets(filters=parsed.filters),
+        request=request,
+    )
 
     template = get_templater().get_template('placetypes.html.j2')
     template_args = {
@@ -67,21 +70,25 @@ async def placetype_search_endpoint(request: Request) -> HTMLResponse:
 
     async with get_db(request=request) as db:
         placetype = await placetype_by_shortname(db, shortname)
-        if not placetype:
-            raise HTTPException(
-                status_code=HTTPStatus.NOT_FOUND,
-                detail=f'Placetype {shortname} not found',
-            )
-
-        placetype_id = placetype['id']
-        total = await db.get_places_by_placetype_count(placetype_id, filters=parsed.filters)
-        result = await db.get_places_by_placetype(
+
+    if not placetype:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Placetype {shortname} not found',
+        )
+
+    placetype_id = placetype['id']
+    total, result = await gather_db(
+        Degradable(lambda db: db.get_places_by_placetype_count(placetype_id, filters=parsed.filters)),
+        lambda db: db.get_places_by_placetype(
             placetype_id,
             filters=parsed.filters,
             after=pagination.after,
             before=pagination.before,
             limit=pagination.limit,
-        )
+        ),
+        request=request,
+    )
 
     paging = build_pagination_context(request, result, pagination=pagination, total=total)
 
@@ -99,6 +106,7 @@ async def placetype_search_endpoint(request: Request) -> HTMLResponse:
         'map': True,
         'centroid': coords.centroid,
         'bounds': coords.bounds,
+        'tiles_url': tiles_url_template(shortname, parsed.query_string),
         'woeid': place['woe_id'] if place else None,
         'name': place['name'] if place else None,
         'scale': placetype_to_scale(placetype_id),
@@ -4,11 +4,15 @@ WOEplanet Spelunker: pages package; search page module
 
 import logging
 from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
 from starlette.responses import HTMLResponse, RedirectResponse, Response
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
 from woeplanet.spelunker.common.coordinates import extract_coordinates
 from woeplanet.spelunker.common.pagination import build_pagination_context
 from woeplanet.spelunker.common.query_params import (
@@ -19,7 +23,7 @@ from woeplanet.spelunker.common.query_params import (
 )
 from woeplanet.spelunker.config.place_scale import placetype_to_scale
 from woeplanet.spelunker.config.placetypes import PLACETYPE_COUNTRY
-from woeplanet.spelunker.dependencies.database import get_db
+from woeplanet.spelunker.dependencies.database import Database, Degradable, gather_db
 from woeplanet.spelunker.dependencies.templates import get_templater
 from woeplanet.spelunker.pages.random import _random_place
 
@@ -37,7 +41,7 @@ async def search_endpoint(request: Request) -> Response:
         if search.name_type == 'woeid':
             return await _do_woeid_search(search.q)
 
-        return await _do_name_search(request, search.q, search.name_type)
+        return await _do_name_search(request, search.q, search.name_type, search.sort)
 
     return await _render_search_form(request, search.q, search.name_type)
 
@@ -58,9 +62,9 @@ async def _do_woeid_search(q: str) -> Response:
     return RedirectResponse(url=f'/id/{woeid}', status_code=HTTPStatus.FOUND)
 
 
-async def _do_name_search(request: Request, q: str, name_type: str) -> HTMLResponse:
+async def _do_name_search(request: Request, q: str, name_type: str, sort: str) -> HTMLResponse:
     """
-    Handle free text name search with optional name_type filter.
+    Handle free text name search with optional name_type filter, sorted by relevance or WOE ID.
     """
 
     sanitised_query = sanitise_name_search_query(q)
@@ -73,22 +77,42 @@ async def _do_name_search(request: Request, q: str, name_type: str) -> HTMLRespo
     parsed = parse_filter_params(request)
     pagination = parse_pagination(request)
 
-    async with get_db(request=request) as db:
-        total = await db.search_places_count(
-            sanitised_query,
-            name_type=name_type if name_type != 'any' else None,
-            filters=parsed.filters,
-        )
-        result = await db.search_places(
+    search_name_type = name_type if name_type != 'any' else None
+    queries: list[Callable[[Database], Awaitable[Any]] | Degradable] = [
+        Degradable(
+            lambda db: db.search_places_count(
+                sanitised_query,
+                name_type=search_name_type,
+                filters=parsed.filters,
+            ),
+        ),
+        lambda db: db.search_places(
             sanitised_query,
-            name_type=name_type if name_type != 'any' else None,
+            name_type=search_name_type,
             filters=parsed.filters,
+            sort=sort,
             after=pagination.after,
+            after_score=pagination.after_score,
             before=pagination.before,
+            before_score=pagination.before_score,
             limit=pagination.limit,
+        ),
+    ]
+    if sort == 'relevance':
+        # relevance only ranks the places of the best matching names, so only their pages can be reached
+        queries.append(
+            Degradable(
+                lambda db: db.search_places_ranked_count(
+                    sanitised_query,
+                    name_type=search_name_type,
+                    filters=parsed.filters,
+                ),
+            ),
         )
+    total, result, *ranked_counts = await gather_db(*queries, request=request)
 
-    paging = build_pagination_context(request, result, pagination=pagination, total=total)
+    ranked = ranked_counts[0] if ranked_counts else total
+    paging = build_pagination_context(request, result, pagination=pagination, total=ranked)
 
     place = result.items[0] if result.items else None
     coords = extract_coordinates(place)
@@ -98,8 +122,10 @@ async def _do_name_search(request: Request, q: str, name_type: str) -> HTMLRespo
         'title': f'Search: {q}',
         'q': q,
         'search_type': name_type,
+        'sort': sort,
         'results': result.items,
         'total': total,
+        'ranked': ranked,
         'includes': parsed.includes,
         'includes_qs': parsed.query_string,
         'map': bool(coords.centroid),
@@ -0,0 +1,72 @@
+"""
+WOEplanet Spelunker: pages package; tiles module.
+"""
+
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+from woeplanet.spelunker.common.http_cache import CACHE_CONTROL_LONG, is_not_modified, make_etag, not_modified_response
+from woeplanet.spelunker.common.path_params import get_path_tile
+from woeplanet.spelunker.common.query_params import parse_filter_params, parse_placetype_filter
+from woeplanet.spelunker.dependencies.database import get_db
+from woeplanet.spelunker.dependencies.tiles import (
+    build_tile,
+    fetch_tile_places,
+    read_archived_tile,
+    read_cached_tile,
+    tile_cache_key,
+    write_cached_tile,
+)
+
+MVT_MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
+
+
+def tiles_url_template(placetype: str, includes_qs: str = '') -> str:
+    """
+    Get the Leaflet style {z}/{x}/{y} URL template for a placetype's vector tiles
+    """
+
+    query_string = urlencode({'placetype': placetype})
+    if includes_qs:
+        query_string = f'{query_string}&{includes_qs}'
+
+    return f'/tiles/{{z}}/{{x}}/{{y}}.mvt?{query_string}'
+
+
+async def tile_endpoint(request: Request) -> Response:
+    """
+    Vector tile endpoint; places of a placetype as a Mapbox Vector Tile
+    """
+
+    z, x, y = get_path_tile(request)
+    placetype = parse_placetype_filter(request)
+    if placetype is None:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Placetype is required')
+
+    parsed = parse_filter_params(request)
+    key = tile_cache_key(placetype, parsed.filters)
+    etag = make_etag('tile', key, z, x, y)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    tile = read_archived_tile(key, z, x, y)
+    if tile is None:
+        tile = read_cached_tile(key, z, x, y)
+
+    if tile is None:
+        async with get_db(request=request) as db:
+            places = await fetch_tile_places(db, placetype, parsed.filters, z=z, x=x, y=y)
+
+        tile = await run_in_threadpool(build_tile, places, placetype, z, x, y)
+        write_cached_tile(key, z, x, y, tile)
+
+    return Response(
+        tile,
+        media_type=MVT_MEDIA_TYPE,
+        headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL_LONG},
+    )
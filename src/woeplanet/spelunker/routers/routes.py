@@ -7,16 +7,26 @@ from starlette.staticfiles import StaticFiles
 
 from woeplanet.spelunker.config.settings import get_settings
 from woeplanet.spelunker.pages.about import about_endpoint
+from woeplanet.spelunker.pages.admin import profile_endpoint, slow_queries_endpoint
+from woeplanet.spelunker.pages.autocomplete import autocomplete_endpoint
 from woeplanet.spelunker.pages.countries import country_facets_endpoint, country_search_endpoint
 from woeplanet.spelunker.pages.credits import credits_endpoint
 from woeplanet.spelunker.pages.data import data_endpoint, download_endpoint
 from woeplanet.spelunker.pages.index import index_endpoint
 from woeplanet.spelunker.pages.licenses import licenses_endpoint
+from woeplanet.spelunker.pages.metrics import metrics_endpoint
 from woeplanet.spelunker.pages.nullisland import nullisland_endpoint
-from woeplanet.spelunker.pages.places import nearby_endpoint, place_endpoint, place_map_endpoint, place_nearby_endpoint
+from woeplanet.spelunker.pages.places import (
+    nearby_endpoint,
+    place_endpoint,
+    place_geojson_endpoint,
+    place_map_endpoint,
+    place_nearby_endpoint,
+)
 from woeplanet.spelunker.pages.placetypes import placetype_facets_endpoint, placetype_search_endpoint
 from woeplanet.spelunker.pages.random import random_endpoint
 from woeplanet.spelunker.pages.search import search_endpoint
+from woeplanet.spelunker.pages.tiles import tile_endpoint
 
 settings = get_settings()
 
@@ -29,10 +39,12 @@ def routes() -> list[Route | Mount]:
     return [
         Route(path='/', endpoint=index_endpoint),
         Route(path='/about', endpoint=about_endpoint),
+        Route(path='/autocomplete', endpoint=autocomplete_endpoint),
         Route(path='/credits', endpoint=credits_endpoint),
         Route(path='/countries', endpoint=country_facets_endpoint),
         Route(path='/countries/{iso:str}', endpoint=country_search_endpoint),
         Route(path='/id/{woeid:int}', endpoint=place_endpoint),
+        Route(path='/id/{woeid:int}.geojson', endpoint=place_geojson_endpoint),
         Route(path='/id/{woeid:int}/map', endpoint=place_map_endpoint),
         Route(path='/id/{woeid:int}/nearby', endpoint=place_nearby_endpoint),
         Route(path='/nearby', endpoint=nearby_endpoint),
@@ -41,8 +53,12 @@ def routes() -> list[Route | Mount]:
         Route(path='/placetypes/{placetype:str}', endpoint=placetype_search_endpoint),
         Route(path='/random', endpoint=random_endpoint),
         Route(path='/search', endpoint=search_endpoint),
+        Route(path='/tiles/{z:int}/{x:int}/{y:int}.mvt', endpoint=tile_endpoint),
         Route(path='/licenses', endpoint=licenses_endpoint),
         Route(path='/data', endpoint=data_endpoint),
+        Route(path='/metrics', endpoint=metrics_endpoint),
+        Route(path='/admin/slow-queries', endpoint=slow_queries_endpoint),
+        Route(path='/admin/profile', endpoint=profile_endpoint, methods=['GET', 'POST', 'DELETE']),
         Route(path='/downloads/{filename:path}', endpoint=download_endpoint, name='downloads'),
         Mount(path='/static', app=StaticFiles(directory=settings.woeplanet_static_dir), name='static'),
     ]
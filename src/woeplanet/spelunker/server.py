@@ -9,24 +9,30 @@ import uvicorn
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 
+from woeplanet.spelunker.common.metrics import init_multiprocess_metrics
 from woeplanet.spelunker.config.settings import get_settings
 from woeplanet.spelunker.handlers.exceptions import client_error_handler, server_error_handler
 from woeplanet.spelunker.handlers.lifespan import lifespan
+from woeplanet.spelunker.middleware.admission import AdmissionMiddleware
+from woeplanet.spelunker.middleware.metrics import MetricsMiddleware
 from woeplanet.spelunker.middleware.timing import TimingMiddleware
 from woeplanet.spelunker.routers.routes import routes
 
 settings = get_settings()
+app_routes = routes()
 handlers = {
     HTTPStatus.BAD_REQUEST.value: client_error_handler,
     HTTPStatus.NOT_FOUND.value: client_error_handler,
     HTTPStatus.INTERNAL_SERVER_ERROR.value: server_error_handler,
 }
 middleware = [
+    Middleware(MetricsMiddleware, routes=app_routes),
     Middleware(TimingMiddleware),  # type: ignore[arg-type]
+    Middleware(AdmissionMiddleware, routes=app_routes),
 ]
 app = Starlette(
     debug=settings.woeplanet_log_level == 'debug',
-    routes=routes(),
+    routes=app_routes,
     exception_handlers=handlers,  # type: ignore[arg-type]
     lifespan=lifespan,
     middleware=middleware,
@@ -39,6 +45,7 @@ def main() -> None:
     """
 
     workers = multiprocessing.cpu_count() * 2 + 1
+    init_multiprocess_metrics(settings.woeplanet_metrics_dir)
     uvicorn.run(
         'woeplanet.spelunker.server:app',
         host=settings.woeplanet_host,
@@ -0,0 +1,78 @@
+"""
+WOEplanet Spelunker: tests package; fixture databases tests.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from woeplanet.spelunker.commands.fixtures import INSERTS, MIN_PLACES, build_fixture_databases
+
+SEED = 7
+
+# geometries are made with SpatiaLite
+pytestmark = pytest.mark.spatialite
+
+
+def build(directory: Path, seed: int = SEED) -> dict[str, list[tuple[Any, ...]]]:
+    """
+    Build the smallest fixture databases in a directory, and read back every table they insert into
+    """
+
+    directory.mkdir()
+    db_path, geom_db_path = directory / 'woeplanet.db', directory / 'geometries.db'
+    build_fixture_databases(db_path, geom_db_path, places=MIN_PLACES, seed=seed)
+
+    tables = {}
+    for table in INSERTS:
+        conn = sqlite3.connect(str(geom_db_path if table == 'geometries' else db_path))
+        try:
+            tables[table] = conn.execute(f'SELECT * FROM {table}').fetchall()  # noqa: S608
+        finally:
+            conn.close()
+
+    return tables
+
+
+class TestBuildFixtureDatabases:
+    """
+    Tests for the build_fixture_databases function.
+    """
+
+    def test_same_seed_same_databases(self, tmp_path: Path) -> None:
+        """
+        The same seed should build the same databases, row for row, and a different seed different ones.
+        """
+
+        tables = build(tmp_path / 'first')
+
+        assert build(tmp_path / 'second') == tables
+        assert build(tmp_path / 'other', SEED + 1) != tables
+
+    def test_every_table_is_filled(self, tmp_path: Path) -> None:
+        """
+        Every table should have rows, and the places at least the requested number.
+        """
+
+        tables = build(tmp_path / 'fixtures')
+
+        assert all(tables.values())
+        assert len(tables['places']) >= MIN_PLACES
+
+    def test_superseded_places_are_linked(self, tmp_path: Path) -> None:
+        """
+        Each superseded place should be among the places its successor supersedes.
+        """
+
+        changes = {
+            woe_id: (superseded_by, supersedes)
+            for woe_id, superseded_by, supersedes in build(tmp_path / 'db')['changes']
+        }
+
+        superseded = [(woe_id, superseded_by) for woe_id, (superseded_by, _) in changes.items() if superseded_by]
+        assert superseded
+        for woe_id, superseded_by in superseded:
+            assert woe_id in json.loads(changes[superseded_by][1])
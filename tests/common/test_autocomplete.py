@@ -0,0 +1,69 @@
+"""
+WOEplanet Spelunker: tests package; autocomplete tests.
+"""
+
+import pytest
+
+from woeplanet.spelunker.common.autocomplete import autocomplete_key, autocomplete_score
+from woeplanet.spelunker.config.placetypes import PLACETYPE_COUNTRY, PLACETYPE_ID, Placetype
+
+PLACETYPE_TOWN = PLACETYPE_ID[Placetype.TOWN]
+PLACETYPE_UNKNOWN = 0
+
+
+class TestAutocompleteKey:
+    """
+    Tests for the autocomplete_key function.
+    """
+
+    @pytest.mark.parametrize(
+        ('text', 'expected'),
+        [
+            ('London', 'london'),
+            ('Zürich', 'zurich'),
+            ('  New   York ', 'new york'),
+            ('STRASSE', 'strasse'),
+            ('Straße', 'strasse'),
+        ],
+    )
+    def test_normalises_text(self, text: str, expected: str) -> None:
+        """
+        Names should be case folded, stripped of accents and have whitespace collapsed.
+        """
+
+        assert autocomplete_key(text) == expected
+
+    def test_prefix_of_name_is_prefix_of_key(self) -> None:
+        """
+        A normalised prefix should be a prefix of the normalised name.
+        """
+
+        assert autocomplete_key('Sao Paulo').startswith(autocomplete_key('São P'))
+
+
+class TestAutocompleteScore:
+    """
+    Tests for the autocomplete_score function.
+    """
+
+    def test_larger_places_rank_first(self) -> None:
+        """
+        Larger placetypes should score better than smaller ones, whatever the name type.
+        """
+
+        assert autocomplete_score(PLACETYPE_COUNTRY, 'A') < autocomplete_score(PLACETYPE_TOWN, 'S')
+
+    def test_name_type_breaks_ties(self) -> None:
+        """
+        Within a placetype, standard names should score better than variants, and variants better than unknown types.
+        """
+
+        assert autocomplete_score(PLACETYPE_TOWN, 'S') < autocomplete_score(PLACETYPE_TOWN, 'V')
+        assert autocomplete_score(PLACETYPE_TOWN, 'V') < autocomplete_score(PLACETYPE_TOWN, None)
+
+    def test_unknown_placetype_ranks_last(self) -> None:
+        """
+        Unknown placetypes should score worse than any known placetype.
+        """
+
+        assert autocomplete_score(PLACETYPE_UNKNOWN, 'S') > autocomplete_score(PLACETYPE_TOWN, 'Q')
@@ -0,0 +1,110 @@
+"""
+WOEplanet Spelunker: tests package; HTTP caching tests.
+"""
+
+from http import HTTPStatus
+from unittest.mock import MagicMock
+
+from starlette.datastructures import Headers
+
+from woeplanet.spelunker.common.http_cache import (
+    CACHE_CONTROL_LONG,
+    data_release,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+
+WOEID_LONDON = 44418
+
+
+class TestMakeEtag:
+    """
+    Tests for the make_etag function.
+    """
+
+    def test_etag_is_weak(self) -> None:
+        """
+        ETags should be weak validators.
+        """
+
+        assert make_etag('geojson', WOEID_LONDON).startswith('W/"')
+
+    def test_etag_includes_data_release(self) -> None:
+        """
+        ETags should change with the data release.
+        """
+
+        assert data_release() in make_etag('geojson', WOEID_LONDON)
+
+    def test_etag_differs_by_parts(self) -> None:
+        """
+        Different resources should have different ETags.
+        """
+
+        assert make_etag('geojson', WOEID_LONDON, 1) != make_etag('geojson', WOEID_LONDON, 2)
+
+
+class TestIsNotModified:
+    """
+    Tests for the is_not_modified function.
+    """
+
+    def test_no_header_is_modified(self) -> None:
+        """
+        No If-None-Match header should be treated as modified.
+        """
+
+        request = MagicMock()
+        request.headers = Headers({})
+
+        assert is_not_modified(request, make_etag('geojson', WOEID_LONDON)) is False
+
+    def test_matching_etag_is_not_modified(self) -> None:
+        """
+        A matching ETag in a list should be treated as not modified.
+        """
+
+        etag = make_etag('geojson', WOEID_LONDON)
+        request = MagicMock()
+        request.headers = Headers({'if-none-match': f'W/"other", {etag}'})
+
+        assert is_not_modified(request, etag) is True
+
+    def test_wildcard_is_not_modified(self) -> None:
+        """
+        A wildcard If-None-Match should be treated as not modified.
+        """
+
+        request = MagicMock()
+        request.headers = Headers({'if-none-match': '*'})
+
+        assert is_not_modified(request, make_etag('geojson', WOEID_LONDON)) is True
+
+    def test_different_etag_is_modified(self) -> None:
+        """
+        A different ETag should be treated as modified.
+        """
+
+        request = MagicMock()
+        request.headers = Headers({'if-none-match': 'W/"other"'})
+
+        assert is_not_modified(request, make_etag('geojson', WOEID_LONDON)) is False
+
+
+class TestNotModifiedResponse:
+    """
+    Tests for the not_modified_response function.
+    """
+
+    def test_not_modified_response(self) -> None:
+        """
+        Response should be a 304 carrying the ETag and caching headers.
+        """
+
+        etag = make_etag('geojson', WOEID_LONDON)
+        response = not_modified_response(etag)
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.headers['etag'] == etag
+        assert response.headers['cache-control'] == CACHE_CONTROL_LONG
@@ -4,7 +4,7 @@ WOEplanet Spelunker: tests package; languages module tests.
 
 import pytest
 
-from woeplanet.spelunker.common.languages import language_name
+from woeplanet.spelunker.common.languages import language_name, load_language_names
 
 
 class TestLanguageName:
@@ -60,3 +60,15 @@ class TestLanguageName:
         """
 
         assert language_name(code) == expected
+
+    def test_names_are_loaded_once(self) -> None:
+        """
+        The code to name map should be built once, and be read only.
+        """
+
+        names = load_language_names()
+
+        assert load_language_names() is names
+        assert names['ger'] == names['deu'] == 'German'
+        with pytest.raises(TypeError):
+            names['xxx'] = 'Invented'  # type: ignore[index]
@@ -0,0 +1,101 @@
+"""
+WOEplanet Spelunker: tests package; metrics module tests.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from woeplanet.spelunker.common.metrics import CACHE_LOOKUPS, result_rows
+from woeplanet.spelunker.dependencies.cache import close_cache, disk_cache, init_cache
+
+PAGE_SIZE = 3
+
+
+@dataclass
+class Page:
+    """
+    A page of results, like PaginatedResult.
+    """
+
+    items: list[dict[str, int]]
+    has_more: bool
+
+
+class TestResultRows:
+    """
+    Tests for the result_rows function.
+    """
+
+    def test_page_is_its_items(self) -> None:
+        """
+        A page of results should count its items.
+        """
+
+        assert result_rows(Page(items=[{'woe_id': n} for n in range(PAGE_SIZE)], has_more=True)) == PAGE_SIZE
+
+    def test_place_is_one_row(self) -> None:
+        """
+        A single place should count as one row, though some of its values are lists.
+        """
+
+        assert result_rows({'woe_id': 1, 'ancestors': [2, 3]}) == 1
+
+    def test_grouped_rows(self) -> None:
+        """
+        Rows grouped by a key should count every row in every group.
+        """
+
+        assert result_rows({'town': [{'woe_id': 1}, {'woe_id': 2}], 'county': [{'woe_id': 3}]}) == PAGE_SIZE
+
+    @pytest.mark.parametrize(
+        ('result', 'expected'),
+        [
+            (None, 0),
+            ([], 0),
+            ([{'woe_id': 1}], 1),
+            ('{"type": "Point"}', 1),
+            (12345, None),
+        ],
+    )
+    def test_other_results(self, result: object, expected: int | None) -> None:
+        """
+        Lists count their rows, and counts aren't rows.
+        """
+
+        assert result_rows(result) == expected
+
+
+def cache_lookups(prefix: str, result: str) -> float:
+    """
+    How many cache lookups for a key prefix, with a result, have been recorded.
+    """
+
+    return CACHE_LOOKUPS.labels(prefix, result)._value.get()  # noqa: SLF001
+
+
+class TestCacheLookups:
+    """
+    Tests for the disk cache hit and miss metrics.
+    """
+
+    async def test_counts_hits_and_misses_by_prefix(self, tmp_path: Path) -> None:
+        """
+        A miss and then a hit should each be counted against the key's prefix.
+        """
+
+        @disk_cache(key_builder=lambda *, iso: f'test_country:{iso}')
+        async def lookup(*, iso: str) -> str:
+            return iso.upper()
+
+        init_cache(tmp_path)
+        try:
+            misses, hits = cache_lookups('test_country', 'miss'), cache_lookups('test_country', 'hit')
+            await lookup(iso='gb')
+            await lookup(iso='gb')
+        finally:
+            close_cache()
+
+        assert cache_lookups('test_country', 'miss') == misses + 1
+        assert cache_lookups('test_country', 'hit') == hits + 1
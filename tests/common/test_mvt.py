@@ -0,0 +1,97 @@
+"""
+WOEplanet Spelunker: tests package; Mapbox Vector Tile encoding tests.
+"""
+
+import pytest
+
+from woeplanet.spelunker.common.mvt import TileFeature, TileLayer, encode_tile, tile_bounds
+
+WORLD_WEST = -180.0
+WORLD_EAST = 180.0
+MAX_LATITUDE = 85.0511
+LAYER_MESSAGE = 0x1A  # field 3, length delimited
+
+POINT_LONDON = {'type': 'Point', 'coordinates': [-0.1276, 51.5072]}
+SQUARE = {
+    'type': 'Polygon',
+    'coordinates': [[[-10.0, -10.0], [10.0, -10.0], [10.0, 10.0], [-10.0, 10.0], [-10.0, -10.0]]],
+}
+SLIVER = {
+    'type': 'Polygon',
+    'coordinates': [[[0.0, 0.0], [0.000001, 0.0], [0.0, 0.000001], [0.0, 0.0]]],
+}
+
+
+class TestTileBounds:
+    """
+    Tests for the tile_bounds function.
+    """
+
+    def test_world_tile(self) -> None:
+        """
+        The zoom 0 tile should cover the whole Web Mercator world.
+        """
+
+        west, south, east, north = tile_bounds(0, 0, 0)
+
+        assert west == WORLD_WEST
+        assert east == WORLD_EAST
+        assert north == pytest.approx(MAX_LATITUDE, abs=1e-4)
+        assert south == pytest.approx(-MAX_LATITUDE, abs=1e-4)
+
+    def test_child_tiles_split_parent(self) -> None:
+        """
+        The north west child tile should share the parent's north west corner and centre.
+        """
+
+        west, _, _, north = tile_bounds(1, 0, 0)
+        _, south, east, _ = tile_bounds(1, 0, 0)
+
+        assert (west, north) == pytest.approx((WORLD_WEST, MAX_LATITUDE), abs=1e-4)
+        assert (east, south) == pytest.approx((0.0, 0.0), abs=1e-9)
+
+
+class TestEncodeTile:
+    """
+    Tests for the encode_tile function.
+    """
+
+    def test_empty_layers_are_omitted(self) -> None:
+        """
+        Layers without features should not be encoded.
+        """
+
+        assert encode_tile([TileLayer(name='empty')], 0, 0, 0) == b''
+
+    def test_layer_is_encoded(self) -> None:
+        """
+        Layers with features should be encoded as tile layer messages containing their name.
+        """
+
+        layer = TileLayer(
+            name='centroids',
+            features=[TileFeature(id=44418, geometry=POINT_LONDON, properties={'name': 'London'})],
+        )
+        tile = encode_tile([layer], 0, 0, 0)
+
+        assert tile[0] == LAYER_MESSAGE
+        assert b'centroids' in tile
+        assert b'London' in tile
+
+    def test_collapsed_polygons_are_dropped(self) -> None:
+        """
+        Polygons that collapse to nothing at the tile's resolution should be dropped.
+        """
+
+        layer = TileLayer(name='geometries', features=[TileFeature(id=1, geometry=SLIVER)])
+
+        assert encode_tile([layer], 0, 0, 0) == b''
+
+    def test_polygon_is_encoded(self) -> None:
+        """
+        Polygons should be encoded.
+        """
+
+        layer = TileLayer(name='geometries', features=[TileFeature(id=1, geometry=SQUARE)])
+
+        assert encode_tile([layer], 0, 0, 0) != b''
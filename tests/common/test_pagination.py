@@ -37,6 +37,8 @@ WOE_ID_NINETY = 90
 WOE_ID_HUNDRED = 100
 
 CURSOR_AFTER_FIVE = 5
+SCORE_FIRST = -12.5
+SCORE_SECOND = -3.25
 
 
 def make_request(url: str = 'http://test/path') -> MagicMock:
@@ -112,6 +114,38 @@ class TestBuildPaginationContext:
         assert f'before={WOE_ID_TEN}' in context.urls.prev
         assert f'after={WOE_ID_TWENTY}' in context.urls.next
 
+    def test_scored_items_use_score_cursor(self) -> None:
+        """
+        Items with a score should paginate on a (score, woe_id) cursor.
+        """
+
+        request = make_request('http://test/path?q=paris&after=5&after_score=-20.0&page=2')
+        result = PaginatedResult(
+            items=[
+                {'woe_id': WOE_ID_TEN, 'score': SCORE_FIRST},
+                {'woe_id': WOE_ID_TWENTY, 'score': SCORE_SECOND},
+            ],
+            has_more=True,
+        )
+        pagination = PaginationParams(
+            after=CURSOR_AFTER_FIVE,
+            before=None,
+            limit=DEFAULT_LIMIT,
+            page=SECOND_PAGE,
+            after_score=-20.0,
+        )
+
+        context = build_pagination_context(request, result, pagination=pagination, total=TOTAL_HUNDRED)
+
+        assert context.urls.prev is not None
+        assert context.urls.next is not None
+        assert f'before={WOE_ID_TEN}' in context.urls.prev
+        assert f'before_score={SCORE_FIRST}' in context.urls.prev
+        assert 'after' not in context.urls.prev
+        assert f'after={WOE_ID_TWENTY}' in context.urls.next
+        assert f'after_score={SCORE_SECOND}' in context.urls.next
+        assert 'after_score=-20.0' not in context.urls.next
+
     def test_last_page_no_next(self) -> None:
         """
         Last page should have no next URL.
@@ -147,6 +181,21 @@ class TestBuildPaginationContext:
 
         assert context.pages == EXPECTED_PAGES_TEN
 
+    def test_unknown_total_still_pages(self) -> None:
+        """
+        Without a total, when counting ran out of time, pages should be unknown but the next URL still built.
+        """
+
+        request = make_request()
+        result = PaginatedResult(items=[{'woe_id': WOE_ID_FIRST}], has_more=True)
+        pagination = PaginationParams(after=None, before=None, limit=DEFAULT_LIMIT, page=FIRST_PAGE)
+
+        context = build_pagination_context(request, result, pagination=pagination, total=None)
+
+        assert context.total is None
+        assert context.pages is None
+        assert context.urls.next is not None
+
 
 class TestBuildOffsetPaginationContext:
     """
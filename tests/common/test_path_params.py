@@ -12,10 +12,13 @@ from woeplanet.spelunker.common.path_params import (
     MAX_WOEID,
     get_path_iso_code,
     get_path_placetype,
+    get_path_tile,
     get_path_woeid,
 )
+from woeplanet.spelunker.config.geometry_tiers import MAX_ZOOM
 
 WOEID_LONDON = 44418
+TILE_LONDON = (10, 511, 340)
 
 
 class TestGetWoeid:
@@ -174,3 +177,54 @@ class TestGetPlacetype:
             get_path_placetype(request)
 
         assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestGetPathTile:
+    """
+    Tests for the get_path_tile function.
+    """
+
+    def test_valid_tile(self) -> None:
+        """
+        Valid tile coordinates should be returned as a z/x/y tuple.
+        """
+
+        z, x, y = TILE_LONDON
+        request = MagicMock()
+        request.path_params = {'z': z, 'x': x, 'y': y}
+        assert get_path_tile(request) == TILE_LONDON
+
+    def test_missing_coordinate_raises(self) -> None:
+        """
+        Missing tile coordinates should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.path_params = {'z': 0, 'x': 0}
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_path_tile(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize(
+        ('z', 'x', 'y'),
+        [
+            (-1, 0, 0),
+            (MAX_ZOOM + 1, 0, 0),
+            (0, 1, 0),
+            (2, 0, 4),
+        ],
+    )
+    def test_out_of_range_tile_raises(self, z: int, x: int, y: int) -> None:
+        """
+        Tile coordinates outside the tile grid should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.path_params = {'z': z, 'x': x, 'y': y}
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_path_tile(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
@@ -9,15 +9,20 @@ import pytest
 from starlette.datastructures import QueryParams
 from starlette.exceptions import HTTPException
 
+from woeplanet.spelunker.common.autocomplete import AUTOCOMPLETE_LIMIT_DEFAULT, AUTOCOMPLETE_LIMIT_MAX
 from woeplanet.spelunker.common.query_params import (
     LIMIT_DEFAULT,
     LIMIT_MAX,
+    parse_autocomplete_params,
     parse_filter_params,
+    parse_map_params,
     parse_nearby_params,
     parse_pagination,
     parse_placetype_filter,
+    parse_profile_params,
     parse_search_params,
 )
+from woeplanet.spelunker.common.sampling import DEFAULT_PROFILE_DURATION, DEFAULT_PROFILE_INTERVAL
 from woeplanet.spelunker.config.placetypes import Placetype
 
 FIRST_PAGE = 1
@@ -25,7 +30,11 @@ FIFTH_PAGE = 5
 CUSTOM_LIMIT = 25
 CURSOR_AFTER = 1000
 CURSOR_BEFORE = 2000
+CURSOR_SCORE = -7.5
 CUSTOM_DISTANCE = 10000
+CUSTOM_ZOOM = 8
+CUSTOM_AUTOCOMPLETE_LIMIT = 5
+CUSTOM_PROFILE_DURATION = 5.0
 
 
 class TestParseFilterParams:
@@ -171,6 +180,33 @@ class TestParsePagination:
 
         assert result.before == CURSOR_BEFORE
 
+    def test_score_cursor(self) -> None:
+        """
+        Score cursors should be parsed alongside WOE ID cursors.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(f'after={CURSOR_AFTER}&after_score={CURSOR_SCORE}')
+
+        result = parse_pagination(request)
+
+        assert result.after == CURSOR_AFTER
+        assert result.after_score == CURSOR_SCORE
+        assert result.before_score is None
+
+    def test_non_finite_score_cursor_raises(self) -> None:
+        """
+        Non finite score cursors should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(f'after={CURSOR_AFTER}&after_score=nan')
+
+        with pytest.raises(HTTPException) as exc_info:
+            parse_pagination(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
     def test_page_number(self) -> None:
         """
         Page number should be parsed.
@@ -228,6 +264,137 @@ class TestParseNearbyParams:
         assert result.distance == CUSTOM_DISTANCE
 
 
+class TestParseMapParams:
+    """
+    Tests for the parse_map_params function.
+    """
+
+    def test_no_zoom_returns_none(self) -> None:
+        """
+        No zoom should return None.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('')
+
+        result = parse_map_params(request)
+
+        assert result.zoom is None
+
+    def test_zoom_parsed(self) -> None:
+        """
+        Zoom should be parsed as an int.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(f'zoom={CUSTOM_ZOOM}')
+
+        result = parse_map_params(request)
+
+        assert result.zoom == CUSTOM_ZOOM
+
+    def test_zoom_out_of_range_raises(self) -> None:
+        """
+        Zoom beyond the maximum should raise 400.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('zoom=99')
+
+        with pytest.raises(HTTPException) as exc_info:
+            parse_map_params(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestParseAutocompleteParams:
+    """
+    Tests for the parse_autocomplete_params function.
+    """
+
+    def test_query_and_default_limit(self) -> None:
+        """
+        Query should be parsed and stripped, with the default limit.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('q=  Lond  ')
+
+        result = parse_autocomplete_params(request)
+
+        assert result.q == 'Lond'
+        assert result.limit == AUTOCOMPLETE_LIMIT_DEFAULT
+
+    def test_custom_limit(self) -> None:
+        """
+        Custom limit should be parsed.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(f'q=Lond&limit={CUSTOM_AUTOCOMPLETE_LIMIT}')
+
+        result = parse_autocomplete_params(request)
+
+        assert result.limit == CUSTOM_AUTOCOMPLETE_LIMIT
+
+    @pytest.mark.parametrize('query_string', ['', 'q=', 'q=%20', f'q=Lond&limit={AUTOCOMPLETE_LIMIT_MAX + 1}'])
+    def test_invalid_params_raise(self, query_string: str) -> None:
+        """
+        Missing queries and limits over the maximum should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(query_string)
+
+        with pytest.raises(HTTPException) as exc_info:
+            parse_autocomplete_params(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestParseProfileParams:
+    """
+    Tests for the parse_profile_params function.
+    """
+
+    def test_defaults(self) -> None:
+        """
+        No params should return the default duration and interval.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('')
+
+        result = parse_profile_params(request)
+
+        assert result.duration == DEFAULT_PROFILE_DURATION
+        assert result.interval == DEFAULT_PROFILE_INTERVAL
+
+    def test_custom_duration(self) -> None:
+        """
+        Custom duration should be parsed.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(f'duration={CUSTOM_PROFILE_DURATION}')
+
+        assert parse_profile_params(request).duration == CUSTOM_PROFILE_DURATION
+
+    @pytest.mark.parametrize('query_string', ['duration=0', 'duration=3600', 'interval=0', 'interval=x'])
+    def test_invalid_params_raise(self, query_string: str) -> None:
+        """
+        Durations and intervals out of range should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams(query_string)
+
+        with pytest.raises(HTTPException) as exc_info:
+            parse_profile_params(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
 class TestParseSearchParams:
     """
     Tests for the parse_search_params function.
@@ -246,6 +413,31 @@ class TestParseSearchParams:
         assert result.q == ''
         assert result.name_type == 'any'
 
+    def test_sort_defaults_to_relevance(self) -> None:
+        """
+        Sort should default to relevance, and accept woeid.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('q=Paris')
+        assert parse_search_params(request).sort == 'relevance'
+
+        request.query_params = QueryParams('q=Paris&sort=woeid')
+        assert parse_search_params(request).sort == 'woeid'
+
+    def test_invalid_sort_raises(self) -> None:
+        """
+        Unknown sort orders should raise HTTPException.
+        """
+
+        request = MagicMock()
+        request.query_params = QueryParams('q=Paris&sort=name')
+
+        with pytest.raises(HTTPException) as exc_info:
+            parse_search_params(request)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
     def test_query_string(self) -> None:
         """
         Query string should be parsed.
@@ -0,0 +1,126 @@
+"""
+WOEplanet Spelunker: tests package; sampling profiler tests.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from woeplanet.spelunker.common.sampling import SamplingProfiler, tag_route
+
+ROUTE = '/id/{woeid:int}'
+DURATION = 0.25  # seconds
+INTERVAL = 0.002  # seconds
+
+
+def spin(stop: threading.Event) -> None:
+    """
+    Keep a thread busy until it's stopped.
+    """
+
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@tag_route
+def serve(route: str, stop: threading.Event) -> None:
+    """
+    Serve a request, as a route tagging middleware does.
+    """
+
+    _ = route
+    spin(stop)
+
+
+def read_stacks(path: str | None) -> dict[str, int]:
+    """
+    Read a profile's folded stacks, and their counts.
+    """
+
+    assert path is not None
+    stacks = {}
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        stack, _, count = line.rpartition(' ')
+        stacks[stack] = int(count)
+
+    return stacks
+
+
+@pytest.fixture
+def stop() -> Iterator[threading.Event]:
+    """
+    An event to stop the threads a test starts.
+    """
+
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+class TestSamplingProfiler:
+    """
+    Tests for the SamplingProfiler class.
+    """
+
+    def test_samples_tagged_with_route(self, tmp_path: Path, stop: threading.Event) -> None:
+        """
+        A busy thread's samples should be tagged with its name and route, then its frames from the outermost in.
+        """
+
+        threading.Thread(target=serve, args=(ROUTE, stop), name='busy', daemon=True).start()
+        profiler = SamplingProfiler(tmp_path)
+
+        assert profiler.start(DURATION, INTERVAL)
+        time.sleep(DURATION / 2)
+        assert profiler.stop()
+
+        stacks = read_stacks(profiler.status().path)
+        busy = [stack for stack in stacks if stack.startswith(f'busy;{ROUTE};')]
+        assert busy
+        assert all(stack.index('serve (') < stack.index('spin (') for stack in busy)
+        assert sum(stacks.values()) == profiler.status().samples
+
+    def test_idle_threads_not_sampled(self, tmp_path: Path, stop: threading.Event) -> None:
+        """
+        Threads waiting for work shouldn't be sampled.
+        """
+
+        threading.Thread(target=stop.wait, name='idle', daemon=True).start()
+        profiler = SamplingProfiler(tmp_path)
+
+        profiler.start(DURATION, INTERVAL)
+        profiler.stop()
+
+        assert not [stack for stack in read_stacks(profiler.status().path) if stack.startswith('idle;')]
+
+    def test_stops_after_duration(self, tmp_path: Path) -> None:
+        """
+        A profile should stop itself, and be written, after its duration.
+        """
+
+        profiler = SamplingProfiler(tmp_path)
+        profiler.start(DURATION, INTERVAL)
+        assert profiler.status().running
+
+        assert profiler._thread is not None  # noqa: SLF001
+        profiler._thread.join()  # noqa: SLF001
+
+        status = profiler.status()
+        assert not status.running
+        assert status.path is not None
+        assert Path(status.path).exists()
+        assert not profiler.stop()
+
+    def test_one_profile_at_a_time(self, tmp_path: Path) -> None:
+        """
+        A profile shouldn't start while another's running.
+        """
+
+        profiler = SamplingProfiler(tmp_path)
+
+        assert profiler.start(DURATION, INTERVAL)
+        assert not profiler.start(DURATION, INTERVAL)
+        profiler.stop()
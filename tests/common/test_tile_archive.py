@@ -0,0 +1,114 @@
+"""
+WOEplanet Spelunker: tests package; tile archive tests.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from woeplanet.spelunker.common.tile_archive import TileArchive, TileArchiveError, TileArchiveWriter, Tileset
+
+TILESET_COUNTRY = Tileset(key='country/000', min_zoom=0, max_zoom=2)
+TILESET_STATE = Tileset(key='state/000', min_zoom=1, max_zoom=2)
+TILE_WORLD = b'world'
+TILE_NORTH_WEST = b'north west'
+TILE_LARGE = bytes(1024)
+
+
+@pytest.fixture
+def archive_path(tmp_path: Path) -> Path:
+    """
+    Write a small tile archive.
+    """
+
+    path = tmp_path / 'tiles.archive'
+    with TileArchiveWriter(path, [TILESET_COUNTRY, TILESET_STATE], metadata={'data_release': 'test'}) as writer:
+        writer.add(TILESET_COUNTRY.key, 1, 0, 0, TILE_NORTH_WEST)
+        writer.add(TILESET_COUNTRY.key, 0, 0, 0, TILE_WORLD)
+        writer.add(TILESET_STATE.key, 1, 0, 0, TILE_NORTH_WEST)
+        writer.add(TILESET_STATE.key, 1, 1, 1, b'')
+
+    return path
+
+
+class TestTileArchive:
+    """
+    Tests for reading and writing tile archives.
+    """
+
+    def test_tiles_round_trip(self, archive_path: Path) -> None:
+        """
+        Tiles should be read back from the tileset and z/x/y they were written to.
+        """
+
+        archive = TileArchive(archive_path)
+        try:
+            assert archive.get(TILESET_COUNTRY.key, 0, 0, 0) == TILE_WORLD
+            assert archive.get(TILESET_COUNTRY.key, 1, 0, 0) == TILE_NORTH_WEST
+            assert archive.get(TILESET_STATE.key, 1, 0, 0) == TILE_NORTH_WEST
+            assert archive.metadata['data_release'] == 'test'
+        finally:
+            archive.close()
+
+    def test_missing_tile_in_zoom_range_is_empty(self, archive_path: Path) -> None:
+        """
+        Tiles within a tileset's zoom range that weren't written should be empty.
+        """
+
+        archive = TileArchive(archive_path)
+        try:
+            assert archive.get(TILESET_COUNTRY.key, 2, 3, 3) == b''
+            assert archive.get(TILESET_STATE.key, 1, 1, 1) == b''
+        finally:
+            archive.close()
+
+    def test_tile_outside_archive_is_none(self, archive_path: Path) -> None:
+        """
+        Tiles outside a tileset's zoom range, or in an unknown tileset, aren't covered by the archive.
+        """
+
+        archive = TileArchive(archive_path)
+        try:
+            assert archive.get(TILESET_COUNTRY.key, 3, 0, 0) is None
+            assert archive.get(TILESET_STATE.key, 0, 0, 0) is None
+            assert archive.get('town/000', 0, 0, 0) is None
+        finally:
+            archive.close()
+
+    def test_identical_tiles_are_stored_once(self, tmp_path: Path) -> None:
+        """
+        Identical tile data should only be stored once.
+        """
+
+        single = tmp_path / 'single.archive'
+        with TileArchiveWriter(single, [TILESET_COUNTRY, TILESET_STATE]) as writer:
+            writer.add(TILESET_COUNTRY.key, 1, 0, 0, TILE_LARGE)
+
+        double = tmp_path / 'double.archive'
+        with TileArchiveWriter(double, [TILESET_COUNTRY, TILESET_STATE]) as writer:
+            writer.add(TILESET_COUNTRY.key, 1, 0, 0, TILE_LARGE)
+            writer.add(TILESET_STATE.key, 1, 0, 0, TILE_LARGE)
+
+        assert double.stat().st_size - single.stat().st_size < len(TILE_LARGE)
+
+    def test_not_an_archive_raises(self, tmp_path: Path) -> None:
+        """
+        Files that aren't tile archives should raise TileArchiveError.
+        """
+
+        path = tmp_path / 'not.archive'
+        path.write_bytes(b'SQLite format 3\x00' + bytes(64))
+
+        with pytest.raises(TileArchiveError):
+            TileArchive(path)
+
+    def test_empty_file_raises(self, tmp_path: Path) -> None:
+        """
+        Empty files should raise TileArchiveError.
+        """
+
+        path = tmp_path / 'empty.archive'
+        path.touch()
+
+        with pytest.raises(TileArchiveError):
+            TileArchive(path)
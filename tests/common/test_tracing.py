@@ -0,0 +1,193 @@
+"""
+WOEplanet Spelunker: tests package; tracing module tests.
+"""
+
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+
+import jinja2
+
+from woeplanet.spelunker.common.tracing import (
+    SPAN_KIND_INTERNAL,
+    SPAN_KIND_SERVER,
+    TraceExporter,
+    add_span,
+    otlp_json,
+    server_timing,
+    start_trace,
+    trace_span,
+)
+from woeplanet.spelunker.dependencies.cache import close_cache, disk_cache, init_cache
+from woeplanet.spelunker.dependencies.templates import TracedTemplate
+
+QUERIES = 3
+
+
+class TestTraceSpan:
+    """
+    Tests for the trace_span and add_span functions.
+    """
+
+    def test_does_nothing_outside_a_trace(self) -> None:
+        """
+        Spans outside a request shouldn't be recorded anywhere.
+        """
+
+        with trace_span('query') as span:
+            pass
+
+        assert span is None
+        add_span('pool.checkout', time.perf_counter())
+
+    def test_spans_nest(self) -> None:
+        """
+        A span should be the child of the span it's started in, and the request its outermost span's parent.
+        """
+
+        with start_trace('request') as trace:
+            with trace_span('query') as outer:
+                add_span('pool.checkout', time.perf_counter())
+            with trace_span('template'):
+                pass
+
+        assert outer is not None
+        spans = {span.name: span for span in trace.spans}
+        assert spans['query'].parent_id == trace.root.span_id
+        assert spans['pool.checkout'].parent_id == outer.span_id
+        assert spans['template'].parent_id == trace.root.span_id
+        assert all(span.end is not None for span in (trace.root, *trace.spans))
+
+    async def test_concurrent_tasks_share_the_trace(self) -> None:
+        """
+        Queries run concurrently, in their own tasks, should be recorded in the request's trace.
+        """
+
+        async def query() -> None:
+            with trace_span('query'):
+                await asyncio.sleep(0)
+
+        with start_trace('request') as trace:
+            await asyncio.gather(*(query() for _ in range(QUERIES)))
+
+        assert [span.name for span in trace.spans] == ['query'] * QUERIES
+        assert {span.parent_id for span in trace.spans} == {trace.root.span_id}
+
+    async def test_template_renders_are_spans(self) -> None:
+        """
+        Rendering a template should be recorded as a span named for it.
+        """
+
+        env = jinja2.Environment(autoescape=True, enable_async=True, loader=jinja2.DictLoader({'t.j2': '{{ x }}'}))
+        env.template_class = TracedTemplate
+
+        with start_trace('request') as trace:
+            assert await env.get_template('t.j2').render_async(x=1) == '1'
+
+        assert [(span.name, span.attributes) for span in trace.spans] == [('template', {'template': 't.j2'})]
+
+    async def test_cache_lookups_and_locks_are_spans(self, tmp_path: Path) -> None:
+        """
+        A miss should record its lookup, the wait for its lock and the lookup under it; a hit, only its lookup.
+        """
+
+        @disk_cache(key_builder=lambda *, iso: f'test_trace:{iso}')
+        async def lookup(*, iso: str) -> str:
+            return iso.upper()
+
+        init_cache(tmp_path)
+        try:
+            with start_trace('request') as miss:
+                await lookup(iso='gb')
+            with start_trace('request') as hit:
+                await lookup(iso='gb')
+        finally:
+            close_cache()
+
+        assert [(span.name, span.attributes.get('hit')) for span in miss.spans] == [
+            ('cache.get', False),
+            ('cache.lock', None),
+            ('cache.get', False),
+        ]
+        assert [(span.name, span.attributes.get('hit')) for span in hit.spans] == [('cache.get', True)]
+
+
+class TestServerTiming:
+    """
+    Tests for the server_timing function.
+    """
+
+    def test_spans_of_a_name_added_up(self) -> None:
+        """
+        Spans of the same name should be one metric, with their count, and the request's total last.
+        """
+
+        with start_trace('request') as trace:
+            for _ in range(QUERIES):
+                add_span('Database.get_place_by_id', time.perf_counter())
+            add_span('template', time.perf_counter())
+
+        metrics = server_timing(trace).split(', ')
+
+        assert re.fullmatch(rf'Database\.get_place_by_id;dur=\d+\.\d;desc="{QUERIES} calls"', metrics[0])
+        assert re.fullmatch(r'template;dur=\d+\.\d', metrics[1])
+        assert re.fullmatch(r'total;dur=\d+\.\d', metrics[2])
+
+    def test_names_are_tokens(self) -> None:
+        """
+        Span names that aren't HTTP tokens should be made into them.
+        """
+
+        with start_trace('request') as trace:
+            add_span('cache get: places', time.perf_counter())
+
+        assert server_timing(trace).startswith('cache-get--places;dur=')
+
+
+class TestOtlpJson:
+    """
+    Tests for OTLP/JSON export.
+    """
+
+    def test_export_request(self) -> None:
+        """
+        A trace should be one resource's spans, the request a server span and its parts internal spans.
+        """
+
+        with start_trace('request', **{'url.path': '/id/1'}) as trace, trace_span('query', rows=2, hit=True):
+            pass
+
+        spans = otlp_json(trace)['resourceSpans'][0]['scopeSpans'][0]['spans']
+        request, query = spans
+
+        assert request['kind'] == SPAN_KIND_SERVER
+        assert 'parentSpanId' not in request
+        assert request['attributes'] == [{'key': 'url.path', 'value': {'stringValue': '/id/1'}}]
+        assert query['kind'] == SPAN_KIND_INTERNAL
+        assert query['parentSpanId'] == request['spanId']
+        assert query['traceId'] == request['traceId'] == trace.trace_id
+        assert query['attributes'] == [
+            {'key': 'rows', 'value': {'intValue': '2'}},
+            {'key': 'hit', 'value': {'boolValue': True}},
+        ]
+        assert int(request['startTimeUnixNano']) <= int(query['startTimeUnixNano'])
+        assert int(query['endTimeUnixNano']) <= int(request['endTimeUnixNano'])
+
+    def test_exporter_appends_lines(self, tmp_path: Path) -> None:
+        """
+        Each trace should be appended as a line of its own.
+        """
+
+        path = tmp_path / 'traces' / 'traces.jsonl'
+        exporter = TraceExporter(path)
+        for _ in range(QUERIES):
+            with start_trace('request') as trace:
+                pass
+            exporter.export(trace)
+        exporter.close()
+
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == QUERIES
+        assert all('resourceSpans' in json.loads(line) for line in lines)
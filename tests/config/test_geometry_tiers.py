@@ -0,0 +1,108 @@
+"""
+WOEplanet Spelunker: tests package; geometry tiers config tests.
+"""
+
+import itertools
+
+import pytest
+
+from woeplanet.spelunker.config.geometry_tiers import (
+    GEOMETRY_TIERS,
+    MAX_ZOOM,
+    MIN_ZOOM,
+    geometry_tier_for_zoom,
+    zoom_for_bounds,
+)
+
+BOUNDS_WORLD = [[-85.0, -180.0], [85.0, 180.0]]
+BOUNDS_UNITED_KINGDOM = [[49.9, -8.6], [60.8, 1.8]]
+BOUNDS_LONDON = [[51.28, -0.51], [51.69, 0.33]]
+
+ZOOM_TIER_1 = 2
+ZOOM_TIER_4 = 12
+ZOOM_FULL = 13
+
+
+class TestGeometryTierForZoom:
+    """
+    Tests for the geometry_tier_for_zoom function.
+    """
+
+    def test_low_zoom_is_coarsest_tier(self) -> None:
+        """
+        Low zoom levels should use the coarsest tier.
+        """
+
+        tier = geometry_tier_for_zoom(ZOOM_TIER_1)
+
+        assert tier is not None
+        assert tier == GEOMETRY_TIERS[0]
+
+    def test_tier_max_zoom_is_inclusive(self) -> None:
+        """
+        A tier's max_zoom should still use that tier.
+        """
+
+        assert geometry_tier_for_zoom(ZOOM_TIER_4) == GEOMETRY_TIERS[-1]
+
+    def test_high_zoom_is_full_resolution(self) -> None:
+        """
+        Zoom levels beyond the last tier should use full resolution.
+        """
+
+        assert geometry_tier_for_zoom(ZOOM_FULL) is None
+        assert geometry_tier_for_zoom(MAX_ZOOM) is None
+
+    def test_tiers_get_finer(self) -> None:
+        """
+        Each tier should have a smaller tolerance and greater precision than the last.
+        """
+
+        for coarse, fine in itertools.pairwise(GEOMETRY_TIERS):
+            assert fine.max_zoom > coarse.max_zoom
+            assert fine.tolerance < coarse.tolerance
+            assert fine.precision > coarse.precision
+
+
+class TestZoomForBounds:
+    """
+    Tests for the zoom_for_bounds function.
+    """
+
+    def test_no_bounds_returns_max_zoom(self) -> None:
+        """
+        No bounds should return the maximum zoom.
+        """
+
+        assert zoom_for_bounds(None) == MAX_ZOOM
+
+    def test_point_bounds_returns_max_zoom(self) -> None:
+        """
+        Zero area bounds should return the maximum zoom.
+        """
+
+        assert zoom_for_bounds([[51.5, -0.1], [51.5, -0.1]]) == MAX_ZOOM
+
+    def test_world_bounds_uses_coarsest_tier(self) -> None:
+        """
+        Whole world bounds should fit at a low zoom, within the coarsest tier.
+        """
+
+        zoom = zoom_for_bounds(BOUNDS_WORLD)
+
+        assert zoom >= MIN_ZOOM
+        assert geometry_tier_for_zoom(zoom) == GEOMETRY_TIERS[0]
+
+    @pytest.mark.parametrize(
+        ('smaller', 'larger'),
+        [
+            (BOUNDS_LONDON, BOUNDS_UNITED_KINGDOM),
+            (BOUNDS_UNITED_KINGDOM, BOUNDS_WORLD),
+        ],
+    )
+    def test_smaller_bounds_zoom_further(self, smaller: list[list[float]], larger: list[list[float]]) -> None:
+        """
+        Smaller bounds should fit at a higher zoom level.
+        """
+
+        assert zoom_for_bounds(smaller) > zoom_for_bounds(larger)
@@ -0,0 +1,94 @@
+"""
+WOEplanet Spelunker: tests package; disk cache tests.
+"""
+
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from woeplanet.spelunker.dependencies.cache import close_cache, disk_cache, init_cache
+
+KEY = 'answer:1'
+ANSWER = 42
+QUERY_SECONDS = 0.2
+TIMEOUT = 5.0  # seconds
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[Any]:
+    """
+    A disk cache, closed afterwards.
+    """
+
+    yield init_cache(tmp_path)
+    close_cache()
+
+
+class TestDiskCache:
+    """
+    Tests for the disk_cache decorator.
+    """
+
+    async def test_concurrent_misses_run_once(self, cache: Any) -> None:  # noqa: ANN401
+        """
+        Concurrent misses of a key should run its query once, without blocking the event loop while they wait.
+        """
+
+        calls = 0
+
+        @disk_cache(lambda: KEY)
+        async def answer() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(QUERY_SECONDS)
+            return ANSWER
+
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            async with asyncio.timeout(TIMEOUT):
+                results = await asyncio.gather(*(answer() for _ in range(3)))
+        finally:
+            ticker.cancel()
+
+        assert results == [ANSWER] * 3
+        assert calls == 1
+        assert ticks > 1
+        assert cache.get(KEY) == ANSWER
+        assert f'{KEY}:lock' not in cache
+
+    async def test_waits_for_another_worker(self, cache: Any) -> None:  # noqa: ANN401
+        """
+        A miss of a key another worker has locked should wait for, and return, that worker's result.
+        """
+
+        calls = 0
+
+        @disk_cache(lambda: KEY)
+        async def answer() -> int:
+            nonlocal calls
+            calls += 1
+            return 0
+
+        cache.add(f'{KEY}:lock', 1)
+
+        async def other_worker() -> None:
+            await asyncio.sleep(QUERY_SECONDS)
+            cache.set(KEY, ANSWER)
+            cache.delete(f'{KEY}:lock')
+
+        async with asyncio.timeout(TIMEOUT):
+            result, _ = await asyncio.gather(answer(), other_worker())
+
+        assert result == ANSWER
+        assert calls == 0
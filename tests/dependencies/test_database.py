@@ -2,15 +2,37 @@
 WOEplanet Spelunker: tests package; database tests.
 """
 
+import asyncio
+import sqlite3
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import aiosqlite
 import pytest
+from aiosqlitepool import SQLiteConnectionPool
 from parametrize_from_file import parametrize
-
+from starlette.testclient import TestClient
+
+from woeplanet.spelunker.commands.schema import create_databases
+from woeplanet.spelunker.commands.search_index import build_search_index
+from woeplanet.spelunker.commands.spatial_index import build_spatial_index
+from woeplanet.spelunker.config.geometry_tiers import GEOMETRY_TIERS
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.dependencies.cache import close_cache, init_cache
 from woeplanet.spelunker.dependencies.database import (
+    CacheFills,
     Database,
+    Degradable,
     PaginatedResult,
     PlaceFilters,
     SearchFilters,
+    create_connection_factory,
+    gather_db,
 )
+from woeplanet.spelunker.dependencies.query_budget import install_query_budget
+from woeplanet.spelunker.server import app
 
 WOEID_LONDON = 44418
 WOEID_NEW_YORK = 2459115
@@ -36,6 +58,29 @@ LAT_LONDON = 51.5074
 LNG_LONDON = -0.1278
 NEARBY_DISTANCE = 5000
 
+# places for vector tiles, as (woe_id, placetype_id, lat, lng, sw_lat, sw_lng, ne_lat, ne_lng); the first crosses the
+# antimeridian, the second is larger than the third, and the fourth is the second's bounds with another placetype
+TILE_PLACES = (
+    (1001, PLACETYPE_ID_COUNTRY, -17.0, 178.5, -20.0, 177.0, -12.0, -178.0),
+    (1002, PLACETYPE_ID_COUNTRY, 5.0, 5.0, 0.0, 0.0, 10.0, 10.0),
+    (1003, PLACETYPE_ID_COUNTRY, 1.5, 1.5, 1.0, 1.0, 2.0, 2.0),
+    (1004, PLACETYPE_ID_TOWN, 5.0, 5.0, 0.0, 0.0, 10.0, 10.0),
+)
+# places for search, as (woe_id, placetype_id, name); the towns' names match better than the country's, which is larger
+SEARCH_PLACES = (
+    (2001, PLACETYPE_ID_COUNTRY, 'Springfield Republic'),
+    *((2002 + town, PLACETYPE_ID_TOWN, 'Springfield') for town in range(SMALL_LIMIT * 2)),
+)
+# a count that runs for a good part of a second, well over SHORT_BUDGET
+SLOW_COUNT = 2_000_000
+SHORT_BUDGET = 0.01
+# every place but the last two towns is superseded, so the best matches are filtered out
+SEARCH_SUPERSEDED = tuple(woe_id for woe_id, *_ in SEARCH_PLACES[:-2])
+TILE_BOUNDS_EAST_OF_ANTIMERIDIAN = (-180.0, -20.0, -179.0, -10.0)
+TILE_BOUNDS_WEST_OF_ANTIMERIDIAN = (179.0, -20.0, 180.0, -10.0)
+TILE_BOUNDS_EMPTY = (20.0, -20.0, 30.0, -10.0)
+TILE_BOUNDS_NESTED = (0.0, 0.0, 10.0, 10.0)
+
 
 @pytest.fixture
 def default_place_filters() -> PlaceFilters:
@@ -92,6 +137,85 @@ def default_search_filters() -> SearchFilters:
     )
 
 
+@pytest.fixture
+async def tile_db(tmp_path: Path) -> AsyncIterator[Database]:
+    """
+    A Database on new databases holding only TILE_PLACES, and their spatial index.
+    """
+
+    db_path, geom_db_path = tmp_path / 'woeplanet.db', tmp_path / 'geometries.db'
+    create_databases(db_path, geom_db_path)
+    places_conn = sqlite3.connect(str(db_path))
+    places_conn.executemany(
+        'INSERT INTO places (woe_id, name, placetype_id) VALUES (?, ?, ?)',
+        [(woe_id, f'Place {woe_id}', placetype_id) for woe_id, placetype_id, *_ in TILE_PLACES],
+    )
+    places_conn.commit()
+    places_conn.close()
+
+    geom_conn = sqlite3.connect(str(geom_db_path))
+    geom_conn.executemany(
+        'INSERT INTO geometries (woe_id, lat, lng, sw_lat, sw_lng, ne_lat, ne_lng) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(woe_id, *bounds) for woe_id, _, *bounds in TILE_PLACES],
+    )
+    geom_conn.commit()
+    geom_conn.close()
+
+    build_spatial_index(db_path, geom_db_path)
+
+    factory = await create_connection_factory(db_path, geom_db_path)
+    conn = await factory()
+    yield Database(conn)
+    await conn.close()
+
+
+@pytest.fixture
+async def search_db(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    request: pytest.FixtureRequest,
+) -> AsyncIterator[Database]:
+    """
+    A Database on new databases holding only SEARCH_PLACES, and their search index, superseding any indirect WOE IDs.
+    """
+
+    db_path, geom_db_path = tmp_path / 'woeplanet.db', tmp_path / 'geometries.db'
+    create_databases(db_path, geom_db_path)
+    places_conn = sqlite3.connect(str(db_path))
+    places_conn.executemany(
+        'INSERT INTO placetypes (id, name, shortname) VALUES (?, ?, ?)',
+        [(PLACETYPE_ID_COUNTRY, 'Country', 'country'), (PLACETYPE_ID_TOWN, 'Town', 'town')],
+    )
+    places_conn.executemany('INSERT INTO places (woe_id, placetype_id, name) VALUES (?, ?, ?)', SEARCH_PLACES)
+    places_conn.executemany(
+        "INSERT INTO aliases (woe_id, name, name_type) VALUES (?, ?, 'S')",
+        [(woe_id, name) for woe_id, _, name in SEARCH_PLACES],
+    )
+    places_conn.execute("INSERT INTO aliases_fts (aliases_fts) VALUES ('rebuild')")
+    places_conn.executemany(
+        'INSERT INTO changes (woe_id, superseded_by) VALUES (?, ?)',
+        [(woe_id, SEARCH_PLACES[-1][0]) for woe_id in getattr(request, 'param', ())],
+    )
+    places_conn.commit()
+    places_conn.close()
+
+    geom_conn = sqlite3.connect(str(geom_db_path))
+    geom_conn.executemany(
+        'INSERT INTO geometries (woe_id, lat, lng) VALUES (?, 1.0, 1.0)',
+        [(woe_id,) for woe_id, *_ in SEARCH_PLACES],
+    )
+    geom_conn.commit()
+    geom_conn.close()
+
+    build_search_index(db_path)
+
+    factory = await create_connection_factory(db_path, geom_db_path)
+    conn = await factory()
+    monkeypatch.setattr(Database, '_search_index', True)
+    yield Database(conn)
+    await conn.close()
+
+
 class TestGetPlaceById:
     """
     Tests for the get_place_by_id method.
@@ -203,6 +327,22 @@ class TestGetPlaceById:
         assert result is not None
         assert 'hierarchy' in result
 
+    async def test_get_place_related_fields(self, db: Database, default_place_filters: PlaceFilters) -> None:
+        """
+        Related WOEIDs should be lists, the hierarchy a dict per level and aliases grouped by language.
+        """
+
+        result = await db.get_place_by_id(WOEID_LONDON, default_place_filters)
+
+        assert result is not None
+        assert all(isinstance(woe_id, int) for woe_id in result['ancestors'])
+        assert isinstance(result['neighbours'], list)
+        assert isinstance(result['children'], list)
+        assert set(result['hierarchy']) == {'continent', 'country', 'state', 'county', 'local_admin'}
+        assert result['hierarchy']['country']['woe_id'] == WOEID_UNITED_KINGDOM
+        assert 'ENG' in result['aliases']
+        assert not any(key.startswith('hierarchy_') for key in result)
+
     async def test_get_place_with_names(self, db: Database) -> None:
         """
         Place with names filter should include aliases.
@@ -335,6 +475,109 @@ class TestGetPlaceById:
         assert result is None
 
 
+class TestGetPlaceGeometry:
+    """
+    Tests for the get_place_geometry method.
+    """
+
+    async def test_get_place_geometry_full_resolution(self, db: Database) -> None:
+        """
+        No tier should return the full resolution GeoJSON geometry.
+        """
+
+        result = await db.get_place_geometry(WOEID_UNITED_KINGDOM)
+
+        assert result is not None
+        assert '"coordinates"' in result
+
+    async def test_get_place_geometry_simplified_is_smaller(self, db: Database) -> None:
+        """
+        The coarsest tier should return a smaller geometry than full resolution.
+        """
+
+        full = await db.get_place_geometry(WOEID_UNITED_KINGDOM)
+        simplified = await db.get_place_geometry(WOEID_UNITED_KINGDOM, tier=GEOMETRY_TIERS[0])
+
+        assert full is not None
+        assert simplified is not None
+        assert len(simplified) < len(full)
+
+    async def test_get_place_geometry_not_found(self, db: Database) -> None:
+        """
+        Non-existent WOE ID should return None.
+        """
+
+        result = await db.get_place_geometry(WOEID_NOT_FOUND, tier=GEOMETRY_TIERS[0])
+
+        assert result is None
+
+
+class TestGetTilePlaces:
+    """
+    Tests for the get_tile_places method, with and without the spatial index.
+    """
+
+    @pytest.fixture(params=[True, False], ids=['indexed', 'bounds'])
+    def spatial_index(self, request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+        """
+        Whether the spatial index is used.
+        """
+
+        monkeypatch.setattr(Database, '_spatial_index', request.param)
+        return bool(request.param)
+
+    @pytest.mark.usefixtures('spatial_index')
+    @pytest.mark.parametrize('bounds', [TILE_BOUNDS_EAST_OF_ANTIMERIDIAN, TILE_BOUNDS_WEST_OF_ANTIMERIDIAN])
+    async def test_get_tile_places_across_antimeridian(
+        self,
+        tile_db: Database,
+        default_search_filters: SearchFilters,
+        bounds: tuple[float, float, float, float],
+    ) -> None:
+        """
+        A place whose bounds cross the antimeridian should be in tiles on both sides of it.
+        """
+
+        result = await tile_db.get_tile_places(PLACETYPE_ID_COUNTRY, bounds, filters=default_search_filters)
+
+        assert [place['woe_id'] for place in result] == [1001]
+
+    @pytest.mark.usefixtures('spatial_index')
+    async def test_get_tile_places_outside_bounds(
+        self,
+        tile_db: Database,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        Bounds that no place's bounds intersect should have no places.
+        """
+
+        result = await tile_db.get_tile_places(PLACETYPE_ID_COUNTRY, TILE_BOUNDS_EMPTY, filters=default_search_filters)
+
+        assert result == []
+
+    @pytest.mark.usefixtures('spatial_index')
+    async def test_get_tile_places_largest_first(
+        self,
+        tile_db: Database,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        Places should be ordered by the area of their bounds, so a limit keeps the largest, of the placetype only.
+        """
+
+        result = await tile_db.get_tile_places(PLACETYPE_ID_COUNTRY, TILE_BOUNDS_NESTED, filters=default_search_filters)
+        limited = await tile_db.get_tile_places(
+            PLACETYPE_ID_COUNTRY,
+            TILE_BOUNDS_NESTED,
+            filters=default_search_filters,
+            limit=1,
+        )
+
+        assert [place['woe_id'] for place in result] == [1002, 1003]
+        assert [place['woe_id'] for place in limited] == [1002]
+
+
 class TestInflateAliases:
     """
     Tests for the inflate_aliases method.
@@ -346,9 +589,9 @@ class TestInflateAliases:
         """
 
         aliases = [
-            {'name': 'London', 'name_type': 'S', 'language': 'ENG'},
-            {'name': 'Londres', 'name_type': 'S', 'language': 'FRA'},
-            {'name': 'LON', 'name_type': 'A', 'language': 'ENG'},
+            ('London', 'S', 'ENG'),
+            ('Londres', 'S', 'FRA'),
+            ('LON', 'A', 'ENG'),
         ]
         result = db.inflate_aliases(aliases)
 
@@ -949,6 +1192,27 @@ class TestSearchPlaces:
 
         assert isinstance(result, PaginatedResult)
 
+    @pytest.mark.parametrize('sort', ['woeid', 'relevance'])
+    async def test_search_places_shows_matched_alias(
+        self,
+        db: Database,
+        default_search_filters: SearchFilters,
+        sort: str,
+    ) -> None:
+        """
+        Each result's alias should be the name that matched, not the place's canonical name.
+        """
+
+        result = await db.search_places(
+            'Londres',
+            filters=default_search_filters,
+            sort=sort,
+            limit=DEFAULT_LIMIT,
+        )
+
+        assert result.items
+        assert all('londres' in item['alias_name'].casefold() for item in result.items)
+
     async def test_search_places_empty_query_returns_empty(
         self,
         db: Database,
@@ -967,6 +1231,156 @@ class TestSearchPlaces:
         assert isinstance(result, PaginatedResult)
         assert len(result.items) == 0
 
+    async def test_search_places_by_relevance_is_scored(
+        self,
+        db: Database,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        Relevance sorted results should be ordered by score, then WOE ID.
+        """
+
+        result = await db.search_places(
+            'London',
+            filters=default_search_filters,
+            sort='relevance',
+            limit=DEFAULT_LIMIT,
+        )
+
+        keys = [(item['score'], item['woe_id']) for item in result.items]
+        assert keys
+        assert keys == sorted(keys)
+
+    async def test_search_places_by_relevance_cursor(
+        self,
+        db: Database,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        The next relevance sorted page should follow on from the last item's (score, woe_id) cursor.
+        """
+
+        first = await db.search_places(
+            'London',
+            filters=default_search_filters,
+            sort='relevance',
+            limit=DEFAULT_LIMIT,
+        )
+        last = first.items[-1]
+
+        second = await db.search_places(
+            'London',
+            filters=default_search_filters,
+            sort='relevance',
+            after=last['woe_id'],
+            after_score=last['score'],
+            limit=DEFAULT_LIMIT,
+        )
+
+        first_ids = {item['woe_id'] for item in first.items}
+        assert all((item['score'], item['woe_id']) > (last['score'], last['woe_id']) for item in second.items)
+        assert not first_ids & {item['woe_id'] for item in second.items}
+
+    async def test_search_places_by_woeid_pages_back(
+        self,
+        db: Database,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        WOE ID sorted pages should hold each place once, and paging back should return the previous page.
+        """
+
+        first = await db.search_places('London', filters=default_search_filters, limit=DEFAULT_LIMIT)
+        first_ids = [item['woe_id'] for item in first.items]
+        assert first_ids == sorted(set(first_ids))
+
+        second = await db.search_places(
+            'London',
+            filters=default_search_filters,
+            after=first_ids[-1],
+            limit=DEFAULT_LIMIT,
+        )
+        previous = await db.search_places(
+            'London',
+            filters=default_search_filters,
+            before=second.items[0]['woe_id'],
+            limit=DEFAULT_LIMIT,
+        )
+
+        assert [item['woe_id'] for item in previous.items] == first_ids
+
+    @pytest.mark.parametrize('sort', ['relevance', 'woeid'])
+    async def test_search_places_pages_are_full(
+        self,
+        db: Database,
+        default_search_filters: SearchFilters,
+        sort: str,
+    ) -> None:
+        """
+        Filtering happens before the page limit, so a page with more to follow should be full, and enriched.
+        """
+
+        result = await db.search_places('London', filters=default_search_filters, sort=sort, limit=SMALL_LIMIT)
+
+        assert result.has_more
+        assert len(result.items) == SMALL_LIMIT
+        assert all('placetype_name' in item and 'country_name' in item for item in result.items)
+
+    async def test_search_places_by_relevance_boosts_every_match(
+        self,
+        search_db: Database,
+        default_search_filters: SearchFilters,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        A larger place should rank first, though more smaller places' names match better than relevance ranks.
+        """
+
+        monkeypatch.setattr('woeplanet.spelunker.dependencies.database.RELEVANCE_CANDIDATES', SMALL_LIMIT)
+
+        result = await search_db.search_places(
+            'Springfield',
+            filters=default_search_filters,
+            sort='relevance',
+            limit=SMALL_LIMIT,
+        )
+
+        assert result.items[0]['woe_id'] == SEARCH_PLACES[0][0]
+
+
+class TestSearchPlacesRankedCount:
+    """
+    Tests for the search_places_ranked_count method.
+    """
+
+    @pytest.mark.parametrize('search_db', [SEARCH_SUPERSEDED], indirect=True)
+    @pytest.mark.parametrize('search_index', [True, False])
+    async def test_counts_places_relevance_reaches(
+        self,
+        search_db: Database,
+        default_search_filters: SearchFilters,
+        monkeypatch: pytest.MonkeyPatch,
+        search_index: bool,  # noqa: FBT001
+    ) -> None:
+        """
+        Only the places relevance pages reach should be counted, though filtered out matches are its best matches.
+        """
+
+        monkeypatch.setattr('woeplanet.spelunker.dependencies.database.RELEVANCE_CANDIDATES', SMALL_LIMIT)
+        monkeypatch.setattr(Database, '_search_index', search_index)
+
+        ranked = await search_db.search_places_ranked_count('Springfield', filters=default_search_filters)
+        total = await search_db.search_places_count('Springfield', filters=default_search_filters)
+        result = await search_db.search_places(
+            'Springfield',
+            filters=default_search_filters,
+            sort='relevance',
+            limit=LARGE_LIMIT,
+        )
+
+        assert ranked == len(result.items)
+        assert ranked < total
+
 
 class TestSearchPlacesCount:
     """
@@ -990,6 +1404,22 @@ class TestSearchPlacesCount:
         assert isinstance(result, int)
         assert result > 0
 
+    async def test_search_places_count_counts_every_match(
+        self,
+        search_db: Database,
+        default_search_filters: SearchFilters,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        Every matching place should be counted, not only those relevance ranks.
+        """
+
+        monkeypatch.setattr('woeplanet.spelunker.dependencies.database.RELEVANCE_CANDIDATES', SMALL_LIMIT)
+
+        result = await search_db.search_places_count('Springfield', filters=default_search_filters)
+
+        assert result == len(SEARCH_PLACES)
+
 
 class TestGetPlacetypes:
     """
@@ -1156,3 +1586,91 @@ class TestGetPlacesNearCentroidCount:
 
         assert isinstance(result, int)
         assert result >= 0
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[Any]:
+    """
+    A disk cache, closed afterwards.
+    """
+
+    yield init_cache(tmp_path)
+    close_cache()
+
+
+@pytest.fixture
+async def slow_count_request(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[MagicMock]:
+    """
+    A request, with the short count budget, to an app whose pooled connections count SLOW_COUNT for every count query.
+    """
+
+    async def slow_count_query(self: Database, *_parts: object) -> int:
+        query = 'WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r WHERE x < ?) SELECT COUNT(*) FROM r'
+        row = await self._fetch_one(query, [SLOW_COUNT])
+        return int(row[0]) if row else 0
+
+    async def connection_factory() -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(':memory:')
+        await install_query_budget(conn)
+        return conn
+
+    monkeypatch.setattr(Database, '_do_count_query', slow_count_query)
+    monkeypatch.setattr(get_settings(), 'woeplanet_count_budget', SHORT_BUDGET)
+
+    request = MagicMock()
+    request.app.state.db_pool = SQLiteConnectionPool(connection_factory=connection_factory, pool_size=2)
+    request.is_disconnected = AsyncMock(return_value=False)
+    yield request
+    await request.app.state.db_pool.close()
+
+
+class TestGatherDb:
+    """
+    Tests for the gather_db helper.
+    """
+
+    async def test_cached_query_over_budget_fills_cache(
+        self,
+        cache: Any,  # noqa: ANN401
+        slow_count_request: MagicMock,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        A cached Degradable query over the budget should return its fallback, then fill the cache in the background.
+        """
+
+        _ = cache
+        query = Degradable(
+            lambda db: db.get_places_by_country_count(
+                country_woe_id=WOEID_UNITED_KINGDOM,
+                filters=default_search_filters,
+            ),
+            cached=True,
+        )
+
+        (degraded,) = await gather_db(query, request=slow_count_request)
+        await asyncio.gather(*CacheFills.tasks)
+        (cached,) = await gather_db(query, request=slow_count_request)
+
+        assert degraded is None
+        assert cached == SLOW_COUNT
+
+    async def test_gather_db_returns_results_in_order(
+        self,
+        client: TestClient,
+        default_search_filters: SearchFilters,
+    ) -> None:
+        """
+        Each query's result should be returned in the order the queries were given.
+        """
+
+        _ = client  # ensure lifespan has run
+        total, result = await gather_db(
+            lambda db: db.search_places_count('London', filters=default_search_filters),
+            lambda db: db.search_places('London', filters=default_search_filters, limit=DEFAULT_LIMIT),
+            app=app,
+        )
+
+        assert isinstance(total, int)
+        assert isinstance(result, PaginatedResult)
+        assert total >= len(result.items)
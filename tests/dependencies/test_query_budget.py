@@ -0,0 +1,117 @@
+"""
+WOEplanet Spelunker: tests package; query budget tests.
+"""
+
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import aiosqlite
+import pytest
+
+from woeplanet.spelunker.dependencies.query_budget import (
+    QueryInterruptedError,
+    install_query_budget,
+    query_budget,
+    suspend_query_budget,
+)
+
+# counts for a good part of a second, well over SHORT_BUDGET
+SLOW_QUERY = 'WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r WHERE x < 1000000) SELECT COUNT(*) FROM r'
+# counts forever, until interrupted
+ENDLESS_QUERY = 'WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r) SELECT COUNT(*) FROM r'
+SHORT_BUDGET = 0.1
+GENEROUS_BUDGET = 10.0
+
+
+@pytest.fixture
+async def conn() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    In-memory connection with a query budget installed.
+    """
+
+    conn = await aiosqlite.connect(':memory:')
+    await install_query_budget(conn)
+    yield conn
+    await conn.close()
+
+
+class TestQueryBudget:
+    """
+    Tests for the query_budget context manager.
+    """
+
+    async def test_query_over_budget_is_interrupted(self, conn: aiosqlite.Connection) -> None:
+        """
+        A query running past its budget should be interrupted promptly.
+        """
+
+        start = time.monotonic()
+        with pytest.raises(QueryInterruptedError, match='budget'):
+            async with query_budget(conn, SHORT_BUDGET):
+                await conn.execute(ENDLESS_QUERY)
+
+        assert time.monotonic() - start < GENEROUS_BUDGET
+
+    async def test_query_within_budget_completes(self, conn: aiosqlite.Connection) -> None:
+        """
+        A query within its budget should return its results.
+        """
+
+        async with query_budget(conn, GENEROUS_BUDGET):
+            cursor = await conn.execute('SELECT 1')
+            rows = list(await cursor.fetchall())
+
+        assert list(rows[0]) == [1]
+
+    async def test_budget_is_reset_after_use(self, conn: aiosqlite.Connection) -> None:
+        """
+        After an interrupted budget, the connection should run queries normally.
+        """
+
+        with pytest.raises(QueryInterruptedError):
+            async with query_budget(conn, SHORT_BUDGET):
+                await conn.execute(ENDLESS_QUERY)
+
+        cursor = await conn.execute('SELECT 2')
+        rows = list(await cursor.fetchall())
+
+        assert list(rows[0]) == [2]
+
+    async def test_client_disconnect_interrupts(self, conn: aiosqlite.Connection) -> None:
+        """
+        A query should be interrupted when its request's client disconnects, well within its budget.
+        """
+
+        request = MagicMock()
+        request.is_disconnected = AsyncMock(return_value=True)
+
+        with pytest.raises(QueryInterruptedError, match='disconnected'):
+            async with query_budget(conn, GENEROUS_BUDGET, request):
+                await conn.execute(ENDLESS_QUERY)
+
+    async def test_no_budget_runs_to_completion(self, conn: aiosqlite.Connection) -> None:
+        """
+        Without a budget, queries shouldn't be interrupted.
+        """
+
+        async with query_budget(conn, None):
+            cursor = await conn.execute('SELECT 3')
+            rows = list(await cursor.fetchall())
+
+        assert list(rows[0]) == [3]
+
+    async def test_suspended_budget_runs_to_completion(self, conn: aiosqlite.Connection) -> None:
+        """
+        While a budget is suspended, queries should run to completion, and the budget should apply again afterwards.
+        """
+
+        async with query_budget(conn, SHORT_BUDGET):
+            with suspend_query_budget(conn):
+                cursor = await conn.execute(SLOW_QUERY)
+                rows = list(await cursor.fetchall())
+            with pytest.raises(sqlite3.OperationalError, match='interrupted'):
+                await conn.execute(ENDLESS_QUERY)
+
+        assert list(rows[0]) == [1000000]
@@ -0,0 +1,577 @@
+"""
+WOEplanet Spelunker: tests package; query plan tests.
+
+Every public Database method is run, with every combination of its filters, against a database with the WOEplanet
+schema, and the EXPLAIN QUERY PLAN of each statement it runs is compared with its snapshot in test_query_plans.yml.
+Plans are compared by their shape, the tables they scan or search and the indexes they use, so the snapshots hold on
+any SQLite version. After an intended change, rewrite the snapshots with WOEPLANET_UPDATE_QUERY_PLANS=1.
+"""
+
+import hashlib
+import inspect
+import itertools
+import os
+import re
+import sqlite3
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from woeplanet.spelunker.commands.autocomplete import build_autocomplete_index
+from woeplanet.spelunker.commands.schema import create_databases
+from woeplanet.spelunker.commands.search_index import build_search_index
+from woeplanet.spelunker.commands.simplify import build_simplified_geometries
+from woeplanet.spelunker.commands.spatial_index import build_spatial_index
+from woeplanet.spelunker.config.geometry_tiers import GEOMETRY_TIERS
+from woeplanet.spelunker.dependencies.cache import CacheHolder
+from woeplanet.spelunker.dependencies.database import (
+    PLACE_RELATIONS,
+    Database,
+    PlaceFilters,
+    PlaceQueryShape,
+    SearchFilters,
+    create_connection_factory,
+)
+from woeplanet.spelunker.dependencies.slow_queries import SlowQueryLog, SlowQueryLogHolder
+
+SNAPSHOT_PATH = Path(__file__).with_name('test_query_plans.yml')
+UPDATE_SNAPSHOTS_ENV = 'WOEPLANET_UPDATE_QUERY_PLANS'
+
+# one of each row a method needs to run all its statements: a country to look up and a place to pick at random
+PLACETYPE_ROW = (7, 'Town', 'Town')
+PLACE_ROW = (44418, 'GB', 'London', 'ENG', 7, 23424975)
+COUNTRY_ROW = (23424975, 'United Kingdom', 'GB', 'GBR')
+GEOMETRY_ROW = (44418, 51.5074, -0.1278)
+
+WOEID = 44418
+ISO = 'GB'
+PLACETYPE = 'town'
+PLACETYPE_ID = 7
+QUERY_TEXT = 'london'
+NAME_TYPE = 'S'
+SCORE = 1.0
+SHORT_KEY = 'lo'
+LONG_KEY = 'londo'
+BOUNDS = (-1.0, 51.0, 1.0, 52.0)
+LAT = 51.5074
+LNG = -0.1278
+DISTANCE = 5000
+PLAN_LOG_SIZE = 100
+
+# full scans of tables that are expected, by method; any other fails. Scans of subqueries and CTEs are of rows already
+# found, and virtual table scans are full text and json_each lookups, so neither is checked
+EXPECTED_SCANS: dict[str, set[str]] = {
+    # placetypes, countries and licenses are a few hundred rows at most
+    'get_placetypes': {'SCAN placetypes'},
+    'get_licenses': {'SCAN licenses'},
+    'get_country_by_iso': {'SCAN countries'},
+    'get_placetypes_by_country': {'SCAN countries'},
+    'get_countries_facets': {'SCAN c'},
+    # counts over every place, which are cached
+    'get_total_woeids': {'SCAN p', 'SCAN places'},
+    'get_placetype_facets': {'SCAN p'},
+    # places without coordinates can only be found by walking every place
+    'get_nullisland_places': {'SCAN p'},
+    'get_nullisland_places_count': {'SCAN p'},
+    'get_nullisland_placetype_facets': {'SCAN p'},
+}
+
+# a plan step's operation and table, and the index it uses; the rest of a step varies between SQLite versions
+PLAN_STEP = re.compile(
+    r'(?P<operation>SCAN|SEARCH) (?P<table>\S+)'
+    r'(?: USING (?:AUTOMATIC )?(?:PARTIAL )?(?:COVERING )?(?P<index>INDEX \w+|INTEGER PRIMARY KEY|PRIMARY KEY)'
+    r'| (?P<virtual>VIRTUAL TABLE))?',
+)
+
+Call = Callable[[Database], Awaitable[object]]
+Method = Callable[..., Awaitable[object]]
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    """
+    A Database method call, and the optional tables the database it's run against has.
+    """
+
+    call: Call
+    search_index: bool = True
+    autocomplete_index: bool = True
+    simplified_geometries: bool = True
+    spatial_index: bool = True
+
+
+def _case_id(**flags: bool) -> str:
+    """
+    Name a combination of filters by the ones that are set
+    """
+
+    return '+'.join(name for name, value in flags.items() if value) or 'none'
+
+
+SEARCH_FILTERS = {
+    _case_id(deprecated=deprecated, unknown=unknown, null_island=null_island): SearchFilters(
+        deprecated=deprecated,
+        unknown=unknown,
+        null_island=null_island,
+    )
+    for deprecated, unknown, null_island in itertools.product((False, True), repeat=3)
+}
+
+CURSORS: dict[str, dict[str, Any]] = {'first': {}, 'after': {'after': WOEID}, 'before': {'before': WOEID}}
+SCORE_CURSORS: dict[str, dict[str, Any]] = {
+    'first': {},
+    'after': {'after': WOEID, 'after_score': SCORE},
+    'before': {'before': WOEID, 'before_score': SCORE},
+}
+
+TIERS = {'full': None, 'simplified': GEOMETRY_TIERS[0], 'unsimplified': GEOMETRY_TIERS[0]}
+
+# the PlaceFilters that shape the place statement, and those that shape its related WOEIDs and aliases statement
+PLACE_STATEMENT_FLAGS = tuple(
+    f.name
+    for f in fields(PlaceQueryShape)
+    if f.name not in {'names', *(relation for relation, _, _ in PLACE_RELATIONS)}
+)
+RELATED_STATEMENT_FLAGS = (*(relation for relation, _, _ in PLACE_RELATIONS), 'names')
+
+
+def _place_filters(**flags: bool) -> PlaceFilters:
+    """
+    Place filters with only the given flags set, and placetypes excluded only if exclude_placetypes is
+    """
+
+    exclude_placetypes = [0, 11, 25] if flags.pop('exclude_placetypes', False) else []
+    unset = {f.name: False for f in fields(PlaceFilters) if f.name != 'exclude_placetypes'}
+    return PlaceFilters(**{**unset, **flags}, exclude_placetypes=exclude_placetypes)
+
+
+def _call(method: Method, /, *args: object, **kwargs: object) -> Call:
+    """
+    A call of a Database method, with its arguments bound
+    """
+
+    async def call(db: Database) -> object:
+        return await method(db, *args, **kwargs)
+
+    return call
+
+
+def _place_by_id_cases() -> dict[str, PlanCase]:
+    """
+    Every place statement shape, without related statements, then every related statement shape
+    """
+
+    cases = {}
+    for names in (PLACE_STATEMENT_FLAGS, RELATED_STATEMENT_FLAGS):
+        for values in itertools.product((False, True), repeat=len(names)):
+            flags = dict(zip(names, values, strict=True))
+            cases[_case_id(**flags)] = PlanCase(_call(Database.get_place_by_id, WOEID, _place_filters(**flags)))
+
+    return cases
+
+
+def _tiered_cases(method: Method, *args: object) -> dict[str, PlanCase]:
+    """
+    A call for each geometry tier, simplified on the fly if the simplify command hasn't been run
+    """
+
+    return {
+        tier_id: PlanCase(_call(method, *args, tier=tier), simplified_geometries=tier_id != 'unsimplified')
+        for tier_id, tier in TIERS.items()
+    }
+
+
+def _filtered_cases(method: Method, *args: object, **kwargs: object) -> dict[str, PlanCase]:
+    """
+    A call for each combination of search filters
+    """
+
+    return {
+        filters_id: PlanCase(_call(method, *args, filters=filters, **kwargs))
+        for filters_id, filters in SEARCH_FILTERS.items()
+    }
+
+
+def _search_cases() -> dict[str, PlanCase]:
+    """
+    A search for each index, sort, name type, cursor and combination of search filters
+    """
+
+    cases = {}
+    for indexed, sort, name_type, filters_id in itertools.product(
+        (True, False),
+        ('woeid', 'relevance'),
+        (None, NAME_TYPE),
+        SEARCH_FILTERS,
+    ):
+        cursors = SCORE_CURSORS if sort == 'relevance' else CURSORS
+        for cursor_id, cursor in cursors.items():
+            case_id = '/'.join(
+                ('indexed' if indexed else 'aliases', sort, name_type or 'any', cursor_id, filters_id),
+            )
+            cases[case_id] = PlanCase(
+                _call(
+                    Database.search_places,
+                    QUERY_TEXT,
+                    name_type=name_type,
+                    filters=SEARCH_FILTERS[filters_id],
+                    sort=sort,
+                    **cursor,
+                ),
+                search_index=indexed,
+            )
+
+    return cases
+
+
+def _search_count_cases(method: Method) -> dict[str, PlanCase]:
+    """
+    A search count for each index, name type and combination of search filters
+    """
+
+    return {
+        '/'.join(('indexed' if indexed else 'aliases', name_type or 'any', filters_id)): PlanCase(
+            _call(method, QUERY_TEXT, name_type=name_type, filters=SEARCH_FILTERS[filters_id]),
+            search_index=indexed,
+        )
+        for indexed, name_type, filters_id in itertools.product(
+            (True, False),
+            (None, NAME_TYPE),
+            SEARCH_FILTERS,
+        )
+    }
+
+
+def _paginated_cases(
+    method: Method,
+    *args: object,
+    variants: tuple[dict[str, Any], ...] = ({},),
+) -> dict[str, PlanCase]:
+    """
+    A paginated call for each variant, cursor and combination of search filters
+    """
+
+    return {
+        '/'.join(filter(None, (*(str(v) for v in variant.values()), cursor_id, filters_id))): PlanCase(
+            _call(method, *args, filters=filters, **variant, **cursor),
+        )
+        for variant in variants
+        for cursor_id, cursor in CURSORS.items()
+        for filters_id, filters in SEARCH_FILTERS.items()
+    }
+
+
+METHOD_CASES: dict[str, Callable[[], dict[str, PlanCase]]] = {
+    'get_place_by_id': _place_by_id_cases,
+    'get_place_geometry': lambda: _tiered_cases(Database.get_place_geometry, WOEID),
+    'get_tile_places': lambda: {
+        f'{"indexed" if indexed else "bounds"}/{tier_id}/{filters_id}': PlanCase(
+            _call(Database.get_tile_places, PLACETYPE_ID, BOUNDS, filters=filters, tier=tier),
+            simplified_geometries=tier_id != 'unsimplified',
+            spatial_index=indexed,
+        )
+        for indexed in (True, False)
+        for tier_id, tier in TIERS.items()
+        for filters_id, filters in SEARCH_FILTERS.items()
+    },
+    'inflate_place_ids': lambda: {'none': PlanCase(_call(Database.inflate_place_ids, [WOEID]))},
+    'get_countries_facets': lambda: _filtered_cases(Database.get_countries_facets),
+    'get_total_woeids': lambda: _filtered_cases(Database.get_total_woeids),
+    'get_placetype_facets': lambda: _filtered_cases(Database.get_placetype_facets),
+    'get_places_by_placetype': lambda: _paginated_cases(Database.get_places_by_placetype, PLACETYPE_ID),
+    'get_places_by_placetype_count': lambda: _filtered_cases(Database.get_places_by_placetype_count, PLACETYPE_ID),
+    'get_country_by_iso': lambda: {'none': PlanCase(_call(Database.get_country_by_iso, ISO))},
+    'get_places_by_country': lambda: _paginated_cases(
+        Database.get_places_by_country,
+        COUNTRY_ROW[0],
+        variants=({'placetype': None}, {'placetype': PLACETYPE}),
+    ),
+    'get_places_by_country_count': lambda: {
+        f'{placetype}/{filters_id}': PlanCase(
+            _call(
+                Database.get_places_by_country_count,
+                country_woe_id=COUNTRY_ROW[0],
+                filters=filters,
+                placetype=placetype,
+            ),
+        )
+        for placetype in (None, PLACETYPE)
+        for filters_id, filters in SEARCH_FILTERS.items()
+    },
+    'get_placetypes_by_country': lambda: _filtered_cases(Database.get_placetypes_by_country, iso2=ISO),
+    'get_nullisland_places': lambda: _paginated_cases(Database.get_nullisland_places),
+    'get_nullisland_places_count': lambda: _filtered_cases(Database.get_nullisland_places_count),
+    'get_nullisland_placetype_facets': lambda: _filtered_cases(Database.get_nullisland_placetype_facets),
+    'search_places': _search_cases,
+    'search_places_count': lambda: _search_count_cases(Database.search_places_count),
+    'search_places_ranked_count': lambda: _search_count_cases(Database.search_places_ranked_count),
+    'autocomplete': lambda: {
+        'prefixes': PlanCase(_call(Database.autocomplete, SHORT_KEY)),
+        'names': PlanCase(_call(Database.autocomplete, LONG_KEY)),
+        'aliases': PlanCase(_call(Database.autocomplete, LONG_KEY), autocomplete_index=False),
+    },
+    'get_placetypes': lambda: {'none': PlanCase(_call(Database.get_placetypes))},
+    'get_licenses': lambda: {'none': PlanCase(_call(Database.get_licenses))},
+    'get_random_place': lambda: {
+        _case_id(null_island=null_island, deprecated=deprecated, exclude_placetypes=exclude): PlanCase(
+            _call(
+                Database.get_random_place,
+                _place_filters(null_island=null_island, deprecated=deprecated, exclude_placetypes=exclude),
+            ),
+        )
+        for null_island, deprecated, exclude in itertools.product((False, True), repeat=3)
+    },
+    'get_places_near_centroid': lambda: _filtered_cases(Database.get_places_near_centroid, LAT, LNG, DISTANCE),
+    'get_places_near_centroid_count': lambda: _filtered_cases(
+        Database.get_places_near_centroid_count,
+        LAT,
+        LNG,
+        DISTANCE,
+    ),
+}
+
+
+def build_plan_databases(db_path: Path, geom_db_path: Path) -> None:
+    """
+    Build databases with the full schema, every optional table, and a row of each kind the methods look up
+    """
+
+    create_databases(db_path, geom_db_path)
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute('INSERT INTO placetypes (id, name, shortname) VALUES (?, ?, ?)', PLACETYPE_ROW)
+    conn.execute('INSERT INTO places VALUES (?, ?, ?, ?, ?, ?)', PLACE_ROW)
+    conn.execute('INSERT INTO countries (woe_id, name, iso2, iso3) VALUES (?, ?, ?, ?)', COUNTRY_ROW)
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(str(geom_db_path))
+    conn.execute('INSERT INTO geometries (woe_id, lat, lng) VALUES (?, ?, ?)', GEOMETRY_ROW)
+    conn.commit()
+    conn.close()
+
+    build_search_index(db_path)
+    build_autocomplete_index(db_path)
+    build_spatial_index(db_path, geom_db_path)
+    build_simplified_geometries(geom_db_path)
+
+
+def load_snapshots() -> dict[str, Any]:
+    """
+    Load the query plan snapshots
+    """
+
+    if not SNAPSHOT_PATH.exists():
+        return {}
+
+    return yaml.safe_load(SNAPSHOT_PATH.read_text()) or {}
+
+
+class SnapshotDumper(yaml.SafeDumper):
+    """
+    Dumps snapshots with shared plans' anchors named for their steps, so rewriting one method's doesn't rename others'.
+    """
+
+    def generate_anchor(self, node: yaml.Node) -> str:
+        """
+        Name an anchor for its plan's steps
+        """
+
+        steps = '\n'.join(str(step.value) for step in node.value)
+        return f'plan-{hashlib.sha256(steps.encode()).hexdigest()[:12]}'
+
+
+def save_snapshots(method: str, plans: dict[str, list[list[str] | None]]) -> None:
+    """
+    Rewrite one method's query plan snapshots; identical plans are written once, and referred to by YAML aliases
+    """
+
+    shared: dict[tuple[str, ...], list[str]] = {}
+    for statements in plans.values():
+        for index, plan in enumerate(statements):
+            if plan is not None:
+                statements[index] = shared.setdefault(tuple(plan), plan)
+
+    snapshots = load_snapshots()
+    snapshots[method] = plans
+    ordered = {
+        'sqlite_version': sqlite3.sqlite_version,
+        **{key: snapshots[key] for key in sorted(snapshots) if key != 'sqlite_version'},
+    }
+    header = f'# EXPLAIN QUERY PLAN snapshots; rewrite with {UPDATE_SNAPSHOTS_ENV}=1\n'
+    snapshot = yaml.dump(ordered, Dumper=SnapshotDumper, sort_keys=False, allow_unicode=True, width=100)
+    SNAPSHOT_PATH.write_text(header + snapshot)
+
+
+def _subqueries(steps: list[str]) -> set[str]:
+    """
+    Get the names of the subqueries and CTEs a plan's steps run, whose scans are of rows they've already found
+    """
+
+    return {step.split(' ', 1)[1] for step in steps if step.startswith(('CO-ROUTINE ', 'MATERIALIZE '))}
+
+
+def plan_shape(plan: list[str] | None) -> list[str] | None:
+    """
+    Reduce a query plan to the tables it scans or searches, in order, and the indexes it uses
+    """
+
+    if plan is None:
+        return None
+
+    steps = [step.strip() for step in plan]
+    subqueries = _subqueries(steps)
+    shape = []
+    for step in steps:
+        match = PLAN_STEP.match(step)
+        if match is None or match['table'] in subqueries or match['table'].startswith('('):
+            continue
+        using = f'USING {match["index"]}' if match['index'] else match['virtual']
+        shape.append(' '.join(filter(None, (match['operation'], match['table'], using))))
+
+    return shape
+
+
+def plan_shapes(plans: dict[str, list[list[str] | None]]) -> dict[str, list[list[str] | None]]:
+    """
+    Reduce each of a method's query plans to its shape
+    """
+
+    return {case_id: [plan_shape(plan) for plan in statements] for case_id, statements in plans.items()}
+
+
+def unexpected_scans(method: str, plans: dict[str, list[list[str] | None]]) -> list[str]:
+    """
+    Find the full table scans in a method's query plans that aren't expected
+    """
+
+    expected = EXPECTED_SCANS.get(method, set())
+    unexpected: list[str] = []
+    for case_id, statements in plans.items():
+        for plan in statements:
+            steps = [step.strip() for step in plan or []]
+            subqueries = _subqueries(steps)
+            unexpected.extend(
+                f'{case_id}: {step}'
+                for step in steps
+                if step.startswith('SCAN ')
+                and 'VIRTUAL TABLE' not in step
+                and step not in {'SCAN CONSTANT ROW', *(f'SCAN {subquery}' for subquery in subqueries)}
+                and step.split(' USING ')[0] not in expected
+            )
+
+    return unexpected
+
+
+async def explain_cases(
+    db: Database,
+    log: SlowQueryLog,
+    cases: dict[str, PlanCase],
+    set_class_flag: Callable[[str, bool], None],
+) -> dict[str, list[list[str] | None]]:
+    """
+    Run each case, and get the query plan of every statement it runs, in order
+    """
+
+    plans: dict[str, list[list[str] | None]] = {}
+    for case_id, case in cases.items():
+        set_class_flag('_search_index', case.search_index)
+        set_class_flag('_autocomplete_index', case.autocomplete_index)
+        set_class_flag('_simplified_geometries', case.simplified_geometries)
+        set_class_flag('_spatial_index', case.spatial_index)
+
+        log.clear()
+        await case.call(db)
+        plans[case_id] = [entry.plan for entry in reversed(log.entries())]
+
+    return plans
+
+
+@pytest.fixture(scope='module')
+def plan_databases(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """
+    WOEplanet and geometries databases with the full schema, for query plans.
+    """
+
+    directory = tmp_path_factory.mktemp('query-plans')
+    db_path, geom_db_path = directory / 'woeplanet.db', directory / 'geometries.db'
+    build_plan_databases(db_path, geom_db_path)
+    return db_path, geom_db_path
+
+
+@pytest.fixture
+async def plan_db(plan_databases: tuple[Path, Path]) -> AsyncIterator[Database]:
+    """
+    A Database on a connection to the query plan databases, made as the app's pool makes them.
+    """
+
+    factory = await create_connection_factory(*plan_databases)
+    conn = await factory()
+    yield Database(conn)
+    await conn.close()
+
+
+@pytest.fixture
+def plan_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[SlowQueryLog]:
+    """
+    A slow query log that records every statement, with its plan; the disk cache is off, so every call runs.
+    """
+
+    log = SlowQueryLog(tmp_path / 'slow-queries', PLAN_LOG_SIZE, threshold=0.0)
+    monkeypatch.setattr(SlowQueryLogHolder, 'log', log)
+    monkeypatch.setattr(CacheHolder, 'cache', None)
+    yield log
+    log.close()
+
+
+class TestQueryPlans:
+    """
+    Tests for the query plans of every Database method.
+    """
+
+    def test_every_method_is_planned(self) -> None:
+        """
+        Every public Database method that runs statements should have its query plans checked.
+        """
+
+        methods = {
+            name for name, _ in inspect.getmembers(Database, inspect.iscoroutinefunction) if not name.startswith('_')
+        }
+
+        assert methods == set(METHOD_CASES)
+
+    @pytest.mark.parametrize('method', list(METHOD_CASES))
+    async def test_query_plans(
+        self,
+        method: str,
+        plan_db: Database,
+        plan_log: SlowQueryLog,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        A method's statements should only scan the tables expected, and plan as their snapshots do.
+        """
+
+        plans = await explain_cases(
+            plan_db,
+            plan_log,
+            METHOD_CASES[method](),
+            lambda name, value: monkeypatch.setattr(Database, name, value),
+        )
+
+        assert not unexpected_scans(method, plans)
+
+        if os.environ.get(UPDATE_SNAPSHOTS_ENV):
+            save_snapshots(method, plans)
+            return
+
+        snapshots = load_snapshots()
+        assert method in snapshots, f'{method} has no snapshot; write it with {UPDATE_SNAPSHOTS_ENV}=1'
+        assert plan_shapes(plans) == plan_shapes(snapshots[method]), (
+            f'{method} plans differently from its snapshot, of SQLite {snapshots.get("sqlite_version")}; '
+            f'after an intended change, rewrite it with {UPDATE_SNAPSHOTS_ENV}=1'
+        )
@@ -0,0 +1,100 @@
+"""
+WOEplanet Spelunker: tests package; records tests.
+"""
+
+import pickle
+import sqlite3
+from collections.abc import Iterator
+
+import pytest
+
+from woeplanet.spelunker.dependencies.records import Record
+
+WOEID_LONDON = 44418
+WOEID_PARIS = 615702
+PLACETYPE_ID_TOWN = 7
+
+
+@pytest.fixture
+def conn() -> Iterator[sqlite3.Connection]:
+    """
+    In-memory connection making Records, with a couple of places.
+    """
+
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = Record
+    conn.execute('CREATE TABLE places (woe_id INTEGER PRIMARY KEY, name TEXT, placetype_id INTEGER)')
+    conn.executemany(
+        'INSERT INTO places VALUES (?, ?, ?)',
+        [(WOEID_LONDON, 'London', PLACETYPE_ID_TOWN), (WOEID_PARIS, 'Paris', PLACETYPE_ID_TOWN)],
+    )
+    yield conn
+    conn.close()
+
+
+class TestRecord:
+    """
+    Tests for the Record row factory.
+    """
+
+    def test_reads_like_a_dict(self, conn: sqlite3.Connection) -> None:
+        """
+        A record should read, and compare, like the dict of its row.
+        """
+
+        row = conn.execute('SELECT woe_id, name FROM places WHERE woe_id = ?', (WOEID_LONDON,)).fetchone()
+
+        assert row['name'] == 'London'
+        assert row[0] == WOEID_LONDON
+        assert row.get('missing') is None
+        assert list(row) == ['woe_id', 'name']
+        assert row == {'woe_id': WOEID_LONDON, 'name': 'London'}
+        assert {**row, 'extra': 1}['extra'] == 1
+
+    def test_is_read_only(self, conn: sqlite3.Connection) -> None:
+        """
+        A record shouldn't be changed in place; callers that need to copy it into a dict.
+        """
+
+        row = conn.execute('SELECT woe_id FROM places').fetchone()
+
+        with pytest.raises(TypeError):
+            row['woe_id'] = WOEID_PARIS
+
+    def test_rows_share_columns(self, conn: sqlite3.Connection) -> None:
+        """
+        All the rows of a query should share one set of column indices.
+        """
+
+        first, second = conn.execute('SELECT woe_id, name FROM places ORDER BY woe_id').fetchall()
+
+        assert first._columns is second._columns  # noqa: SLF001
+
+    def test_queries_get_their_own_columns(self, conn: sqlite3.Connection) -> None:
+        """
+        Consecutive queries with different columns should each read their own.
+        """
+
+        first = conn.execute('SELECT woe_id, name FROM places').fetchone()
+        second = conn.execute('SELECT name, placetype_id FROM places').fetchone()
+
+        assert list(first) == ['woe_id', 'name']
+        assert list(second) == ['name', 'placetype_id']
+
+    def test_first_of_a_repeated_name(self, conn: sqlite3.Connection) -> None:
+        """
+        Like sqlite3.Row, a name selected twice should be the first column of that name.
+        """
+
+        row = conn.execute("SELECT name, 'other' as name FROM places WHERE woe_id = ?", (WOEID_PARIS,)).fetchone()
+
+        assert row['name'] == 'Paris'
+
+    def test_pickles(self, conn: sqlite3.Connection) -> None:
+        """
+        Records should survive a round trip through pickle, as disk cached results do.
+        """
+
+        rows = conn.execute('SELECT * FROM places ORDER BY woe_id').fetchall()
+
+        assert pickle.loads(pickle.dumps(rows)) == rows  # noqa: S301
@@ -0,0 +1,125 @@
+"""
+WOEplanet Spelunker: tests package; slow query log tests.
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+from woeplanet.spelunker.dependencies.cache import CacheHolder
+from woeplanet.spelunker.dependencies.database import Database
+from woeplanet.spelunker.dependencies.query_budget import QueryInterruptedError, install_query_budget, query_budget
+from woeplanet.spelunker.dependencies.slow_queries import SlowQueryLog, SlowQueryLogHolder
+
+ENDLESS_QUERY = 'WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r) SELECT COUNT(*) FROM r'
+SCAN_QUERY = 'SELECT * FROM placetypes WHERE shortname = ?'
+SHORT_BUDGET = 0.1
+LOG_SIZE = 2
+PLACETYPES = [(7, 'town', 'Town'), (12, 'country', 'Country'), (22, 'suburb', 'Suburb')]
+
+
+@pytest.fixture
+async def conn() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    In-memory connection with a query budget installed, and a few placetypes.
+    """
+
+    conn = await aiosqlite.connect(':memory:')
+    await install_query_budget(conn)
+    await conn.execute('CREATE TABLE placetypes (id INTEGER PRIMARY KEY, shortname TEXT, name TEXT)')
+    await conn.executemany('INSERT INTO placetypes VALUES (?, ?, ?)', PLACETYPES)
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture
+def slow_query_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[SlowQueryLog]:
+    """
+    A slow query log of every statement, for the Database layer; the disk cache is off, so every call runs.
+    """
+
+    log = SlowQueryLog(tmp_path, LOG_SIZE, threshold=0.0)
+    monkeypatch.setattr(SlowQueryLogHolder, 'log', log)
+    monkeypatch.setattr(CacheHolder, 'cache', None)
+    yield log
+    log.close()
+
+
+class TestSlowQueryLog:
+    """
+    Tests for the SlowQueryLog class.
+    """
+
+    async def test_records_statement_with_plan(self, conn: aiosqlite.Connection, slow_query_log: SlowQueryLog) -> None:
+        """
+        A slow statement should be recorded with its parameters, rows, and query plan.
+        """
+
+        await slow_query_log.record(conn, SCAN_QUERY, ['town'], 1, 0.75)
+
+        (entry,) = slow_query_log.entries()
+        assert entry.sql == SCAN_QUERY
+        assert entry.params == ['town']
+        assert entry.rows == 1
+        assert entry.plan is not None
+        assert any(step.startswith('SCAN placetypes') for step in entry.plan)
+
+    async def test_ignores_fast_statements(self, conn: aiosqlite.Connection, tmp_path: Path) -> None:
+        """
+        Statements within the threshold shouldn't be recorded.
+        """
+
+        slow_query_log = SlowQueryLog(tmp_path, LOG_SIZE, threshold=1.0)
+        await slow_query_log.record(conn, SCAN_QUERY, ['town'], 1, 0.5)
+
+        assert slow_query_log.entries() == []
+        slow_query_log.close()
+
+    async def test_keeps_most_recent(self, conn: aiosqlite.Connection, slow_query_log: SlowQueryLog) -> None:
+        """
+        The log should keep only its most recent statements, most recent first.
+        """
+
+        for _, shortname, _ in PLACETYPES:
+            await slow_query_log.record(conn, SCAN_QUERY, [shortname], 1, 1.0)
+
+        assert [entry.params for entry in slow_query_log.entries()] == [['suburb'], ['country']]
+
+
+class TestDatabaseStatements:
+    """
+    Tests for recording the Database layer's statements in the slow query log.
+    """
+
+    async def test_records_rows(self, conn: aiosqlite.Connection, slow_query_log: SlowQueryLog) -> None:
+        """
+        A Database method's statement should be recorded with the rows it returned.
+        """
+
+        placetypes = await Database(conn).get_placetypes()
+
+        (entry,) = slow_query_log.entries()
+        assert entry.sql == 'SELECT * FROM placetypes'
+        assert entry.rows == len(placetypes) == len(PLACETYPES)
+        assert entry.plan == ['SCAN placetypes']
+
+    async def test_records_interrupted_statements(
+        self,
+        conn: aiosqlite.Connection,
+        slow_query_log: SlowQueryLog,
+    ) -> None:
+        """
+        A statement interrupted for running over its budget should be recorded, without rows, but with its plan.
+        """
+
+        with pytest.raises(QueryInterruptedError):
+            async with query_budget(conn, SHORT_BUDGET):
+                await Database(conn)._fetch_one(ENDLESS_QUERY)  # noqa: SLF001
+
+        (entry,) = slow_query_log.entries()
+        assert entry.sql == ENDLESS_QUERY
+        assert entry.rows is None
+        assert entry.elapsed >= SHORT_BUDGET
+        assert entry.plan
@@ -0,0 +1,121 @@
+"""
+WOEplanet Spelunker: tests package; SQL statements tests.
+"""
+
+from woeplanet.spelunker.dependencies.database import (
+    PlaceFilters,
+    PlaceQueryShape,
+    _build_place_query,
+    _build_place_related_query,
+)
+from woeplanet.spelunker.dependencies.statements import select_sql
+
+SELECT_COLS = ('p.woe_id', 'p.name')
+JOINS = ('JOIN placetypes pt ON p.placetype_id = pt.id',)
+WHERE_CLAUSES = ('p.placetype_id = ?', 'p.woe_id > ?')
+
+
+class TestSelectSql:
+    """
+    Tests for the select_sql function.
+    """
+
+    def test_assembles_all_parts(self) -> None:
+        """
+        Every part should appear in the statement, in SQL order.
+        """
+
+        query = select_sql(SELECT_COLS, 'places p', JOINS, WHERE_CLAUSES, 'p.woe_id ASC', limit=True)
+
+        assert query.splitlines() == [
+            'SELECT p.woe_id, p.name',
+            'FROM places p',
+            'JOIN placetypes pt ON p.placetype_id = pt.id',
+            'WHERE p.placetype_id = ? AND p.woe_id > ?',
+            'ORDER BY p.woe_id ASC',
+            'LIMIT ?',
+        ]
+
+    def test_omits_empty_where(self) -> None:
+        """
+        A statement without where clauses shouldn't have a WHERE.
+        """
+
+        query = select_sql(('COUNT(*)',), 'places p')
+
+        assert 'WHERE' not in query
+
+    def test_same_shape_is_same_text(self) -> None:
+        """
+        The same shape, from different parts objects, should assemble the same statement text.
+        """
+
+        first = select_sql(SELECT_COLS, 'places p', JOINS, WHERE_CLAUSES)
+        select_cols, joins, where_clauses = [*SELECT_COLS], [*JOINS], [*WHERE_CLAUSES]
+        second = select_sql(tuple(select_cols), 'places p', tuple(joins), tuple(where_clauses))
+
+        assert first == second
+
+
+class TestBuildPlaceQuery:
+    """
+    Tests for the _build_place_query function.
+    """
+
+    def test_excluded_placetypes_dont_change_the_statement(self) -> None:
+        """
+        Different excluded placetypes should bind different parameters to the same statement.
+        """
+
+        first, _ = _build_place_query(PlaceQueryShape.from_filters(PlaceFilters(exclude_placetypes=[0])))
+        second, _ = _build_place_query(PlaceQueryShape.from_filters(PlaceFilters(exclude_placetypes=[0, 11, 25])))
+
+        assert first is second
+        assert first.count('?') == len(['woe_id', 'exclude_placetypes'])
+
+    def test_filters_shape_the_statement(self) -> None:
+        """
+        Filters that select different columns should build different statements and JSON fields.
+        """
+
+        full, full_fields = _build_place_query(PlaceQueryShape.from_filters(PlaceFilters()))
+        bare, bare_fields = _build_place_query(
+            PlaceQueryShape.from_filters(PlaceFilters(deprecated=True, exclude_placetypes=[])),
+        )
+
+        assert full != bare
+        assert 'supersedes' in full_fields
+        assert 'supersedes' not in bare_fields
+        assert 'json_each' not in bare
+
+
+class TestBuildPlaceRelatedQuery:
+    """
+    Tests for the _build_place_related_query function.
+    """
+
+    def test_selects_requested_relations(self) -> None:
+        """
+        Only the requested relations, and aliases, should be selected; one WOEID parameter per SELECT.
+        """
+
+        query = _build_place_related_query(
+            PlaceQueryShape.from_filters(PlaceFilters(ancestors=False, neighbours=False)),
+        )
+
+        assert query is not None
+        assert 'FROM children' in query
+        assert 'FROM aliases' in query
+        assert 'FROM ancestors' not in query
+        assert query.count('?') == len(['children', 'aliases'])
+
+    def test_nothing_related(self) -> None:
+        """
+        A shape without relations or names shouldn't need a related query.
+        """
+
+        shape = PlaceQueryShape.from_filters(
+            PlaceFilters(ancestors=False, neighbours=False, children=False, names=False),
+        )
+
+        assert _build_place_related_query(shape) is None
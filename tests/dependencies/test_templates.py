@@ -8,11 +8,14 @@ import pytest
 
 from woeplanet.spelunker.dependencies.templates import (
     any_filter,
+    collation_key,
     comma_filter,
     http_description_filter,
     http_phrase_filter,
+    load_placetype_inflections,
     name_type_filter,
     plural_filter,
+    unicode_sort_filter,
 )
 
 
@@ -52,6 +55,17 @@ class TestPluralFilter:
         assert plural_filter('town', 1) == 'town'
         assert plural_filter('town', 2) == 'towns'
 
+    def test_loaded_placetype_names(self) -> None:
+        """
+        Placetype names loaded from the database should pluralise as inflect would, as written or lower cased.
+        """
+
+        load_placetype_inflections(['Historical County'])
+
+        assert plural_filter('Historical County') == 'Historical Countys'  # as inflect has it, for a proper noun
+        assert plural_filter('historical county', 3) == 'historical counties'
+        assert plural_filter('historical county', 1) == 'historical county'
+
 
 class TestAnyFilter:
     """
@@ -80,6 +94,47 @@ class TestAnyFilter:
         assert any_filter('miscellaneous') == 'miscellaneous'
         assert any_filter('Miscellaneous') == 'Miscellaneous'
 
+    def test_other_words(self) -> None:
+        """
+        Words that aren't placetypes, such as language names, should still get their article.
+        """
+
+        assert any_filter('Icelandic') == 'an Icelandic'
+        assert any_filter('Welsh') == 'a Welsh'
+
+
+class TestUnicodeSortFilter:
+    """
+    Tests for the unicode_sort_filter function.
+    """
+
+    def test_collates_accents(self) -> None:
+        """
+        Accented names should sort with their unaccented letters, not after Z.
+        """
+
+        assert unicode_sort_filter(['Zürich', 'Évry', 'Paris']) == ['Évry', 'Paris', 'Zürich']
+
+    def test_sorts_by_attribute(self) -> None:
+        """
+        Mappings should sort by the named attribute.
+        """
+
+        places = [{'name': 'Óbidos'}, {'name': 'Lisboa'}, {'name': 'Aveiro'}]
+
+        assert [p['name'] for p in unicode_sort_filter(places, attribute='name')] == ['Aveiro', 'Lisboa', 'Óbidos']
+
+    def test_keys_are_cached(self) -> None:
+        """
+        A string's collation key should be computed once, and reused.
+        """
+
+        collation_key.cache_clear()
+        unicode_sort_filter(['Köln', 'Bonn'])
+        unicode_sort_filter(['Bonn', 'Köln'])
+
+        assert collation_key.cache_info().hits == len(['Köln', 'Bonn'])
+
 
 class TestHttpPhraseFilter:
     """
@@ -0,0 +1,241 @@
+"""
+WOEplanet Spelunker: tests package; lifespan tests.
+"""
+
+import asyncio
+import dataclasses
+import sqlite3
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+import pytest
+from aiosqlitepool import SQLiteConnectionPool
+from starlette.applications import Starlette
+
+from woeplanet.spelunker.dependencies.cache import close_cache, init_cache
+from woeplanet.spelunker.dependencies.database import Database, SearchFilters, get_db
+from woeplanet.spelunker.dependencies.query_budget import install_query_budget
+from woeplanet.spelunker.handlers import lifespan
+from woeplanet.spelunker.handlers.lifespan import PREWARM_FILTERS, PREWARM_LOCK_KEY, WARM_KEY, prewarm_cache
+
+FACET_QUERIES = ('get_total_woeids', 'get_placetype_facets', 'get_countries_facets')
+FILTER_COMBINATIONS = 2 ** len(dataclasses.fields(SearchFilters))
+LICENSES = [(1, 'CC-BY'), (2, 'CC0')]
+# the pre-warm's queries, and a request's
+POOL_SIZE = len(FACET_QUERIES) + 1
+TIMEOUT = 5.0  # seconds
+
+
+class RecordingDatabase:
+    """
+    Records the count and facets queries it's asked to run.
+    """
+
+    def __init__(self, calls: list[tuple[str, SearchFilters]]) -> None:
+        self._calls = calls
+
+    async def get_total_woeids(self, *, filters: SearchFilters) -> int:
+        self._calls.append(('get_total_woeids', filters))
+        return 0
+
+    async def get_placetype_facets(self, *, filters: SearchFilters) -> list[Any]:
+        self._calls.append(('get_placetype_facets', filters))
+        return []
+
+    async def get_countries_facets(self, *, filters: SearchFilters) -> list[Any]:
+        self._calls.append(('get_countries_facets', filters))
+        return []
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[Any]:
+    """
+    A disk cache, closed afterwards.
+    """
+
+    yield init_cache(tmp_path)
+    close_cache()
+
+
+@pytest.fixture
+async def app(tmp_path: Path) -> AsyncIterator[Starlette]:
+    """
+    An app with a pool of connections to a database of a few licenses, closed afterwards.
+    """
+
+    db_path = tmp_path / 'woeplanet.db'
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE licenses (id INTEGER PRIMARY KEY, name TEXT)')
+        conn.executemany('INSERT INTO licenses VALUES (?, ?)', LICENSES)
+    conn.close()
+
+    async def connection_factory() -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(str(db_path))
+        await install_query_budget(conn)
+        return conn
+
+    app = Starlette()
+    app.state.db_pool = SQLiteConnectionPool(connection_factory=connection_factory, pool_size=POOL_SIZE)
+    yield app
+    await app.state.db_pool.close()
+
+
+def patch_facets(monkeypatch: pytest.MonkeyPatch, facet: Callable[..., Awaitable[Any]]) -> None:
+    """
+    Replace the Database's count and facets queries with one query
+    """
+
+    for name in FACET_QUERIES:
+        monkeypatch.setattr(Database, name, facet)
+
+
+@pytest.fixture
+def batches(monkeypatch: pytest.MonkeyPatch) -> list[list[tuple[str, SearchFilters]]]:
+    """
+    The queries of each gather_db call the pre-warm makes.
+    """
+
+    recorded: list[list[tuple[str, SearchFilters]]] = []
+
+    async def gather_db(*queries: Callable[[Any], Awaitable[Any]], app: Starlette) -> list[Any]:
+        _ = app
+        calls: list[tuple[str, SearchFilters]] = []
+        results = [await query(RecordingDatabase(calls)) for query in queries]
+        recorded.append(calls)
+        return results
+
+    monkeypatch.setattr(lifespan, 'gather_db', gather_db)
+    return recorded
+
+
+class TestPrewarmCache:
+    """
+    Tests for the prewarm_cache function.
+    """
+
+    def test_every_filter_combination(self) -> None:
+        """
+        Every combination of filters should be pre-warmed, the default first.
+        """
+
+        assert len({dataclasses.astuple(filters) for filters in PREWARM_FILTERS}) == FILTER_COMBINATIONS
+        assert PREWARM_FILTERS[0] == SearchFilters()
+
+    async def test_facets_in_parallel_per_filters(
+        self,
+        cache: Any,  # noqa: ANN401
+        batches: list[list[tuple[str, SearchFilters]]],
+    ) -> None:
+        """
+        Each combination's count and facets should be gathered together, then the cache marked warm and unlocked.
+        """
+
+        await prewarm_cache(Starlette())
+
+        assert len(batches) == FILTER_COMBINATIONS
+        for batch, filters in zip(batches, PREWARM_FILTERS, strict=True):
+            assert batch == [(name, filters) for name in FACET_QUERIES]
+        assert cache.get(WARM_KEY)
+        assert cache.get(PREWARM_LOCK_KEY) is None
+
+    async def test_skips_warm_cache(self, cache: Any, batches: list[Any]) -> None:  # noqa: ANN401
+        """
+        A warm cache shouldn't be pre-warmed again.
+        """
+
+        cache.set(WARM_KEY, 1)
+
+        await prewarm_cache(Starlette())
+
+        assert batches == []
+
+    async def test_skips_while_another_worker_prewarms(self, cache: Any, batches: list[Any]) -> None:  # noqa: ANN401
+        """
+        A worker shouldn't pre-warm, or wait, while another worker holds the lock.
+        """
+
+        cache.add(PREWARM_LOCK_KEY, 1)
+
+        await prewarm_cache(Starlette())
+
+        assert batches == []
+        assert not cache.get(WARM_KEY)
+
+    async def test_failure_releases_lock(self, cache: Any, monkeypatch: pytest.MonkeyPatch) -> None:  # noqa: ANN401
+        """
+        A failed pre-warm should be logged, not raised, and leave the cache unlocked and cold.
+        """
+
+        async def gather_db(*_queries: Any, app: Starlette) -> list[Any]:  # noqa: ANN401
+            _ = app
+            msg = 'database is locked'
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr(lifespan, 'gather_db', gather_db)
+
+        await prewarm_cache(Starlette())
+
+        assert cache.get(PREWARM_LOCK_KEY) is None
+        assert not cache.get(WARM_KEY)
+
+    async def test_facets_run_concurrently(
+        self,
+        cache: Any,  # noqa: ANN401
+        app: Starlette,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        Each combination's count and facets should run at the same time, on their own pooled connections.
+        """
+
+        # none of a combination's queries returns until all of them are running
+        barrier = asyncio.Barrier(len(FACET_QUERIES))
+
+        async def facet(_db: Database, *, filters: SearchFilters) -> list[Any]:
+            _ = filters
+            async with asyncio.timeout(TIMEOUT):
+                await barrier.wait()
+            return []
+
+        patch_facets(monkeypatch, facet)
+
+        await prewarm_cache(app)
+
+        assert cache.get(WARM_KEY)
+
+    async def test_request_served_during_prewarm(
+        self,
+        cache: Any,  # noqa: ANN401
+        app: Starlette,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        A request's query should be answered while the pre-warm's queries are still running.
+        """
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def facet(_db: Database, *, filters: SearchFilters) -> list[Any]:
+            _ = filters
+            started.set()
+            await release.wait()
+            return []
+
+        patch_facets(monkeypatch, facet)
+
+        prewarm = asyncio.create_task(prewarm_cache(app))
+        try:
+            async with asyncio.timeout(TIMEOUT):
+                await started.wait()
+                async with get_db(app=app) as db:
+                    licenses = await db.get_licenses()
+            assert [(record['id'], record['name']) for record in licenses] == LICENSES
+            assert not prewarm.done()
+        finally:
+            release.set()
+            await prewarm
+
+        assert cache.get(WARM_KEY)
@@ -0,0 +1,130 @@
+"""
+WOEplanet Spelunker: tests package; admission control middleware tests.
+"""
+
+import asyncio
+from http import HTTPStatus
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from woeplanet.spelunker.config.admission import ADMISSION_LIMITS, AdmissionLimit, CostClass
+from woeplanet.spelunker.middleware.admission import AdmissionGate, AdmissionMiddleware
+
+SLOW_RESPONSE = 0.2  # seconds
+TIGHT_LIMIT = AdmissionLimit(concurrency=1, queue=1, max_wait=5.0, retry_after=3)
+
+
+async def slow_endpoint(request: Request) -> PlainTextResponse:
+    """
+    An endpoint that holds its admission slot for a while.
+    """
+
+    _ = request
+    await asyncio.sleep(SLOW_RESPONSE)
+    return PlainTextResponse('ok')
+
+
+def make_client() -> httpx.AsyncClient:
+    """
+    Create a client for an app with a listing route and an unclassified route.
+    """
+
+    routes = [
+        Route(path='/search', endpoint=slow_endpoint),
+        Route(path='/about', endpoint=slow_endpoint),
+    ]
+    app = Starlette(routes=routes, middleware=[Middleware(AdmissionMiddleware, routes=routes)])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+
+class TestAdmissionGate:
+    """
+    Tests for the AdmissionGate class.
+    """
+
+    async def test_admits_up_to_concurrency(self) -> None:
+        """
+        Requests within the concurrency limit should be admitted without waiting.
+        """
+
+        gate = AdmissionGate(TIGHT_LIMIT)
+
+        waited = await gate.acquire()
+
+        assert waited is not None
+        assert waited < SLOW_RESPONSE
+
+    async def test_sheds_past_queue(self) -> None:
+        """
+        Requests past the concurrency limit and a full queue should be shed straight away.
+        """
+
+        gate = AdmissionGate(TIGHT_LIMIT)
+        await gate.acquire()
+        queued = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+
+        assert await gate.acquire() is None
+
+        gate.release()
+        assert await queued is not None
+
+    async def test_sheds_after_max_wait(self) -> None:
+        """
+        Queued requests waiting past the max wait should be shed.
+        """
+
+        gate = AdmissionGate(AdmissionLimit(concurrency=1, queue=1, max_wait=0.01, retry_after=1))
+        await gate.acquire()
+
+        assert await gate.acquire() is None
+        assert gate.waiting == 0
+
+
+class TestAdmissionMiddleware:
+    """
+    Tests for the AdmissionMiddleware class.
+    """
+
+    async def test_reports_queue_wait_time(self) -> None:
+        """
+        Admitted requests to a classified route should report their queue wait time.
+        """
+
+        async with make_client() as client:
+            response = await client.get('/search')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['X-Queue-Wait-Time'].endswith('s')
+
+    async def test_unclassified_routes_are_not_limited(self) -> None:
+        """
+        Routes without a cost class should pass straight through.
+        """
+
+        async with make_client() as client:
+            response = await client.get('/about')
+
+        assert 'X-Queue-Wait-Time' not in response.headers
+
+    async def test_saturated_class_returns_503(self) -> None:
+        """
+        Requests past a saturated cost class's queue should get a 503 with Retry-After.
+        """
+
+        limit = ADMISSION_LIMITS[CostClass.LISTING]
+        burst = limit.concurrency + limit.queue + 1
+
+        async with make_client() as client:
+            responses = await asyncio.gather(*(client.get('/search') for _ in range(burst)))
+
+        statuses = [response.status_code for response in responses]
+        shed = [response for response in responses if response.status_code == HTTPStatus.SERVICE_UNAVAILABLE]
+        assert statuses.count(HTTPStatus.OK) == limit.concurrency + limit.queue
+        assert len(shed) == 1
+        assert shed[0].headers['Retry-After'] == str(limit.retry_after)
@@ -0,0 +1,120 @@
+"""
+WOEplanet Spelunker: tests package; metrics middleware tests.
+"""
+
+from http import HTTPStatus
+
+import httpx
+import pytest
+from pydantic import SecretStr
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from woeplanet.spelunker.common.metrics import REQUEST_SECONDS, UNMATCHED_ROUTE, render_metrics
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.middleware.metrics import MetricsMiddleware
+from woeplanet.spelunker.pages.metrics import metrics_endpoint
+
+PLACE_ROUTE = '/test/{woeid:int}'
+ADMIN_TOKEN = 'correct-horse-battery-staple'  # noqa: S105
+
+
+async def place_endpoint(request: Request) -> PlainTextResponse:
+    """
+    An endpoint with a path parameter.
+    """
+
+    return PlainTextResponse(str(request.path_params['woeid']))
+
+
+def make_client() -> httpx.AsyncClient:
+    """
+    Create a client for an app with a place route and a metrics route.
+    """
+
+    routes = [
+        Route(path=PLACE_ROUTE, endpoint=place_endpoint),
+        Route(path='/metrics', endpoint=metrics_endpoint),
+    ]
+    app = Starlette(routes=routes, middleware=[Middleware(MetricsMiddleware, routes=routes)])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+
+def request_count(route: str, status: HTTPStatus) -> float:
+    """
+    How many requests for a route, with a status, have been recorded.
+    """
+
+    for metric in REQUEST_SECONDS.collect():
+        for sample in metric.samples:
+            if (
+                sample.name.endswith('_count')
+                and sample.labels['route'] == route
+                and sample.labels['status'] == str(status.value)
+            ):
+                return sample.value
+
+    return 0.0
+
+
+class TestMetricsMiddleware:
+    """
+    Tests for the MetricsMiddleware class.
+    """
+
+    async def test_labels_by_route_path(self) -> None:
+        """
+        Requests for different places should be recorded against their one route.
+        """
+
+        before = request_count(PLACE_ROUTE, HTTPStatus.OK)
+
+        async with make_client() as client:
+            await client.get('/test/1')
+            await client.get('/test/2')
+
+        assert request_count(PLACE_ROUTE, HTTPStatus.OK) == before + len(['/test/1', '/test/2'])
+
+    async def test_unmatched_paths_share_a_label(self) -> None:
+        """
+        Requests that don't match a route shouldn't make a series of their own.
+        """
+
+        before = request_count(UNMATCHED_ROUTE, HTTPStatus.NOT_FOUND)
+
+        async with make_client() as client:
+            response = await client.get('/no/such/path')
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert request_count(UNMATCHED_ROUTE, HTTPStatus.NOT_FOUND) == before + 1
+
+    async def test_metrics_endpoint(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        The metrics endpoint should serve the recorded metrics in the Prometheus text format.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_admin_token', SecretStr(ADMIN_TOKEN))
+
+        async with make_client() as client:
+            await client.get('/test/1')
+            response = await client.get('/metrics', headers={'Authorization': f'Bearer {ADMIN_TOKEN}'})
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('text/plain')
+        assert 'woeplanet_request_seconds_bucket' in response.text
+        assert render_metrics().startswith(b'#')
+
+    async def test_metrics_endpoint_is_admin_only(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        The metrics endpoint should only serve requests with the admin token.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_admin_token', SecretStr(ADMIN_TOKEN))
+
+        async with make_client() as client:
+            response = await client.get('/metrics')
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
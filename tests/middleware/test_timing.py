@@ -0,0 +1,94 @@
+"""
+WOEplanet Spelunker: tests package; timing middleware tests.
+"""
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from woeplanet.spelunker.common.tracing import close_trace_exporter, init_trace_exporter, trace_span
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.middleware.timing import TimingMiddleware
+
+
+async def traced_endpoint(request: Request) -> PlainTextResponse:
+    """
+    An endpoint that runs a query.
+    """
+
+    _ = request
+    with trace_span('Database.get_place_by_id'):
+        pass
+
+    return PlainTextResponse('ok')
+
+
+def make_client() -> httpx.AsyncClient:
+    """
+    Create a client for an app with the timing middleware, as the settings are now.
+    """
+
+    app = Starlette(
+        routes=[Route('/', traced_endpoint)],
+        middleware=[Middleware(TimingMiddleware)],  # type: ignore[arg-type]
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+
+class TestTimingMiddleware:
+    """
+    Tests for the TimingMiddleware class.
+    """
+
+    async def test_page_load_time(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Requests should report their page load time, and not Server-Timing, unless it's set.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_server_timing', False)
+
+        async with make_client() as client:
+            response = await client.get('/')
+
+        assert response.headers['X-Page-Load-Time'].endswith('s')
+        assert 'Server-Timing' not in response.headers
+
+    async def test_server_timing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        With Server-Timing set, requests should report their spans, and their total.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_server_timing', True)
+
+        async with make_client() as client:
+            response = await client.get('/')
+
+        assert 'X-Page-Load-Time' in response.headers
+        metrics = [metric.partition(';')[0] for metric in response.headers['Server-Timing'].split(', ')]
+        assert metrics == ['Database.get_place_by_id', 'total']
+
+    async def test_trace_file(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        """
+        With a trace file set, each request's trace should be exported to it, with its response status.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_server_timing', False)
+        path = tmp_path / 'traces.jsonl'
+        init_trace_exporter(path)
+        try:
+            async with make_client() as client:
+                response = await client.get('/')
+        finally:
+            close_trace_exporter()
+
+        assert 'Server-Timing' not in response.headers
+        spans = json.loads(path.read_text(encoding='utf-8'))['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert [span['name'] for span in spans] == ['request', 'Database.get_place_by_id']
+        assert {'key': 'http.response.status_code', 'value': {'intValue': '200'}} in spans[0]['attributes']
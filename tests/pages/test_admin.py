@@ -0,0 +1,64 @@
+"""
+WOEplanet Spelunker: tests package; admin endpoints tests.
+"""
+
+from http import HTTPStatus
+
+import pytest
+from pydantic import SecretStr
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from woeplanet.spelunker.config.settings import get_settings
+from woeplanet.spelunker.pages.admin import authorize_admin
+
+ADMIN_TOKEN = 'correct-horse-battery-staple'  # noqa: S105
+
+
+def make_request(authorization: str | None = None) -> Request:
+    """
+    Create a request, with an Authorization header if given.
+    """
+
+    headers = [(b'authorization', authorization.encode())] if authorization else []
+    return Request({'type': 'http', 'method': 'GET', 'path': '/admin/slow-queries', 'headers': headers})
+
+
+class TestAuthorizeAdmin:
+    """
+    Tests for the authorize_admin function.
+    """
+
+    def test_not_found_without_admin_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Admin endpoints shouldn't exist unless an admin token is set.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_admin_token', None)
+
+        with pytest.raises(HTTPException) as exc_info:
+            authorize_admin(make_request(f'Bearer {ADMIN_TOKEN}'))
+
+        assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('authorization', [None, 'Bearer wrong', f'Basic {ADMIN_TOKEN}'])
+    def test_unauthorized(self, monkeypatch: pytest.MonkeyPatch, authorization: str | None) -> None:
+        """
+        Requests without the admin token as their bearer token should be unauthorized.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_admin_token', SecretStr(ADMIN_TOKEN))
+
+        with pytest.raises(HTTPException) as exc_info:
+            authorize_admin(make_request(authorization))
+
+        assert exc_info.value.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_authorized(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Requests with the admin token as their bearer token should be authorized.
+        """
+
+        monkeypatch.setattr(get_settings(), 'woeplanet_admin_token', SecretStr(ADMIN_TOKEN))
+
+        authorize_admin(make_request(f'Bearer {ADMIN_TOKEN}'))
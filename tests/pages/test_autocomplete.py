@@ -0,0 +1,59 @@
+"""
+WOEplanet Spelunker: tests package; autocomplete endpoint tests.
+"""
+
+from http import HTTPStatus
+
+from starlette.testclient import TestClient
+
+WOEID_LONDON = 44418
+SMALL_LIMIT = 3
+
+
+class TestAutocompleteEndpoint:
+    """
+    Tests for the autocomplete endpoint.
+    """
+
+    def test_autocomplete_returns_results(self, client: TestClient) -> None:
+        """
+        Autocomplete should return matching places as JSON, with caching headers.
+        """
+
+        response = client.get('/autocomplete?q=Londo')
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'] == 'application/json'
+        assert 'etag' in response.headers
+        assert 'max-age' in response.headers['cache-control']
+
+        data = response.json()
+        assert data['q'] == 'Londo'
+        assert WOEID_LONDON in [result['woe_id'] for result in data['results']]
+
+    def test_autocomplete_respects_limit(self, client: TestClient) -> None:
+        """
+        Autocomplete should return no more than limit results.
+        """
+
+        response = client.get(f'/autocomplete?q=L&limit={SMALL_LIMIT}')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) <= SMALL_LIMIT
+
+    def test_autocomplete_not_modified(self, client: TestClient) -> None:
+        """
+        Autocomplete should return 304 when the ETag matches.
+        """
+
+        response = client.get('/autocomplete?q=Londo')
+        etag = response.headers['etag']
+
+        response = client.get('/autocomplete?q=Londo', headers={'If-None-Match': etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_autocomplete_requires_query(self, client: TestClient) -> None:
+        """
+        Autocomplete should return 400 without a query.
+        """
+
+        response = client.get('/autocomplete')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -79,6 +79,56 @@ class TestPlaceMapEndpoint:
         assert response.status_code == HTTPStatus.OK
 
 
+class TestPlaceGeojsonEndpoint:
+    """
+    Tests for the place GeoJSON endpoint.
+    """
+
+    def test_place_geojson_returns_feature(self, client: TestClient) -> None:
+        """
+        Place GeoJSON should return a Feature with caching headers.
+        """
+
+        response = client.get(f'/id/{WOEID_LONDON}.geojson')
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('application/geo+json')
+        assert 'etag' in response.headers
+        assert 'max-age' in response.headers['cache-control']
+
+        feature = response.json()
+        assert feature['type'] == 'Feature'
+        assert feature['properties']['woe_id'] == WOEID_LONDON
+        assert feature['geometry'] is not None
+
+    def test_place_geojson_not_modified(self, client: TestClient) -> None:
+        """
+        Place GeoJSON should return 304 when the ETag matches.
+        """
+
+        response = client.get(f'/id/{WOEID_LONDON}.geojson?zoom=4')
+        etag = response.headers['etag']
+
+        response = client.get(f'/id/{WOEID_LONDON}.geojson?zoom=4', headers={'If-None-Match': etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_place_geojson_not_found(self, client: TestClient) -> None:
+        """
+        Place GeoJSON should return 404 for non-existent WOEID.
+        """
+
+        response = client.get('/id/999999999.geojson')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_place_map_references_geojson(self, client: TestClient) -> None:
+        """
+        Place map page should reference the GeoJSON endpoint rather than inline the geometry.
+        """
+
+        response = client.get(f'/id/{WOEID_LONDON}/map')
+        assert response.status_code == HTTPStatus.OK
+        assert f'/id/{WOEID_LONDON}.geojson' in response.text
+
+
 class TestPlaceNearbyEndpoint:
     """
     Tests for the place nearby endpoint - no centroid path.
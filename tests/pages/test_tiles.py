@@ -0,0 +1,62 @@
+"""
+WOEplanet Spelunker: tests package; vector tile endpoint tests.
+"""
+
+from http import HTTPStatus
+
+from starlette.testclient import TestClient
+
+TILE_LONDON = '/tiles/10/511/340.mvt'
+
+
+class TestTileEndpoint:
+    """
+    Tests for the vector tile endpoint.
+    """
+
+    def test_tile_returns_mvt(self, client: TestClient) -> None:
+        """
+        Tile should return a vector tile with caching headers.
+        """
+
+        response = client.get(f'{TILE_LONDON}?placetype=town')
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'] == 'application/vnd.mapbox-vector-tile'
+        assert 'etag' in response.headers
+        assert 'max-age' in response.headers['cache-control']
+
+    def test_tile_not_modified(self, client: TestClient) -> None:
+        """
+        Tile should return 304 when the ETag matches.
+        """
+
+        response = client.get(f'{TILE_LONDON}?placetype=town')
+        etag = response.headers['etag']
+
+        response = client.get(f'{TILE_LONDON}?placetype=town', headers={'If-None-Match': etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_tile_etag_varies_with_includes(self, client: TestClient) -> None:
+        """
+        Tiles with different include filters should be cached separately.
+        """
+
+        plain = client.get(f'{TILE_LONDON}?placetype=town')
+        deprecated = client.get(f'{TILE_LONDON}?placetype=town&include=deprecated')
+        assert plain.headers['etag'] != deprecated.headers['etag']
+
+    def test_tile_requires_placetype(self, client: TestClient) -> None:
+        """
+        Tile should return 400 without a placetype.
+        """
+
+        response = client.get(TILE_LONDON)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_tile_out_of_range(self, client: TestClient) -> None:
+        """
+        Tile should return 400 for coordinates outside the tile grid.
+        """
+
+        response = client.get('/tiles/1/5/0.mvt?placetype=town')
+        assert response.status_code == HTTPStatus.BAD_REQUEST